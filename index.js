@@ -10,25 +10,112 @@ j=d.createElement(s),dl=l!='dataLayer'?'&l='+l:'';j.async=true;j.src=
 })(window,document,'script','dataLayer','GTM-WVC4SNLB');
 // End Google Tag Manager
 
+// Precompiled data bundle (scripts/site_bundle.py): modules, statuses, recent signals and the
+// README section index in one small JSON request. Fetched once; null when it is not deployed,
+// in which case the raw README.md / modules.yml / latest.json are used instead.
+let bundlePromise = null;
+function loadBundle() {
+  if (!bundlePromise) {
+    bundlePromise = fetch('./bundle/site.json')
+      .then(resp => (resp.ok ? resp.json() : null))
+      .catch(() => null);
+  }
+  return bundlePromise;
+}
+
+// The bundle's part for a raw source file when the bundle has it, else the raw file's text.
+// No freshness check is needed here: the broadcast server rebuilds bundle/ before serving it
+// whenever README.md, modules.yml or the signals changed, and hosts without bundle/ (GitHub
+// Pages) answer site.json with a 404, so the raw file is only downloaded when it is needed.
+async function loadSource(name, pick) {
+  const bundle = await loadBundle();
+  const part = bundle ? pick(bundle) : null;
+  if (part) return { part, text: null };
+  const resp = await fetch('./' + name);
+  if (!resp.ok) throw new Error(name + ' not found');
+  return { part: null, text: await resp.text() };
+}
+
+// marked and js-yaml are only downloaded when a section actually needs them
+const scriptPromises = {};
+function loadScript(src) {
+  if (!scriptPromises[src]) {
+    scriptPromises[src] = new Promise(resolve => {
+      const el = document.createElement('script');
+      el.src = src;
+      el.onload = () => resolve(true);
+      el.onerror = () => resolve(false);
+      document.head.appendChild(el);
+    });
+  }
+  return scriptPromises[src];
+}
+const MARKED_URL = 'https://cdn.jsdelivr.net/npm/marked/marked.min.js';
+const JSYAML_URL = 'https://cdn.jsdelivr.net/npm/js-yaml@4.1.0/dist/js-yaml.min.js';
+
+async function renderMarkdown(md) {
+  await loadScript(MARKED_URL);
+  if (typeof marked === 'undefined') {
+    // If marked isn't available, render Markdown as preformatted text
+    return '<pre>' + escapeHtml(md) + '</pre>';
+  }
+  return marked.parse(md);
+}
+
 // Load and render README.md as HTML using marked.js
 async function loadReadme() {
   const readmeDiv = document.getElementById('readme-container');
   if (!readmeDiv) return;
+  if (readmeDiv.dataset.loaded) return;
+  let source;
   try {
-    const response = await fetch('./README.md');
-    if (!response.ok) {
-      throw new Error('README.md not found');
-    }
-    const md = await response.text();
-    if (typeof marked === 'undefined') {
-      // If marked isn't available, render Markdown as preformatted text
-      readmeDiv.innerHTML = '<pre>' + escapeHtml(md) + '</pre>';
-    } else {
-      readmeDiv.innerHTML = marked.parse(md);
-    }
+    source = await loadSource('README.md', b => (b.readme && b.readme.sections && b.readme.sections.length
+      ? b.readme.sections : null));
   } catch (error) {
     readmeDiv.innerHTML = '<p style="color:#888;"><em>README.md not found.</em></p>';
+    return;
+  }
+  if (source.part) {
+    await loadReadmeSections(readmeDiv, source.part);
+    return;
+  }
+  readmeDiv.innerHTML = await renderMarkdown(source.text);
+  readmeDiv.dataset.loaded = 'full';
+}
+
+// README from the bundle: a table of contents plus the intro; other sections load on click
+async function loadReadmeSections(readmeDiv, sections) {
+  readmeDiv.innerHTML = '';
+  const toc = document.createElement('nav');
+  toc.className = 'readme-toc';
+  const body = document.createElement('div');
+  body.className = 'readme-body';
+  readmeDiv.appendChild(toc);
+  readmeDiv.appendChild(body);
+
+  async function showSection(section) {
+    try {
+      const resp = await fetch('./bundle/' + section.file);
+      if (!resp.ok) throw new Error(section.file + ' not found');
+      body.innerHTML = await renderMarkdown(await resp.text());
+      toc.querySelectorAll('button').forEach(b => b.classList.toggle('active', b.dataset.slug === section.slug));
+    } catch (e) {
+      body.innerHTML = '<p style="color:#888;"><em>README section not available.</em></p>';
+    }
   }
+
+  sections.forEach(section => {
+    const btn = document.createElement('button');
+    btn.type = 'button';
+    btn.className = 'readme-toc-item';
+    btn.dataset.slug = section.slug;
+    btn.textContent = section.title;
+    if (section.subsections && section.subsections.length) btn.title = section.subsections.join(' · ');
+    btn.addEventListener('click', () => showSection(section));
+    toc.appendChild(btn);
+  });
+  await showSection(sections[0]);
+  readmeDiv.dataset.loaded = 'sections';
 }
 
 function escapeHtml(unsafe) {
@@ -196,11 +283,11 @@ document.addEventListener("DOMContentLoaded", () => {
 
   async function loadModulesYaml() {
     try {
-      const resp = await fetch('./seeds/modules.yml');
-      if (!resp.ok) throw new Error('modules.yml not found');
-      const text = await resp.text();
+      const source = await loadSource('seeds/modules.yml', b => b.modules);
+      if (source.part) return source.part;
       // parse YAML using js-yaml
-      const obj = window.jsyaml ? window.jsyaml.load(text) : null;
+      await loadScript(JSYAML_URL);
+      const obj = window.jsyaml ? window.jsyaml.load(source.text) : null;
       return obj;
     } catch (e) {
       console.warn('Failed to load modules.yml', e);
@@ -339,9 +426,10 @@ document.addEventListener("DOMContentLoaded", () => {
 
   async function loadArchiveSignals() {
     try {
-      const resp = await fetch('./signals/latest.json');
-      if (!resp.ok) throw new Error('signals/latest.json not found');
-      const data = await resp.json();
+      const source = await loadSource('signals/latest.json',
+        b => (Array.isArray(b.signals) && b.signals.length ? b.signals : null));
+      if (source.part) return source.part.slice();
+      const data = JSON.parse(source.text);
       // If the file is a single object (not an array), wrap it so renderSignalCards can iterate
       if (data && !Array.isArray(data)) return [data];
       return data;
@@ -426,13 +514,79 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   }
 
+  // Live updates: the broadcast server pushes each new broadcast over SSE
+  // (GET /api/broadcasts/stream), so the viewer never refetches latest.json / archive.latest.json.
+  // The stream is only opened once a quick probe shows a local server is running (the deployed
+  // site has none). EventSource resumes with Last-Event-ID after a dropped connection; a connect
+  // that fails, before the first open or on the retry after a drop, closes it for good until
+  // Signals is opened again.
+  const SIGNAL_STREAM_URL = 'http://127.0.0.1:5002/api/broadcasts/stream';
+  const SIGNAL_PROBE_URL = 'http://127.0.0.1:5002/api/broadcasts?limit=1';
+  const SIGNAL_PROBE_TIMEOUT_MS = 1500;
+  const MAX_LIVE_SIGNALS = 200;
+  let shownSignals = null;
+  let signalStream = null;
+  let signalProbe = null;
+
+  async function probeSignalServer() {
+    const controller = typeof AbortController !== 'undefined' ? new AbortController() : null;
+    const timer = controller ? setTimeout(() => controller.abort(), SIGNAL_PROBE_TIMEOUT_MS) : null;
+    try {
+      const resp = await fetch(SIGNAL_PROBE_URL, { signal: controller ? controller.signal : undefined });
+      return resp.ok;
+    } catch (e) {
+      return false;
+    } finally {
+      if (timer) clearTimeout(timer);
+    }
+  }
+
+  async function startSignalStream() {
+    if (signalStream || signalProbe || typeof EventSource === 'undefined') return;
+    signalProbe = probeSignalServer();
+    const available = await signalProbe;
+    signalProbe = null;
+    if (!available || signalStream) return;
+    const stream = new EventSource(SIGNAL_STREAM_URL);
+    signalStream = stream;
+    let connected = false;
+    stream.addEventListener('open', () => { connected = true; });
+    stream.addEventListener('error', () => {
+      if (connected && stream.readyState === EventSource.CONNECTING) {
+        // dropped after being open: allow the one automatic reconnect
+        connected = false;
+        return;
+      }
+      stream.close();
+      if (signalStream === stream) signalStream = null;
+    });
+    stream.addEventListener('broadcast', (ev) => {
+      try {
+        const entry = JSON.parse(ev.data);
+        shownSignals = [entry].concat(shownSignals || []).slice(0, MAX_LIVE_SIGNALS);
+        if (signalsSection && !signalsSection.hidden) renderSignalCards(shownSignals.slice());
+      } catch (e) {
+        console.warn('Bad broadcast event', e);
+      }
+    });
+    // the server could not replay everything we missed; start over from the files
+    stream.addEventListener('reset', async () => {
+      const data = await loadArchiveSignals();
+      shownSignals = Array.isArray(data) ? data : (data && data.items) ? data.items : null;
+      if (signalsSection && !signalsSection.hidden) renderSignalCards(shownSignals ? shownSignals.slice() : null);
+    });
+  }
+
   if (showSignalsBtn) showSignalsBtn.addEventListener('click', async () => {
-    const data = await loadArchiveSignals();
-    // support either an object with items array or an array directly
-    const items = Array.isArray(data) ? data : (data && data.items) ? data.items : null;
-    renderSignalCards(items);
+    if (!shownSignals) {
+      const data = await loadArchiveSignals();
+      // support either an object with items array or an array directly
+      shownSignals = Array.isArray(data) ? data : (data && data.items) ? data.items : null;
+    }
+    renderSignalCards(shownSignals ? shownSignals.slice() : null);
     if (signalsSection) signalsSection.hidden = false;
     signalsSection?.scrollIntoView({ behavior: 'smooth' });
+    startSignalStream();
   });
   if (hideSignalsBtn) hideSignalsBtn.addEventListener('click', () => { if (signalsSection) signalsSection.hidden = true; });
 
@@ -649,15 +803,26 @@ document.addEventListener("DOMContentLoaded", () => {
       console.warn('Failed to push to dataLayer', e);
     }
 
-    // Post to local broadcast server
+    // Post to local broadcast server. Resubmitting the same form contents (e.g. after a
+    // timeout) reuses the Idempotency-Key, so the server returns the first broadcast
+    // instead of storing a duplicate.
+    const body = JSON.stringify(formData);
+    if (form.dataset.idempotencyBody !== body) {
+      form.dataset.idempotencyBody = body;
+      form.dataset.idempotencyKey = window.crypto && crypto.randomUUID
+        ? crypto.randomUUID()
+        : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+    }
     try {
       const resp = await fetch('http://127.0.0.1:5002/api/broadcast', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(formData)
+        headers: { 'Content-Type': 'application/json', 'Idempotency-Key': form.dataset.idempotencyKey },
+        body
       });
       const result = await resp.json();
       if (resp.ok) {
+        // the next submit is a new broadcast, even with identical contents
+        delete form.dataset.idempotencyBody;
         // replace alert with inline success message inside modal
         const successDiv = document.createElement('div');
         successDiv.style.color = 'green';
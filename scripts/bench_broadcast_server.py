@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""Load benchmark for scripts/broadcast_server.py
+
+Starts the broadcast server in-process on an ephemeral loopback port (writing to a
+throwaway temp directory, never to data/internal or signals/), fires concurrent
+POST /api/broadcast requests at it and reports requests/second plus p50/p99 latency.
+
+Usage:
+  python3 scripts/bench_broadcast_server.py
+  python3 scripts/bench_broadcast_server.py --mode single --clients 8 --requests 50
+  python3 scripts/bench_broadcast_server.py --url http://127.0.0.1:5002   # hit a running server
+  python3 scripts/bench_broadcast_server.py --compare-batch 10000   # one-at-a-time vs POST /api/broadcasts
+  python3 scripts/bench_broadcast_server.py --workflow 10000        # workflow ingest + GET lookups
+  python3 scripts/bench_broadcast_server.py --durability --clients 16  # throughput per commit mode / durability policy
+  python3 scripts/bench_broadcast_server.py --storage sqlite        # any of the above on the SQLite engine
+  python3 scripts/bench_broadcast_server.py --stream 100,500,1000   # SSE delivery latency with N open streams
+  python3 scripts/bench_broadcast_server.py --metrics-overhead      # same load with /metrics recording on and off
+  python3 scripts/bench_broadcast_server.py --profile-overhead 100  # same load with profiling off / every 100th request
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import selectors
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import broadcast_server  # noqa: E402
+
+RATINGS = ['critical', 'high', 'normal', 'mundane']
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def sample_payload(rng, module_ids, status_ids):
+    return {
+        'moduleId': rng.choice(module_ids),
+        'broadcastRating': rng.choice(RATINGS),
+        # unique, so a server run with BROADCAST_IDEMPOTENCY_CONTENT_TTL still commits every request
+        'broadcastName': f'Bench broadcast {rng.getrandbits(48):012x}',
+        'broadcastSummary': 'Synthetic load generated by bench_broadcast_server.py',
+        'statusId': rng.choice(status_ids),
+        'artifactGitLink': 'https://zbreeden.github.io/FourTwentyAnalytics/',
+        'tagsKeys': ['bench', 'signal'],
+    }
+
+
+def seed_ids():
+    modules, statuses, _ = broadcast_server.load_seeds()
+    module_ids = sorted((modules or {}).keys()) or ['fourtwenty_analytics']
+    status_ids = sorted((statuses or {}).keys()) or ['developing']
+    return module_ids, status_ids
+
+
+def start_server(mode, workers, keepalive):
+    """Run the broadcast server in a background thread against a temp data root."""
+    root = tempfile.mkdtemp(prefix='broadcast-bench-')
+    broadcast_server.use_data_root(root)
+    broadcast_server.ensure_csv()
+    # per-request access logging to stderr would dominate the measurement
+    broadcast_server.Handler.log_message = lambda self, *args: None
+    httpd = broadcast_server.make_server('127.0.0.1', 0, mode=mode, workers=workers, keepalive=keepalive)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    return httpd, root
+
+
+def client_loop(host, port, path, payloads, keepalive, latencies, errors):
+    conn = None
+    for payload in payloads:
+        body = json.dumps(payload).encode('utf-8')
+        if conn is None or not keepalive:
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        t0 = time.perf_counter()
+        try:
+            conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+            if resp.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = None
+        except Exception as e:
+            errors.append(str(e))
+            conn.close()
+            conn = None
+        latencies.append(time.perf_counter() - t0)
+        if not keepalive and conn is not None:
+            conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+
+def run_load(host, port, clients, requests, keepalive, path='/api/broadcast', seed=420):
+    rng = random.Random(seed)
+    module_ids, status_ids = seed_ids()
+    latencies, errors = [], []
+    threads = []
+    for _ in range(clients):
+        payloads = [sample_payload(rng, module_ids, status_ids) for _ in range(requests)]
+        t = threading.Thread(target=client_loop, args=(host, port, path, payloads, keepalive, latencies, errors))
+        threads.append(t)
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    total = clients * requests
+    return {
+        'requests': total,
+        'errors': len(errors),
+        'seconds': round(elapsed, 4),
+        'rps': round(total / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def _stop(httpd, root):
+    httpd.shutdown()
+    httpd.server_close()
+    # drain the group writer before its files disappear
+    broadcast_server.close_commit()
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def compare_batch(n, workers, keepalive, seed=420):
+    """Ingest the same n records one request at a time and as single batch requests."""
+    rng = random.Random(seed)
+    module_ids, status_ids = seed_ids()
+    records = [sample_payload(rng, module_ids, status_ids) for _ in range(n)]
+    results = {'records': n}
+
+    httpd, root = start_server('threaded', workers, keepalive)
+    try:
+        latencies, errors = [], []
+        t0 = time.perf_counter()
+        client_loop(*httpd.server_address[:2], '/api/broadcast', records, True, latencies, errors)
+        elapsed = time.perf_counter() - t0
+        results['single'] = {'seconds': round(elapsed, 4), 'records_per_s': round(n / elapsed, 1), 'errors': len(errors)}
+    finally:
+        _stop(httpd, root)
+
+    bodies = {
+        'batch_json': ('application/json', json.dumps(records).encode('utf-8')),
+        'batch_ndjson': ('application/x-ndjson', ''.join(json.dumps(r) + '\n' for r in records).encode('utf-8')),
+    }
+    for name, (ctype, body) in bodies.items():
+        httpd, root = start_server('threaded', workers, keepalive)
+        try:
+            conn = http.client.HTTPConnection(*httpd.server_address[:2], timeout=600)
+            t0 = time.perf_counter()
+            conn.request('POST', '/api/broadcasts', body=body, headers={'Content-Type': ctype})
+            resp = conn.getresponse()
+            payload = json.loads(resp.read())
+            elapsed = time.perf_counter() - t0
+            conn.close()
+            results[name] = {
+                'seconds': round(elapsed, 4),
+                'records_per_s': round(n / elapsed, 1),
+                'accepted': payload.get('accepted'),
+                'rejected': payload.get('rejected'),
+            }
+        finally:
+            _stop(httpd, root)
+
+    single = results['single']['seconds']
+    for name in bodies:
+        results[name]['speedup'] = round(single / results[name]['seconds'], 1) if results[name]['seconds'] else None
+    return results
+
+
+DURABILITY_CASES = [
+    ('sync', 'none'),
+    ('group', 'none'),
+    ('group', 'batch-fsync'),
+    ('group', 'per-request-fsync'),
+    ('sync', 'per-request-fsync'),
+]
+
+
+def compare_durability(clients, requests, workers, keepalive, interval_ms=None):
+    """Run the same POST /api/broadcast load under each commit mode and durability policy."""
+    results = []
+    for mode, durability in DURABILITY_CASES:
+        httpd, root = start_server('threaded', workers, keepalive)
+        broadcast_server.configure_commit(mode, durability, interval_ms)
+        try:
+            result = run_load(*httpd.server_address[:2], clients, requests, keepalive=keepalive > 0)
+            result.update({'commit_mode': mode, 'durability': durability})
+            group = broadcast_server.commit_stats().get('group')
+            if group:
+                result['avg_requests_per_group'] = group['avg_requests_per_group']
+            results.append(result)
+        finally:
+            _stop(httpd, root)
+            broadcast_server.configure_commit()
+    return results
+
+
+def sample_workflow(i, rng, owners):
+    return {
+        'workflow_id': f'bench-wf-{i:07d}',
+        'workflow_name': f'Bench workflow {i}',
+        'workflow_description': 'Synthetic load generated by bench_broadcast_server.py',
+        'workflow_type': 'ci',
+        'workflow_creation_date': '2025-10-06',
+        'workflow_status': rng.choice(['queued', 'in_progress', 'success', 'failure']),
+        'workflow_owner': rng.choice(owners),
+        'workflow_last_updated': '2025-10-06',
+        'workflow_steps_integer': 3,
+        'workflow_steps_array': ['build', 'test', 'deploy'],
+        'workflow_artifacts_array': ['report.html'],
+    }
+
+
+def bench_workflows(n, workers, keepalive, lookups=2000, seed=420):
+    """Ingest n workflows (a batch, then single posts for status changes) and time the GET lookups."""
+    rng = random.Random(seed)
+    owners = [f'owner{i}' for i in range(25)]
+    records = [sample_workflow(i, rng, owners) for i in range(n)]
+    results = {'workflows': n}
+    httpd, root = start_server('threaded', workers, keepalive)
+    try:
+        host, port = httpd.server_address[:2]
+        conn = http.client.HTTPConnection(host, port, timeout=600)
+        t0 = time.perf_counter()
+        conn.request('POST', '/api/workflows', body=json.dumps(records).encode('utf-8'),
+                     headers={'Content-Type': 'application/json'})
+        payload = json.loads(conn.getresponse().read())
+        elapsed = time.perf_counter() - t0
+        results['ingest_batch'] = {'seconds': round(elapsed, 4), 'records_per_s': round(n / elapsed, 1),
+                                   'accepted': payload.get('accepted')}
+
+        updates = [dict(records[rng.randrange(n)], workflow_status='success') for _ in range(min(n, 2000))]
+        latencies, errors = [], []
+        t0 = time.perf_counter()
+        client_loop(host, port, '/api/workflow', updates, True, latencies, errors)
+        elapsed = time.perf_counter() - t0
+        results['ingest_single'] = {'records': len(updates), 'records_per_s': round(len(updates) / elapsed, 1),
+                                    'p50_ms': round(percentile(latencies, 50) * 1000, 3), 'errors': len(errors)}
+
+        cases = {
+            'get': lambda: f'/api/workflow/bench-wf-{rng.randrange(n):07d}',
+            'steps': lambda: f'/api/workflow/bench-wf-{rng.randrange(n):07d}/steps',
+            'by_status': lambda: f"/api/workflows?status={rng.choice(['queued', 'success'])}&limit=50",
+            'by_owner': lambda: f'/api/workflows?owner={rng.choice(owners)}&limit=50',
+        }
+        for name, make in cases.items():
+            latencies = []
+            for _ in range(lookups):
+                path = make()
+                t0 = time.perf_counter()
+                conn.request('GET', path)
+                resp = conn.getresponse()
+                resp.read()
+                latencies.append(time.perf_counter() - t0)
+            results[name] = {'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+                             'p99_ms': round(percentile(latencies, 99) * 1000, 3)}
+        conn.close()
+    finally:
+        _stop(httpd, root)
+    return results
+
+
+def compare_metrics(clients, requests, workers, keepalive, rounds=3):
+    """Alternate the same POST load with metrics recording on and off; best rps of each."""
+    runs = {'on': [], 'off': []}
+    for _ in range(rounds):
+        for label in ('off', 'on'):
+            httpd, root = start_server('threaded', workers, keepalive)
+            broadcast_server.METRICS.enabled = label == 'on'
+            try:
+                runs[label].append(run_load(*httpd.server_address[:2], clients, requests, keepalive=keepalive > 0))
+            finally:
+                _stop(httpd, root)
+                broadcast_server.METRICS.enabled = True
+    result = {}
+    for label, results in runs.items():
+        best = max(results, key=lambda r: r['rps'])
+        result[label] = {'rps': best['rps'], 'p50_ms': best['p50_ms'], 'p99_ms': best['p99_ms'],
+                         'all_rps': [r['rps'] for r in results]}
+    result['overhead_pct'] = round((result['off']['rps'] - result['on']['rps']) / result['off']['rps'] * 100, 2)
+    stages = broadcast_server.METRICS.snapshot()['histograms']
+    result['stages'] = {k: v for k, v in stages.items() if k.startswith('broadcast_stage_seconds')}
+    return result
+
+
+def compare_profile(every_values, clients, requests, workers, keepalive, tracemalloc_frames=0, rounds=3):
+    """Alternate the same POST load over profiler settings (every=0 is off); best rps of each."""
+    profiler = broadcast_server.PROFILER
+    runs = {every: [] for every in every_values}
+    summaries = {}
+    for _ in range(rounds):
+        for every in every_values:
+            httpd, root = start_server('threaded', workers, keepalive)
+            profiler.out_dir = os.path.join(root, 'profiles')
+            profiler.configure(every=every, tracemalloc_frames=tracemalloc_frames if every else 0, reset=True)
+            try:
+                runs[every].append(run_load(*httpd.server_address[:2], clients, requests, keepalive=keepalive > 0))
+                summaries[every] = profiler.summary(top=5)
+            finally:
+                profiler.configure(every=0, tracemalloc_frames=0)
+                _stop(httpd, root)
+    result = {}
+    for every, results in runs.items():
+        best = max(results, key=lambda r: r['rps'])
+        summary = summaries[every]
+        result[f'every_{every}' if every else 'off'] = {
+            'rps': best['rps'], 'p50_ms': best['p50_ms'], 'p99_ms': best['p99_ms'],
+            'all_rps': [r['rps'] for r in results], 'profiled': summary['profiled'],
+            'skipped_busy': summary['skipped_busy'], 'dumps_kept': len(summary['dumps']),
+            'top': [f"{row['function']} {row['tottime_ms']}ms" for row in summary['top']],
+        }
+    return result
+
+
+def _raise_fd_limit():
+    """Lift the soft open-file limit to the hard one (both ends of every stream live in this process)."""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard == resource.RLIM_INFINITY or hard > soft:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536,) * 2)
+        return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    except Exception:
+        return None
+
+
+def _open_stream(host, port):
+    sock = socket.create_connection((host, port), timeout=10)
+    sock.sendall(f'GET /api/broadcasts/stream HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('ascii'))
+    head = b''
+    while b'\r\n\r\n' not in head:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError('stream closed before headers')
+        head += chunk
+    if not head.startswith(b'HTTP/1.1 200') and not head.startswith(b'HTTP/1.0 200'):
+        raise ConnectionError(head.split(b'\r\n', 1)[0].decode('ascii', 'replace'))
+    sock.setblocking(False)
+    return sock, head.split(b'\r\n\r\n', 1)[1]
+
+
+def bench_stream(counts, posts, workers, keepalive, seed=420):
+    """Open N SSE streams, POST broadcasts one by one and time each event's arrival at every stream."""
+    rng = random.Random(seed)
+    module_ids, status_ids = seed_ids()
+    fd_limit = _raise_fd_limit()
+    results = {'fd_limit': fd_limit, 'posts': posts, 'runs': []}
+    for n in counts:
+        httpd, root = start_server('threaded', workers, keepalive)
+        host, port = httpd.server_address[:2]
+        socks, buffers = [], {}
+        run = {'streams': n}
+        try:
+            t0 = time.perf_counter()
+            try:
+                for _ in range(n):
+                    sock, rest = _open_stream(host, port)
+                    socks.append(sock)
+                    buffers[sock] = rest
+            except OSError as e:
+                run['connect_error'] = str(e)
+            run['connected'] = len(socks)
+            run['connect_seconds'] = round(time.perf_counter() - t0, 3)
+
+            sent_at, arrivals = {}, []
+            expected = len(socks) * posts
+            done = threading.Event()
+
+            def reader():
+                sel = selectors.DefaultSelector()
+                for sock in socks:
+                    sel.register(sock, selectors.EVENT_READ)
+                deadline = time.perf_counter() + 60 + posts * 0.05
+                while len(arrivals) < expected and time.perf_counter() < deadline:
+                    for key, _ in sel.select(0.5):
+                        try:
+                            chunk = key.fileobj.recv(65536)
+                        except BlockingIOError:
+                            continue
+                        now = time.perf_counter()
+                        if not chunk:
+                            sel.unregister(key.fileobj)
+                            continue
+                        buf = buffers[key.fileobj] + chunk
+                        *frames, buffers[key.fileobj] = buf.split(b'\n\n')
+                        for frame in frames:
+                            if b'event: broadcast' not in frame:
+                                continue
+                            data = frame.split(b'data: ', 1)[1]
+                            name = json.loads(data).get('broadcast.name')
+                            if name in sent_at:
+                                arrivals.append(now - sent_at[name])
+                sel.close()
+                done.set()
+
+            thread = threading.Thread(target=reader, daemon=True)
+            thread.start()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            post_latencies = []
+            for i in range(posts):
+                payload = sample_payload(rng, module_ids, status_ids)
+                payload['broadcastName'] = f'stream-bench-{i}'
+                body = json.dumps(payload).encode('utf-8')
+                sent_at[payload['broadcastName']] = t1 = time.perf_counter()
+                conn.request('POST', '/api/broadcast', body=body, headers={'Content-Type': 'application/json'})
+                conn.getresponse().read()
+                post_latencies.append(time.perf_counter() - t1)
+                # one event at a time, so latency is not dominated by queueing behind the previous one
+                time.sleep(0.02)
+            conn.close()
+            done.wait(120)
+            run.update({
+                'delivered': len(arrivals),
+                'expected': expected,
+                'delivery_p50_ms': round(percentile(arrivals, 50) * 1000, 3),
+                'delivery_p99_ms': round(percentile(arrivals, 99) * 1000, 3),
+                'delivery_max_ms': round(max(arrivals) * 1000, 3) if arrivals else None,
+                'post_p50_ms': round(percentile(post_latencies, 50) * 1000, 3),
+                'post_p99_ms': round(percentile(post_latencies, 99) * 1000, 3),
+                'server_stream': broadcast_server.STREAM.stats(),
+            })
+        finally:
+            for sock in socks:
+                sock.close()
+            _stop(httpd, root)
+        results['runs'].append(run)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', default='threaded', choices=['threaded', 'single'])
+    parser.add_argument('--workers', type=int, default=broadcast_server.DEFAULT_WORKERS)
+    parser.add_argument('--keepalive', type=float, default=broadcast_server.DEFAULT_KEEPALIVE,
+                        help='server keep-alive timeout; 0 makes clients reconnect per request')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100, help='requests per client')
+    parser.add_argument('--url', default=None, help='benchmark an already running server instead')
+    parser.add_argument('--compare-batch', type=int, default=0, metavar='N',
+                        help='compare N one-at-a-time posts against POST /api/broadcasts')
+    parser.add_argument('--durability', action='store_true',
+                        help='compare throughput for each commit mode and durability policy')
+    parser.add_argument('--commit-interval-ms', type=float, default=None,
+                        help='group commit wait for --durability (default: server setting)')
+    parser.add_argument('--workflow', type=int, default=0, metavar='N',
+                        help='ingest N workflows and time GET /api/workflow lookups')
+    parser.add_argument('--storage', default=broadcast_server.STORAGE, choices=['csv', 'sqlite', 'partitioned'],
+                        help='broadcast storage engine for the in-process server')
+    parser.add_argument('--stream', default=None, metavar='N[,N...]',
+                        help='open N SSE streams and time delivery of --requests broadcasts to each')
+    parser.add_argument('--metrics-overhead', action='store_true',
+                        help='compare throughput with metrics recording on and off')
+    parser.add_argument('--profile-overhead', default=None, metavar='N[,N...]',
+                        help='compare throughput with profiling off and on for every Nth request')
+    parser.add_argument('--tracemalloc', type=int, default=0, metavar='FRAMES',
+                        help='with --profile-overhead, also snapshot tracemalloc with this many frames')
+    args = parser.parse_args(argv)
+    broadcast_server.configure_storage(args.storage)
+
+    if args.profile_overhead:
+        every_values = [0] + [int(v) for v in args.profile_overhead.split(',') if v.strip()]
+        result = compare_profile(every_values, args.clients, args.requests, args.workers, args.keepalive,
+                                 tracemalloc_frames=args.tracemalloc)
+        print(json.dumps(result, indent=2), flush=True)
+        return result
+    if args.metrics_overhead:
+        result = compare_metrics(args.clients, args.requests, args.workers, args.keepalive)
+        print(json.dumps(result, indent=2), flush=True)
+        return result
+
+    if args.stream:
+        counts = [int(n) for n in args.stream.split(',') if n.strip()]
+        result = bench_stream(counts, args.requests, args.workers, args.keepalive)
+        print(json.dumps(result, indent=2), flush=True)
+        return result
+
+    if args.durability:
+        result = compare_durability(args.clients, args.requests, args.workers, args.keepalive, args.commit_interval_ms)
+        print(json.dumps(result, indent=2), flush=True)
+        return result
+
+    if args.workflow:
+        result = bench_workflows(args.workflow, args.workers, args.keepalive)
+        print(json.dumps(result, indent=2), flush=True)
+        return result
+
+    if args.compare_batch:
+        result = compare_batch(args.compare_batch, args.workers, args.keepalive)
+        print(json.dumps(result, indent=2), flush=True)
+        return result
+
+    root = None
+    httpd = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        httpd, root = start_server(args.mode, args.workers, args.keepalive)
+        host, port = httpd.server_address[:2]
+    try:
+        result = run_load(host, port, args.clients, args.requests, keepalive=args.keepalive > 0)
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+            httpd.server_close()
+        if root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    result.update({'mode': args.mode, 'workers': args.workers, 'clients': args.clients, 'keepalive': args.keepalive,
+                   'storage': args.storage})
+    print(json.dumps(result, indent=2), flush=True)
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""Reproducible benchmark suite for the ingest and normalize paths at production scale.
+
+Generates a seeded dataset with scripts/synth_data.py (broadcast log with malformed rows,
+signals archive, workflow CSVs, modules list), then runs each phase against a scratch copy
+of it and writes one JSON results file that can be diffed against another commit's:
+
+  generate          synth_data.write_all: rows/s and MB written
+  normalize         normalize_broadcast_csv.normalize on the raw (malformed) log: rows/s,
+                    MB/s, rows repaired/skipped
+  server_inprocess  broadcast_server with its data root on the normalized log: engine bootstrap
+                    and index warm-up, then prepare_broadcast + write_broadcasts from --clients
+                    threads (no HTTP) and STORE.query with random filters, date ranges and paging
+  server_http       the same server on a loopback port: concurrent POST /api/broadcast, then
+                    concurrent GET /api/broadcasts
+  workflows         workflow_store on the generated CSVs: cold open, get/steps/find lookups
+  seed_integrity    seed_integrity.check with the generated modules list in place of modules.yml
+
+Every phase runs in a fresh child process, so its peak RSS (ru_maxrss) is its own and no
+phase warms a cache for the next; rss_baseline_mb is the child's footprint after imports.
+Latencies are reported as p50/p90/p99/p999/max in ms. With --repeat N each phase runs N
+times and the median of every metric is kept (the raw runs are kept under "runs").
+
+The dataset is keyed by rows/seed/malformed and cached under --data-dir, so repeated runs
+and runs on other commits measure the same bytes; without --data-dir it lives in a temp
+directory that is removed afterwards. Results go to data/bench/<commit>-<rows>.json unless
+--out is given; the file records the commit, interpreter, platform and every parameter.
+
+`compare` prints the change of every metric between two results files and exits 1 when
+one regressed by more than --threshold percent (throughput down, latency/time/RSS up).
+
+Usage:
+  python3 scripts/bench_suite.py run                                  # 100k rows, every phase
+  python3 scripts/bench_suite.py run --rows 1000000 --data-dir /tmp/bench-data --repeat 3
+  python3 scripts/bench_suite.py run --phases normalize,server_http --storage sqlite
+  python3 scripts/bench_suite.py compare data/bench/<old>.json data/bench/<new>.json --threshold 10
+"""
+import argparse
+import calendar
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+RESULTS_DIR = os.path.join(REPO_ROOT, 'data', 'bench')
+PHASES = ('generate', 'normalize', 'server_inprocess', 'server_http', 'workflows', 'seed_integrity')
+DEFAULT_ROWS = 100000
+DEFAULT_THRESHOLD = 10.0
+RESULTS_VERSION = 1
+# metric name suffix -> whether a larger value is better; anything else is only reported when it changes
+HIGHER_IS_BETTER = ('rps', 'per_sec')
+LOWER_IS_BETTER = ('_ms', 'seconds', '_mb')
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_stats(prefix, samples):
+    """Flat {prefix_p50_ms, ..., prefix_max_ms} from samples in seconds."""
+    from bench_broadcast_server import percentile
+    out = {}
+    for name, pct in (('p50', 50), ('p90', 90), ('p99', 99), ('p999', 99.9)):
+        out[f'{prefix}_{name}_ms'] = round(percentile(samples, pct) * 1000, 3)
+    out[f'{prefix}_max_ms'] = round(max(samples) * 1000, 3) if samples else 0.0
+    return out
+
+
+def dataset_root(params):
+    return os.path.join(params['data_dir'], 'rows{rows}-seed{seed}-malformed{malformed}'.format(**params))
+
+
+def _scratch_root(params):
+    """A throwaway data root holding a copy of the dataset's log (normalized) and archive."""
+    import normalize_broadcast_csv
+    src = dataset_root(params)
+    root = tempfile.mkdtemp(prefix='bench-suite-', dir=params['data_dir'])
+    data_dir = os.path.join(root, 'data', 'internal')
+    os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, 'broadcast.csv')
+    shutil.copyfile(os.path.join(src, 'data', 'internal', 'broadcast.csv'), csv_path)
+    # the server reads the log the normalizer leaves behind, as in production
+    normalize_broadcast_csv.normalize(csv_path)
+    shutil.copytree(os.path.join(src, 'signals'), os.path.join(root, 'signals'))
+    return root
+
+
+# -- phases (each runs in its own child process) --------------------------------------------------------
+
+def phase_generate(params):
+    import synth_data
+    root = dataset_root(params)
+    shutil.rmtree(root, ignore_errors=True)
+    t0 = time.perf_counter()
+    stats = synth_data.write_all(root, params['rows'], params['seed'], params['malformed'])
+    elapsed = time.perf_counter() - t0
+    total_bytes = sum(s['bytes'] for s in stats.values())
+    return {
+        'seconds': round(elapsed, 3),
+        'broadcast_rows_per_sec': stats['broadcast']['rows_per_sec'],
+        'broadcast_bytes': stats['broadcast']['bytes'],
+        'malformed_rows': sum(stats['broadcast']['malformed'].values()),
+        'archive_entries': stats['archive']['rows'],
+        'workflows': stats['workflows']['rows'],
+        'modules': stats['modules']['rows'],
+        'total_mb_per_sec': round(total_bytes / elapsed / 1e6, 2) if elapsed else None,
+    }
+
+
+def phase_normalize(params):
+    import normalize_broadcast_csv
+    root = tempfile.mkdtemp(prefix='bench-suite-', dir=params['data_dir'])
+    try:
+        path = os.path.join(root, 'broadcast.csv')
+        shutil.copyfile(os.path.join(dataset_root(params), 'data', 'internal', 'broadcast.csv'), path)
+        stats = normalize_broadcast_csv.normalize(path)
+        return {
+            'seconds': stats['seconds'],
+            'rows': stats['rows'],
+            'repaired': stats['repaired'],
+            'skipped': stats['skipped'],
+            'rows_per_sec': stats['rows_per_sec'],
+            'mb_per_sec': stats['mb_per_sec'],
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _open_server_root(params):
+    """Point broadcast_server at a scratch root on the configured engine; returns (root, timings)."""
+    import broadcast_server
+    root = _scratch_root(params)
+    broadcast_server.use_data_root(root)
+    broadcast_server.configure_storage(params['storage'])
+    out = {}
+    t0 = time.perf_counter()
+    if params['storage'] in ('sqlite', 'partitioned'):
+        broadcast_server.STORE.bootstrap(broadcast_server.CSV_PATH)
+    out['bootstrap_seconds'] = round(time.perf_counter() - t0, 3)
+    t0 = time.perf_counter()
+    broadcast_server.STORE.warm()
+    out['warm_seconds'] = round(time.perf_counter() - t0, 3)
+    return root, out
+
+
+def _query_cases(rng, module_ids, status_ids, ratings):
+    """Yield (filters dict, date_from, date_to, pages) for random queries over the generated span."""
+    from broadcast_query import FILTER_FIELDS
+    import synth_data
+    start = calendar.timegm(time.strptime(synth_data.DEFAULT_START, '%Y-%m-%d'))
+    span = synth_data.DEFAULT_DAYS * 86400
+    while True:
+        filters = {field: set() for field in FILTER_FIELDS}
+        kind = rng.random()
+        if kind < 0.4:
+            filters['module.id'].add(rng.choice(module_ids))
+        elif kind < 0.6:
+            filters['status.id'].add(rng.choice(status_ids))
+        elif kind < 0.8:
+            filters['broadcast.rating'].add(rng.choice(ratings))
+        date_from = date_to = None
+        if rng.random() < 0.5:
+            first = start + rng.random() * span * 0.9
+            date_from = time.strftime('%Y-%m-%d', time.gmtime(first))
+            date_to = time.strftime('%Y-%m-%d', time.gmtime(first + rng.randint(1, 60) * 86400))
+        yield filters, date_from, date_to, rng.choice((1, 1, 1, 3))
+
+
+def phase_server_inprocess(params):
+    import broadcast_server
+    from bench_broadcast_server import RATINGS, sample_payload, seed_ids
+    root, out = _open_server_root(params)
+    try:
+        rng = random.Random(params['seed'])
+        module_ids, status_ids = seed_ids()
+        clients, per_client = params['clients'], params['requests']
+        payloads = [[sample_payload(rng, module_ids, status_ids) for _ in range(per_client)] for _ in range(clients)]
+        latencies, errors = [], []
+
+        def ingest(batch):
+            for payload in batch:
+                t0 = time.perf_counter()
+                try:
+                    entry = broadcast_server.prepare_broadcast(payload, broadcast_server.SEEDS.snapshot())
+                    broadcast_server.write_broadcasts([entry])
+                except Exception as e:
+                    errors.append(str(e))
+                latencies.append(time.perf_counter() - t0)
+
+        # the first write pays for loading the id index, rollups and archive; keep it out of the percentiles
+        ingest([sample_payload(rng, module_ids, status_ids)])
+        out['first_write_ms'] = round(latencies.pop() * 1000, 3)
+        threads = [threading.Thread(target=ingest, args=(batch,)) for batch in payloads]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        out.update({'ingest_requests': clients * per_client, 'ingest_errors': len(errors),
+                    'ingest_rps': round(clients * per_client / elapsed, 1)})
+        out.update(latency_stats('ingest', latencies))
+
+        latencies, rows = [], 0
+        cases = _query_cases(rng, module_ids, status_ids, RATINGS)
+        t0 = time.perf_counter()
+        for _ in range(params['queries']):
+            filters, date_from, date_to, pages = next(cases)
+            cursor = None
+            for _ in range(pages):
+                q0 = time.perf_counter()
+                items, cursor = broadcast_server.STORE.query(filters, date_from, date_to, limit=50, cursor=cursor)
+                latencies.append(time.perf_counter() - q0)
+                rows += len(items)
+                if cursor is None:
+                    break
+        elapsed = time.perf_counter() - t0
+        out.update({'queries': len(latencies), 'query_rows': rows, 'query_rps': round(len(latencies) / elapsed, 1)})
+        out.update(latency_stats('query', latencies))
+        return out
+    finally:
+        broadcast_server.close_commit()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def phase_server_http(params):
+    import http.client
+    import urllib.parse
+    import broadcast_server
+    from bench_broadcast_server import RATINGS, client_loop, sample_payload, seed_ids
+    root, out = _open_server_root(params)
+    broadcast_server.Handler.log_message = lambda self, *args: None
+    httpd = broadcast_server.make_server('127.0.0.1', 0, workers=params['workers'] or broadcast_server.DEFAULT_WORKERS,
+                                         keepalive=broadcast_server.DEFAULT_KEEPALIVE)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    host, port = httpd.server_address[:2]
+    try:
+        rng = random.Random(params['seed'])
+        module_ids, status_ids = seed_ids()
+        clients, per_client = params['clients'], params['requests']
+        latencies, errors = [], []
+        client_loop(host, port, '/api/broadcast', [sample_payload(rng, module_ids, status_ids)], True, latencies,
+                    errors)
+        out['first_write_ms'] = round(latencies.pop() * 1000, 3)
+        threads = []
+        for _ in range(clients):
+            batch = [sample_payload(rng, module_ids, status_ids) for _ in range(per_client)]
+            threads.append(threading.Thread(target=client_loop,
+                                            args=(host, port, '/api/broadcast', batch, True, latencies, errors)))
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        out.update({'post_requests': clients * per_client, 'post_errors': len(errors),
+                    'post_rps': round(clients * per_client / elapsed, 1)})
+        out.update(latency_stats('post', latencies))
+
+        cases = _query_cases(rng, module_ids, status_ids, RATINGS)
+        paths = []
+        for _ in range(params['queries']):
+            filters, date_from, date_to, _ = next(cases)
+            query = {field: ','.join(sorted(values)) for field, values in filters.items() if values}
+            query.update({k: v for k, v in (('from', date_from), ('to', date_to)) if v})
+            query['limit'] = 50
+            paths.append('/api/broadcasts?' + urllib.parse.urlencode(query))
+        latencies, errors = [], []
+
+        def get_loop(batch):
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+            for path in batch:
+                t0 = time.perf_counter()
+                try:
+                    conn.request('GET', path)
+                    resp = conn.getresponse()
+                    resp.read()
+                    if resp.status != 200:
+                        errors.append(resp.status)
+                except Exception as e:
+                    errors.append(str(e))
+                    conn.close()
+                    conn = http.client.HTTPConnection(host, port, timeout=60)
+                latencies.append(time.perf_counter() - t0)
+            conn.close()
+
+        threads = [threading.Thread(target=get_loop, args=(paths[i::clients],)) for i in range(clients)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        out.update({'get_requests': len(paths), 'get_errors': len(errors), 'get_rps': round(len(paths) / elapsed, 1)})
+        out.update(latency_stats('get', latencies))
+        return out
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        broadcast_server.close_commit()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def phase_workflows(params):
+    from workflow_store import WorkflowStore
+    src = os.path.join(dataset_root(params), 'data', 'internal')
+    root = tempfile.mkdtemp(prefix='bench-suite-', dir=params['data_dir'])
+    try:
+        paths = []
+        for name in ('master.workflow.csv', 'steps.workflow.csv'):
+            paths.append(os.path.join(root, name))
+            shutil.copyfile(os.path.join(src, name), paths[-1])
+        rng = random.Random(params['seed'])
+        n = max(1, params['rows'] // 10)
+        store = WorkflowStore(*paths)
+        t0 = time.perf_counter()
+        store.get('wf-00000000')
+        out = {'workflows': n, 'open_seconds': round(time.perf_counter() - t0, 3)}
+        import synth_data
+        statuses = list(synth_data.SeedIds().workflow_steps)
+        cases = {
+            'get': lambda: store.get(f'wf-{rng.randrange(n):08d}'),
+            'steps': lambda: store.steps(f'wf-{rng.randrange(n):08d}'),
+            'find_status': lambda: store.find(status=rng.choice(statuses)),
+        }
+        for name, fn in cases.items():
+            samples = []
+            for _ in range(params['queries']):
+                t0 = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - t0)
+            out.update(latency_stats(name, samples))
+        return out
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def phase_seed_integrity(params):
+    import seed_integrity
+    seeds = tempfile.mkdtemp(prefix='bench-suite-', dir=params['data_dir'])
+    try:
+        for name in seed_integrity.SEED_FILES:
+            src = os.path.join(seed_integrity.SEEDS_DIR, name)
+            if os.path.exists(src):
+                shutil.copyfile(src, os.path.join(seeds, name))
+        shutil.copyfile(os.path.join(dataset_root(params), 'seeds', 'modules.yml'), os.path.join(seeds, 'modules.yml'))
+        t0 = time.perf_counter()
+        report = seed_integrity.check(seeds)
+        return {
+            'seconds': round(time.perf_counter() - t0, 3),
+            'parse_ms': round(report['parse_seconds'] * 1000, 2),
+            'check_ms': round(report['check_seconds'] * 1000, 2),
+            'references': report['references_checked'],
+            'findings': len(report['findings']),
+        }
+    finally:
+        shutil.rmtree(seeds, ignore_errors=True)
+
+
+PHASE_FUNCS = {
+    'generate': phase_generate,
+    'normalize': phase_normalize,
+    'server_inprocess': phase_server_inprocess,
+    'server_http': phase_server_http,
+    'workflows': phase_workflows,
+    'seed_integrity': phase_seed_integrity,
+}
+
+
+def run_phase_child(name, params_path, result_path):
+    """Entry point of the child process: run one phase and write its metrics as JSON."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    with open(params_path, 'r', encoding='utf-8') as f:
+        params = json.load(f)
+    # import what every server phase needs before reading the baseline, so it is comparable
+    if name.startswith('server'):
+        import broadcast_server  # noqa: F401
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    out = PHASE_FUNCS[name](params)
+    out['wall_seconds'] = round(time.perf_counter() - t0, 3)
+    out['rss_baseline_mb'] = baseline
+    out['peak_rss_mb'] = peak_rss_mb()
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(out, f)
+
+
+def run_phase(name, params):
+    """Run one phase in a fresh interpreter; returns its metrics (or {'error': ...})."""
+    fd, params_path = tempfile.mkstemp(prefix='bench-params-', suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    result_path = params_path[:-len('.json')] + '.result.json'
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '_phase', name, params_path, result_path],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0 or not os.path.exists(result_path):
+            return {'error': (proc.stderr or f'exit status {proc.returncode}').strip().splitlines()[-1]}
+        with open(result_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        for path in (params_path, result_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else round((ordered[mid - 1] + ordered[mid]) / 2, 3)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True,
+                              timeout=30).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment():
+    try:
+        import yaml
+        cloader = hasattr(yaml, 'CSafeLoader')
+    except Exception:
+        cloader = None
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'yaml_cloader': cloader,
+        'env': {k: v for k, v in sorted(os.environ.items()) if k.startswith('BROADCAST_')},
+    }
+
+
+def run(args):
+    phases = [p.strip() for p in args.phases.split(',') if p.strip()] if args.phases else list(PHASES)
+    unknown = [p for p in phases if p not in PHASES]
+    if unknown:
+        raise SystemExit(f'unknown phase(s): {", ".join(unknown)}; choose from {", ".join(PHASES)}')
+    temp_data = args.data_dir is None
+    data_dir = tempfile.mkdtemp(prefix='bench-suite-data-') if temp_data else os.path.abspath(args.data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    params = {'rows': args.rows, 'seed': args.seed, 'malformed': args.malformed, 'storage': args.storage,
+              'clients': args.clients, 'requests': args.requests, 'queries': args.queries, 'workers': args.workers,
+              'data_dir': data_dir}
+    results = {'version': RESULTS_VERSION, 'started': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+               'environment': environment(),
+               'params': {k: v for k, v in params.items() if k != 'data_dir'},
+               'repeat': args.repeat, 'phases': {}, 'runs': {}}
+    try:
+        cached = os.path.exists(os.path.join(dataset_root(params), 'data', 'internal', 'broadcast.csv'))
+        if 'generate' not in phases and not cached:
+            print(f'generating {args.rows} rows into {dataset_root(params)}', file=sys.stderr)
+            generated = run_phase('generate', params)
+            if 'error' in generated:
+                raise SystemExit(f"dataset generation failed: {generated['error']}")
+        for name in phases:
+            runs = []
+            for i in range(args.repeat if name != 'generate' else 1):
+                print(f'{name} ({i + 1}/{args.repeat})', file=sys.stderr, flush=True)
+                runs.append(run_phase(name, params))
+            ok = [r for r in runs if 'error' not in r]
+            if not ok:
+                results['phases'][name] = runs[0]
+                continue
+            merged = {}
+            for key, value in ok[0].items():
+                values = [r.get(key) for r in ok]
+                numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+                merged[key] = _median(values) if numeric else value
+            results['phases'][name] = merged
+            if len(runs) > 1:
+                results['runs'][name] = runs
+    finally:
+        if temp_data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    results['finished'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+    out = args.out
+    if not out:
+        commit = (results['environment']['commit'] or 'nocommit')[:12]
+        suffix = '-dirty' if results['environment']['dirty'] else ''
+        out = os.path.join(RESULTS_DIR, f'{commit}{suffix}-{args.rows}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    tmp = out + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp, out)
+    print(json.dumps(results['phases'], indent=2))
+    print(f'results written to {out}', file=sys.stderr)
+    return 0 if all('error' not in r for r in results['phases'].values()) else 1
+
+
+def _direction(metric):
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """{'rows': [...], 'regressions': n, 'notes': [...]} for every metric in both results."""
+    notes = []
+    if old.get('params') != new.get('params'):
+        notes.append(f"parameters differ: {old.get('params')} vs {new.get('params')}")
+    for key in ('python', 'platform', 'cpus'):
+        a, b = old.get('environment', {}).get(key), new.get('environment', {}).get(key)
+        if a != b:
+            notes.append(f'{key} differs: {a} vs {b}')
+    rows, regressions = [], 0
+    for phase, metrics in new.get('phases', {}).items():
+        before = old.get('phases', {}).get(phase)
+        if before is None:
+            notes.append(f'phase {phase} is new')
+            continue
+        for metric, value in metrics.items():
+            prev = before.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(prev, (int, float)) or metric == 'wall_seconds':
+                continue
+            direction = _direction(metric)
+            if direction == 0 and value == prev:
+                continue
+            change = round((value - prev) / prev * 100, 1) if prev else None
+            verdict = ''
+            if direction and change is not None and abs(change) >= threshold:
+                verdict = 'better' if change * direction > 0 else 'REGRESSION'
+                regressions += verdict == 'REGRESSION'
+            rows.append({'phase': phase, 'metric': metric, 'old': prev, 'new': value, 'change_pct': change,
+                         'verdict': verdict})
+    return {'old': old.get('environment', {}).get('commit'), 'new': new.get('environment', {}).get('commit'),
+            'threshold_pct': threshold, 'regressions': regressions, 'notes': notes, 'rows': rows}
+
+
+def format_compare(diff):
+    lines = [f"{(diff['old'] or '?')[:12]} -> {(diff['new'] or '?')[:12]} (threshold {diff['threshold_pct']}%)"]
+    lines.extend(f'note: {n}' for n in diff['notes'])
+    for r in diff['rows']:
+        change = 'n/a' if r['change_pct'] is None else f"{r['change_pct']:+.1f}%"
+        lines.append(f"{r['phase']:<17} {r['metric']:<26} {r['old']:>12} {r['new']:>12} {change:>9}  {r['verdict']}")
+    lines.append(f"{diff['regressions']} regression(s)")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['_phase']:
+        run_phase_child(*argv[1:4])
+        return 0
+    parser = argparse.ArgumentParser(description='Synthetic-data benchmark suite for ingest and normalize')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('run', help='generate (or reuse) a dataset and run the phases')
+    p.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='broadcast log rows (10k-10M intended)')
+    p.add_argument('--seed', type=int, default=420)
+    p.add_argument('--malformed', type=float, default=0.01, help='fraction of malformed broadcast rows')
+    p.add_argument('--phases', default=None, help=f'comma-separated subset of: {",".join(PHASES)}')
+    p.add_argument('--repeat', type=int, default=1, help='runs per phase; the median is reported')
+    p.add_argument('--storage', default='csv', choices=['csv', 'sqlite', 'partitioned'])
+    p.add_argument('--clients', type=int, default=8, help='concurrent writers / HTTP clients')
+    p.add_argument('--requests', type=int, default=200, help='writes per client')
+    p.add_argument('--queries', type=int, default=2000, help='read queries / lookups per case')
+    p.add_argument('--workers', type=int, default=None, help='HTTP server worker threads (default: the server\'s)')
+    p.add_argument('--data-dir', default=None, help='cache generated datasets here (default: temp, removed)')
+    p.add_argument('--out', default=None, help='results file (default: data/bench/<commit>-<rows>.json)')
+    c = sub.add_parser('compare', help='diff two results files')
+    c.add_argument('old')
+    c.add_argument('new')
+    c.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='percent change that counts')
+    c.add_argument('--format', choices=['text', 'json'], default='text')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        if args.rows < 1 or args.repeat < 1:
+            parser.error('--rows and --repeat must be at least 1')
+        return run(args)
+    with open(args.old, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    diff = compare(old, new, args.threshold)
+    print(json.dumps(diff, indent=2) if args.format == 'json' else format_compare(diff))
+    return 1 if diff['regressions'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
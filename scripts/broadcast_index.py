@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""In-memory index of broadcast.id values in data/internal/broadcast.csv
+
+The index is built with one streaming pass over the CSV and then kept current by the
+server as it appends rows, so making an id unique no longer re-reads the whole log on
+every POST. The CSV's (inode, size, mtime) signature is remembered after each of our
+own appends; any other change to the file (a hand edit, normalize_broadcast_csv.py,
+a restore from backup) shows up as a signature mismatch and triggers a rebuild.
+
+Usage:
+  python3 scripts/broadcast_index.py      # build the index for this repo's CSV and print stats
+"""
+import csv
+import json
+import os
+import time
+
+
+class BroadcastIdIndex:
+    """Set of known broadcast ids plus a per-base hint for the next free `-N` suffix.
+
+    `rows` counts the CSV rows that carry an id, duplicates included, which is what the
+    store reports as its length; len() of the index is the number of distinct ids.
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self._ids = set()
+        self._next_suffix = {}
+        self._signature = False
+        self.rows = 0
+        self.rebuilds = 0
+        self.last_rebuild_seconds = None
+
+    def _current_signature(self):
+        try:
+            st = os.stat(self.csv_path)
+            return (st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    def rebuild(self):
+        t0 = time.perf_counter()
+        ids = set()
+        rows = 0
+        if os.path.exists(self.csv_path):
+            with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                for r in reader:
+                    broadcast_id = r.get('broadcast.id')
+                    ids.add(broadcast_id)
+                    if broadcast_id:
+                        rows += 1
+        self._ids = ids
+        self.rows = rows
+        self._next_suffix = {}
+        self._signature = self._current_signature()
+        self.rebuilds += 1
+        self.last_rebuild_seconds = round(time.perf_counter() - t0, 6)
+
+    def ensure_fresh(self):
+        """Rebuild if the CSV changed behind our back since the last sync point."""
+        if self._current_signature() != self._signature:
+            self.rebuild()
+
+    def resolve(self, base_id):
+        """Return base_id, or base_id-N for the first free N, without registering it.
+
+        The suffix hint makes repeated collisions on one base amortized O(1) instead of
+        walking -1, -2, ... from the start every time.
+        """
+        if base_id not in self._ids:
+            return base_id
+        n = self._next_suffix.get(base_id, 1)
+        candidate = f"{base_id}-{n}"
+        while candidate in self._ids:
+            n += 1
+            candidate = f"{base_id}-{n}"
+        self._next_suffix[base_id] = n
+        return candidate
+
+    def add(self, broadcast_id):
+        self._ids.add(broadcast_id)
+        if broadcast_id:
+            self.rows += 1
+
+    def invalidate(self):
+        """Force a rebuild on next use, e.g. after ids were handed out for a failed write."""
+        self._signature = False
+
+    def mark_synced(self):
+        """Record the CSV signature after our own append so it is not mistaken for an external edit."""
+        self._signature = self._current_signature()
+
+    def __contains__(self, broadcast_id):
+        return broadcast_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def stats(self):
+        return {
+            'ids': len(self._ids),
+            'rows': self.rows,
+            'rebuilds': self.rebuilds,
+            'last_rebuild_seconds': self.last_rebuild_seconds,
+        }
+
+
+if __name__ == '__main__':
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    index = BroadcastIdIndex(os.path.join(root, 'data', 'internal', 'broadcast.csv'))
+    index.ensure_fresh()
+    print(json.dumps(index.stats(), indent=2))
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""In-process counters, gauges and latency histograms for the broadcast server.
+
+The server records:
+
+  broadcast_stage_seconds{stage}                    time per hot-path stage (parse, seeds,
+                                                    validate, commit, store_ids, store_write, ...)
+  broadcast_http_request_seconds{route,method}      handler time per route, from the parsed
+                                                    request line to the last byte written
+  broadcast_http_requests_total{route,method,status}
+  broadcast_validation_failures_total{kind}         records rejected with 400
+  broadcast_id_collisions_total                     ids that needed a -N suffix
+  broadcast_write_errors_total{target}              store / archive / latest / rollups / stream
+  broadcast_exceptions_total                        tracebacks written to the error log
+  broadcast_file_bytes{file}                        sizes of broadcast.csv, the archive, ...
+
+GET /metrics renders them in the Prometheus text format; /debug includes a JSON summary
+with approximate p50/p99 per histogram.
+
+Histograms use fixed buckets, so recording is a bisect plus three additions under a lock
+(1-3 us in CPython, see `bench`) and memory does not grow with traffic. Gauges are callables
+evaluated only when /metrics or /debug is read. BROADCAST_METRICS=0 turns recording off.
+
+Usage:
+  METRICS = Metrics()
+  with METRICS.timer('broadcast_stage_seconds', stage='validate'):
+      ...
+  METRICS.inc('broadcast_id_collisions_total', n)
+  python3 scripts/broadcast_metrics.py bench     # cost per observation
+"""
+import argparse
+import bisect
+import json
+import threading
+import time
+
+# seconds; the hot path lives in the 0.1-10 ms range, fsyncs and full rewrites above it
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # one slot per bucket plus the overflow (+Inf) slot
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None when empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'labels', 't0')
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        """Register HELP/TYPE lines for a metric family (kind: counter | gauge | histogram)."""
+        self._help[name] = (kind, text)
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels)
+
+    def inc(self, name, n=1, **labels):
+        if not self.enabled or not n:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def gauge(self, name, fn):
+        """fn() returns a number or a list of (labels dict, number); evaluated at read time."""
+        self._gauges[name] = fn
+
+    def _gauge_values(self):
+        out = []
+        for name, fn in self._gauges.items():
+            try:
+                value = fn()
+            except Exception:
+                continue
+            if isinstance(value, list):
+                out.extend((name, _labels_key(labels), v) for labels, v in value if v is not None)
+            elif value is not None:
+                out.append((name, (), value))
+        return out
+
+    def _copy(self):
+        with self._lock:
+            histograms = {key: (list(h.counts), h.count, h.sum) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        return histograms, counters
+
+    def render(self):
+        """The Prometheus text exposition (format 0.0.4)."""
+        histograms, counters = self._copy()
+        families = {}
+        for (name, key), value in counters.items():
+            families.setdefault(name, []).append(f'{name}{_format_labels(key)} {_format_value(value)}')
+        for name, key, value in self._gauge_values():
+            families.setdefault(name, []).append(f'{name}{_format_labels(key)} {_format_value(value)}')
+        for (name, key), (counts, count, total) in sorted(histograms.items()):
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{_format_labels(key, ("le", _format_value(float(bound))))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(key)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(key)} {count}')
+        out = []
+        for name in sorted(families):
+            kind, text = self._help.get(name, ('untyped', ''))
+            if text:
+                out.append(f'# HELP {name} {text}')
+            out.append(f'# TYPE {name} {kind}')
+            out.extend(families[name])
+        return '\n'.join(out) + '\n'
+
+    def snapshot(self):
+        """JSON-friendly summary for /debug: counters, gauges and count/mean/p50/p99 (ms) per histogram."""
+        histograms, counters = self._copy()
+        out = {'enabled': self.enabled, 'uptime_seconds': round(time.time() - self.started, 1),
+               'counters': {}, 'gauges': {}, 'histograms': {}}
+        for (name, key), value in sorted(counters.items()):
+            out['counters'][name + _format_labels(key)] = value
+        for name, key, value in self._gauge_values():
+            out['gauges'][name + _format_labels(key)] = value
+        for (name, key), (counts, count, total) in sorted(histograms.items()):
+            hist = Histogram(self.buckets)
+            hist.counts, hist.count, hist.sum = counts, count, total
+            p50, p99 = hist.quantile(0.5), hist.quantile(0.99)
+            out['histograms'][name + _format_labels(key)] = {
+                'count': count,
+                'mean_ms': round(total / count * 1000, 3) if count else None,
+                'p50_ms_le': p50 * 1000 if p50 is not None else None,
+                'p99_ms_le': p99 * 1000 if p99 is not None else None,
+            }
+        return out
+
+
+def bench(n=200000):
+    metrics = Metrics()
+    stages = ['parse', 'seeds', 'validate', 'commit']
+    t0 = time.perf_counter()
+    for i in range(n):
+        metrics.observe('broadcast_stage_seconds', 0.0004, stage=stages[i & 3])
+    observe_ns = (time.perf_counter() - t0) / n * 1e9
+    t0 = time.perf_counter()
+    for i in range(n):
+        with metrics.timer('broadcast_stage_seconds', stage=stages[i & 3]):
+            pass
+    timer_ns = (time.perf_counter() - t0) / n * 1e9
+    t0 = time.perf_counter()
+    for _ in range(n):
+        metrics.inc('broadcast_id_collisions_total')
+    inc_ns = (time.perf_counter() - t0) / n * 1e9
+    t0 = time.perf_counter()
+    text = metrics.render()
+    render_ms = (time.perf_counter() - t0) * 1000
+    return {'observe_ns': round(observe_ns), 'timer_ns': round(timer_ns), 'inc_ns': round(inc_ns),
+            'render_ms': round(render_ms, 3), 'render_bytes': len(text)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Broadcast server metrics: microbenchmark')
+    parser.add_argument('command', choices=['bench'])
+    parser.add_argument('--n', type=int, default=200000)
+    args = parser.parse_args(argv)
+    print(json.dumps(bench(args.n), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""Month-partitioned layout for the broadcast log, with partition pruning for range reads.
+
+data/internal/broadcast.csv is one ever-growing file, so every reader walks the whole
+history even when it only wants last week. The partitioned layout splits the log by the
+month of its `date` column (falling back to ts.utc5, like the query index does):
+
+  data/internal/broadcast/manifest.json            per partition: rows, bytes, min/max date and ts
+  data/internal/broadcast/date=2025-10/part.csv    canonical HEADER CSV, append order
+  data/internal/broadcast/date=2025-11/part.csv
+  data/internal/broadcast/date=unknown/part.csv    rows without a usable date
+
+Readers ask prune(date_from, date_to) for the partitions whose [min_date, max_date]
+overlaps the range and open only those. A row goes to the partition of its own date,
+so a late or backdated broadcast lands in its month's file and pruning stays exact.
+
+The manifest is rewritten when a partition is created and on close(). Each entry records
+the partition's byte size, so a partition that grew after the last save (a crash, a hand
+edit, normalize_broadcast_csv.py --partitions) is rescanned the next time the manifest is
+loaded or refreshed, and nothing else is.
+
+BROADCAST_STORAGE=partitioned serves the broadcast server from this layout
+(broadcast_store.PartitionedBroadcastStore). The single-file view stays available:
+export writes broadcast.csv as the concatenation of the partitions, and the server does
+that on shutdown just as it does for the SQLite engine.
+
+Usage:
+  python3 scripts/broadcast_partitions.py migrate [--csv PATH] [--root DIR] [--force]
+  python3 scripts/broadcast_partitions.py export  [--root DIR] [--csv PATH]
+  python3 scripts/broadcast_partitions.py read --from 2025-10-01 --to 2025-10-07 [--format jsonl]
+  python3 scripts/broadcast_partitions.py stats
+  python3 scripts/broadcast_partitions.py bench --rows 500000   # full scan vs pruned range read
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from group_commit import CsvAppender
+
+HEADER = [
+    "broadcast.id",
+    "ts.utc5",
+    "date",
+    "module.id",
+    "broadcast.rating",
+    "broadcast.name",
+    "broadcast.summary",
+    "status.id",
+    "artifact.git.link",
+    "tags.keys",
+    "glyph_icons",
+    "status_icons",
+]
+MANIFEST_NAME = 'manifest.json'
+PART_NAME = 'part.csv'
+UNKNOWN = 'unknown'
+BUFFER_SIZE = 1024 * 1024
+_ID, _TS, _DATE = HEADER.index('broadcast.id'), HEADER.index('ts.utc5'), HEADER.index('date')
+
+
+def _atomic_write_json(path, obj):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _is_date(value):
+    return (len(value) >= 10 and value[4] == '-' and value[7] == '-'
+            and value[0:4].isdigit() and value[5:7].isdigit() and value[8:10].isdigit())
+
+
+def row_date(date_value, ts_value=''):
+    """The row's YYYY-MM-DD: the date column, else the ts.utc5 prefix, else ''."""
+    for value in (date_value, ts_value):
+        if value and _is_date(value):
+            return value[:10]
+    return ''
+
+
+def partition_key(date_value, ts_value=''):
+    """'YYYY-MM' for the row's month, or 'unknown'."""
+    day = row_date(date_value, ts_value)
+    return day[:7] if day else UNKNOWN
+
+
+def _validate_bound(value):
+    if value is not None and (len(value) != 10 or not _is_date(value)):
+        raise ValueError(f'expected YYYY-MM-DD, got {value!r}')
+    return value
+
+
+def _open_body(path):
+    """Open a partition for reading, positioned after its header line."""
+    f = open(path, 'r', newline='', encoding='utf-8', buffering=BUFFER_SIZE)
+    f.readline()
+    return f
+
+
+class PartitionedLog:
+    def __init__(self, root):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._partitions = None
+        self._appenders = {}
+        self._dirty = False
+        self.rescans = 0
+
+    # -- manifest -----------------------------------------------------------
+
+    def part_path(self, key):
+        return os.path.join(self.root, f'date={key}', PART_NAME)
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def _on_disk(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(name[len('date='):] for name in names
+                      if name.startswith('date=') and os.path.exists(os.path.join(self.root, name, PART_NAME)))
+
+    def _load(self):
+        """The partition table, loaded from the manifest once and refreshed against the files."""
+        if self._partitions is not None:
+            return self._partitions
+        partitions = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    partitions = json.load(f).get('partitions') or {}
+            except (OSError, ValueError, AttributeError):
+                partitions = {}
+        self._partitions = partitions
+        self.refresh()
+        return partitions
+
+    def refresh(self):
+        """Rescan partitions whose size no longer matches the manifest; pick up new ones, drop vanished ones."""
+        with self._lock:
+            partitions = self._load() if self._partitions is None else self._partitions
+            on_disk = set(self._on_disk())
+            for key in list(partitions):
+                if key not in on_disk:
+                    del partitions[key]
+                    self._dirty = True
+            for key in on_disk:
+                try:
+                    size = os.path.getsize(self.part_path(key))
+                except OSError:
+                    continue
+                meta = partitions.get(key)
+                if meta is None or meta.get('bytes') != size:
+                    partitions[key] = self._scan(key)
+                    self._dirty = True
+            return partitions
+
+    def _scan(self, key):
+        meta = {'path': f'date={key}/{PART_NAME}', 'rows': 0, 'bytes': 0,
+                'min_date': None, 'max_date': None, 'min_ts': None, 'max_ts': None}
+        path = self.part_path(key)
+        with _open_body(path) as f:
+            for row in csv.reader(f):
+                if len(row) > _ID and row[_ID]:
+                    self._note(meta, row)
+        meta['bytes'] = os.path.getsize(path)
+        self.rescans += 1
+        return meta
+
+    @staticmethod
+    def _note(meta, row):
+        meta['rows'] += 1
+        day = row_date(row[_DATE] if len(row) > _DATE else '', row[_TS] if len(row) > _TS else '')
+        if day:
+            if meta['min_date'] is None or day < meta['min_date']:
+                meta['min_date'] = day
+            if meta['max_date'] is None or day > meta['max_date']:
+                meta['max_date'] = day
+        ts = row[_TS] if len(row) > _TS else ''
+        if ts:
+            if meta['min_ts'] is None or ts < meta['min_ts']:
+                meta['min_ts'] = ts
+            if meta['max_ts'] is None or ts > meta['max_ts']:
+                meta['max_ts'] = ts
+
+    def save(self):
+        with self._lock:
+            partitions = self._load()
+            os.makedirs(self.root, exist_ok=True)
+            _atomic_write_json(self.manifest_path, {
+                'version': 1,
+                'layout': 'date=YYYY-MM/' + PART_NAME,
+                'header': HEADER,
+                'rows': sum(meta['rows'] for meta in partitions.values()),
+                'partitions': {key: partitions[key] for key in sorted(partitions)},
+            })
+            self._dirty = False
+
+    # -- reading --------------------------------------------------------------
+
+    def keys(self):
+        """Partition keys oldest first; 'unknown' sorts before every month."""
+        with self._lock:
+            return sorted(self._load(), key=lambda key: '' if key == UNKNOWN else key)
+
+    def prune(self, date_from=None, date_to=None):
+        """Keys (oldest first) of the partitions that can hold rows dated within [date_from, date_to]."""
+        _validate_bound(date_from)
+        _validate_bound(date_to)
+        with self._lock:
+            partitions = self._load()
+            keys = []
+            for key in self.keys():
+                meta = partitions[key]
+                if not meta['rows']:
+                    continue
+                if date_from is None and date_to is None:
+                    keys.append(key)
+                    continue
+                # undated rows cannot match a date range
+                if meta['min_date'] is None:
+                    continue
+                if date_from is not None and meta['max_date'] < date_from:
+                    continue
+                if date_to is not None and meta['min_date'] > date_to:
+                    continue
+                keys.append(key)
+            return keys
+
+    def iter_rows(self, date_from=None, date_to=None):
+        """Yield HEADER-ordered rows oldest partition first, reading only partitions in range."""
+        bounded = date_from is not None or date_to is not None
+        for key in self.prune(date_from, date_to):
+            with _open_body(self.part_path(key)) as f:
+                for row in csv.reader(f):
+                    if len(row) <= _ID or not row[_ID]:
+                        continue
+                    if len(row) < len(HEADER):
+                        row += [''] * (len(HEADER) - len(row))
+                    if bounded:
+                        day = row_date(row[_DATE], row[_TS])
+                        if not day or (date_from and day < date_from) or (date_to and day > date_to):
+                            continue
+                    yield row
+
+    def iter_ids(self):
+        for key in self.keys():
+            with _open_body(self.part_path(key)) as f:
+                for row in csv.reader(f):
+                    if len(row) > _ID and row[_ID]:
+                        yield row[_ID]
+
+    def signature(self):
+        """(key, inode, size, mtime) of every partition; changes whenever any partition does."""
+        out = []
+        for key in self._on_disk():
+            try:
+                st = os.stat(self.part_path(key))
+            except OSError:
+                continue
+            out.append((key, st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(out)
+
+    def __len__(self):
+        with self._lock:
+            return sum(meta['rows'] for meta in self._load().values())
+
+    # -- writing --------------------------------------------------------------
+
+    def _create(self, key):
+        path = self.part_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(HEADER)
+        self._partitions[key] = {'path': f'date={key}/{PART_NAME}', 'rows': 0, 'bytes': os.path.getsize(path),
+                                 'min_date': None, 'max_date': None, 'min_ts': None, 'max_ts': None}
+
+    def append(self, rows, sync=False):
+        """Append HEADER-ordered rows to their month partitions; returns the keys written."""
+        by_key = {}
+        for row in rows:
+            by_key.setdefault(partition_key(row[_DATE], row[_TS]), []).append(row)
+        with self._lock:
+            partitions = self._load()
+            created = False
+            for key, chunk in by_key.items():
+                if key not in partitions:
+                    self._create(key)
+                    created = True
+                appender = self._appenders.get(key)
+                if appender is None:
+                    appender = self._appenders[key] = CsvAppender(self.part_path(key))
+                buf = io.StringIO()
+                csv.writer(buf).writerows(chunk)
+                appender.write(buf.getvalue())
+                if sync:
+                    appender.sync()
+                meta = partitions[key]
+                for row in chunk:
+                    self._note(meta, row)
+                meta['bytes'] = os.path.getsize(self.part_path(key))
+                self._dirty = True
+            if created:
+                # readers of the manifest should see a new partition right away
+                self.save()
+        return list(by_key)
+
+    def import_csv(self, csv_path):
+        """Split a single-file log into partitions in one streaming pass; returns the row count."""
+        with self._lock:
+            if self._on_disk():
+                raise ValueError(f'{self.root} already holds partitions')
+            self._partitions = {}
+            writers, files, rows = {}, [], 0
+            try:
+                with open(csv_path, 'r', newline='', encoding='utf-8', buffering=BUFFER_SIZE) as src:
+                    reader = csv.reader(src)
+                    header = next(reader, None) or []
+                    position = {name: i for i, name in enumerate(header)}
+                    columns = [position.get(h) for h in HEADER]
+                    for values in reader:
+                        n = len(values)
+                        row = [values[i] if i is not None and i < n else '' for i in columns]
+                        if not row[_ID]:
+                            continue
+                        key = partition_key(row[_DATE], row[_TS])
+                        writer = writers.get(key)
+                        if writer is None:
+                            self._create(key)
+                            f = open(self.part_path(key), 'a', newline='', encoding='utf-8', buffering=BUFFER_SIZE)
+                            files.append(f)
+                            writer = writers[key] = csv.writer(f)
+                        writer.writerow(row)
+                        self._note(self._partitions[key], row)
+                        rows += 1
+            finally:
+                for f in files:
+                    f.close()
+            for key, meta in self._partitions.items():
+                meta['bytes'] = os.path.getsize(self.part_path(key))
+            self.save()
+            return rows
+
+    def export_csv(self, out_path):
+        """Write the single-file view (HEADER + every partition, oldest first); returns the row count."""
+        with self._lock:
+            keys = self.keys()
+            rows = len(self)
+            directory = os.path.dirname(out_path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(out_path) + '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    out.write((','.join(HEADER) + '\r\n').encode('utf-8'))
+                    for key in keys:
+                        with open(self.part_path(key), 'rb') as f:
+                            f.readline()
+                            shutil.copyfileobj(f, out, BUFFER_SIZE)
+                os.replace(tmp, out_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+            return rows
+
+    def close(self):
+        with self._lock:
+            for appender in self._appenders.values():
+                appender.close()
+            self._appenders = {}
+            if self._dirty and self._partitions is not None:
+                self.save()
+
+    def stats(self):
+        with self._lock:
+            partitions = self._load()
+            keys = self.keys()
+            return {
+                'root': self.root,
+                'partitions': len(keys),
+                'rows': sum(meta['rows'] for meta in partitions.values()),
+                'bytes': sum(meta['bytes'] for meta in partitions.values()),
+                'oldest': keys[0] if keys else None,
+                'newest': keys[-1] if keys else None,
+                'open_appenders': len(self._appenders),
+                'rescans': self.rescans,
+            }
+
+
+def _scan_csv(path, date_from, date_to):
+    """The single-file baseline: read every row, keep the ones in range."""
+    kept = 0
+    with open(path, 'r', newline='', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            day = row_date(row[_DATE], row[_TS]) if len(row) > _DATE else ''
+            if day and date_from <= day <= date_to:
+                kept += 1
+    return kept
+
+
+def bench(rows, days=7):
+    """Last-`days` range read: full CSV scan vs pruned partitions; plus a cold GET-style range query."""
+    from broadcast_store import CsvBroadcastStore, PartitionedBroadcastStore, synthetic_csv
+    root = tempfile.mkdtemp(prefix='broadcast-partitions-bench-')
+    try:
+        csv_path = os.path.join(root, 'broadcast.csv')
+        synthetic_csv(csv_path, rows)
+        part_root = os.path.join(root, 'broadcast')
+        t0 = time.perf_counter()
+        log = PartitionedLog(part_root)
+        log.import_csv(csv_path)
+        migrate_s = time.perf_counter() - t0
+        newest = max(meta['max_date'] for meta in log.refresh().values() if meta['max_date'])
+        date_to = newest
+        date_from = newest[:8] + f'{max(1, int(newest[8:]) - days + 1):02d}'
+        out = {'rows': rows, 'partitions': len(log.keys()), 'range': [date_from, date_to],
+               'migrate_seconds': round(migrate_s, 3)}
+
+        t0 = time.perf_counter()
+        full = _scan_csv(csv_path, date_from, date_to)
+        out['full_scan_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+        t0 = time.perf_counter()
+        pruned = sum(1 for _ in PartitionedLog(part_root).iter_rows(date_from, date_to))
+        out['pruned_read_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+        out['rows_in_range'] = [full, pruned]
+        out['partitions_read'] = len(log.prune(date_from, date_to))
+
+        for name, store in (('csv', CsvBroadcastStore(csv_path)), ('partitioned', PartitionedBroadcastStore(part_root))):
+            t0 = time.perf_counter()
+            items, _ = store.query(date_from=date_from, date_to=date_to, limit=50)
+            out[f'{name}_cold_range_query_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+            t0 = time.perf_counter()
+            for _ in range(100):
+                store.query(date_from=date_from, date_to=date_to, limit=50)
+            out[f'{name}_warm_range_query_ms'] = round((time.perf_counter() - t0) / 100 * 1000, 3)
+            store.close()
+
+        t0 = time.perf_counter()
+        exported = log.export_csv(os.path.join(root, 'export.csv'))
+        out['export_seconds'] = round(time.perf_counter() - t0, 3)
+        out['export_rows'] = exported
+        return out
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    here = os.path.dirname(os.path.abspath(__file__))
+    data = os.path.join(os.path.dirname(here), 'data', 'internal')
+    parser = argparse.ArgumentParser(description='Month-partitioned broadcast log: migrate, export, read, stats, bench')
+    parser.add_argument('command', choices=['migrate', 'export', 'read', 'stats', 'bench'])
+    parser.add_argument('--root', default=os.path.join(data, 'broadcast'), help='partition directory')
+    parser.add_argument('--csv', default=os.path.join(data, 'broadcast.csv'), help='single-file log')
+    parser.add_argument('--force', action='store_true', help='migrate: replace existing partitions')
+    parser.add_argument('--from', dest='date_from', default=None, help='read: first date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', default=None, help='read: last date (YYYY-MM-DD)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv', help='read: output format')
+    parser.add_argument('--rows', type=int, default=500000, help='bench: synthetic log size')
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        print(json.dumps(bench(args.rows), indent=2))
+        return 0
+    log = PartitionedLog(args.root)
+    if args.command == 'migrate':
+        if log._on_disk():
+            if not args.force:
+                print(f'{args.root} already holds partitions; pass --force to rebuild them from {args.csv}')
+                return 1
+            shutil.rmtree(args.root)
+            log = PartitionedLog(args.root)
+        t0 = time.perf_counter()
+        n = log.import_csv(args.csv)
+        print(f'Split {n} broadcasts from {args.csv} into {len(log.keys())} partitions under {args.root} '
+              f'in {time.perf_counter() - t0:.2f}s')
+    elif args.command == 'export':
+        n = log.export_csv(args.csv)
+        print(f'Exported {n} broadcasts to {args.csv}')
+    elif args.command == 'read':
+        try:
+            rows = log.iter_rows(args.date_from, args.date_to)
+            if args.format == 'jsonl':
+                for row in rows:
+                    sys.stdout.write(json.dumps(dict(zip(HEADER, row)), ensure_ascii=False) + '\n')
+            else:
+                writer = csv.writer(sys.stdout)
+                writer.writerow(HEADER)
+                writer.writerows(rows)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+    else:
+        stats = log.stats()
+        if log._dirty:
+            log.save()
+        print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Sampling request profiler for the broadcast server (cProfile + optional tracemalloc).
+
+With profiling on, every Nth request (and every Nth group commit on the writer thread,
+where the CSV/SQLite work actually happens) runs under cProfile. Each profiled call:
+
+  - is dumped to <dir>/<UTC timestamp>-<seq>-<label>.prof (open with pstats or snakeviz);
+    only the newest `keep` dumps are kept
+  - is added to a running pstats aggregate that GET /debug/profile turns into a top-N
+    table by self time or cumulative time
+  - with tracemalloc on, also takes a tracemalloc snapshot, dumped next to it as
+    <same name>.tracemalloc; GET /debug/profile lists the source lines whose allocations
+    grew most between the last two snapshots (the comparison takes tens of ms, so it
+    runs when the route is read, not on the request)
+
+Only one call is profiled at a time (cProfile cannot nest across threads); a sampled
+request that finds the profiler busy simply runs unprofiled. When `every` is 0 the
+server checks one attribute per request and nothing else runs. tracemalloc, once
+started, slows every allocation in the process, so it is a separate switch.
+
+Settings come from the environment and can be changed at runtime with
+POST /debug/profile {"every": 50, "tracemalloc": 10, "keep": 20, "reset": true}:
+  BROADCAST_PROFILE_EVERY       profile every Nth request/commit; 0 = off (default)
+  BROADCAST_PROFILE_TRACEMALLOC frames per allocation traceback; 0 = off (default)
+  BROADCAST_PROFILE_KEEP        dumps to keep (default 20)
+  BROADCAST_PROFILE_DIR         where dumps go (default /tmp/broadcast_server_profiles)
+
+Usage:
+  python3 scripts/broadcast_profile.py show /tmp/broadcast_server_profiles/<dump>.prof [--sort tottime]
+  python3 scripts/broadcast_profile.py show <newer>.tracemalloc --compare <older>.tracemalloc
+"""
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+
+DEFAULT_DIR = '/tmp/broadcast_server_profiles'
+DEFAULT_KEEP = 20
+DEFAULT_TOP = 25
+SORT_KEYS = ('tottime', 'cumtime')
+
+_LABEL_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+# the profiler's own allocations would otherwise top every comparison
+_ALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+)
+
+
+def _func_name(key):
+    filename, line, name = key
+    if filename == '~':
+        # built-ins have no file
+        return name
+    return f'{os.path.basename(filename)}:{line}({name})'
+
+
+def top_functions(stats, sort='tottime', top=DEFAULT_TOP):
+    """[{function, calls, tottime_ms, cumtime_ms}] from a pstats.Stats, heaviest first."""
+    index = 2 if sort == 'tottime' else 3
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)[:top]
+    return [{'function': _func_name(key), 'calls': nc, 'primitive_calls': cc,
+             'tottime_ms': round(tt * 1000, 3), 'cumtime_ms': round(ct * 1000, 3)}
+            for key, (cc, nc, tt, ct, _) in rows]
+
+
+def allocation_growth(newer, older, top=DEFAULT_TOP):
+    """[{where, size_diff_kb, size_kb, count_diff}] for the source lines that grew most from older to newer."""
+    diff = newer.filter_traces(_ALLOC_FILTERS).compare_to(older.filter_traces(_ALLOC_FILTERS), 'lineno')
+    return [{'where': str(d.traceback[0]), 'size_diff_kb': round(d.size_diff / 1024, 1),
+             'size_kb': round(d.size / 1024, 1), 'count_diff': d.count_diff}
+            for d in diff[:top] if d.size_diff]
+
+
+class RequestProfiler:
+    def __init__(self, out_dir=DEFAULT_DIR, every=0, tracemalloc_frames=0, keep=DEFAULT_KEEP):
+        self.out_dir = out_dir
+        self.every = 0
+        self.tracemalloc_frames = 0
+        self.keep = keep
+        self._lock = threading.Lock()
+        # held while a call is being profiled
+        self._busy = threading.Lock()
+        self._seen = 0
+        self._seq = 0
+        self._stats = None
+        # (older, newer) tracemalloc snapshots and the growth computed from them, if any
+        self._snapshots = (None, None)
+        self._allocations = None
+        self.profiled = 0
+        self.skipped_busy = 0
+        self.started = None
+        self.configure(every=every, tracemalloc_frames=tracemalloc_frames)
+
+    def configure(self, every=None, tracemalloc_frames=None, keep=None, reset=False):
+        """Change settings at runtime; starting/stopping tracemalloc follows tracemalloc_frames."""
+        with self._lock:
+            if every is not None:
+                self.every = max(0, int(every))
+                if self.every and self.started is None:
+                    self.started = time.time()
+            if keep is not None:
+                self.keep = max(1, int(keep))
+            if tracemalloc_frames is not None:
+                frames = max(0, int(tracemalloc_frames))
+                if frames and not tracemalloc.is_tracing():
+                    tracemalloc.start(frames)
+                elif not frames and tracemalloc.is_tracing() and self.tracemalloc_frames:
+                    # only stop tracing we started ourselves
+                    tracemalloc.stop()
+                self.tracemalloc_frames = frames
+                self._snapshots = (None, None)
+                self._allocations = None
+            if reset:
+                self._stats = None
+                self._snapshots = (None, None)
+                self._allocations = None
+                self.profiled = 0
+                self.skipped_busy = 0
+                self.started = time.time() if self.every else None
+
+    def _sampled(self):
+        with self._lock:
+            self._seen += 1
+            return self.every and self._seen % self.every == 0
+
+    def maybe(self, label, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs), under the profiler if this call is sampled."""
+        if not self.every or not self._sampled():
+            return fn(*args, **kwargs)
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            return fn(*args, **kwargs)
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # another profiler (a debugger, sys.monitoring tool) owns the hook
+                self.skipped_busy += 1
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                try:
+                    self._record(label, profile)
+                except Exception:
+                    pass
+        finally:
+            self._busy.release()
+
+    def _record(self, label, profile):
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        name = '{}-{:06d}-{}'.format(time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()), seq,
+                                     _LABEL_RE.sub('_', label).strip('_')[:60] or 'call')
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, name)
+        profile.dump_stats(base + '.prof')
+        stats = pstats.Stats(profile)
+        snapshot = None
+        if self.tracemalloc_frames and tracemalloc.is_tracing():
+            # a few ms; comparing snapshots is what is slow, and that waits for summary()
+            snapshot = tracemalloc.take_snapshot()
+            snapshot.dump(base + '.tracemalloc')
+        with self._lock:
+            if self._stats is None:
+                self._stats = stats
+            else:
+                self._stats.add(stats)
+            if snapshot is not None:
+                self._snapshots = (self._snapshots[1], snapshot)
+                self._allocations = None
+            self.profiled += 1
+        self._rotate()
+
+    def _rotate(self):
+        try:
+            dumps = sorted(f for f in os.listdir(self.out_dir) if f.endswith('.prof'))
+        except OSError:
+            return
+        for old in dumps[:-self.keep] if len(dumps) > self.keep else []:
+            for path in (old, old[:-len('.prof')] + '.tracemalloc'):
+                try:
+                    os.remove(os.path.join(self.out_dir, path))
+                except OSError:
+                    pass
+
+    def dumps(self):
+        try:
+            return sorted((f for f in os.listdir(self.out_dir) if f.endswith('.prof')), reverse=True)
+        except OSError:
+            return []
+
+    def summary(self, top=DEFAULT_TOP, sort='tottime'):
+        """Settings, counters, the aggregated top-N functions and the latest allocation growth."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f'sort must be one of {", ".join(SORT_KEYS)}')
+        with self._lock:
+            functions = top_functions(self._stats, sort, top) if self._stats is not None else []
+            older, newer = self._snapshots
+            allocations = self._allocations
+        if allocations is None and older is not None:
+            allocations = allocation_growth(newer, older)
+            with self._lock:
+                if self._snapshots[1] is newer:
+                    self._allocations = allocations
+        out = {
+            'every': self.every,
+            'tracemalloc_frames': self.tracemalloc_frames,
+            'keep': self.keep,
+            'dir': self.out_dir,
+            'since': self.started,
+            'profiled': self.profiled,
+            'skipped_busy': self.skipped_busy,
+            'sort': sort,
+            'top': functions,
+            'allocations': (allocations or [])[:top],
+            'dumps': self.dumps(),
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            out['traced_memory_kb'] = {'current': round(current / 1024, 1), 'peak': round(peak / 1024, 1)}
+        return out
+
+    def stats(self):
+        return {'every': self.every, 'tracemalloc_frames': self.tracemalloc_frames, 'profiled': self.profiled}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show a broadcast server profile dump')
+    parser.add_argument('command', choices=['show'])
+    parser.add_argument('path', help='a .prof dump, or a .tracemalloc snapshot')
+    parser.add_argument('--sort', default='tottime', choices=SORT_KEYS)
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP)
+    parser.add_argument('--compare', default=None, metavar='OLDER',
+                        help='for a .tracemalloc snapshot: an older snapshot to diff against')
+    args = parser.parse_args(argv)
+    if args.path.endswith('.tracemalloc'):
+        newer = tracemalloc.Snapshot.load(args.path)
+        if args.compare:
+            rows = allocation_growth(newer, tracemalloc.Snapshot.load(args.compare), args.top)
+        else:
+            rows = [{'where': str(s.traceback[0]), 'size_kb': round(s.size / 1024, 1), 'count': s.count}
+                    for s in newer.filter_traces(_ALLOC_FILTERS).statistics('lineno')[:args.top]]
+        print(json.dumps(rows, indent=2))
+        return
+    out = io.StringIO()
+    pstats.Stats(args.path, stream=out).sort_stats(args.sort).print_stats(args.top)
+    print(out.getvalue())
+
+
+if __name__ == '__main__':
+    main()
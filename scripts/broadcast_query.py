@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""Indexed queries over data/internal/broadcast.csv for GET /api/broadcasts.
+
+The CSV is scanned once into compact in-memory indexes; rows themselves stay on disk:
+
+  offsets      byte offset of every record (rows are numbered in append order)
+  columns      module.id / status.id / broadcast.rating interned to small integer codes,
+               with one posting list (ascending row numbers) per value
+  tags         a posting list per tag, plus each row's interned tag set
+  dates        YYYYMMDD per row; while the log stays in date order a date range is a
+               bisect instead of a scan
+
+A query walks the smallest matching posting list newest-first from the cursor, checks
+the other filters against the per-row codes, stops once a page is full and only then
+seeks to and parses the handful of rows it returns. Appends are picked up by parsing
+just the bytes past the last indexed offset; any other change to the file (replaced,
+truncated) triggers a full rebuild, like BroadcastIdIndex.
+
+Usage:
+  python3 scripts/broadcast_query.py --module protector_model --limit 5
+  python3 scripts/broadcast_query.py --tag testing --from 2025-10-01 --to 2025-10-31
+  python3 scripts/broadcast_query.py --bench 2000          # time a mix of queries against the CSV
+  python3 scripts/broadcast_query.py --csv /tmp/big.csv --bench 2000
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+COLUMN_FIELDS = ('module.id', 'status.id', 'broadcast.rating')
+TAGS_FIELD = 'tags.keys'
+FILTER_FIELDS = COLUMN_FIELDS + (TAGS_FIELD,)
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+
+def _date_key(value):
+    """'YYYY-MM-DD...' -> YYYYMMDD as an int, or -1 when the value is not a date."""
+    if not value or len(value) < 10 or value[4] != '-' or value[7] != '-':
+        return -1
+    try:
+        return int(value[0:4] + value[5:7] + value[8:10])
+    except ValueError:
+        return -1
+
+
+def parse_date(value):
+    """Validate a YYYY-MM-DD query bound and return its key; raises ValueError."""
+    key = _date_key(value)
+    if key < 0 or len(value) != 10:
+        raise ValueError(f'expected YYYY-MM-DD, got {value!r}')
+    return key
+
+
+def _split_tags(value):
+    return [t.strip() for t in value.split(',') if t.strip()] if value else []
+
+
+class _Column:
+    """One field interned to integer codes, with a posting list per distinct value."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+        self.rows = array('I')
+        self.postings = []
+
+    def add(self, pos, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.postings.append(array('I'))
+        self.rows.append(code)
+        self.postings[code].append(pos)
+
+
+def _descending(postings, lo, hi):
+    """Row numbers from an ascending posting list within [lo, hi), newest first."""
+    start = bisect_left(postings, lo)
+    for i in range(bisect_left(postings, hi) - 1, start - 1, -1):
+        yield postings[i]
+
+
+def _dedupe(positions):
+    last = None
+    for pos in positions:
+        if pos != last:
+            yield pos
+            last = pos
+
+
+class BroadcastQueryIndex:
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self._lock = threading.RLock()
+        self._reset()
+        self.rebuilds = 0
+        self.appended = 0
+        self.last_rebuild_seconds = None
+
+    def _reset(self):
+        self._header = None
+        self._field_pos = {}
+        self._offsets = array('Q')
+        self._columns = {f: _Column() for f in COLUMN_FIELDS}
+        self._tag_postings = {}
+        self._tagset_codes = {}
+        self._tagsets = []
+        self._tagset_rows = array('I')
+        self._dates = array('i')
+        self._dates_sorted = True
+        self._end = 0
+        self._signature = False
+
+    def _current_signature(self):
+        try:
+            st = os.stat(self.csv_path)
+            return (st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    # -- building -----------------------------------------------------------
+
+    def _set_header(self, row):
+        self._header = row
+        self._field_pos = {name: i for i, name in enumerate(row)}
+
+    def _add(self, row, offset):
+        pos = len(self._offsets)
+        self._offsets.append(offset)
+        fp = self._field_pos
+        n = len(row)
+
+        def get(name):
+            i = fp.get(name)
+            return row[i] if i is not None and i < n else ''
+
+        for field, column in self._columns.items():
+            column.add(pos, get(field))
+
+        tags = frozenset(_split_tags(get(TAGS_FIELD)))
+        code = self._tagset_codes.get(tags)
+        if code is None:
+            code = self._tagset_codes[tags] = len(self._tagsets)
+            self._tagsets.append(tags)
+        self._tagset_rows.append(code)
+        for tag in tags:
+            postings = self._tag_postings.get(tag)
+            if postings is None:
+                postings = self._tag_postings[tag] = array('I')
+            postings.append(pos)
+
+        key = _date_key(get('date')) if 'date' in fp else -1
+        if key < 0:
+            key = _date_key(get('ts.utc5'))
+        if self._dates and key < self._dates[-1]:
+            self._dates_sorted = False
+        self._dates.append(key)
+
+    def _ingest(self, offset):
+        """Index complete records from byte offset to EOF; returns the number added."""
+        if not os.path.exists(self.csv_path):
+            return 0
+        consumed = [offset]
+        last_line = [b'\n']
+
+        def lines(f):
+            for raw in f:
+                consumed[0] += len(raw)
+                last_line[0] = raw
+                yield raw.decode('utf-8', errors='replace')
+
+        added = 0
+        with open(self.csv_path, 'rb') as f:
+            f.seek(offset)
+            reader = csv.reader(lines(f))
+            start = offset
+            if self._header is None:
+                for row in reader:
+                    if any(cell.strip() for cell in row):
+                        self._set_header(row)
+                        break
+                else:
+                    return 0
+                start = consumed[0]
+                self._end = start
+            for row in reader:
+                if not last_line[0].endswith(b'\n'):
+                    # a record still being written; pick it up on the next sync
+                    break
+                end = consumed[0]
+                if row:
+                    self._add(row, start)
+                    added += 1
+                start = end
+                self._end = end
+        return added
+
+    def rebuild(self):
+        with self._lock:
+            t0 = time.perf_counter()
+            self._reset()
+            signature = self._current_signature()
+            self._ingest(0)
+            self._signature = signature if signature and signature[1] == self._end else self._current_signature()
+            self.rebuilds += 1
+            self.last_rebuild_seconds = round(time.perf_counter() - t0, 6)
+
+    def ensure_fresh(self):
+        """Index appended rows, or rebuild if the CSV was replaced or shrank."""
+        with self._lock:
+            signature = self._current_signature()
+            if signature == self._signature:
+                return
+            if (not self._signature or signature is None or signature[0] != self._signature[0]
+                    or signature[1] < self._end):
+                self.rebuild()
+                return
+            self.appended += self._ingest(self._end)
+            self._signature = signature
+
+    def sync(self):
+        """Pick up rows the server just appended; a no-op until the index is first built."""
+        with self._lock:
+            if self._signature is not False:
+                self.ensure_fresh()
+
+    # -- querying -----------------------------------------------------------
+
+    def query(self, filters=None, date_from=None, date_to=None, limit=DEFAULT_LIMIT, cursor=None):
+        """Return (entries, next_cursor), newest first.
+
+        filters maps a field in FILTER_FIELDS to a collection of accepted values; values
+        of one field are OR-ed (a tag filter matches rows carrying any of the tags) and
+        different fields are AND-ed. date_from/date_to are inclusive YYYY-MM-DD bounds.
+        cursor is the next_cursor of the previous page.
+        """
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        lo_key = parse_date(date_from) if date_from else None
+        hi_key = parse_date(date_to) if date_to else None
+        self.ensure_fresh()
+        with self._lock:
+            n = len(self._offsets)
+            hi = n if cursor is None else max(0, min(int(cursor), n))
+            lo = 0
+            dates = self._dates
+            date_check = lo_key is not None or hi_key is not None
+            if date_check and self._dates_sorted:
+                if lo_key is not None:
+                    lo = bisect_left(dates, lo_key, 0, hi)
+                if hi_key is not None:
+                    hi = bisect_right(dates, hi_key, lo, hi)
+                date_check = False
+
+            plans = []
+            for field, values in (filters or {}).items():
+                values = set(values)
+                if not values:
+                    continue
+                if field == TAGS_FIELD:
+                    lists = [self._tag_postings[t] for t in values if t in self._tag_postings]
+                    allowed = {code for code, tags in enumerate(self._tagsets) if not tags.isdisjoint(values)}
+                    rows = self._tagset_rows
+                elif field in self._columns:
+                    column = self._columns[field]
+                    allowed = {column.codes[v] for v in values if v in column.codes}
+                    lists = [column.postings[c] for c in allowed]
+                    rows = column.rows
+                else:
+                    raise ValueError(f'cannot filter on {field!r}')
+                if not lists:
+                    return [], None
+                plans.append((sum(len(p) for p in lists), lists, rows, allowed))
+
+            if plans:
+                # drive from the most selective filter, verify the rest per row
+                plans.sort(key=lambda p: p[0])
+                lists = plans[0][1]
+                if len(lists) == 1:
+                    candidates = _descending(lists[0], lo, hi)
+                else:
+                    candidates = _dedupe(heapq.merge(*(_descending(p, lo, hi) for p in lists), reverse=True))
+                checks = [(rows, allowed) for _, _, rows, allowed in plans[1:]]
+            else:
+                candidates = range(hi - 1, lo - 1, -1)
+                checks = []
+
+            found = []
+            for pos in candidates:
+                if date_check:
+                    d = dates[pos]
+                    if (lo_key is not None and d < lo_key) or (hi_key is not None and d > hi_key):
+                        continue
+                for rows, allowed in checks:
+                    if rows[pos] not in allowed:
+                        break
+                else:
+                    found.append(pos)
+                    # one extra row tells us whether there is another page
+                    if len(found) > limit:
+                        break
+
+            more = len(found) > limit
+            found = found[:limit]
+            offsets = self._offsets
+            spans = [(offsets[p], offsets[p + 1] if p + 1 < n else self._end) for p in found]
+            header = self._header
+        next_cursor = str(found[-1]) if more else None
+        return self._fetch(spans, header), next_cursor
+
+    def _fetch(self, spans, header):
+        if not spans:
+            return []
+        with open(self.csv_path, 'rb') as f:
+            texts = []
+            for start, end in spans:
+                f.seek(start)
+                texts.append(f.read(end - start).decode('utf-8', errors='replace'))
+        # each span is exactly one record, so one reader over all of them yields one row per span
+        width = len(header)
+        entries = []
+        for row in csv.reader(texts):
+            if len(row) < width:
+                row += [''] * (width - len(row))
+            entry = dict(zip(header, row))
+            if TAGS_FIELD in entry:
+                entry[TAGS_FIELD] = _split_tags(entry[TAGS_FIELD])
+            entries.append(entry)
+        return entries
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rows': len(self._offsets),
+                'values': {f: len(c.values) for f, c in self._columns.items()},
+                'tags': len(self._tag_postings),
+                'dates_sorted': self._dates_sorted,
+                'rebuilds': self.rebuilds,
+                'appended': self.appended,
+                'last_rebuild_seconds': self.last_rebuild_seconds,
+            }
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def bench(index, n):
+    """Time a mix of single-filter, combined, tag, date-range and paged queries."""
+    index.ensure_fresh()
+    modules = index._columns['module.id'].values or ['']
+    statuses = index._columns['status.id'].values or ['']
+    ratings = index._columns['broadcast.rating'].values or ['']
+    tags = sorted(index._tag_postings) or ['']
+    dates = sorted({d for d in index._dates if d > 0}) or [20250101]
+    as_date = lambda k: f'{k // 10000:04d}-{k // 100 % 100:02d}-{k % 100:02d}'
+    cases = {
+        'newest': lambda i: {},
+        'module': lambda i: {'filters': {'module.id': [modules[i % len(modules)]]}},
+        'module+rating': lambda i: {'filters': {'module.id': [modules[i % len(modules)]],
+                                                'broadcast.rating': [ratings[i % len(ratings)]]}},
+        'status+tag': lambda i: {'filters': {'status.id': [statuses[i % len(statuses)]],
+                                             'tags.keys': [tags[i % len(tags)]]}},
+        'date_range': lambda i: {'date_from': as_date(dates[i % len(dates)]),
+                                 'date_to': as_date(dates[min(len(dates) - 1, i % len(dates) + 7)])},
+        'page_3': None,
+    }
+    out = {'rows': len(index), 'queries_per_case': n}
+    for name, make in cases.items():
+        timings = []
+        for i in range(n):
+            t0 = time.perf_counter()
+            if make is None:
+                _, cursor = index.query(limit=50)
+                for _ in range(2):
+                    _, cursor = index.query(limit=50, cursor=cursor)
+            else:
+                index.query(limit=50, **make(i))
+            timings.append((time.perf_counter() - t0) * 1000)
+        out[name] = {'p50_ms': round(_percentile(timings, 0.5), 4), 'p99_ms': round(_percentile(timings, 0.99), 4)}
+    return out
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='Query broadcast.csv through the in-memory indexes')
+    parser.add_argument('--csv', default=os.path.join(root, 'data', 'internal', 'broadcast.csv'))
+    parser.add_argument('--module', action='append', default=[])
+    parser.add_argument('--status', action='append', default=[])
+    parser.add_argument('--rating', action='append', default=[])
+    parser.add_argument('--tag', action='append', default=[])
+    parser.add_argument('--from', dest='date_from')
+    parser.add_argument('--to', dest='date_to')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--cursor')
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help='run N queries per case and report latency')
+    args = parser.parse_args(argv)
+
+    index = BroadcastQueryIndex(args.csv)
+    index.ensure_fresh()
+    if args.bench:
+        out = index.stats()
+        out['bench'] = bench(index, args.bench)
+        print(json.dumps(out, indent=2))
+        return
+    filters = {'module.id': args.module, 'status.id': args.status,
+               'broadcast.rating': args.rating, 'tags.keys': args.tag}
+    items, cursor = index.query(filters, args.date_from, args.date_to, args.limit, args.cursor)
+    print(json.dumps({'items': items, 'next_cursor': cursor}, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Materialized broadcast counts per date bucket, module, rating and status.
+
+Rollups hold one counter per (bucket, module.id, broadcast.rating, status.id) for three
+bucket sizes:
+
+  day    2025-10-14
+  week   2025-W42 (ISO week; labels sort in date order)
+  month  2025-10
+
+The broadcast server adds every committed entry (three dict increments, whatever the
+size of the log) and rewrites signals/rollups.json every BROADCAST_ROLLUP_EXPORT_EVERY
+entries and on shutdown, so dashboards can fetch a few KB instead of the whole CSV.
+GET /api/rollups answers from memory. Entries without a usable date are only counted
+in 'undated'.
+
+signals/rollups.json:
+  {"rows": 1234, "undated": 0, "dimensions": ["module.id", "broadcast.rating", "status.id"],
+   "day":   [["2025-10-14", "protector_model", "high", "active", 3], ...],
+   "week":  [...], "month": [...]}
+
+Usage:
+  python3 scripts/broadcast_rollup.py rebuild [--csv PATH] [--out PATH]   # one streaming pass over the CSV
+  python3 scripts/broadcast_rollup.py show --bucket week --group-by module.id
+  python3 scripts/broadcast_rollup.py bench [--rows 200000]              # rollup reads vs a full CSV scan
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timezone
+
+GRANULARITIES = ('day', 'week', 'month')
+DIMENSIONS = ('module.id', 'broadcast.rating', 'status.id')
+DEFAULT_GRANULARITY = 'week'
+
+
+def _day(entry):
+    """The entry's YYYY-MM-DD day (date, else the ts.utc5 prefix) or None."""
+    for value in (entry.get('date'), entry.get('ts.utc5')):
+        if value and len(value) >= 10 and value[4] == '-' and value[7] == '-':
+            return value[:10]
+    return None
+
+
+def _bucket_bound(granularity, value):
+    """Translate an inclusive YYYY-MM-DD query bound into a bucket label; raises ValueError."""
+    try:
+        day = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        day = None
+    if day is None or len(value) != 10:
+        raise ValueError(f'expected YYYY-MM-DD, got {value!r}')
+    if granularity == 'day':
+        return value
+    if granularity == 'month':
+        return value[:7]
+    year, week, _ = day.isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+class Rollups:
+    def __init__(self):
+        self.counts = {g: {} for g in GRANULARITIES}
+        self.rows = 0
+        self.undated = 0
+        self._buckets = {}
+        # the server adds on its writer thread while request threads query
+        self._lock = threading.Lock()
+
+    def _buckets_for(self, day):
+        """(day, week, month) labels for a day string, memoized; None for a malformed day."""
+        buckets = self._buckets.get(day)
+        if buckets is None:
+            try:
+                year, week, _ = date.fromisoformat(day).isocalendar()
+            except ValueError:
+                return None
+            buckets = self._buckets[day] = (day, f'{year}-W{week:02d}', day[:7])
+        return buckets
+
+    def add(self, entry):
+        self.rows += 1
+        day = _day(entry)
+        buckets = self._buckets_for(day) if day else None
+        if buckets is None:
+            self.undated += 1
+            return
+        dims = (entry.get('module.id') or '', entry.get('broadcast.rating') or '', entry.get('status.id') or '')
+        for granularity, bucket in zip(GRANULARITIES, buckets):
+            counts = self.counts[granularity]
+            key = (bucket,) + dims
+            counts[key] = counts.get(key, 0) + 1
+
+    def add_many(self, entries):
+        with self._lock:
+            for entry in entries:
+                self.add(entry)
+
+    def query(self, granularity=DEFAULT_GRANULARITY, filters=None, date_from=None, date_to=None,
+              group_by=('module.id',)):
+        """Counts per bucket (oldest first) and per value of the group_by dimensions.
+
+        filters maps a dimension to accepted values (OR within a dimension, AND across);
+        date_from/date_to are inclusive YYYY-MM-DD bounds applied at bucket resolution.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f'bucket must be one of {", ".join(GRANULARITIES)}')
+        unknown = [d for d in list(group_by) + list(filters or {}) if d not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f'unknown dimension {unknown[0]!r}; expected one of {", ".join(DIMENSIONS)}')
+        lo = _bucket_bound(granularity, date_from) if date_from else None
+        hi = _bucket_bound(granularity, date_to) if date_to else None
+        checks = [(1 + DIMENSIONS.index(d), set(v)) for d, v in (filters or {}).items() if v]
+        picks = [1 + DIMENSIONS.index(d) for d in group_by]
+
+        totals = {}
+        with self._lock:
+            counted = list(self.counts[granularity].items())
+        for key, n in counted:
+            bucket = key[0]
+            if (lo is not None and bucket < lo) or (hi is not None and bucket > hi):
+                continue
+            if any(key[i] not in accepted for i, accepted in checks):
+                continue
+            out = (bucket,) + tuple(key[i] for i in picks)
+            totals[out] = totals.get(out, 0) + n
+        items = []
+        for out in sorted(totals):
+            item = {'bucket': out[0]}
+            item.update(zip(group_by, out[1:]))
+            item['count'] = totals[out]
+            items.append(item)
+        return items
+
+    def to_json(self):
+        doc = {
+            'generated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'rows': self.rows,
+            'undated': self.undated,
+            'dimensions': list(DIMENSIONS),
+        }
+        with self._lock:
+            counted = {g: list(self.counts[g].items()) for g in GRANULARITIES}
+        for granularity in GRANULARITIES:
+            doc[granularity] = [list(key) + [n] for key, n in sorted(counted[granularity])]
+        return doc
+
+    @classmethod
+    def from_json(cls, doc):
+        rollups = cls()
+        rollups.rows = int(doc.get('rows', 0))
+        rollups.undated = int(doc.get('undated', 0))
+        for granularity in GRANULARITIES:
+            rollups.counts[granularity] = {tuple(row[:-1]): int(row[-1]) for row in doc.get(granularity, [])}
+        return rollups
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Rollups from a rollups.json, or None if it is missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_json(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError, IndexError):
+            return None
+
+    def stats(self):
+        return {
+            'rows': self.rows,
+            'undated': self.undated,
+            'keys': {g: len(self.counts[g]) for g in GRANULARITIES},
+        }
+
+
+def iter_csv_entries(path):
+    """Stream a broadcast CSV as dicts, oldest first."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', newline='', encoding='utf-8', buffering=1024 * 1024) as f:
+        for row in csv.DictReader(f):
+            if row.get('broadcast.id'):
+                yield row
+
+
+def rebuild(entries):
+    rollups = Rollups()
+    rollups.add_many(entries)
+    return rollups
+
+
+def scan_count(path, granularity, filters, group_by):
+    """What a dashboard has to do without rollups: read the whole CSV and count."""
+    rollups = Rollups()
+    wanted = {d: set(v) for d, v in filters.items()}
+    for entry in iter_csv_entries(path):
+        if all(entry.get(d) in v for d, v in wanted.items()):
+            rollups.add(entry)
+    return rollups.query(granularity, group_by=group_by)
+
+
+def bench(csv_path=None, rows=200000, reads=200):
+    from broadcast_store import synthetic_csv
+
+    tmpdir = None
+    if csv_path is None:
+        tmpdir = tempfile.mkdtemp(prefix='broadcast-rollup-bench-')
+        csv_path = os.path.join(tmpdir, 'broadcast.csv')
+        synthetic_csv(csv_path, rows)
+    try:
+        t0 = time.perf_counter()
+        rollups = rebuild(iter_csv_entries(csv_path))
+        rebuild_s = time.perf_counter() - t0
+        cases = {
+            'per_module_per_week': ('week', {}, ('module.id',)),
+            'critical_per_month': ('month', {'broadcast.rating': ['critical']}, ()),
+            'status_per_day': ('day', {}, ('status.id',)),
+        }
+        out = {'csv': csv_path, 'rows': rollups.rows, 'rebuild_seconds': round(rebuild_s, 3),
+               'keys': rollups.stats()['keys']}
+        for name, (granularity, filters, group_by) in cases.items():
+            t0 = time.perf_counter()
+            expected = scan_count(csv_path, granularity, filters, group_by)
+            scan_ms = (time.perf_counter() - t0) * 1000
+            t0 = time.perf_counter()
+            for _ in range(reads):
+                got = rollups.query(granularity, filters, group_by=group_by)
+            rollup_ms = (time.perf_counter() - t0) / reads * 1000
+            out[name] = {'scan_ms': round(scan_ms, 2), 'rollup_ms': round(rollup_ms, 3),
+                         'speedup': round(scan_ms / rollup_ms, 1) if rollup_ms else None,
+                         'matches_scan': got == expected}
+        entry = {'date': '2025-12-31', 'module.id': 'bench_model', 'broadcast.rating': 'high', 'status.id': 'active'}
+        t0 = time.perf_counter()
+        for _ in range(100000):
+            rollups.add(entry)
+        out['add_us'] = round((time.perf_counter() - t0) / 100000 * 1e6, 3)
+        return out
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='Broadcast rollups: rebuild, show, bench')
+    parser.add_argument('command', choices=['rebuild', 'show', 'bench'])
+    parser.add_argument('--csv', default=os.path.join(root, 'data', 'internal', 'broadcast.csv'))
+    parser.add_argument('--out', default=os.path.join(root, 'signals', 'rollups.json'))
+    parser.add_argument('--bucket', default=DEFAULT_GRANULARITY, choices=GRANULARITIES)
+    parser.add_argument('--group-by', default='module.id', help='comma-separated dimensions (may be empty)')
+    parser.add_argument('--rows', type=int, default=200000, help='bench: synthetic log size')
+    parser.add_argument('--bench-csv', default=None, help='bench: use this CSV instead of a synthetic one')
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        print(json.dumps(bench(args.bench_csv, args.rows), indent=2))
+        return
+    if args.command == 'rebuild':
+        t0 = time.perf_counter()
+        rollups = rebuild(iter_csv_entries(args.csv))
+        rollups.save(args.out)
+        print(f'Rolled up {rollups.rows} broadcasts ({rollups.undated} undated) into {args.out} '
+              f'in {time.perf_counter() - t0:.2f}s')
+        return
+    rollups = Rollups.load(args.out)
+    if rollups is None:
+        print(f'No rollups at {args.out}; run: python3 scripts/broadcast_rollup.py rebuild')
+        return
+    group_by = tuple(d for d in args.group_by.split(',') if d)
+    print(json.dumps(rollups.query(args.bucket, group_by=group_by), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,15 +5,142 @@ Lightweight HTTP server to accept broadcast JSON and append rows to data/interna
 Usage:
   python3 scripts/broadcast_server.py
 
-The server listens on 127.0.0.1:5000 and exposes POST /api/broadcast which accepts a JSON payload
+The server listens on 127.0.0.1:5002 and exposes POST /api/broadcast which accepts a JSON payload
 matching the form fields. It will ensure the CSV file exists and append a row using the canonical
 header defined in this repo's scripts/broadcast.py.
+
+POST /api/broadcasts takes many broadcasts at once, either as a JSON array or as NDJSON
+(Content-Type: application/x-ndjson, one object per line). All records are validated
+against one seed snapshot, appended with a single CSV write and latest.json is updated
+once; the response lists a per-record result in request order. A batch of more than
+BROADCAST_BATCH_MAX records (default 50000) is refused with 413 and max_records.
+
+GET /api/broadcasts returns stored broadcasts newest first, filtered by any of module.id,
+status.id, broadcast.rating and tags.keys (comma-separated values are OR-ed, different
+filters AND-ed) and an inclusive from/to date range (YYYY-MM-DD), e.g.
+
+  GET /api/broadcasts?module.id=protector_model&tags.keys=testing&from=2025-10-01&limit=20
+
+Pass the response's next_cursor back as ?cursor= for the next page. Queries are answered
+from in-memory indexes over broadcast.csv (scripts/broadcast_query.py), or by SQLite under
+the sqlite storage engine.
+
+Broadcasts are kept by a storage engine (scripts/broadcast_store.py):
+  BROADCAST_STORAGE      csv (default): append to broadcast.csv with in-memory id/query indexes
+                         sqlite: data/internal/broadcast.sqlite3 in WAL mode; seeded from
+                         broadcast.csv on first start, broadcast.csv is re-exported on shutdown
+                         partitioned: one CSV per month under data/internal/broadcast/
+                         (scripts/broadcast_partitions.py), so date-bounded queries only read
+                         the months they overlap; split from broadcast.csv on first start,
+                         broadcast.csv is re-exported as their concatenation on shutdown
+  BROADCAST_SQLITE_PATH  database file for the sqlite engine
+
+POST /api/workflow takes the workflow form from index.js (POST /api/workflows takes many, as
+a JSON array or NDJSON) and appends to data/internal/master.workflow.csv, plus a
+steps.workflow.csv row whenever a workflow's status changes. Lookups are served from an
+in-memory index (scripts/workflow_store.py):
+  GET /api/workflow/<id>          current record, version and step history
+  GET /api/workflow/<id>/steps    step history only
+  GET /api/workflows?status=&owner=&limit=   most recently updated first
+
+POST /api/broadcast is idempotent: a retry that carries the same Idempotency-Key header is
+answered from an in-memory LRU/TTL cache with the first attempt's broadcast_id and an Idempotent-Replayed: true header, without touching
+the seeds, the store or signals/ (scripts/idempotency_cache.py). A key reused for a different
+payload gets 422, one whose first request is still committing gets its result (or 409 after
+30 s). Requests without the header are never deduplicated unless a content TTL is set, so
+two intentionally identical broadcasts still get two ids. Keys are journaled to
+data/internal/idempotency.jsonl by the background flush thread so they survive a restart:
+  BROADCAST_IDEMPOTENCY_MAX_KEYS     keys kept before the least recently used go (default 10000)
+  BROADCAST_IDEMPOTENCY_TTL          seconds an Idempotency-Key is remembered (default 86400)
+  BROADCAST_IDEMPOTENCY_CONTENT_TTL  opt-in: also treat a header-less request with the same
+                                     normalized payload as a retry for this many seconds
+                                     (default 0 = only honor Idempotency-Key)
+
+GET /api/glossary?q=data+la returns ranked glossary terms (the last word also matches as a
+prefix, for autocomplete) with optional tag=/orbit= facets; GET /api/glossary/<key> returns one
+term with its resolved see_also links. Both use the index scripts/glossary_index.py compiles.
+
+The server also serves the static site (index.html, index.js, README.md, assets/, seeds/,
+signals/ and the precompiled bundle/ from scripts/site_bundle.py) with strong ETags, 304 on
+a matching If-None-Match and precompressed gzip/brotli variants; bundle/ is rebuilt before it
+is served whenever one of its sources changed, so index.js never needs the raw files to check it.
+
+GET /api/broadcasts/stream is a Server-Sent Events stream of every newly committed broadcast
+(scripts/broadcast_stream.py). Open streams are handed to one fan-out thread, so they do not
+hold request workers; reconnecting with Last-Event-ID replays what was missed from a ring of
+the newest events:
+  BROADCAST_STREAM_RING         events kept for Last-Event-ID replay (default 1024)
+  BROADCAST_STREAM_MAX_CLIENTS  open streams before new ones get 503 (default 4096)
+  BROADCAST_STREAM_HEARTBEAT    seconds between ': ping' comments (default 15)
+
+GET /metrics exposes per-stage ingest timers (seed snapshot, validation, id resolution, CSV/SQLite
+write, archive, latest.json, ...), per-route latency histograms, counters for validation failures,
+id collisions, write errors and exceptions, and data file sizes in the Prometheus text format
+(scripts/broadcast_metrics.py); /debug carries the same numbers as JSON. BROADCAST_METRICS=0
+turns recording off.
+
+GET /debug/profile shows where time and memory go under real traffic: with profiling on, every
+Nth request and every Nth group commit runs under cProfile (optionally with tracemalloc
+snapshots), each profile is dumped to a rotated, timestamped .prof file and the route returns
+the aggregated top-N functions (scripts/broadcast_profile.py). POST /debug/profile
+{"every": 50, "tracemalloc": 10} switches it at runtime; {"every": 0} turns it off again.
+  BROADCAST_PROFILE_EVERY        profile every Nth request/commit; 0 = off (default)
+  BROADCAST_PROFILE_TRACEMALLOC  traceback frames per allocation; 0 = off (default)
+  BROADCAST_PROFILE_KEEP         .prof dumps kept in BROADCAST_PROFILE_DIR (default 20)
+
+GET /api/rollups returns broadcast counts per day/week/month bucket from in-memory rollups
+(scripts/broadcast_rollup.py) that are updated on every append and saved to
+signals/rollups.json for the static site every BROADCAST_ROLLUP_EXPORT_EVERY entries
+(default 100) and BROADCAST_ROLLUP_EXPORT_AFTER seconds after the last one (default 1), e.g.
+
+  GET /api/rollups?bucket=week&group_by=module.id,broadcast.rating&status.id=active&from=2025-10-01
+
+Every stored record is checked against schema/broadcast.schema.yml (compiled once by
+scripts/schema_validator.py); a record that fails is rejected with 400 and the list of errors.
+
+Serving mode is controlled through environment variables:
+  BROADCAST_SERVER_MODE       threaded (default) | single
+  BROADCAST_SERVER_WORKERS    size of the request worker pool in threaded mode (default 8)
+  BROADCAST_SERVER_KEEPALIVE  idle keep-alive timeout in seconds; 0 disables keep-alive (default 5)
+
+Broadcast appends are group-committed by a background writer (scripts/group_commit.py):
+  BROADCAST_COMMIT_MODE          group (default) | sync (write on the request thread)
+  BROADCAST_DURABILITY           none (default) | batch-fsync | per-request-fsync; a response
+                                 is only sent once its rows reached that point
+  BROADCAST_COMMIT_INTERVAL_MS   how long the writer waits for more requests to join a group (default 1)
+  BROADCAST_COMMIT_MAX_ROWS      commit early once this many rows are waiting (default 1000)
+
+Whatever the mode, every write to broadcast.csv and signals/*.json happens under WRITE_LOCK so
+concurrent requests can never interleave rows or clobber each other's latest/archive files.
+
+signals/archive.latest.json is regenerated from the archive segments by a background flush
+thread, never by the writer and never under WRITE_LOCK: the segments have their own lock and
+a line appended mid-export simply lands in the next one. Exports are coalesced: one runs after
+N archived entries, or once no entry has been archived for a while, and a GET of the file
+through this server exports first when anything is pending, so a viewer never sees it stale.
+SIGTERM shuts down like Ctrl-C: the writer is drained and every derived file is flushed
+before the process exits.
+  BROADCAST_ARCHIVE_EXPORT_EVERY  export after this many archived entries (default 100)
+  BROADCAST_ARCHIVE_EXPORT_AFTER  export this many seconds after the last one; 0 = off (default 30)
+
+With BROADCAST_STORAGE=sqlite or partitioned, data/internal/broadcast.csv is re-exported from
+the store the same way, so the normalizer, rollup/funnel scripts and seed_sync never read a
+CSV more than a few seconds (or N rows) behind:
+  BROADCAST_CSV_EXPORT_EVERY  export after this many committed rows (default 10000)
+  BROADCAST_CSV_EXPORT_AFTER  export this many seconds after the last commit; 0 = off (default 5)
 """
 import http.server
 import socketserver
 import json
 import os
 import csv
+import hashlib
+import re
+import signal
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 try:
     from zoneinfo import ZoneInfo
@@ -26,15 +153,169 @@ try:
 except Exception:
     yaml = None
 
+from broadcast_metrics import Metrics
+from broadcast_profile import DEFAULT_DIR as PROFILE_DIR, DEFAULT_KEEP as PROFILE_KEEP, DEFAULT_TOP as PROFILE_TOP, \
+    RequestProfiler
+from broadcast_query import DEFAULT_LIMIT, FILTER_FIELDS
+from broadcast_rollup import DEFAULT_GRANULARITY, DIMENSIONS as ROLLUP_DIMENSIONS, Rollups, rebuild as rebuild_rollups
+from broadcast_store import StoreError, make_store
+from broadcast_stream import BroadcastStream, parse_event_id
+from glossary_index import GlossaryIndex, DEFAULT_LIMIT as GLOSSARY_LIMIT
+from group_commit import DURABILITY_POLICIES, GroupCommitter
+from idempotency_cache import IdempotencyCache
+from schema_validator import VALIDATORS
+from seed_registry import SeedRegistry
+from signal_archive import SignalArchive
+from site_bundle import StaticSite
+from workflow_store import WorkflowStore, DEFAULT_LIMIT as WORKFLOW_LIMIT
+
 PORT = 5002
 HOST = '127.0.0.1'
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(REPO_ROOT, 'data', 'internal')
 CSV_PATH = os.path.join(DATA_DIR, 'broadcast.csv')
+SQLITE_PATH = os.environ.get('BROADCAST_SQLITE_PATH') or os.path.join(DATA_DIR, 'broadcast.sqlite3')
+WORKFLOW_MASTER_PATH = os.path.join(DATA_DIR, 'master.workflow.csv')
+WORKFLOW_STEPS_PATH = os.path.join(DATA_DIR, 'steps.workflow.csv')
 SEEDS_DIR = os.path.join(REPO_ROOT, 'seeds')
 MODULES_YML = os.path.join(SEEDS_DIR, 'modules.yml')
 STATUSES_YML = os.path.join(SEEDS_DIR, 'statuses.yml')
 EMOJI_YML = os.path.join(SEEDS_DIR, 'emoji_palette.yml')
+GLOSSARY_YML = os.path.join(SEEDS_DIR, 'glossary.yml')
+GLOSSARY_INDEX_PATH = os.path.join(REPO_ROOT, 'data', 'glossary.index.json')
+BROADCAST_SCHEMA = os.path.join(REPO_ROOT, 'schema', 'broadcast.schema.yml')
+SIGNALS_DIR = os.path.join(REPO_ROOT, 'signals')
+LATEST_PATH = os.path.join(SIGNALS_DIR, 'latest.json')
+ARCHIVE_PATH = os.path.join(SIGNALS_DIR, 'archive.latest.json')
+ARCHIVE_DIR = os.path.join(SIGNALS_DIR, 'archive')
+ROLLUPS_PATH = os.path.join(SIGNALS_DIR, 'rollups.json')
+
+
+def _env_number(name, default, cast=int):
+    try:
+        raw = os.environ.get(name)
+        return cast(raw) if raw not in (None, '') else default
+    except Exception:
+        return default
+
+
+DEFAULT_MODE = 'threaded'
+DEFAULT_WORKERS = 8
+DEFAULT_KEEPALIVE = 5.0
+
+# POST /api/broadcasts: upper bound on records per request, and the NDJSON content types
+BATCH_MAX = _env_number('BROADCAST_BATCH_MAX', 50000)
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# the flush thread regenerates archive.latest.json from the segments once N entries are pending
+# (0 = no count trigger) or once no entry has been archived for N seconds (0 = no time trigger)
+ARCHIVE_EXPORT_EVERY = _env_number('BROADCAST_ARCHIVE_EXPORT_EVERY', 100)
+ARCHIVE_EXPORT_AFTER = _env_number('BROADCAST_ARCHIVE_EXPORT_AFTER', 30.0, float)
+# how often the flush thread looks for exports that are due
+FLUSH_TICK = 0.25
+
+# sqlite/partitioned engines: broadcast.csv is re-exported every N committed rows, and by the
+# flush thread N seconds after the last commit (0 disables either trigger)
+CSV_EXPORT_EVERY = _env_number('BROADCAST_CSV_EXPORT_EVERY', 10000)
+CSV_EXPORT_AFTER = _env_number('BROADCAST_CSV_EXPORT_AFTER', 5.0, float)
+
+# rollups.json is rewritten every N rolled-up entries (0 = only on shutdown),
+# and by the flush thread N seconds after the last one (0 = no time-based export)
+ROLLUP_EXPORT_EVERY = _env_number('BROADCAST_ROLLUP_EXPORT_EVERY', 100)
+ROLLUP_EXPORT_AFTER = _env_number('BROADCAST_ROLLUP_EXPORT_AFTER', 1.0, float)
+
+# Broadcast appends: 'group' hands rows to a background writer that commits everything queued
+# within BROADCAST_COMMIT_INTERVAL_MS (or BROADCAST_COMMIT_MAX_ROWS rows) as one write; 'sync'
+# writes on the request thread. BROADCAST_DURABILITY decides what must have happened before a
+# response is sent: none | batch-fsync | per-request-fsync (see scripts/group_commit.py).
+COMMIT_MODE = os.environ.get('BROADCAST_COMMIT_MODE') or 'group'
+DURABILITY = os.environ.get('BROADCAST_DURABILITY') or 'none'
+COMMIT_INTERVAL_MS = _env_number('BROADCAST_COMMIT_INTERVAL_MS', 1.0, float)
+COMMIT_MAX_ROWS = _env_number('BROADCAST_COMMIT_MAX_ROWS', 1000)
+_committer = None
+_committer_lock = threading.Lock()
+
+# Parsed once at startup; reloads only when a seed file's mtime and content hash change
+SEEDS = SeedRegistry(MODULES_YML, STATUSES_YML, EMOJI_YML)
+
+# seeds/glossary.yml compiled into data/glossary.index.json; recompiled only when the YAML hash changes
+GLOSSARY = GlossaryIndex(GLOSSARY_YML, GLOSSARY_INDEX_PATH)
+
+# index.html, index.js, index.css, README.md and the assets/bundle/seeds/signals trees
+SITE = StaticSite(REPO_ROOT)
+
+# Where broadcasts live: id uniqueness, appends and GET /api/broadcasts all go through STORE
+STORAGE = os.environ.get('BROADCAST_STORAGE') or 'csv'
+STORE = make_store(STORAGE, CSV_PATH, SQLITE_PATH)
+_committed_since_csv_export = 0
+_last_commit = 0.0
+
+# GET /api/broadcasts parameter names (camelCase aliases match the POST payload)
+QUERY_PARAMS = {
+    'module.id': 'module.id', 'moduleId': 'module.id',
+    'status.id': 'status.id', 'statusId': 'status.id',
+    'broadcast.rating': 'broadcast.rating', 'broadcastRating': 'broadcast.rating',
+    'tags.keys': 'tags.keys', 'tagsKeys': 'tags.keys', 'tag': 'tags.keys',
+}
+
+# master/steps workflow CSVs plus their id/status/owner index, written through WRITE_LOCK
+WORKFLOWS = WorkflowStore(WORKFLOW_MASTER_PATH, WORKFLOW_STEPS_PATH)
+WORKFLOW_ID_RE = re.compile(r'^[A-Za-z0-9._:\-]+$')
+
+# Append-only history of previous latest.json entries (signals/archive/*.jsonl)
+ARCHIVE = SignalArchive(ARCHIVE_DIR)
+_archived_since_export = 0
+_last_archive_append = 0.0
+# the pending count is bumped by the writer and settled by exports, which run without WRITE_LOCK
+_archive_count_lock = threading.Lock()
+_archive_export_lock = threading.Lock()
+ARCHIVE_URL = '/signals/archive.latest.json'
+_flusher = None
+_flusher_lock = threading.Lock()
+
+# Idempotency-Key (or, when opted in, payload hash) -> first POST /api/broadcast result,
+# journaled next to broadcast.csv by the flush thread
+IDEMPOTENCY_PATH = os.path.join(DATA_DIR, 'idempotency.jsonl')
+IDEMPOTENCY_MAX_KEYS = _env_number('BROADCAST_IDEMPOTENCY_MAX_KEYS', 10000)
+IDEMPOTENCY_TTL = _env_number('BROADCAST_IDEMPOTENCY_TTL', 86400.0, float)
+IDEMPOTENCY_CONTENT_TTL = _env_number('BROADCAST_IDEMPOTENCY_CONTENT_TTL', 0.0, float)
+IDEMPOTENCY_KEY_MAX = 255
+IDEMPOTENCY = IdempotencyCache(IDEMPOTENCY_PATH, IDEMPOTENCY_MAX_KEYS)
+# what prepare_broadcast reads, as (form key, snake_case alias); anything else cannot change the stored row
+IDEMPOTENT_FIELDS = (
+    ('broadcastId', 'broadcast_id'), ('moduleId', 'module_id'), ('broadcastRating', 'broadcast_rating'),
+    ('broadcastName', 'broadcast_name'), ('broadcastSummary', 'broadcast_summary'), ('statusId', 'status_id'),
+    ('artifactGitLink', 'artifact_git_link'), ('tagsKeys', None),
+)
+
+# Counts per day/week/month x module x rating x status; loaded (or rebuilt) on first use
+ROLLUPS = None
+_rolled_since_export = 0
+_last_rollup = 0.0
+
+# Per-stage timers, per-route latency histograms, error counters and file-size gauges,
+# served at GET /metrics (Prometheus text) and in /debug; BROADCAST_METRICS=0 stops recording
+METRICS = Metrics(enabled=os.environ.get('BROADCAST_METRICS', '1') != '0')
+METRIC_ROUTES = ('/api/broadcast', '/api/broadcasts', '/api/broadcasts/stream', '/api/workflow', '/api/workflows',
+                 '/api/glossary', '/api/rollups', '/debug', '/debug/profile', '/metrics')
+
+# Sampled cProfile/tracemalloc of requests and group commits, read at GET /debug/profile;
+# with BROADCAST_PROFILE_EVERY=0 (the default) a request only pays for one attribute check
+PROFILER = RequestProfiler(os.environ.get('BROADCAST_PROFILE_DIR') or PROFILE_DIR,
+                           every=_env_number('BROADCAST_PROFILE_EVERY', 0),
+                           tracemalloc_frames=_env_number('BROADCAST_PROFILE_TRACEMALLOC', 0),
+                           keep=_env_number('BROADCAST_PROFILE_KEEP', PROFILE_KEEP))
+
+# GET /api/broadcasts/stream: SSE fan-out of committed broadcasts with a Last-Event-ID replay ring
+STREAM_RING = _env_number('BROADCAST_STREAM_RING', 1024)
+STREAM_MAX_CLIENTS = _env_number('BROADCAST_STREAM_MAX_CLIENTS', 4096)
+STREAM_HEARTBEAT = _env_number('BROADCAST_STREAM_HEARTBEAT', 15.0, float)
+STREAM = BroadcastStream(STREAM_RING, STREAM_HEARTBEAT, max_clients=STREAM_MAX_CLIENTS)
+
+# Single writer: the id uniqueness check, the CSV append and the signals rewrite
+# must run as one unit, otherwise two requests can pick the same id or race on
+# the latest/archive temp files.
+WRITE_LOCK = threading.Lock()
 
 HEADER = [
     "broadcast.id",
@@ -52,47 +333,336 @@ HEADER = [
 ]
 
 
+def use_data_root(root):
+    """Point every writable path (CSV log, signals) at another root directory.
+
+    Seeds are still read from this repo. Used by the benchmarks so load runs never
+    touch the real data/internal and signals/ files.
+    """
+    global DATA_DIR, CSV_PATH, SQLITE_PATH, SIGNALS_DIR, LATEST_PATH, ARCHIVE_PATH, ARCHIVE_DIR, STORE, ARCHIVE
+    global ROLLUPS_PATH, ROLLUPS, STREAM, IDEMPOTENCY_PATH, IDEMPOTENCY
+    global WORKFLOW_MASTER_PATH, WORKFLOW_STEPS_PATH, WORKFLOWS, _committed_since_csv_export
+    close_commit()
+    # rows counted against the old store must not trigger an export of the new one
+    _committed_since_csv_export = 0
+    DATA_DIR = os.path.join(root, 'data', 'internal')
+    CSV_PATH = os.path.join(DATA_DIR, 'broadcast.csv')
+    WORKFLOW_MASTER_PATH = os.path.join(DATA_DIR, 'master.workflow.csv')
+    WORKFLOW_STEPS_PATH = os.path.join(DATA_DIR, 'steps.workflow.csv')
+    WORKFLOWS = WorkflowStore(WORKFLOW_MASTER_PATH, WORKFLOW_STEPS_PATH)
+    SQLITE_PATH = os.path.join(DATA_DIR, 'broadcast.sqlite3')
+    STORE = make_store(STORAGE, CSV_PATH, SQLITE_PATH)
+    IDEMPOTENCY.close()
+    IDEMPOTENCY_PATH = os.path.join(DATA_DIR, 'idempotency.jsonl')
+    IDEMPOTENCY = IdempotencyCache(IDEMPOTENCY_PATH, IDEMPOTENCY_MAX_KEYS)
+    SIGNALS_DIR = os.path.join(root, 'signals')
+    LATEST_PATH = os.path.join(SIGNALS_DIR, 'latest.json')
+    ARCHIVE_PATH = os.path.join(SIGNALS_DIR, 'archive.latest.json')
+    ARCHIVE_DIR = os.path.join(SIGNALS_DIR, 'archive')
+    ARCHIVE = SignalArchive(ARCHIVE_DIR)
+    ROLLUPS_PATH = os.path.join(SIGNALS_DIR, 'rollups.json')
+    ROLLUPS = None
+    STREAM.close()
+    STREAM = BroadcastStream(STREAM_RING, STREAM_HEARTBEAT, max_clients=STREAM_MAX_CLIENTS)
+
+
+def configure_storage(engine):
+    """Switch the storage engine (csv | sqlite) for the current data root."""
+    global STORAGE, STORE, ROLLUPS, STREAM, _committed_since_csv_export
+    close_commit()
+    _committed_since_csv_export = 0
+    STORE = make_store(engine, CSV_PATH, SQLITE_PATH)
+    STORAGE = engine
+    ROLLUPS = None
+    STREAM.close()
+    STREAM = BroadcastStream(STREAM_RING, STREAM_HEARTBEAT, max_clients=STREAM_MAX_CLIENTS)
+
+
+def configure_commit(mode=None, durability=None, interval_ms=None, max_rows=None):
+    """Switch commit mode / durability policy; any running group writer is drained first."""
+    global COMMIT_MODE, DURABILITY, COMMIT_INTERVAL_MS, COMMIT_MAX_ROWS
+    if mode is not None and mode not in ('group', 'sync'):
+        raise ValueError(f'unknown commit mode: {mode}')
+    if durability is not None and durability not in DURABILITY_POLICIES:
+        raise ValueError(f'unknown durability policy: {durability}')
+    close_commit()
+    COMMIT_MODE = mode or COMMIT_MODE
+    DURABILITY = durability or DURABILITY
+    COMMIT_INTERVAL_MS = COMMIT_INTERVAL_MS if interval_ms is None else interval_ms
+    COMMIT_MAX_ROWS = COMMIT_MAX_ROWS if max_rows is None else max_rows
+
+
+def close_commit():
+    """Flush and stop the group writer and close the store's open files/connections."""
+    global _committer
+    with _committer_lock:
+        if _committer is not None:
+            _committer.close()
+            _committer = None
+    with WRITE_LOCK:
+        STORE.close()
+
+
+def _get_committer():
+    global _committer
+    if _committer is None:
+        with _committer_lock:
+            if _committer is None:
+                _committer = GroupCommitter(_profiled_commit, COMMIT_INTERVAL_MS, COMMIT_MAX_ROWS,
+                                            name='broadcast-commit')
+    return _committer
+
+
+def commit_stats():
+    out = {'mode': COMMIT_MODE, 'durability': DURABILITY}
+    committer = _committer
+    if committer is not None:
+        out['group'] = committer.stats()
+    return out
+
+
+def archive_signals(entries):
+    """Append entries (oldest first) to the segmented archive; the flush thread exports archive.latest.json."""
+    global _archived_since_export, _last_archive_append
+    if not entries:
+        return
+    # first write after upgrading: carry the legacy archive.latest.json over into segments
+    ARCHIVE.bootstrap(ARCHIVE_PATH)
+    ARCHIVE.append_many(entries)
+    with _archive_count_lock:
+        _archived_since_export += len(entries)
+        _last_archive_append = time.monotonic()
+    if ARCHIVE_EXPORT_EVERY or ARCHIVE_EXPORT_AFTER:
+        _start_flusher()
+
+
+def export_archive():
+    """Rewrite the newest-first archive.latest.json the static site reads.
+
+    Needs no WRITE_LOCK: SignalArchive locks its own manifest and skips a torn tail line,
+    so entries appended while this runs are simply left for the next export.
+    """
+    global _archived_since_export
+    with _archive_export_lock:
+        with _archive_count_lock:
+            pending = _archived_since_export
+        ARCHIVE.bootstrap(ARCHIVE_PATH)
+        ARCHIVE.export(ARCHIVE_PATH)
+        with _archive_count_lock:
+            _archived_since_export -= min(pending, _archived_since_export)
+
+
+def archive_export_due(now=None):
+    pending = _archived_since_export
+    if not pending:
+        return False
+    if ARCHIVE_EXPORT_EVERY and pending >= ARCHIVE_EXPORT_EVERY:
+        return True
+    return _due(pending, _last_archive_append, ARCHIVE_EXPORT_AFTER, time.monotonic() if now is None else now)
+
+
+def mirror_csv(entries):
+    """Count committed entries toward the next broadcast.csv export (sqlite/partitioned only)."""
+    global _committed_since_csv_export, _last_commit
+    if STORAGE == 'csv' or not entries:
+        return
+    _committed_since_csv_export += len(entries)
+    _last_commit = time.monotonic()
+    if CSV_EXPORT_EVERY and _committed_since_csv_export >= CSV_EXPORT_EVERY:
+        export_csv()
+    elif CSV_EXPORT_AFTER:
+        _start_flusher()
+
+
+def export_csv():
+    """Rewrite the canonical broadcast.csv from the store (a no-op for the csv engine)."""
+    global _committed_since_csv_export
+    STORE.export_csv(CSV_PATH)
+    _committed_since_csv_export = 0
+
+
+def _due(pending, last, after, now):
+    return bool(pending) and after > 0 and now - last >= after
+
+
+def _due_exports():
+    now = time.monotonic()
+    due = []
+    if _due(_rolled_since_export, _last_rollup, ROLLUP_EXPORT_AFTER, now):
+        due.append(export_rollups)
+    if _due(_committed_since_csv_export, _last_commit, CSV_EXPORT_AFTER, now):
+        due.append(export_csv)
+    return due
+
+
+def flush_due():
+    """Run the exports that have waited past their *_EXPORT_AFTER since the last write."""
+    if archive_export_due():
+        try:
+            export_archive()
+        except Exception:
+            _log_exception()
+    if not _due_exports():
+        return
+    with WRITE_LOCK:
+        # checked again under the lock: a count-triggered export may have run meanwhile
+        for export in _due_exports():
+            try:
+                export()
+            except Exception:
+                _log_exception()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_TICK)
+        try:
+            flush_due()
+            IDEMPOTENCY.flush()
+        except Exception:
+            _log_exception()
+
+
+def _start_flusher():
+    """Start the daemon thread that runs overdue exports and appends the idempotency journal."""
+    global _flusher
+    if _flusher is None:
+        with _flusher_lock:
+            if _flusher is None:
+                _flusher = threading.Thread(target=_flush_loop, name='broadcast-flush', daemon=True)
+                _flusher.start()
+
+
+def _load_rollups():
+    """ROLLUPS, loading rollups.json or rebuilding from the store if it does not match. Caller holds WRITE_LOCK."""
+    global ROLLUPS
+    if ROLLUPS is None:
+        rollups = Rollups.load(ROLLUPS_PATH)
+        if rollups is None or rollups.rows != len(STORE):
+            rollups = rebuild_rollups(STORE.iter_entries())
+        ROLLUPS = rollups
+    return ROLLUPS
+
+
+def get_rollups():
+    if ROLLUPS is None:
+        with WRITE_LOCK:
+            return _load_rollups()
+    return ROLLUPS
+
+
+def rollup_entries(entries):
+    """Count committed entries into the rollups and periodically refresh rollups.json."""
+    global _rolled_since_export, _last_rollup
+    if ROLLUPS is None or not entries:
+        return
+    ROLLUPS.add_many(entries)
+    _rolled_since_export += len(entries)
+    _last_rollup = time.monotonic()
+    if ROLLUP_EXPORT_EVERY and _rolled_since_export >= ROLLUP_EXPORT_EVERY:
+        export_rollups()
+    elif ROLLUP_EXPORT_AFTER:
+        _start_flusher()
+
+
+def export_rollups():
+    global _rolled_since_export
+    if ROLLUPS is not None:
+        ROLLUPS.save(ROLLUPS_PATH)
+    _rolled_since_export = 0
+
+
+def _route_label(path):
+    """Bounded route label for metrics: ids and static file names are folded together."""
+    if path in METRIC_ROUTES:
+        return path
+    if path.startswith('/api/workflow/'):
+        return '/api/workflow/<id>/steps' if path.endswith('/steps') else '/api/workflow/<id>'
+    if path.startswith('/api/glossary/'):
+        return '/api/glossary/<key>'
+    return 'other' if path.startswith('/api/') else 'static'
+
+
+def _file_sizes():
+    sizes = []
+    for name, path in (('broadcast.csv', CSV_PATH), ('broadcast.sqlite3', SQLITE_PATH),
+                       ('broadcast.sqlite3-wal', SQLITE_PATH + '-wal'), ('latest.json', LATEST_PATH),
+                       ('archive.latest.json', ARCHIVE_PATH), ('rollups.json', ROLLUPS_PATH),
+                       ('master.workflow.csv', WORKFLOW_MASTER_PATH), ('steps.workflow.csv', WORKFLOW_STEPS_PATH)):
+        try:
+            sizes.append(({'file': name}, os.path.getsize(path)))
+        except OSError:
+            pass
+    try:
+        with os.scandir(ARCHIVE_DIR) as it:
+            sizes.append(({'file': 'archive/'}, sum(e.stat().st_size for e in it if e.is_file())))
+    except OSError:
+        pass
+    if STORAGE == 'partitioned':
+        sizes.append(({'file': 'broadcast/'}, STORE.log.stats()['bytes']))
+    return sizes
+
+
+def _describe_metrics():
+    for name, kind, text in (
+        ('broadcast_stage_seconds', 'histogram', 'Time spent per ingest stage.'),
+        ('broadcast_http_request_seconds', 'histogram', 'Request handling time per route.'),
+        ('broadcast_http_requests_total', 'counter', 'Requests per route, method and status.'),
+        ('broadcast_validation_failures_total', 'counter', 'Records rejected by validation.'),
+        ('broadcast_id_collisions_total', 'counter', 'Broadcast ids that needed a -N suffix.'),
+        ('broadcast_write_errors_total', 'counter', 'Failed writes per target.'),
+        ('broadcast_exceptions_total', 'counter', 'Unhandled exceptions logged by the server.'),
+        ('broadcast_idempotent_replays_total', 'counter', 'POST /api/broadcast retries answered from the key cache.'),
+        ('broadcast_file_bytes', 'gauge', 'Size of the data files.'),
+        ('broadcast_stream_clients', 'gauge', 'Open /api/broadcasts/stream connections.'),
+        ('broadcast_uptime_seconds', 'gauge', 'Seconds since the server started.'),
+    ):
+        METRICS.describe(name, kind, text)
+    METRICS.gauge('broadcast_file_bytes', _file_sizes)
+    METRICS.gauge('broadcast_stream_clients', lambda: STREAM.stats()['clients'])
+    METRICS.gauge('broadcast_uptime_seconds', lambda: round(time.time() - METRICS.started, 1))
+
+
+_describe_metrics()
+
+
+def seed_stream():
+    """Number stream events after the rows already in the log, so ids survive restarts."""
+    if not STREAM.seeded:
+        with WRITE_LOCK:
+            STREAM.seed(len(STORE))
+
+
+def stream_entries(entries):
+    """Push just-committed entries to stream clients. Caller holds WRITE_LOCK."""
+    if not entries:
+        return
+    count = len(STORE)
+    STREAM.seed(count - len(entries))
+    STREAM.publish(count - len(entries) + 1, entries)
+
+
+def _is_blank(path):
+    # the repo ships the data CSVs as a bare newline; treat that like a missing file
+    if not os.path.exists(path):
+        return True
+    if os.path.getsize(path) > 2:
+        return False
+    with open(path, 'rb') as f:
+        return not f.read().strip()
+
+
 def ensure_csv():
     os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.exists(CSV_PATH):
+    if _is_blank(CSV_PATH):
         with open(CSV_PATH, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(HEADER)
 
 
 def load_seeds():
-    modules = {}
-    statuses = {}
-    emoji = {}
-    if yaml is None:
-        return None, None, None
-    try:
-        if os.path.exists(MODULES_YML):
-            with open(MODULES_YML, 'r', encoding='utf-8') as f:
-                raw = yaml.safe_load(f) or {}
-                # modules.yml in this repo is a YAML list of mappings with `id` keys
-                if isinstance(raw, list):
-                    for item in raw:
-                        if isinstance(item, dict) and 'id' in item:
-                            modules[item['id']] = item
-                elif isinstance(raw, dict):
-                    modules = raw
-        if os.path.exists(STATUSES_YML):
-            with open(STATUSES_YML, 'r', encoding='utf-8') as f:
-                raw = yaml.safe_load(f) or {}
-                if isinstance(raw, list):
-                    for item in raw:
-                        if isinstance(item, dict) and 'id' in item:
-                            statuses[item['id']] = item
-                elif isinstance(raw, dict):
-                    statuses = raw
-        if os.path.exists(EMOJI_YML):
-            with open(EMOJI_YML, 'r', encoding='utf-8') as f:
-                emoji = yaml.safe_load(f) or {}
-    except Exception:
-        # On any YAML parse error, return empty dicts to avoid crashing
-        return {}, {}, {}
-    return modules, statuses, emoji
+    """Return (modules, statuses, emoji) from the seed cache; (None, None, None) without PyYAML."""
+    return SEEDS.snapshot().as_tuple()
 
 
 def utc5_now_iso():
@@ -134,336 +704,851 @@ def to_eastern_iso(ts_str=None):
     return eastern.isoformat()
 
 
+class BroadcastError(Exception):
+    """A broadcast rejected with an HTTP status and a JSON error payload."""
+
+    def __init__(self, code, payload):
+        super().__init__(payload.get('error', 'error'))
+        self.code = code
+        self.payload = payload
+
+
+def normalize_payload(data):
+    """Map dot-separated keys from signals/latest.json onto the flat form keys
+    (moduleId, broadcastName, ...) without overwriting explicit fields."""
+    normalized = {}
+    # broadcast id
+    if 'broadcast.id' in data:
+        normalized['broadcastId'] = data.get('broadcast.id')
+    if 'broadcastId' in data:
+        normalized['broadcastId'] = normalized.get('broadcastId') or data.get('broadcastId')
+
+    # timestamp variants
+    if 'ts.utc5' in data:
+        normalized['timestamp'] = data.get('ts.utc5')
+    if 'timestamp' in data:
+        normalized['timestamp'] = normalized.get('timestamp') or data.get('timestamp')
+
+    # module id
+    if 'module.id' in data:
+        normalized['moduleId'] = data.get('module.id')
+    if 'moduleId' in data:
+        normalized['moduleId'] = normalized.get('moduleId') or data.get('moduleId')
+
+    # broadcast fields
+    if 'broadcast.name' in data:
+        normalized['broadcastName'] = data.get('broadcast.name')
+    if 'broadcast.summary' in data:
+        normalized['broadcastSummary'] = data.get('broadcast.summary')
+    if 'broadcast.rating' in data:
+        normalized['broadcastRating'] = data.get('broadcast.rating')
+
+    # status
+    if 'status.id' in data:
+        normalized['statusId'] = data.get('status.id')
+
+    # artifact link
+    if 'artifact.git.link' in data:
+        normalized['artifactGitLink'] = data.get('artifact.git.link')
+
+    # tags
+    if 'tags.keys' in data:
+        normalized['tagsKeys'] = data.get('tags.keys')
+
+    # merge normalized keys back into data (without overwriting existing explicit fields)
+    for k, v in normalized.items():
+        if k not in data or not data.get(k):
+            data[k] = v
+    return data
+
+
+def payload_fingerprint(data):
+    """sha256 over the normalized fields prepare_broadcast uses; client timestamps are ignored like there."""
+    normalize_payload(data)
+    canonical = {}
+    for key, alias in IDEMPOTENT_FIELDS:
+        value = data.get(key) or (data.get(alias) if alias else None) or ''
+        if key == 'tagsKeys':
+            value = value if isinstance(value, list) else str(value).split(',')
+        elif isinstance(value, str):
+            value = value.strip()
+        canonical[key] = value
+    text = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def idempotency_key(header, data):
+    """(cache key, payload fingerprint, ttl) for POST /api/broadcast, or None when not applicable.
+
+    An Idempotency-Key header wins; without one the payload hash is the key only when
+    BROADCAST_IDEMPOTENCY_CONTENT_TTL is set (it is 0, off, by default).
+    """
+    if not isinstance(data, dict):
+        return None
+    header = (header or '').strip()
+    if len(header) > IDEMPOTENCY_KEY_MAX:
+        raise BroadcastError(400, {'error': 'invalid Idempotency-Key',
+                                   'details': f'longer than {IDEMPOTENCY_KEY_MAX} characters'})
+    if not header and IDEMPOTENCY_CONTENT_TTL <= 0:
+        return None
+    fingerprint = payload_fingerprint(data)
+    if header:
+        return 'key:' + header, fingerprint, IDEMPOTENCY_TTL
+    return 'sha256:' + fingerprint, fingerprint, IDEMPOTENCY_CONTENT_TTL
+
+
+def prepare_broadcast(data, seeds):
+    """Validate one payload against a seed snapshot and build its latest.json-shaped entry.
+
+    The entry's broadcast.id is the requested (or generated) base id; write_broadcasts()
+    makes it unique. Raises BroadcastError for anything the client has to fix.
+    """
+    if not isinstance(data, dict):
+        raise BroadcastError(400, {'error': 'invalid json', 'details': 'expected a JSON object'})
+    normalize_payload(data)
+
+    # Map incoming data to header fields with sensible defaults
+    module_id = (data.get('moduleId') or data.get('module_id') or '').strip()
+    if not module_id:
+        raise BroadcastError(400, {'error': 'moduleId is required'})
+
+    # Validate module id if modules loaded
+    if seeds.module_ids and module_id not in seeds.module_ids:
+        raise BroadcastError(400, {'error': 'unknown moduleId', 'details': f"{module_id} not found in modules.yml"})
+
+    # Validate broadcast rating
+    allowed_ratings = seeds.allowed_ratings
+    rating = (data.get('broadcastRating') or data.get('broadcast_rating') or '').strip()
+    if rating and rating not in allowed_ratings:
+        raise BroadcastError(400, {'error': 'invalid broadcastRating', 'allowed': allowed_ratings})
+
+    # Validate status if statuses available
+    status = (data.get('statusId') or data.get('status_id') or '').strip()
+    if seeds.status_ids and status and status not in seeds.status_ids:
+        raise BroadcastError(400, {'error': 'invalid statusId', 'details': f"{status} not in statuses.yml"})
+
+    # Server-authoritative timestamp: ignore any client-supplied timestamp
+    try:
+        ts_et = to_eastern_iso(None)
+    except Exception as e:
+        raise BroadcastError(500, {'error': 'failed to compute server timestamp', 'details': str(e)})
+
+    # build broadcast id if not provided - canonical UTC Z timestamp + repo + module
+    broadcast_id = (data.get('broadcastId') or data.get('broadcast_id') or '').strip()
+    if not broadcast_id:
+        utc_now = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+        safe_module = module_id.replace(' ', '-').replace('/', '-')
+        broadcast_id = f"{utc_now}-FourTwentyAnalytics-{safe_module}"
+
+    date = ts_et.split('T')[0] if 'T' in ts_et else ts_et.split(' ')[0]
+    tags = data.get('tagsKeys')
+
+    # glyph_icons come from modules.yml (mapped through the emoji palette, falling back to the
+    # module's own emoji); status_icons from the rating, or the status id as a legacy fallback.
+    entry = {
+        'broadcast.id': broadcast_id,
+        'ts.utc5': ts_et,
+        'date': date,
+        'module.id': module_id,
+        'broadcast.rating': rating,
+        'broadcast.name': data.get('broadcastName') or data.get('broadcast_name') or '',
+        'broadcast.summary': data.get('broadcastSummary') or data.get('broadcast_summary') or '',
+        'status.id': status,
+        'artifact.git.link': data.get('artifactGitLink') or data.get('artifact_git_link') or '',
+        'tags.keys': tags if isinstance(tags, list) else (str(tags or '')).split(','),
+        'glyph_icons': seeds.module_glyph_icons.get(module_id, ''),
+        'status_icons': seeds.status_icon(rating, status),
+    }
+
+    # the compiled validator is cached by schema hash, so this is a few dict/regex checks per record
+    validator = VALIDATORS.get(BROADCAST_SCHEMA)
+    if validator is not None:
+        errors = validator(entry)
+        if errors:
+            raise BroadcastError(400, {'error': 'schema validation failed', 'details': errors})
+    return entry
+
+
+def _read_latest():
+    """The current latest.json entry; it may be an object or a single-item array."""
+    if not os.path.exists(LATEST_PATH):
+        return None
+    try:
+        with open(LATEST_PATH, 'r', encoding='utf-8') as lf:
+            loaded = json.load(lf)
+        if isinstance(loaded, list):
+            return loaded[0] if loaded else None
+        return loaded
+    except Exception:
+        return None
+
+
+def write_broadcasts(entries):
+    """Persist prepared entries and return their final, unique broadcast ids.
+
+    In group mode the entries join the background writer's next group and this call
+    returns once that group has reached the configured durability point; in sync mode
+    they are committed on the calling thread.
+    """
+    if not entries:
+        return []
+    if COMMIT_MODE == 'group':
+        return _get_committer().submit(entries)
+    return _commit_broadcast_groups([entries])[0]
+
+
+def _profiled_commit(groups):
+    """The group writer's commit; sampled by PROFILER since its work never runs on a request thread."""
+    if PROFILER.every:
+        return PROFILER.maybe('commit', _commit_broadcast_groups, groups)
+    return _commit_broadcast_groups(groups)
+
+
+def _commit_broadcast_groups(groups):
+    """Commit several requests' entries as one unit; returns one id list per request.
+
+    The store resolves ids and persists every row in one write/transaction (one per
+    request under per-request-fsync), the displaced latest.json entry plus all but the
+    newest new entry are archived together, and latest.json is rewritten once for the
+    newest entry.
+    """
+    entries = [entry for group in groups for entry in group]
+    if not entries:
+        return [[] for _ in groups]
+    t0 = time.perf_counter()
+    # Everything from the id check to the signals rewrite runs as the single writer
+    with WRITE_LOCK:
+        METRICS.observe('broadcast_stage_seconds', time.perf_counter() - t0, stage='lock_wait')
+        try:
+            # before the commit, so a rebuild from the store cannot already contain these entries
+            _load_rollups()
+        except Exception:
+            pass
+        proposed = [entry['broadcast.id'] for entry in entries]
+        timings = {}
+        try:
+            STORE.commit(groups, DURABILITY, timings)
+        except StoreError as e:
+            METRICS.inc('broadcast_write_errors_total', target='store')
+            raise BroadcastError(500, {'error': e.message, 'details': e.details})
+        for step, seconds in timings.items():
+            METRICS.observe('broadcast_stage_seconds', seconds, stage='store_' + step)
+        try:
+            with METRICS.timer('broadcast_stage_seconds', stage='csv_export'):
+                mirror_csv(entries)
+        except Exception:
+            METRICS.inc('broadcast_write_errors_total', target='csv_export')
+        METRICS.inc('broadcast_id_collisions_total',
+                    sum(1 for base, entry in zip(proposed, entries) if entry['broadcast.id'] != base))
+        try:
+            with METRICS.timer('broadcast_stage_seconds', stage='rollups'):
+                rollup_entries(entries)
+        except Exception:
+            METRICS.inc('broadcast_write_errors_total', target='rollups')
+        try:
+            with METRICS.timer('broadcast_stage_seconds', stage='stream'):
+                stream_entries(entries)
+        except Exception:
+            METRICS.inc('broadcast_write_errors_total', target='stream')
+
+        # Update signals archive and latest JSON files
+        try:
+            os.makedirs(SIGNALS_DIR, exist_ok=True)
+
+            # the displaced latest entry and every new entry except the newest become archive lines
+            old_entry = _read_latest()
+            try:
+                with METRICS.timer('broadcast_stage_seconds', stage='archive'):
+                    archive_signals(([old_entry] if old_entry else []) + entries[:-1])
+            except Exception:
+                # non-fatal; continue
+                METRICS.inc('broadcast_write_errors_total', target='archive')
+
+            # write new latest.json (single entry) atomically
+            tmp_latest = LATEST_PATH + '.tmp'
+            try:
+                with METRICS.timer('broadcast_stage_seconds', stage='latest'):
+                    with open(tmp_latest, 'w', encoding='utf-8') as lf:
+                        json.dump(entries[-1], lf, indent=2, ensure_ascii=False)
+                    os.replace(tmp_latest, LATEST_PATH)
+            except Exception:
+                METRICS.inc('broadcast_write_errors_total', target='latest')
+                try:
+                    if os.path.exists(tmp_latest):
+                        os.remove(tmp_latest)
+                except Exception:
+                    pass
+        except Exception:
+            # non-fatal; don't block the main response
+            METRICS.inc('broadcast_write_errors_total', target='signals')
+            try:
+                with open('/tmp/broadcast_server_debug.log', 'a', encoding='utf-8') as dbg:
+                    dbg.write('Failed to update signals/latest/archive.json\n')
+            except Exception:
+                pass
+    ids = iter(entry['broadcast.id'] for entry in entries)
+    return [[next(ids) for _ in group] for group in groups]
+
+
+def _payload_text(data, *keys):
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            return str(value).strip()
+    return ''
+
+
+def _payload_list(value):
+    if isinstance(value, list):
+        items = value
+    elif isinstance(value, str):
+        items = value.split(',')
+    else:
+        items = []
+    # values are stored comma-joined, so a comma inside one item would split it on read
+    return [str(v).strip().replace(',', ' ') for v in items if str(v).strip()]
+
+
+def prepare_workflow(data):
+    """Validate one workflow form payload and build its master.workflow.csv record.
+
+    Accepts the snake_case fields index.js sends (camelCase aliases too). Raises
+    BroadcastError for anything the client has to fix.
+    """
+    if not isinstance(data, dict):
+        raise BroadcastError(400, {'error': 'invalid json', 'details': 'expected a JSON object'})
+    name = _payload_text(data, 'workflow_name', 'workflowName')
+    workflow_id = _payload_text(data, 'workflow_id', 'workflowId')
+    if not workflow_id and not name:
+        raise BroadcastError(400, {'error': 'workflow_id or workflow_name is required'})
+    if not workflow_id:
+        slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'workflow'
+        workflow_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}-workflow-{slug}"
+    if not WORKFLOW_ID_RE.match(workflow_id):
+        raise BroadcastError(400, {'error': 'invalid workflow_id', 'details': 'use letters, digits and . _ : -'})
+
+    # statuses line up with the workflow_run funnel step ids (queued, in_progress, success, ...)
+    status = re.sub(r'[\s\-]+', '_', _payload_text(data, 'workflow_status', 'workflowStatus').lower()) or 'queued'
+
+    steps = _payload_list(data.get('workflow_steps_array', data.get('workflowStepsArray')))
+    artifacts = _payload_list(data.get('workflow_artifacts_array', data.get('workflowArtifactsArray')))
+    raw_count = data.get('workflow_steps_integer', data.get('workflowStepsInteger'))
+    try:
+        steps_count = int(raw_count or 0)
+        if steps_count < 0:
+            raise ValueError(raw_count)
+    except (TypeError, ValueError):
+        raise BroadcastError(400, {'error': 'invalid workflow_steps_integer', 'details': f'{raw_count!r} is not a non-negative integer'})
+
+    try:
+        today = to_eastern_iso().split('T')[0]
+    except Exception as e:
+        raise BroadcastError(500, {'error': 'failed to compute server timestamp', 'details': str(e)})
+    dates = {}
+    for field, alias in (('workflow_creation_date', 'workflowCreationDate'), ('workflow_last_updated', 'workflowLastUpdated')):
+        value = _payload_text(data, field, alias)
+        if value and not re.match(r'^\d{4}-\d{2}-\d{2}', value):
+            raise BroadcastError(400, {'error': f'invalid {field}', 'details': 'expected YYYY-MM-DD'})
+        dates[field] = value or today
+
+    return {
+        'workflow_id': workflow_id,
+        'workflow_name': name,
+        'workflow_description': _payload_text(data, 'workflow_description', 'workflowDescription'),
+        'workflow_type': _payload_text(data, 'workflow_type', 'workflowType'),
+        'workflow_creation_date': dates['workflow_creation_date'],
+        'workflow_status': status,
+        'workflow_owner': _payload_text(data, 'workflow_owner', 'workflowOwner'),
+        'workflow_last_updated': dates['workflow_last_updated'],
+        'workflow_steps_integer': steps_count or len(steps),
+        'workflow_steps_array': steps,
+        'workflow_artifacts_array': artifacts,
+        'ts.utc5': '',
+    }
+
+
+def write_workflows(records):
+    """Append prepared workflow records as one unit; returns [(workflow_id, version)]."""
+    if not records:
+        return []
+    with WRITE_LOCK:
+        try:
+            now = to_eastern_iso()
+        except Exception as e:
+            raise BroadcastError(500, {'error': 'failed to compute server timestamp', 'details': str(e)})
+        for record in records:
+            record['ts.utc5'] = now
+        try:
+            with METRICS.timer('broadcast_stage_seconds', stage='workflow_write'):
+                return WORKFLOWS.append(records, now)
+        except Exception as e:
+            METRICS.inc('broadcast_write_errors_total', target='workflows')
+            raise BroadcastError(500, {'error': 'failed to write workflow csv', 'details': str(e)})
+
+
+def count_invalid(kind, error):
+    """Count a record rejected by validation (400); server-side failures are counted where they happen."""
+    if error.code == 400:
+        METRICS.inc('broadcast_validation_failures_total', kind=kind)
+
+
+def _log_exception():
+    # write exception details to a temporary log for debugging
+    METRICS.inc('broadcast_exceptions_total')
+    try:
+        with open('/tmp/broadcast_server_error.log', 'a', encoding='utf-8') as errf:
+            import traceback
+            errf.write('---\n')
+            traceback.print_exc(file=errf)
+    except Exception:
+        pass
+
+
 class Handler(http.server.BaseHTTPRequestHandler):
-    def _send(self, code=200, payload=None):
+    # headers and body go out as separate writes; without TCP_NODELAY a keep-alive client
+    # waits on Nagle + delayed ACK (~40 ms) for every response
+    disable_nagle_algorithm = True
+
+    def parse_request(self):
+        # the clock starts once the request line is in, so keep-alive idle time is not counted
+        self._started = time.perf_counter()
+        return super().parse_request()
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def handle_one_request(self):
+        self._started = None
+        self._status = None
+        super().handle_one_request()
+        if self._started is not None and self.command:
+            route = _route_label(self.path.partition('?')[0])
+            METRICS.observe('broadcast_http_request_seconds', time.perf_counter() - self._started,
+                            route=route, method=self.command)
+            METRICS.inc('broadcast_http_requests_total', route=route, method=self.command, status=str(self._status))
+
+    def _send_text(self, code, text, content_type):
+        body = text.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, code=200, payload=None, headers=None):
+        if payload is None:
+            payload = {}
+        body = json.dumps(payload).encode('utf-8')
         self.send_response(code)
         # CORS: allow local dev origins to POST from the static site
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Idempotency-Key')
+        self.send_header('Access-Control-Expose-Headers', 'Idempotent-Replayed')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.send_header('Content-Type', 'application/json')
+        # Content-Length is required for keep-alive connections to find the end of the body
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        if payload is None:
-            payload = {}
-        self.wfile.write(json.dumps(payload).encode('utf-8'))
+        self.wfile.write(body)
+
+    def _send_static(self, path, head=False):
+        """Serve a site file with a strong ETag, 304 revalidation and br/gzip; False if not a site file."""
+        if path == ARCHIVE_URL and _archived_since_export:
+            # exported on demand, so the coalesced background export never shows up as staleness
+            try:
+                export_archive()
+            except Exception:
+                _log_exception()
+        asset = SITE.get(path)
+        if asset is None:
+            return False
+        encoding, body, etag = asset.negotiate(self.headers.get('Accept-Encoding'))
+        not_modified = asset.not_modified(self.headers.get('If-None-Match'), etag)
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        # revalidate every time: a 304 costs a round trip but never serves a stale bundle
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if not_modified:
+            self.end_headers()
+            return True
+        self.send_header('Content-Type', asset.content_type)
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
+
+    def _open_stream(self, query):
+        """Send the SSE response headers, then hand the socket to STREAM for the fan-out thread."""
+        params = urllib.parse.parse_qs(query)
+        last_id = parse_event_id(self.headers.get('Last-Event-ID'))
+        if last_id is None:
+            last_id = parse_event_id((params.get('last_event_id') or [None])[-1])
+        seed_stream()
+        stream = STREAM
+        if not stream.reserve():
+            return self._send(503, {'error': 'too many stream clients', 'max_clients': stream.max_clients})
+        try:
+            self.send_response(200)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            # the body runs until either side closes; nothing more is read from this connection
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.flush()
+        except Exception:
+            stream.release()
+            raise
+        self.close_connection = True
+        if stream.subscribe(self.connection, last_id):
+            self.server.detach(self.connection)
+
+    def do_HEAD(self):
+        try:
+            if not self._send_static(self.path.partition('?')[0], head=True):
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+        except Exception:
+            _log_exception()
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
 
     def do_OPTIONS(self):
         # respond to CORS preflight
         self.send_response(204)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Idempotency-Key')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length).decode('utf-8') if length > 0 else ''
+
     def do_POST(self):
+        if PROFILER.every and self.path != '/debug/profile':
+            return PROFILER.maybe('POST ' + _route_label(self.path), self._do_post)
+        return self._do_post()
+
+    def _do_post(self):
         try:
-            if self.path != '/api/broadcast':
-                return self._send(404, {'error': 'not found'})
+            if self.path == '/debug/profile':
+                return self._configure_profile()
+            if self.path == '/api/broadcasts':
+                # one seed snapshot for the whole batch so every record is judged by the same seeds
+                with METRICS.timer('broadcast_stage_seconds', stage='seeds'):
+                    seeds = SEEDS.snapshot()
+                return self._post_batch(lambda record: prepare_broadcast(record, seeds), write_broadcasts,
+                                        'broadcasts', 'broadcast_id')
+            if self.path == '/api/workflows':
+                return self._post_batch(prepare_workflow, lambda records: [wid for wid, _ in write_workflows(records)],
+                                        'workflows', 'workflow_id')
 
-            length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(length).decode('utf-8') if length > 0 else ''
+            # always drain the body so a keep-alive connection stays in sync, even on 404
+            body = self._read_body()
+
+            if self.path not in ('/api/broadcast', '/api/workflow'):
+                return self._send(404, {'error': 'not found'})
 
             try:
-                data = json.loads(body)
+                with METRICS.timer('broadcast_stage_seconds', stage='parse'):
+                    data = json.loads(body)
             except Exception as e:
+                METRICS.inc('broadcast_validation_failures_total', kind=self.path.rsplit('/', 1)[-1])
                 return self._send(400, {'error': 'invalid json', 'details': str(e)})
 
-            # Normalize common dot-separated keys from signals/latest.json
-            # into the flat keys the server expects (moduleId, broadcastName, etc.)
-            normalized = {}
-            # broadcast id
-            if 'broadcast.id' in data:
-                normalized['broadcastId'] = data.get('broadcast.id')
-            if 'broadcastId' in data:
-                normalized['broadcastId'] = normalized.get('broadcastId') or data.get('broadcastId')
-
-            # timestamp variants
-            if 'ts.utc5' in data:
-                normalized['timestamp'] = data.get('ts.utc5')
-            if 'timestamp' in data:
-                normalized['timestamp'] = normalized.get('timestamp') or data.get('timestamp')
-
-            # module id
-            if 'module.id' in data:
-                normalized['moduleId'] = data.get('module.id')
-            if 'moduleId' in data:
-                normalized['moduleId'] = normalized.get('moduleId') or data.get('moduleId')
-
-            # broadcast fields
-            if 'broadcast.name' in data:
-                normalized['broadcastName'] = data.get('broadcast.name')
-            if 'broadcast.summary' in data:
-                normalized['broadcastSummary'] = data.get('broadcast.summary')
-            if 'broadcast.rating' in data:
-                normalized['broadcastRating'] = data.get('broadcast.rating')
-
-            # status
-            if 'status.id' in data:
-                normalized['statusId'] = data.get('status.id')
-
-            # artifact link
-            if 'artifact.git.link' in data:
-                normalized['artifactGitLink'] = data.get('artifact.git.link')
-
-            # tags
-            if 'tags.keys' in data:
-                normalized['tagsKeys'] = data.get('tags.keys')
-
-            # merge normalized keys back into data (without overwriting existing explicit fields)
-            for k, v in normalized.items():
-                if k not in data or not data.get(k):
-                    data[k] = v
-
-            # load seed data for validation (optional)
-            modules, statuses, emoji = load_seeds()
+            if self.path == '/api/workflow':
+                try:
+                    with METRICS.timer('broadcast_stage_seconds', stage='validate'):
+                        record = prepare_workflow(data)
+                    workflow_id, version = write_workflows([record])[0]
+                except BroadcastError as e:
+                    count_invalid('workflow', e)
+                    return self._send(e.code, e.payload)
+                return self._send(200, {'status': 'ok', 'workflow_id': workflow_id, 'version': version})
 
-            # Map incoming data to header fields with sensible defaults
-            module_id = (data.get('moduleId') or data.get('module_id') or '').strip()
-            if not module_id:
-                return self._send(400, {'error': 'moduleId is required'})
-
-            # Validate module id if modules loaded
-            if modules is not None and modules != {}:
-                module_keys = []
-                if isinstance(modules, dict):
-                    module_keys = list(modules.keys())
-                if module_id not in module_keys:
-                    return self._send(400, {'error': 'unknown moduleId', 'details': f"{module_id} not found in modules.yml"})
-
-            # Validate broadcast rating
-            allowed_ratings = ['critical', 'high', 'normal', 'mundane']
-            if emoji and isinstance(emoji, dict):
-                for k in ('ratings', 'broadcast_ratings'):
-                    if k in emoji and isinstance(emoji[k], dict):
-                        allowed_ratings = list(emoji[k].keys())
-                        break
-
-            rating = (data.get('broadcastRating') or data.get('broadcast_rating') or '').strip()
-            if rating and rating not in allowed_ratings:
-                return self._send(400, {'error': 'invalid broadcastRating', 'allowed': allowed_ratings})
-
-            # Validate status if statuses available
-            status = (data.get('statusId') or data.get('status_id') or '').strip()
-            if statuses and isinstance(statuses, dict):
-                status_keys = list(statuses.keys())
-                if status and status not in status_keys:
-                    return self._send(400, {'error': 'invalid statusId', 'details': f"{status} not in statuses.yml"})
-
-            # Server-authoritative timestamp: ignore any client-supplied timestamp
+            # a retry of a request we already committed is answered before any seed or store work
             try:
-                ts_et = to_eastern_iso(None)
-            except Exception as e:
-                return self._send(500, {'error': 'failed to compute server timestamp', 'details': str(e)})
+                with METRICS.timer('broadcast_stage_seconds', stage='idempotency'):
+                    idem = idempotency_key(self.headers.get('Idempotency-Key'), data)
+                    state, result = IDEMPOTENCY.begin(*idem[:2]) if idem else ('owner', None)
+            except BroadcastError as e:
+                count_invalid('broadcast', e)
+                return self._send(e.code, e.payload)
+            if state == 'hit':
+                METRICS.inc('broadcast_idempotent_replays_total')
+                return self._send(200, result, {'Idempotent-Replayed': 'true'})
+            if state == 'mismatch':
+                return self._send(422, {'error': 'Idempotency-Key was already used for a different payload'})
+            if state == 'busy':
+                return self._send(409, {'error': 'a request with this Idempotency-Key is still being processed'})
 
-            # build broadcast id if not provided - canonical UTC Z timestamp + repo + module
-            broadcast_id = (data.get('broadcastId') or data.get('broadcast_id') or '').strip()
-            if not broadcast_id:
-                utc_now = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
-                safe_module = module_id.replace(' ', '-').replace('/', '-')
-                broadcast_id = f"{utc_now}-FourTwentyAnalytics-{safe_module}"
-
-            # Ensure uniqueness by checking existing CSV
+            result = None
             try:
-                ensure_csv()
-                existing_ids = set()
-                with open(CSV_PATH, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for r in reader:
-                        existing_ids.add(r.get('broadcast.id'))
-                unique_id = broadcast_id
-                suffix = 1
-                while unique_id in existing_ids:
-                    unique_id = f"{broadcast_id}-{suffix}"
-                    suffix += 1
-                broadcast_id = unique_id
-            except Exception as e:
-                return self._send(500, {'error': 'failed to check existing csv', 'details': str(e)})
+                # seed lookups come from the in-memory registry; files are only re-parsed when they change
+                try:
+                    with METRICS.timer('broadcast_stage_seconds', stage='seeds'):
+                        seeds = SEEDS.snapshot()
+                    with METRICS.timer('broadcast_stage_seconds', stage='validate'):
+                        entry = prepare_broadcast(data, seeds)
+                    # queueing for the group writer plus the commit itself
+                    with METRICS.timer('broadcast_stage_seconds', stage='commit'):
+                        broadcast_id = write_broadcasts([entry])[0]
+                except BroadcastError as e:
+                    count_invalid('broadcast', e)
+                    return self._send(e.code, e.payload)
+                result = {'status': 'ok', 'broadcast_id': broadcast_id}
+            finally:
+                # only successes are remembered; a failed attempt can simply be retried
+                if idem and result is None:
+                    IDEMPOTENCY.abandon(idem[0])
+                elif idem:
+                    # the journal line is written by the flush thread, not on this request
+                    IDEMPOTENCY.complete(idem[0], result, idem[2])
+                    _start_flusher()
 
-            date = ts_et.split('T')[0] if 'T' in ts_et else ts_et.split(' ')[0]
+            return self._send(200, result)
+        except Exception as e:
+            _log_exception()
+            return self._send(500, {'error': 'internal server error', 'details': str(e)})
 
-            # Enrich glyph_icons from modules.yml and status_icons from emoji palette when available.
-            # If the repo-level emoji palette doesn't provide mappings for the module glyph keys,
-            # fall back to the module's own `emoji` / icon field where present.
-            glyphs_list = []
-            status_icons_list = []
-            try:
-                module_entry = {}
-                if modules and isinstance(modules, dict) and module_id in modules:
-                    module_entry = modules.get(module_id) or {}
-                    # module_entry may have 'glyphs' or variants in YAML
-                    glyphs_candidates = module_entry.get('glyphs') or module_entry.get('glyphs:') or module_entry.get('glyphs', [])
-                    if isinstance(glyphs_candidates, list):
-                        glyphs_list = glyphs_candidates
-
-                # Attempt to map glyph keys to emojis via emoji['glyph_icons']
-                glyph_icons_field = ''
-                mapped = []
-                if emoji and isinstance(emoji, dict) and 'glyph_icons' in emoji and glyphs_list:
-                    mapped = [emoji['glyph_icons'].get(g, '') for g in glyphs_list]
-                    mapped = [m for m in mapped if m]
-
-                if mapped:
-                    glyph_icons_field = ','.join(mapped)
-                else:
-                    # Fallback 1: use module's own emoji/icon field if present
-                    mod_emoji = module_entry.get('emoji') or module_entry.get('icon') or module_entry.get('glyph')
-                    if isinstance(mod_emoji, list) and mod_emoji:
-                        glyph_icons_field = ','.join(mod_emoji)
-                    elif isinstance(mod_emoji, str) and mod_emoji:
-                        glyph_icons_field = mod_emoji
-                    else:
-                        # Final fallback: return the raw glyph keys joined (so something is present)
-                        glyph_icons_field = ','.join(glyphs_list)
-
-                status_icons_field = ''
-                # Prefer deriving the status icon from the broadcast rating (e.g. critical/high/normal)
-                # This allows the icon to reflect the severity/importance of the broadcast.
-                try:
-                    icon = None
-                    if emoji and isinstance(emoji, dict):
-                        # 1) Try mapping rating -> status icon (backwards compatible if status_icons keyed by rating)
-                        if rating:
-                            if 'status_icons' in emoji and isinstance(emoji['status_icons'], dict):
-                                icon = emoji['status_icons'].get(rating)
-                            # 2) Try explicit ratings mapping (common names: 'ratings' or 'broadcast_ratings')
-                            if not icon:
-                                for key in ('ratings', 'broadcast_ratings'):
-                                    if key in emoji and isinstance(emoji[key], dict):
-                                        icon = emoji[key].get(rating)
-                                        if icon:
-                                            break
-                        # 3) Fallback: if no rating-based icon, fall back to status id mapping (legacy behavior)
-                        if not icon and status and 'status_icons' in emoji and isinstance(emoji['status_icons'], dict):
-                            icon = emoji['status_icons'].get(status)
-                    if icon:
-                        status_icons_field = icon
-                    else:
-                        status_icons_field = ''
-                except Exception:
-                    status_icons_field = ''
-            except Exception:
-                glyph_icons_field = ''
-                status_icons_field = ''
-
-            row = [
-                broadcast_id,
-                ts_et,
-                date,
-                module_id,
-                rating,
-                data.get('broadcastName') or data.get('broadcast_name') or '',
-                data.get('broadcastSummary') or data.get('broadcast_summary') or '',
-                status,
-                data.get('artifactGitLink') or data.get('artifact_git_link') or '',
-                ','.join(data.get('tagsKeys') if isinstance(data.get('tagsKeys'), list) else (str(data.get('tagsKeys') or '')).split(',')),
-                glyph_icons_field,
-                status_icons_field,
-            ]
+    def _iter_batch(self, key):
+        """Yield decoded records from a JSON array (or {key: [...]}) body or an NDJSON body.
 
-            try:
-                with open(CSV_PATH, 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(row)
-            except Exception as e:
-                return self._send(500, {'error': 'failed to write csv', 'details': str(e)})
+        NDJSON is parsed line by line as it is read off the socket, so the raw body is
+        never held in memory alongside the decoded records.
+        """
+        length = int(self.headers.get('Content-Length', 0))
+        ctype = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if ctype in NDJSON_TYPES:
+            remaining = length
+            while remaining > 0:
+                line = self.rfile.readline(min(remaining, 1 << 20))
+                if not line:
+                    break
+                remaining -= len(line)
+                line = line.strip()
+                if line:
+                    yield json.loads(line.decode('utf-8'))
+            return
+        body = self.rfile.read(length).decode('utf-8') if length > 0 else ''
+        data = json.loads(body)
+        if isinstance(data, dict) and isinstance(data.get(key), list):
+            data = data[key]
+        if not isinstance(data, list):
+            raise ValueError(f'expected a JSON array of {key}')
+        for record in data:
+            yield record
 
-            # Update signals archive and latest JSON files
-            try:
-                SIGNALS_DIR = os.path.join(REPO_ROOT, 'signals')
-                os.makedirs(SIGNALS_DIR, exist_ok=True)
-                latest_path = os.path.join(SIGNALS_DIR, 'latest.json')
-                archive_path = os.path.join(SIGNALS_DIR, 'archive.latest.json')
-
-                # load existing latest.json (if present) and append to archive
-                old_entry = None
-                if os.path.exists(latest_path):
-                    try:
-                        with open(latest_path, 'r', encoding='utf-8') as lf:
-                            loaded = json.load(lf)
-                            # latest.json may be an object or a single-item array
-                            if isinstance(loaded, list):
-                                old_entry = loaded[0] if loaded else None
-                            else:
-                                old_entry = loaded
-                    except Exception:
-                        old_entry = None
-
-                archive = []
-                if os.path.exists(archive_path):
-                    try:
-                        with open(archive_path, 'r', encoding='utf-8') as af:
-                            archive = json.load(af) or []
-                    except Exception:
-                        archive = []
-
-                if old_entry:
-                    # Prepend so newest entries are first
-                    archive = [old_entry] + archive
-
-                # write updated archive atomically
-                tmp_archive = archive_path + '.tmp'
-                try:
-                    with open(tmp_archive, 'w', encoding='utf-8') as af:
-                        json.dump(archive, af, indent=2, ensure_ascii=False)
-                    os.replace(tmp_archive, archive_path)
-                except Exception:
-                    # non-fatal; continue
-                    try:
-                        if os.path.exists(tmp_archive):
-                            os.remove(tmp_archive)
-                    except Exception:
-                        pass
-
-                # build new latest entry object
-                new_entry = {
-                    'broadcast.id': broadcast_id,
-                    'ts.utc5': ts_et,
-                    'date': date,
-                    'module.id': module_id,
-                    'broadcast.rating': rating,
-                    'broadcast.name': data.get('broadcastName') or data.get('broadcast_name') or '',
-                    'broadcast.summary': data.get('broadcastSummary') or data.get('broadcast_summary') or '',
-                    'status.id': status,
-                    'artifact.git.link': data.get('artifactGitLink') or data.get('artifact_git_link') or '',
-                    'tags.keys': data.get('tagsKeys') if isinstance(data.get('tagsKeys'), list) else (str(data.get('tagsKeys') or '')).split(','),
-                    'glyph_icons': glyph_icons_field,
-                    'status_icons': status_icons_field,
-                }
-
-                # write new latest.json (single entry) atomically
-                tmp_latest = latest_path + '.tmp'
-                try:
-                    with open(tmp_latest, 'w', encoding='utf-8') as lf:
-                        json.dump(new_entry, lf, indent=2, ensure_ascii=False)
-                    os.replace(tmp_latest, latest_path)
-                except Exception:
-                    try:
-                        if os.path.exists(tmp_latest):
-                            os.remove(tmp_latest)
-                    except Exception:
-                        pass
-            except Exception:
-                # non-fatal; don't block the main response
+    def _post_batch(self, prepare, write, key, id_field):
+        """Prepare every record, write the valid ones in one call and report per-record results."""
+        results = []
+        entries = []
+        kind = key[:-1]
+        t0 = time.perf_counter()
+        try:
+            for i, record in enumerate(self._iter_batch(key)):
+                if i >= BATCH_MAX:
+                    raise BroadcastError(413, {'error': 'batch too large', 'max_records': BATCH_MAX,
+                                               'details': f'a batch may hold at most {BATCH_MAX} {key}'})
                 try:
-                    with open('/tmp/broadcast_server_debug.log', 'a', encoding='utf-8') as dbg:
-                        dbg.write('Failed to update signals/latest/archive.json\n')
-                except Exception:
-                    pass
+                    entries.append((i, prepare(record)))
+                    results.append(None)
+                except BroadcastError as e:
+                    count_invalid(kind, e)
+                    results.append(dict(e.payload, index=i, status='error'))
+        except ValueError as e:
+            # the body could not be read as a batch at all; drain whatever is left
+            self.close_connection = True
+            METRICS.inc('broadcast_validation_failures_total', kind=kind)
+            return self._send(400, {'error': 'invalid json', 'details': str(e)})
+        except BroadcastError as e:
+            # over BATCH_MAX: stop reading rather than decode the rest of the body
+            self.close_connection = True
+            METRICS.inc('broadcast_validation_failures_total', kind=kind)
+            return self._send(e.code, e.payload)
+        # reading and decoding are interleaved with validation for streamed NDJSON, so one stage
+        METRICS.observe('broadcast_stage_seconds', time.perf_counter() - t0, stage='batch_validate')
 
-            return self._send(200, {'status': 'ok', 'broadcast_id': broadcast_id})
-        except Exception as e:
-            # write exception details to a temporary log for debugging
+        try:
+            with METRICS.timer('broadcast_stage_seconds', stage='commit'):
+                ids = write([entry for _, entry in entries])
+        except BroadcastError as e:
+            return self._send(e.code, e.payload)
+        for (i, _), record_id in zip(entries, ids):
+            results[i] = {'index': i, 'status': 'ok', id_field: record_id}
+
+        rejected = len(results) - len(ids)
+        return self._send(200, {
+            'status': 'ok' if not rejected else ('partial' if ids else 'rejected'),
+            'accepted': len(ids),
+            'rejected': rejected,
+            'results': results,
+        })
+
+    def _get_broadcasts(self, query):
+        params = urllib.parse.parse_qs(query)
+        filters = {field: set() for field in FILTER_FIELDS}
+        for name, values in params.items():
+            field = QUERY_PARAMS.get(name)
+            if field:
+                for value in values:
+                    filters[field].update(v.strip() for v in value.split(',') if v.strip())
+
+        def one(name):
+            values = params.get(name)
+            return values[-1] if values else None
+
+        try:
+            limit = int(one('limit') or DEFAULT_LIMIT)
+            cursor = one('cursor')
+            if cursor is not None:
+                cursor = int(cursor)
+            items, next_cursor = STORE.query(
+                filters, one('from'), one('to'), limit=limit, cursor=cursor)
+        except ValueError as e:
+            return self._send(400, {'error': 'invalid query', 'details': str(e)})
+        return self._send(200, {'items': items, 'count': len(items), 'next_cursor': next_cursor})
+
+    def _get_glossary(self, path, query):
+        glossary = GLOSSARY.get()
+        if glossary is None:
+            return self._send(503, {'error': 'glossary unavailable', 'details': GLOSSARY.stats()['last_error']})
+        if path.startswith('/api/glossary/'):
+            key = urllib.parse.unquote(path[len('/api/glossary/'):])
+            term = glossary.term(key)
+            if term is None:
+                return self._send(404, {'error': 'unknown glossary key', 'key': key})
+            return self._send(200, term)
+        params = urllib.parse.parse_qs(query)
+        one = lambda name: (params.get(name) or [None])[-1]
+        try:
+            limit = int(one('limit') or GLOSSARY_LIMIT)
+        except ValueError as e:
+            return self._send(400, {'error': 'invalid query', 'details': str(e)})
+        items, suggestions = glossary.search(one('q') or '', limit=limit, tag=one('tag'), orbit=one('orbit'))
+        return self._send(200, {'items': items, 'count': len(items), 'suggestions': suggestions})
+
+    def _get_rollups(self, query):
+        # keep blanks: group_by= asks for bucket totals only
+        params = urllib.parse.parse_qs(query, keep_blank_values=True)
+        one = lambda name: (params.get(name) or [None])[-1]
+        filters = {}
+        for name, values in params.items():
+            field = QUERY_PARAMS.get(name)
+            if field in ROLLUP_DIMENSIONS:
+                for value in values:
+                    filters.setdefault(field, set()).update(v.strip() for v in value.split(',') if v.strip())
+        group_by = one('group_by')
+        group_by = tuple(QUERY_PARAMS.get(g.strip(), g.strip()) for g in group_by.split(',') if g.strip()) \
+            if group_by is not None else ('module.id',)
+        bucket = one('bucket') or DEFAULT_GRANULARITY
+        rollups = get_rollups()
+        try:
+            items = rollups.query(bucket, filters, one('from'), one('to'), group_by=group_by)
+        except ValueError as e:
+            return self._send(400, {'error': 'invalid query', 'details': str(e)})
+        return self._send(200, {'bucket': bucket, 'group_by': list(group_by), 'items': items, 'count': len(items)})
+
+    def _get_workflows(self, path, query):
+        if path == '/api/workflows':
+            params = urllib.parse.parse_qs(query)
+            one = lambda name: (params.get(name) or [None])[-1]
             try:
-                with open('/tmp/broadcast_server_error.log', 'a', encoding='utf-8') as errf:
-                    import traceback
-                    errf.write('---\n')
-                    traceback.print_exc(file=errf)
-            except Exception:
-                pass
-            return self._send(500, {'error': 'internal server error', 'details': str(e)})
+                limit = int(one('limit') or WORKFLOW_LIMIT)
+            except ValueError as e:
+                return self._send(400, {'error': 'invalid query', 'details': str(e)})
+            items, total = WORKFLOWS.find(status=one('status'), owner=one('owner'), limit=limit)
+            return self._send(200, {'items': items, 'count': len(items), 'total': total})
+
+        # /api/workflow/<id> and /api/workflow/<id>/steps
+        parts = [urllib.parse.unquote(p) for p in path[len('/api/workflow/'):].split('/') if p]
+        if len(parts) == 1 or (len(parts) == 2 and parts[1] == 'steps'):
+            record = WORKFLOWS.get(parts[0])
+            if record is None:
+                return self._send(404, {'error': 'unknown workflow', 'workflow_id': parts[0]})
+            steps = WORKFLOWS.steps(parts[0])
+            if len(parts) == 2:
+                return self._send(200, {'workflow_id': parts[0], 'steps': steps})
+            return self._send(200, {'workflow': record, 'steps': steps})
+        return self._send(404, {'error': 'not found'})
+
+    def _configure_profile(self):
+        """POST /debug/profile {"every", "tracemalloc", "keep", "reset"}: change the profiler at runtime."""
+        try:
+            data = json.loads(self._read_body() or '{}')
+            if not isinstance(data, dict):
+                raise ValueError('expected a JSON object')
+            settings = {name: data.get(key) for name, key in (('every', 'every'), ('tracemalloc_frames', 'tracemalloc'),
+                                                              ('keep', 'keep'))}
+            for name, value in settings.items():
+                if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+                    raise ValueError(f'{name} must be a non-negative integer')
+        except ValueError as e:
+            return self._send(400, {'error': 'invalid profile settings', 'details': str(e)})
+        PROFILER.configure(reset=bool(data.get('reset')), **settings)
+        return self._send(200, PROFILER.summary(top=0))
+
+    def _get_profile(self, query):
+        params = urllib.parse.parse_qs(query)
+        try:
+            top = int((params.get('top') or [PROFILE_TOP])[-1])
+            return self._send(200, PROFILER.summary(top=max(0, top), sort=(params.get('sort') or ['tottime'])[-1]))
+        except ValueError as e:
+            return self._send(400, {'error': 'invalid profile query', 'details': str(e)})
 
     def do_GET(self):
-        if self.path == '/debug':
+        if PROFILER.every and not self.path.startswith('/debug'):
+            return PROFILER.maybe('GET ' + _route_label(self.path.partition('?')[0]), self._do_get)
+        return self._do_get()
+
+    def _do_get(self):
+        path, _, query = self.path.partition('?')
+        if path == '/api/broadcasts/stream':
+            try:
+                return self._open_stream(query)
+            except Exception as e:
+                _log_exception()
+                return self._send(500, {'error': 'stream failed', 'details': str(e)})
+        if path == '/api/broadcasts':
+            try:
+                return self._get_broadcasts(query)
+            except Exception as e:
+                _log_exception()
+                return self._send(500, {'error': 'query failed', 'details': str(e)})
+        if path == '/api/glossary' or path.startswith('/api/glossary/'):
+            try:
+                return self._get_glossary(path, query)
+            except Exception as e:
+                _log_exception()
+                return self._send(500, {'error': 'glossary lookup failed', 'details': str(e)})
+        if path == '/api/rollups':
+            try:
+                return self._get_rollups(query)
+            except Exception as e:
+                _log_exception()
+                return self._send(500, {'error': 'rollup query failed', 'details': str(e)})
+        if path == '/api/workflows' or path.startswith('/api/workflow/'):
+            try:
+                return self._get_workflows(path, query)
+            except Exception as e:
+                _log_exception()
+                return self._send(500, {'error': 'workflow lookup failed', 'details': str(e)})
+        if path == '/debug/profile':
+            return self._get_profile(query)
+        if path == '/metrics':
+            return self._send_text(200, METRICS.render(), 'text/plain; version=0.0.4; charset=utf-8')
+        if path == '/debug':
             modules, statuses, emoji = load_seeds()
             ok = {
                 'modules_loaded': modules is not None,
@@ -471,11 +1556,104 @@ class Handler(http.server.BaseHTTPRequestHandler):
                 'emoji_loaded': emoji is not None,
                 'yaml_available': yaml is not None,
                 'zoneinfo_available': ZoneInfo is not None,
+                'seed_cache': SEEDS.stats(),
+                'glossary': GLOSSARY.stats(),
+                'storage': STORE.stats(),
+                'workflows': WORKFLOWS.stats(),
+                'commit': commit_stats(),
+                'idempotency': IDEMPOTENCY.stats(),
+                'archive': ARCHIVE.stats(),
+                'rollups': ROLLUPS.stats() if ROLLUPS is not None else None,
+                'stream': STREAM.stats(),
+                'metrics': METRICS.snapshot(),
+                'profile': PROFILER.stats(),
+                'schemas': VALIDATORS.stats(),
+                'site': SITE.stats(),
             }
             return self._send(200, ok)
+        if not path.startswith('/api/'):
+            try:
+                if self._send_static(path):
+                    return
+            except Exception as e:
+                _log_exception()
+                return self._send(500, {'error': 'static file failed', 'details': str(e)})
         return self._send(404, {'error': 'not found'})
 
 
+class DetachableMixin:
+    """Lets a handler keep its socket open after handle() returns (SSE streams hand it to STREAM)."""
+
+    def __init__(self, *args, **kwargs):
+        self._detached = set()
+        super().__init__(*args, **kwargs)
+
+    def detach(self, request):
+        self._detached.add(request)
+
+    def shutdown_request(self, request):
+        if request in self._detached:
+            self._detached.discard(request)
+            return
+        super().shutdown_request(request)
+
+
+class PooledHTTPServer(DetachableMixin, socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTPServer that hands each connection to a bounded thread pool.
+
+    socketserver.ThreadingMixIn spawns one unbounded thread per connection; here the
+    pool size caps concurrency so a burst of clients cannot exhaust the process.
+    A keep-alive connection holds its worker until it closes or idles out.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS):
+        self.workers = max(1, int(workers))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='broadcast')
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+class SingleHTTPServer(DetachableMixin, http.server.HTTPServer):
+    """The original one-request-at-a-time server, kept for debugging."""
+    allow_reuse_address = True
+
+
+def _interrupt(signum, frame):
+    # SIGTERM takes the same shutdown path as Ctrl-C: drain the writer, then flush every export
+    raise KeyboardInterrupt
+
+
+def make_server(host=HOST, port=PORT, mode=DEFAULT_MODE, workers=DEFAULT_WORKERS, keepalive=DEFAULT_KEEPALIVE):
+    """Build a broadcast server for the requested serving mode.
+
+    keepalive > 0 switches the handler to HTTP/1.1 persistent connections and uses the
+    value as the idle socket timeout; 0 keeps the HTTP/1.0 close-per-request behaviour.
+    """
+    if mode == 'single':
+        # a single-threaded server would be pinned by one idle keep-alive client
+        keepalive = 0
+    if keepalive and keepalive > 0:
+        Handler.protocol_version = 'HTTP/1.1'
+        Handler.timeout = keepalive
+    else:
+        Handler.protocol_version = 'HTTP/1.0'
+        Handler.timeout = None
+
+    if mode == 'single':
+        return SingleHTTPServer((host, port), Handler)
+    if mode == 'threaded':
+        return PooledHTTPServer((host, port), Handler, workers=workers)
+    raise ValueError(f"unknown server mode: {mode}")
+
+
 if __name__ == '__main__':
     ensure_csv()
     # allow overriding port via environment variable for flexibility
@@ -486,12 +1664,50 @@ if __name__ == '__main__':
     except Exception:
         pass
 
-    # prevent bind errors when restarting frequently during development
-    socketserver.TCPServer.allow_reuse_address = True
-    with socketserver.TCPServer((HOST, PORT), Handler) as httpd:
-        print(f"Broadcast server listening at http://{HOST}:{PORT}/api/broadcast")
+    mode = os.environ.get('BROADCAST_SERVER_MODE') or DEFAULT_MODE
+    workers = _env_number('BROADCAST_SERVER_WORKERS', DEFAULT_WORKERS)
+    keepalive = _env_number('BROADCAST_SERVER_KEEPALIVE', DEFAULT_KEEPALIVE, float)
+
+    signal.signal(signal.SIGTERM, _interrupt)
+    # allow_reuse_address on both server classes prevents bind errors when restarting frequently
+    with make_server(HOST, PORT, mode=mode, workers=workers, keepalive=keepalive) as httpd:
+        if STORAGE in ('sqlite', 'partitioned'):
+            # first start on a new engine: carry the existing CSV log over before taking writes
+            imported = STORE.bootstrap(CSV_PATH)
+            if imported:
+                target = SQLITE_PATH if STORAGE == 'sqlite' else STORE.root
+                print(f"Imported {imported} broadcasts from {CSV_PATH} into {target}")
+        # build the query indexes in the background so the first GET does not pay for it
+        threading.Thread(target=STORE.warm, daemon=True).start()
+        print(f"Broadcast server listening at http://{HOST}:{PORT}/api/broadcast ({mode}, workers={workers}, keepalive={keepalive}s)")
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print('\nShutting down')
             httpd.server_close()
+        finally:
+            STREAM.close()
+            close_commit()
+            try:
+                IDEMPOTENCY.close()
+            except Exception:
+                pass
+            with WRITE_LOCK:
+                try:
+                    export_archive()
+                except Exception:
+                    pass
+                try:
+                    export_rollups()
+                except Exception:
+                    pass
+                try:
+                    # keep the canonical CSV current for the static site and the normalizer
+                    export_csv()
+                except Exception:
+                    pass
+                try:
+                    # leave bundle/ current for whatever serves it next
+                    SITE.refresh_bundle()
+                except Exception:
+                    pass
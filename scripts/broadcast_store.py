@@ -0,0 +1,766 @@
+#!/usr/bin/env python3
+"""Storage backends for broadcast records.
+
+  CsvBroadcastStore     data/internal/broadcast.csv, the append-only log the server has
+                        always written, with the in-memory id index (broadcast_index.py)
+                        and query index (broadcast_query.py) kept alongside it
+  SqliteBroadcastStore  data/internal/broadcast.sqlite3 (stdlib sqlite3, WAL mode): a
+                        unique index on the broadcast id, secondary indexes on module,
+                        status, rating and date plus a tag table, so id checks, appends and
+                        filtered reads cost the same however long the history gets
+  PartitionedBroadcastStore
+                        data/internal/broadcast/date=YYYY-MM/part.csv (broadcast_partitions.py):
+                        one CSV per month plus a manifest of row counts and date ranges; a
+                        date-bounded query only indexes and reads the months it overlaps
+
+Both implement BroadcastStore. commit() makes every entry's broadcast.id unique (adding
+-1, -2, ... like the CSV log always has) and persists the entries; query() serves
+GET /api/broadcasts newest-first with an opaque integer cursor.
+
+The SQLite and partitioned engines keep the canonical CSV available for the static site
+and normalize_broadcast_csv.py through export_csv(), which the server runs on shutdown,
+and are seeded from an existing CSV on first start with bootstrap().
+
+Usage:
+  python3 scripts/broadcast_store.py import [--db PATH] [--csv PATH]   # CSV -> SQLite, once
+  python3 scripts/broadcast_store.py export [--db PATH] [--csv PATH]   # SQLite -> canonical CSV
+  python3 scripts/broadcast_store.py stats  [--db PATH]
+  python3 scripts/broadcast_store.py bench --rows 200000               # both engines on a synthetic log
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from broadcast_index import BroadcastIdIndex
+from broadcast_partitions import PartitionedLog, UNKNOWN
+from broadcast_query import BroadcastQueryIndex, DEFAULT_LIMIT, MAX_LIMIT, parse_date
+from group_commit import CsvAppender
+
+HEADER = [
+    "broadcast.id",
+    "ts.utc5",
+    "date",
+    "module.id",
+    "broadcast.rating",
+    "broadcast.name",
+    "broadcast.summary",
+    "status.id",
+    "artifact.git.link",
+    "tags.keys",
+    "glyph_icons",
+    "status_icons",
+]
+
+# HEADER field -> SQLite column
+COLUMNS = {
+    "broadcast.id": 'broadcast_id',
+    "ts.utc5": 'ts_utc5',
+    "date": 'date',
+    "module.id": 'module_id',
+    "broadcast.rating": 'rating',
+    "broadcast.name": 'name',
+    "broadcast.summary": 'summary',
+    "status.id": 'status_id',
+    "artifact.git.link": 'git_link',
+    "tags.keys": 'tags',
+    "glyph_icons": 'glyph_icons',
+    "status_icons": 'status_icons',
+}
+FILTER_COLUMNS = {'module.id': 'module_id', 'status.id': 'status_id', 'broadcast.rating': 'rating'}
+IMPORT_BATCH = 5000
+
+
+class StoreError(Exception):
+    """A write failed; message is the API error string, details the underlying cause."""
+
+    def __init__(self, message, details=''):
+        super().__init__(message)
+        self.message = message
+        self.details = str(details)
+
+
+def is_blank(path):
+    # the repo ships the data CSVs as a bare newline; treat that like a missing file
+    if not os.path.exists(path):
+        return True
+    if os.path.getsize(path) > 2:
+        return False
+    with open(path, 'rb') as f:
+        return not f.read().strip()
+
+
+def ensure_csv(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if is_blank(path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(HEADER)
+
+
+def entry_to_row(entry):
+    return [','.join(entry[h]) if h == 'tags.keys' else entry[h] for h in HEADER]
+
+
+def _tag_list(value):
+    if isinstance(value, list):
+        return [t.strip() for t in value if t and t.strip()]
+    return [t.strip() for t in (value or '').split(',') if t.strip()]
+
+
+class BroadcastStore:
+    """Interface every storage engine implements."""
+
+    name = None
+
+    def commit(self, groups, durability='none', timings=None):
+        """Make ids unique and persist each group (a list of entries); raises StoreError.
+
+        A timings dict, if given, is filled with seconds spent per step ('ids', 'write', 'index').
+        """
+        raise NotImplementedError
+
+    def query(self, filters=None, date_from=None, date_to=None, limit=DEFAULT_LIMIT, cursor=None):
+        """Return (entries, next_cursor) newest-first; raises ValueError for a bad query."""
+        raise NotImplementedError
+
+    def export_csv(self, path):
+        """Write every stored broadcast to path as the canonical HEADER CSV; returns the row count."""
+        raise NotImplementedError
+
+    def iter_entries(self):
+        """Yield every stored broadcast as a HEADER dict, oldest first (constant memory)."""
+        raise NotImplementedError
+
+    def warm(self):
+        """Build whatever the first query or commit would otherwise have to build."""
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'engine': self.name}
+
+    def close(self):
+        """Release open files/connections; the store reopens them on next use."""
+
+
+class CsvBroadcastStore(BroadcastStore):
+    name = 'csv'
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.ids = BroadcastIdIndex(csv_path)
+        self.index = BroadcastQueryIndex(csv_path)
+        self._appender = None
+
+    def commit(self, groups, durability='none', timings=None):
+        entries = [entry for group in groups for entry in group]
+        t0 = time.perf_counter()
+        # Ensure uniqueness against the id index (rebuilt only if the CSV was edited externally)
+        try:
+            ensure_csv(self.csv_path)
+            self.ids.ensure_fresh()
+            for entry in entries:
+                entry['broadcast.id'] = self.ids.resolve(entry['broadcast.id'])
+                self.ids.add(entry['broadcast.id'])
+        except Exception as e:
+            self.ids.invalidate()
+            raise StoreError('failed to check existing csv', e)
+        t1 = time.perf_counter()
+
+        try:
+            if self._appender is None:
+                self._appender = CsvAppender(self.csv_path)
+            chunks = groups if durability == 'per-request-fsync' else [entries]
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                buf = io.StringIO()
+                csv.writer(buf).writerows(entry_to_row(entry) for entry in chunk)
+                self._appender.write(buf.getvalue())
+                if durability != 'none':
+                    self._appender.sync()
+        except Exception as e:
+            # ids handed out above were never written; rebuild from the file next time
+            self.ids.invalidate()
+            raise StoreError('failed to write csv', e)
+        self.ids.mark_synced()
+        t2 = time.perf_counter()
+        try:
+            # index just the rows appended above so queries see them immediately
+            self.index.sync()
+        except Exception:
+            pass
+        if timings is not None:
+            timings.update(ids=t1 - t0, write=t2 - t1, index=time.perf_counter() - t2)
+
+    def query(self, filters=None, date_from=None, date_to=None, limit=DEFAULT_LIMIT, cursor=None):
+        return self.index.query(filters, date_from, date_to, limit=limit, cursor=cursor)
+
+    def export_csv(self, path):
+        if os.path.abspath(path) == os.path.abspath(self.csv_path):
+            return len(self)
+        tmp = path + '.tmp'
+        shutil.copyfile(self.csv_path, tmp)
+        os.replace(tmp, path)
+        return len(self)
+
+    def iter_entries(self):
+        if is_blank(self.csv_path):
+            return
+        with open(self.csv_path, 'r', newline='', encoding='utf-8', buffering=1024 * 1024) as f:
+            for row in csv.DictReader(f):
+                if row.get('broadcast.id'):
+                    entry = {h: row.get(h) or '' for h in HEADER}
+                    entry['tags.keys'] = _tag_list(entry['tags.keys'])
+                    yield entry
+
+    def warm(self):
+        self.ids.ensure_fresh()
+        self.index.ensure_fresh()
+
+    def __len__(self):
+        # rows, not distinct ids: rollups.rows and the SSE event ids count every stored entry
+        self.ids.ensure_fresh()
+        return self.ids.rows
+
+    def stats(self):
+        return {
+            'engine': self.name,
+            'path': self.csv_path,
+            'id_index': self.ids.stats(),
+            'query_index': self.index.stats(),
+            'csv': self._appender.stats() if self._appender else None,
+        }
+
+    def close(self):
+        if self._appender is not None:
+            self._appender.close()
+            self._appender = None
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS broadcasts (
+    seq          INTEGER PRIMARY KEY,
+    broadcast_id TEXT NOT NULL,
+    ts_utc5      TEXT NOT NULL DEFAULT '',
+    date         TEXT NOT NULL DEFAULT '',
+    module_id    TEXT NOT NULL DEFAULT '',
+    rating       TEXT NOT NULL DEFAULT '',
+    name         TEXT NOT NULL DEFAULT '',
+    summary      TEXT NOT NULL DEFAULT '',
+    status_id    TEXT NOT NULL DEFAULT '',
+    git_link     TEXT NOT NULL DEFAULT '',
+    tags         TEXT NOT NULL DEFAULT '',
+    glyph_icons  TEXT NOT NULL DEFAULT '',
+    status_icons TEXT NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS broadcasts_id ON broadcasts (broadcast_id);
+CREATE INDEX IF NOT EXISTS broadcasts_module ON broadcasts (module_id, seq);
+CREATE INDEX IF NOT EXISTS broadcasts_status ON broadcasts (status_id, seq);
+CREATE INDEX IF NOT EXISTS broadcasts_rating ON broadcasts (rating, seq);
+CREATE INDEX IF NOT EXISTS broadcasts_date ON broadcasts (date, seq);
+CREATE TABLE IF NOT EXISTS broadcast_tags (
+    tag TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (tag, seq)
+) WITHOUT ROWID;
+"""
+_FIELDS = ', '.join(COLUMNS[h] for h in HEADER)
+INSERT_SQL = f"INSERT INTO broadcasts (seq, {_FIELDS}) VALUES ({', '.join('?' * (len(HEADER) + 1))})"
+INSERT_TAG_SQL = 'INSERT OR IGNORE INTO broadcast_tags (tag, seq) VALUES (?, ?)'
+EXISTS_SQL = 'SELECT 1 FROM broadcasts WHERE broadcast_id = ?'
+MAX_SEQ_SQL = 'SELECT COALESCE(MAX(seq), 0) FROM broadcasts'
+SELECT_SQL = f'SELECT seq, {_FIELDS} FROM broadcasts'
+# what each durability policy needs from SQLite: in WAL mode NORMAL only syncs at
+# checkpoints, FULL syncs the WAL on every COMMIT
+SYNCHRONOUS = {'none': 'NORMAL', 'batch-fsync': 'FULL', 'per-request-fsync': 'FULL'}
+
+
+class SqliteBroadcastStore(BroadcastStore):
+    name = 'sqlite'
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._writer = None
+        self._local = threading.local()
+        self._next_suffix = {}
+        self._synchronous = None
+        self.commits = 0
+
+    # -- connections --------------------------------------------------------
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False, cached_statements=256)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        return conn
+
+    def _write_conn(self):
+        if self._writer is None:
+            conn = self._connect()
+            conn.executescript(SQLITE_SCHEMA)
+            self._writer = conn
+            self._synchronous = None
+        return self._writer
+
+    def _read_conn(self):
+        """One connection per reader thread; WAL lets them read while the writer commits."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'generation', None) is not self._writer:
+            self._write_conn()
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.generation = self._writer
+        return conn
+
+    # -- writes -------------------------------------------------------------
+
+    def _resolve(self, conn, base_id, pending):
+        """base_id, or base_id-N for the first free N (checked against the table and this transaction)."""
+        if base_id not in pending and conn.execute(EXISTS_SQL, (base_id,)).fetchone() is None:
+            return base_id
+        n = self._next_suffix.get(base_id, 1)
+        while True:
+            candidate = f'{base_id}-{n}'
+            if candidate not in pending and conn.execute(EXISTS_SQL, (candidate,)).fetchone() is None:
+                self._next_suffix[base_id] = n
+                return candidate
+            n += 1
+
+    def commit(self, groups, durability='none', timings=None):
+        spent = {'ids': 0.0, 'write': 0.0}
+        with self._lock:
+            try:
+                conn = self._write_conn()
+                synchronous = SYNCHRONOUS.get(durability, 'NORMAL')
+                if synchronous != self._synchronous:
+                    conn.execute(f'PRAGMA synchronous={synchronous}')
+                    self._synchronous = synchronous
+            except sqlite3.Error as e:
+                raise StoreError('failed to open sqlite store', e)
+            if durability == 'per-request-fsync':
+                chunks = groups
+            else:
+                chunks = [[entry for group in groups for entry in group]]
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                try:
+                    t0 = time.perf_counter()
+                    conn.execute('BEGIN IMMEDIATE')
+                    seq = conn.execute(MAX_SEQ_SQL).fetchone()[0]
+                    pending = set()
+                    rows, tags = [], []
+                    for entry in chunk:
+                        entry['broadcast.id'] = self._resolve(conn, entry['broadcast.id'], pending)
+                        pending.add(entry['broadcast.id'])
+                        seq += 1
+                        rows.append([seq] + entry_to_row(entry))
+                        tags.extend((tag, seq) for tag in _tag_list(entry.get('tags.keys')))
+                    t1 = time.perf_counter()
+                    conn.executemany(INSERT_SQL, rows)
+                    if tags:
+                        conn.executemany(INSERT_TAG_SQL, tags)
+                    conn.execute('COMMIT')
+                    self.commits += 1
+                    spent['ids'] += t1 - t0
+                    spent['write'] += time.perf_counter() - t1
+                except Exception as e:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    # suffix hints may point past ids that were rolled back; they only speed up the search
+                    self._next_suffix.clear()
+                    raise StoreError('failed to write sqlite store', e)
+            if timings is not None:
+                timings.update(spent)
+
+    def import_csv(self, csv_path, batch=IMPORT_BATCH):
+        """Copy every row of an existing broadcast CSV into the store, oldest first; returns the count."""
+        if is_blank(csv_path):
+            return 0
+        count = 0
+        chunk = []
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                entry = {h: (row.get(h) or '') for h in HEADER}
+                if not entry['broadcast.id']:
+                    continue
+                entry['tags.keys'] = _tag_list(entry['tags.keys'])
+                chunk.append(entry)
+                if len(chunk) >= batch:
+                    self.commit([chunk])
+                    count += len(chunk)
+                    chunk = []
+        if chunk:
+            self.commit([chunk])
+            count += len(chunk)
+        return count
+
+    def bootstrap(self, csv_path):
+        """Seed an empty store from the CSV log the first time the SQLite engine is used."""
+        if len(self):
+            return 0
+        return self.import_csv(csv_path)
+
+    # -- reads --------------------------------------------------------------
+
+    @staticmethod
+    def _entry(row):
+        entry = dict(zip(HEADER, row[1:]))
+        entry['tags.keys'] = _tag_list(entry['tags.keys'])
+        return entry
+
+    def query(self, filters=None, date_from=None, date_to=None, limit=DEFAULT_LIMIT, cursor=None):
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        where, params = [], []
+        for field, values in (filters or {}).items():
+            values = sorted(set(values or ()))
+            if not values:
+                continue
+            marks = ', '.join('?' * len(values))
+            if field == 'tags.keys':
+                where.append(f'seq IN (SELECT seq FROM broadcast_tags WHERE tag IN ({marks}))')
+            elif field in FILTER_COLUMNS:
+                where.append(f'{FILTER_COLUMNS[field]} IN ({marks})')
+            else:
+                raise ValueError(f'cannot filter on {field!r}')
+            params.extend(values)
+        if date_from:
+            parse_date(date_from)
+            where.append('date >= ?')
+            params.append(date_from)
+        if date_to:
+            parse_date(date_to)
+            where.append('date <= ?')
+            params.append(date_to)
+        if cursor is not None:
+            where.append('seq < ?')
+            params.append(int(cursor))
+        sql = SELECT_SQL + (' WHERE ' + ' AND '.join(where) if where else '') + ' ORDER BY seq DESC LIMIT ?'
+        params.append(limit + 1)
+        rows = self._read_conn().execute(sql, params).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = str(rows[-1][0]) if more else None
+        return [self._entry(r) for r in rows], next_cursor
+
+    def export_csv(self, path):
+        """Stream the table, oldest first, into the canonical CSV (temp file + atomic replace)."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        count = 0
+        cur = self._read_conn().execute(SELECT_SQL + ' ORDER BY seq')
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            while True:
+                rows = cur.fetchmany(IMPORT_BATCH)
+                if not rows:
+                    break
+                writer.writerows(r[1:] for r in rows)
+                count += len(rows)
+        os.replace(tmp, path)
+        return count
+
+    def iter_entries(self):
+        cur = self._read_conn().execute(SELECT_SQL + ' ORDER BY seq')
+        while True:
+            rows = cur.fetchmany(IMPORT_BATCH)
+            if not rows:
+                return
+            for row in rows:
+                yield self._entry(row)
+
+    def __len__(self):
+        # seq is assigned densely from 1 and rows are never deleted, so MAX(seq) is the count (one index seek)
+        return self._read_conn().execute(MAX_SEQ_SQL).fetchone()[0]
+
+    def stats(self):
+        wal = self.db_path + '-wal'
+        return {
+            'engine': self.name,
+            'path': self.db_path,
+            'rows': len(self),
+            'commits': self.commits,
+            'synchronous': self._synchronous,
+            'db_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            'wal_bytes': os.path.getsize(wal) if os.path.exists(wal) else 0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                try:
+                    self._writer.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                except sqlite3.Error:
+                    pass
+                self._writer.close()
+                self._writer = None
+        # reader connections belong to their threads; they notice the new writer and reconnect
+
+
+class PartitionedIdIndex(BroadcastIdIndex):
+    """BroadcastIdIndex over every partition; any partition changing behind our back triggers a rebuild."""
+
+    def __init__(self, log):
+        super().__init__(None)
+        self.log = log
+
+    def _current_signature(self):
+        return self.log.signature()
+
+    def rebuild(self):
+        t0 = time.perf_counter()
+        self._ids = set(self.log.iter_ids())
+        self._next_suffix = {}
+        self._signature = self._current_signature()
+        self.rebuilds += 1
+        self.last_rebuild_seconds = round(time.perf_counter() - t0, 6)
+
+
+# a partitioned cursor is YYYYMM * CURSOR_BASE + the row cursor inside that month's partition
+CURSOR_BASE = 10 ** 10
+
+
+def _partition_number(key):
+    return 0 if key == UNKNOWN else int(key[:4] + key[5:7])
+
+
+class PartitionedBroadcastStore(BroadcastStore):
+    name = 'partitioned'
+
+    def __init__(self, root):
+        self.root = root
+        self.log = PartitionedLog(root)
+        self.ids = PartitionedIdIndex(self.log)
+        # month -> BroadcastQueryIndex, built the first time a query reaches that month
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _index(self, key):
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = BroadcastQueryIndex(self.log.part_path(key))
+            return index
+
+    def commit(self, groups, durability='none', timings=None):
+        entries = [entry for group in groups for entry in group]
+        t0 = time.perf_counter()
+        try:
+            self.ids.ensure_fresh()
+            for entry in entries:
+                entry['broadcast.id'] = self.ids.resolve(entry['broadcast.id'])
+                self.ids.add(entry['broadcast.id'])
+        except Exception as e:
+            self.ids.invalidate()
+            raise StoreError('failed to check existing partitions', e)
+        t1 = time.perf_counter()
+
+        touched = set()
+        try:
+            chunks = groups if durability == 'per-request-fsync' else [entries]
+            for chunk in chunks:
+                if chunk:
+                    touched.update(self.log.append([entry_to_row(entry) for entry in chunk],
+                                                   sync=durability != 'none'))
+        except Exception as e:
+            self.ids.invalidate()
+            raise StoreError('failed to write partition', e)
+        self.ids.mark_synced()
+        t2 = time.perf_counter()
+        for key in touched:
+            index = self._indexes.get(key)
+            if index is not None:
+                try:
+                    index.sync()
+                except Exception:
+                    pass
+        if timings is not None:
+            timings.update(ids=t1 - t0, write=t2 - t1, index=time.perf_counter() - t2)
+
+    def query(self, filters=None, date_from=None, date_to=None, limit=DEFAULT_LIMIT, cursor=None):
+        """Newest month first, newest row first within a month; only months overlapping the range are read."""
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        if date_from:
+            parse_date(date_from)
+        if date_to:
+            parse_date(date_to)
+        self.log.refresh()
+        keys = self.log.prune(date_from or None, date_to or None)[::-1]
+        start, inner = None, None
+        if cursor is not None:
+            start, inner = divmod(int(cursor), CURSOR_BASE)
+        found = []
+        for i, key in enumerate(keys):
+            number = _partition_number(key)
+            if start is not None and number > start:
+                continue
+            items, next_inner = self._index(key).query(
+                filters, date_from, date_to, limit=limit - len(found),
+                cursor=inner if number == start else None)
+            found.extend(items)
+            if len(found) < limit:
+                continue
+            if next_inner is not None:
+                return found, str(number * CURSOR_BASE + int(next_inner))
+            # this month is used up: only hand out a cursor if an older month still has a match
+            for older in keys[i + 1:]:
+                if self._index(older).query(filters, date_from, date_to, limit=1)[0]:
+                    return found, str(number * CURSOR_BASE)
+            return found, None
+        return found, None
+
+    def bootstrap(self, csv_path):
+        """Split an existing single-file log into partitions on first start; returns rows imported."""
+        if self.log.keys() or is_blank(csv_path):
+            return 0
+        n = self.log.import_csv(csv_path)
+        self.ids.invalidate()
+        return n
+
+    def export_csv(self, path):
+        return self.log.export_csv(path)
+
+    def iter_entries(self):
+        for row in self.log.iter_rows():
+            entry = dict(zip(HEADER, row))
+            entry['tags.keys'] = _tag_list(entry['tags.keys'])
+            yield entry
+
+    def warm(self):
+        # ids span every month; query indexes are left to be built per month on demand
+        self.ids.ensure_fresh()
+
+    def __len__(self):
+        self.log.refresh()
+        return len(self.log)
+
+    def stats(self):
+        return {
+            'engine': self.name,
+            'layout': self.log.stats(),
+            'id_index': self.ids.stats(),
+            'query_indexes': {key: index.stats()['rows'] for key, index in sorted(self._indexes.items())},
+        }
+
+    def close(self):
+        self.log.close()
+
+
+def make_store(engine, csv_path, db_path):
+    if engine == 'csv':
+        return CsvBroadcastStore(csv_path)
+    if engine == 'sqlite':
+        return SqliteBroadcastStore(db_path)
+    if engine == 'partitioned':
+        return PartitionedBroadcastStore(os.path.join(os.path.dirname(csv_path), 'broadcast'))
+    raise ValueError(f'unknown storage engine: {engine}')
+
+
+def synthetic_csv(path, rows, seed=420):
+    rng = random.Random(seed)
+    modules = [f'module{i}_model' for i in range(40)]
+    statuses = ['seed', 'developing', 'active', 'stable', 'archived']
+    ratings = ['critical', 'high', 'normal', 'mundane']
+    tags = [f'tag{i}' for i in range(60)]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            day = f'2025-{1 + i * 12 // rows:02d}-{1 + i % 28:02d}'
+            writer.writerow([f'20250101T000000Z-bench-{i}', f'{day}T12:00:00-04:00', day, rng.choice(modules),
+                             rng.choice(ratings), 'Bench', 'Synthetic row', rng.choice(statuses), '',
+                             ','.join(rng.sample(tags, 2)), '', ''])
+    return modules, tags
+
+
+def bench(rows, commits=1000):
+    """Cold start, single-entry commits and queries for both engines over the same synthetic log."""
+    root = tempfile.mkdtemp(prefix='broadcast-store-bench-')
+    try:
+        csv_path = os.path.join(root, 'broadcast.csv')
+        db_path = os.path.join(root, 'broadcast.sqlite3')
+        modules, tags = synthetic_csv(csv_path, rows)
+        out = {'rows': rows}
+        t0 = time.perf_counter()
+        SqliteBroadcastStore(db_path).import_csv(csv_path)
+        out['sqlite_import_seconds'] = round(time.perf_counter() - t0, 3)
+
+        for engine in ('csv', 'sqlite'):
+            store = make_store(engine, csv_path, db_path)
+            result = {}
+            entry = lambda i: {h: '' for h in HEADER} | {
+                'broadcast.id': f'20261231T000000Z-bench-new-{i}', 'date': '2025-12-31',
+                'ts.utc5': '2025-12-31T12:00:00-04:00', 'module.id': modules[i % len(modules)],
+                'broadcast.rating': 'high', 'status.id': 'active', 'tags.keys': ['bench']}
+            t0 = time.perf_counter()
+            store.commit([[entry(0)]])
+            result['first_commit_ms'] = round((time.perf_counter() - t0) * 1000, 3)
+            t0 = time.perf_counter()
+            for i in range(1, commits + 1):
+                store.commit([[entry(i)]])
+            result['commit_us'] = round((time.perf_counter() - t0) / commits * 1e6, 1)
+            t0 = time.perf_counter()
+            store.query(limit=1)
+            result['first_query_ms'] = round((time.perf_counter() - t0) * 1000, 3)
+            cases = {
+                'newest': {},
+                'module': {'filters': {'module.id': [modules[3]]}},
+                'module+status': {'filters': {'module.id': [modules[5]], 'status.id': ['active']}},
+                'tag': {'filters': {'tags.keys': [tags[7]]}},
+                'date_range': {'date_from': '2025-06-01', 'date_to': '2025-06-07'},
+            }
+            for name, kwargs in cases.items():
+                t0 = time.perf_counter()
+                for _ in range(200):
+                    store.query(limit=50, **kwargs)
+                result[f'query_{name}_ms'] = round((time.perf_counter() - t0) / 200 * 1000, 3)
+            store.close()
+            out[engine] = result
+        return out
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data = os.path.join(root, 'data', 'internal')
+    parser = argparse.ArgumentParser(description='Broadcast storage engines: import, export, stats, bench')
+    parser.add_argument('command', choices=['import', 'export', 'stats', 'bench'])
+    parser.add_argument('--db', default=os.path.join(data, 'broadcast.sqlite3'))
+    parser.add_argument('--csv', default=os.path.join(data, 'broadcast.csv'))
+    parser.add_argument('--rows', type=int, default=200000, help='bench: synthetic log size')
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        print(json.dumps(bench(args.rows), indent=2))
+        return
+    store = SqliteBroadcastStore(args.db)
+    if args.command == 'import':
+        if len(store):
+            print(f'{args.db} already holds {len(store)} broadcasts; not importing')
+            return
+        t0 = time.perf_counter()
+        n = store.import_csv(args.csv)
+        print(f'Imported {n} broadcasts into {args.db} in {time.perf_counter() - t0:.2f}s')
+    elif args.command == 'export':
+        n = store.export_csv(args.csv)
+        print(f'Exported {n} broadcasts to {args.csv}')
+    else:
+        print(json.dumps(store.stats(), indent=2))
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""Server-Sent Events fan-out for newly committed broadcasts.
+
+GET /api/broadcasts/stream hands its socket to BroadcastStream once the response headers
+are out, so an open stream never holds one of the server's request workers. A single
+fan-out thread owns every stream socket (non-blocking, multiplexed with selectors) and:
+
+  - writes each published event to every client from a per-client output buffer; a
+    client whose buffer grows past max_buffer (it stopped reading) is dropped
+  - sends a ': ping' comment every heartbeat seconds so idle proxies keep the
+    connection and dead peers are noticed
+  - notices closed connections by reading from them
+
+Events are framed once and shared by all clients:
+
+  id: 1234            the broadcast's row number in the log, stable across restarts
+  event: broadcast
+  data: {...entry...}
+
+The newest ring_size events stay in a ring buffer. A reconnecting client that sends
+Last-Event-ID (EventSource does this on its own; ?last_event_id= works too) gets the
+events it missed from the ring. If the ring no longer reaches back that far (or the
+server restarted) it gets an 'event: reset' frame first and should refetch the
+broadcasts it needs from GET /api/broadcasts.
+
+publish() only appends to the ring and wakes the fan-out thread, so the commit path
+never waits on a slow client.
+
+Usage:
+  stream = BroadcastStream()
+  stream.seed(row_count)                  # once, so ids continue the log's numbering
+  if stream.reserve():                    # before the HTTP response headers are sent
+      stream.subscribe(sock, last_event_id)
+  stream.publish(first_id, entries)       # after each commit
+"""
+import collections
+import json
+import selectors
+import socket
+import threading
+import time
+
+DEFAULT_RING_SIZE = 1024
+DEFAULT_HEARTBEAT = 15.0
+DEFAULT_MAX_BUFFER = 1 << 20
+DEFAULT_MAX_CLIENTS = 4096
+RETRY_MS = 3000
+
+
+def encode_event(event_id, entry, event='broadcast'):
+    data = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+    return f'id: {event_id}\nevent: {event}\ndata: {data}\n\n'.encode('utf-8')
+
+
+def parse_event_id(value):
+    """An integer Last-Event-ID, or None when absent or malformed."""
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Client:
+    __slots__ = ('sock', 'buffer', 'cursor', 'peer')
+
+    def __init__(self, sock, initial, cursor):
+        self.sock = sock
+        self.buffer = bytearray(initial)
+        # id of the newest event already in buffer, so queued frames are not sent twice
+        self.cursor = cursor
+        try:
+            self.peer = sock.getpeername()
+        except OSError:
+            self.peer = None
+
+
+class BroadcastStream:
+    def __init__(self, ring_size=DEFAULT_RING_SIZE, heartbeat=DEFAULT_HEARTBEAT,
+                 max_buffer=DEFAULT_MAX_BUFFER, max_clients=DEFAULT_MAX_CLIENTS):
+        self.ring_size = max(1, int(ring_size))
+        self.heartbeat = float(heartbeat)
+        self.max_buffer = int(max_buffer)
+        self.max_clients = int(max_clients)
+        self._ring = collections.deque(maxlen=self.ring_size)
+        self._lock = threading.Lock()
+        # handed from request/commit threads to the fan-out thread
+        self._joining = []
+        self._outbox = []
+        self._clients = {}
+        # subscribed and not yet dropped; kept under _lock so publish() knows whether to queue
+        self._active = 0
+        self._selector = None
+        self._wake_r = self._wake_w = None
+        self._thread = None
+        self._closed = False
+        self.last_id = 0
+        self.seeded = False
+        self.published = 0
+        self.subscribed = 0
+        self.replayed = 0
+        self.resets = 0
+        self.dropped_slow = 0
+        self.disconnected = 0
+
+    def _start(self):
+        """Start the fan-out thread on first use. Caller holds _lock."""
+        if self._thread is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, name='broadcast-stream', daemon=True)
+        self._thread.start()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            # the pipe is already full of wake-ups, or we are shutting down
+            pass
+
+    def seed(self, last_id):
+        """Start numbering after last_id (the log's current row count) before the first publish."""
+        with self._lock:
+            if not self.seeded:
+                self.last_id = int(last_id)
+                self.seeded = True
+
+    def reserve(self):
+        """Claim a client slot before the response headers go out; False if the server is full."""
+        with self._lock:
+            if self._closed or self._active >= self.max_clients:
+                return False
+            self._active += 1
+            return True
+
+    def release(self):
+        """Give back a reserved slot that never became a subscription."""
+        with self._lock:
+            self._active -= 1
+
+    def publish(self, first_id, entries):
+        """Queue entries (oldest first) as events first_id, first_id + 1, ..."""
+        if not entries:
+            return
+        frames = [(first_id + i, encode_event(first_id + i, entry)) for i, entry in enumerate(entries)]
+        with self._lock:
+            self._ring.extend(frames)
+            self.last_id = frames[-1][0]
+            self.seeded = True
+            self.published += len(frames)
+            if not self._active:
+                return
+            self._outbox.extend(frames)
+        self._wake()
+
+    def subscribe(self, sock, last_event_id=None):
+        """Take over sock (response headers already sent) in a slot claimed with reserve()."""
+        with self._lock:
+            if self._closed:
+                self._active -= 1
+                return False
+            initial = [f'retry: {RETRY_MS}\n\n'.encode('ascii')]
+            if last_event_id is not None and last_event_id != self.last_id:
+                oldest = self._ring[0][0] if self._ring else self.last_id + 1
+                # older than the ring reaches, or newer than anything this log has (another data root)
+                if last_event_id + 1 < oldest or last_event_id > self.last_id:
+                    initial.append(encode_event(self.last_id, {'reason': 'gap', 'last_event_id': last_event_id,
+                                                               'oldest_id': oldest}, event='reset'))
+                    self.resets += 1
+                missed = [frame for event_id, frame in self._ring if event_id > last_event_id]
+                initial.extend(missed)
+                self.replayed += len(missed)
+            self._joining.append(_Client(sock, b''.join(initial), self.last_id))
+            self.subscribed += 1
+            self._start()
+        self._wake()
+        return True
+
+    def _run(self):
+        last_beat = time.monotonic()
+        while True:
+            timeout = max(0.0, last_beat + self.heartbeat - time.monotonic()) if self.heartbeat > 0 else None
+            try:
+                events = self._selector.select(timeout)
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            if self._closed:
+                return
+            for key, mask in events:
+                client = key.data
+                if client is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    continue
+                if mask & selectors.EVENT_READ:
+                    # clients never send anything after the request; readable means closed (or garbage)
+                    try:
+                        if not client.sock.recv(4096):
+                            self._drop(client, slow=False)
+                            continue
+                    except BlockingIOError:
+                        pass
+                    except OSError:
+                        self._drop(client, slow=False)
+                        continue
+                if mask & selectors.EVENT_WRITE:
+                    self._flush(client)
+
+            with self._lock:
+                joining, self._joining = self._joining, []
+                outbox, self._outbox = self._outbox, []
+            for client in joining:
+                try:
+                    client.sock.setblocking(False)
+                    self._selector.register(client.sock, selectors.EVENT_READ, client)
+                except (OSError, ValueError):
+                    with self._lock:
+                        self._active -= 1
+                    self._close_sock(client.sock)
+                    continue
+                self._clients[client.sock.fileno()] = client
+                self._flush(client)
+            if outbox:
+                payload = b''.join(frame for _, frame in outbox)
+                newest = outbox[-1][0]
+                for client in list(self._clients.values()):
+                    if client.cursor >= newest:
+                        continue
+                    if client.cursor < outbox[0][0]:
+                        client.buffer += payload
+                    else:
+                        client.buffer += b''.join(frame for event_id, frame in outbox if event_id > client.cursor)
+                    client.cursor = newest
+                    self._flush(client)
+
+            if self.heartbeat > 0 and time.monotonic() - last_beat >= self.heartbeat:
+                last_beat = time.monotonic()
+                for client in list(self._clients.values()):
+                    client.buffer += b': ping\n\n'
+                    self._flush(client)
+
+    def _flush(self, client):
+        if client.sock.fileno() not in self._clients:
+            return
+        try:
+            while client.buffer:
+                sent = client.sock.send(client.buffer)
+                if not sent:
+                    break
+                del client.buffer[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(client, slow=False)
+            return
+        if len(client.buffer) > self.max_buffer:
+            self._drop(client, slow=True)
+            return
+        mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.buffer else 0)
+        if self._selector.get_key(client.sock).events != mask:
+            self._selector.modify(client.sock, mask, client)
+
+    def _drop(self, client, slow):
+        fd = client.sock.fileno()
+        if self._clients.pop(fd, None) is None:
+            return
+        with self._lock:
+            self._active -= 1
+        if slow:
+            self.dropped_slow += 1
+        else:
+            self.disconnected += 1
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        self._close_sock(client.sock)
+
+    @staticmethod
+    def _close_sock(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def close(self):
+        """Disconnect every client and stop the fan-out thread."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+            joining, self._joining = self._joining, []
+        for client in joining:
+            self._close_sock(client.sock)
+        if thread is None:
+            return
+        self._wake()
+        thread.join(timeout=5)
+        for client in list(self._clients.values()):
+            self._drop(client, slow=False)
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def stats(self):
+        return {
+            'clients': self._active,
+            'max_clients': self.max_clients,
+            'ring': len(self._ring),
+            'ring_size': self.ring_size,
+            'last_id': self.last_id,
+            'published': self.published,
+            'subscribed': self.subscribed,
+            'replayed': self.replayed,
+            'resets': self.resets,
+            'dropped_slow': self.dropped_slow,
+            'disconnected': self.disconnected,
+            'buffered_bytes': sum(len(c.buffer) for c in list(self._clients.values())),
+        }
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Merge every module checkout's signals into one newest-first hub feed.
+
+Each checkout under --root (any directory holding signals/latest.json and/or
+signals/archive.latest.json) is scanned on a worker pool. A worker parses its repo's
+files, normalizes the entries (the hub's broadcast.* shape and the older id/ts_utc shape
+new-module.sh writes), keeps one entry per broadcast id, sorts them newest first and
+writes them to a per-repo cache file:
+
+  data/constellation/manifest.json   per repo: mtime_ns/size/sha1 of each signals file, entry count
+  data/constellation/<repo>.tsv      sort_ms<TAB>json id<TAB>entry json per line, newest first
+
+A repo whose files have the same mtime and size as last time is not opened at all; one
+whose files were touched but hash the same is not re-parsed. The feed is then a k-way
+merge (heapq.merge) over the per-repo caches, streamed straight into the output file,
+with duplicates across repos dropped by broadcast id: memory holds one pending line per
+repo plus the set of ids already written, never the whole feed. Entries are stored
+serialized, so merging copies text instead of decoding and re-encoding every entry, and
+a run where no repo changed leaves the feed alone.
+
+Usage:
+  python3 scripts/constellation_feed.py --root ~/src                      # writes signals/constellation.latest.json (gitignored)
+  python3 scripts/constellation_feed.py --root ~/src --limit 500 --out /tmp/feed.json
+  python3 scripts/constellation_feed.py --bench 300 --signals 50         # synthetic checkouts, cold vs warm
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEED_PATH = os.path.join(REPO_ROOT, 'signals', 'constellation.latest.json')
+CACHE_DIR = os.path.join(REPO_ROOT, 'data', 'constellation')
+SIGNAL_FILES = ('signals/latest.json', 'signals/archive.latest.json')
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+POOLS = ('process', 'thread')
+
+
+def _sort_ms(entry):
+    """Milliseconds since the epoch for the entry's timestamp (0 when it has none we can read)."""
+    for field in ('ts.utc5', 'ts_utc', 'ts', 'date'):
+        value = entry.get(field)
+        if not isinstance(value, str) or not value:
+            continue
+        try:
+            ts = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            continue
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return int(ts.timestamp() * 1000)
+    return 0
+
+
+def _entries(doc):
+    if isinstance(doc, list):
+        return [e for e in doc if isinstance(e, dict)]
+    if isinstance(doc, dict):
+        return [doc]
+    return []
+
+
+def _cache_name(repo):
+    return repo.replace(os.sep, '_') + '.tsv'
+
+
+def scan_repo(repo, path, cached, cache_dir):
+    """Refresh one repo's cache file; returns its manifest record plus what happened."""
+    stats = []
+    for rel in SIGNAL_FILES:
+        try:
+            st = os.stat(os.path.join(path, rel))
+            stats.append((rel, st.st_mtime_ns, st.st_size))
+        except OSError:
+            pass
+    old_files = (cached or {}).get('files', {})
+    cache_file = os.path.join(cache_dir, _cache_name(repo))
+    have_cache = cached is not None and os.path.exists(cache_file)
+    if have_cache and {rel: [m, s] for rel, m, s in stats} == {rel: f[:2] for rel, f in old_files.items()}:
+        return dict(cached, repo=repo, action='unchanged')
+
+    raw = {}
+    for rel, _, _ in stats:
+        with open(os.path.join(path, rel), 'rb') as f:
+            raw[rel] = f.read()
+    files = {rel: [m, s, hashlib.sha1(raw[rel]).hexdigest()] for rel, m, s in stats}
+    if have_cache and {r: f[2] for r, f in files.items()} == {r: f[2] for r, f in old_files.items()}:
+        return dict(cached, repo=repo, files=files, action='touched')
+
+    newest = {}
+    errors = []
+    for rel, data in raw.items():
+        try:
+            doc = json.loads(data.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            errors.append(f'{rel}: {e}')
+            continue
+        for entry in _entries(doc):
+            broadcast_id = entry.get('broadcast.id') or entry.get('id')
+            if not broadcast_id:
+                continue
+            key = _sort_ms(entry)
+            if broadcast_id not in newest or key > newest[broadcast_id][0]:
+                entry = dict(entry)
+                entry['broadcast.id'] = broadcast_id
+                entry['source.repo'] = repo
+                newest[broadcast_id] = (key, entry)
+    rows = sorted(((key, bid, entry) for bid, (key, entry) in newest.items()), key=lambda r: (-r[0], r[1]))
+    tmp = cache_file + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for key, bid, entry in rows:
+            # json text never contains a raw tab or newline, so both are safe separators
+            f.write(f'{key}\t{json.dumps(bid, ensure_ascii=False)}\t{json.dumps(entry, ensure_ascii=False)}\n')
+    os.replace(tmp, cache_file)
+    return {'repo': repo, 'files': files, 'entries': len(rows), 'errors': errors, 'action': 'parsed'}
+
+
+def _scan(args):
+    return scan_repo(*args)
+
+
+def find_checkouts(root):
+    """[(name, path)] for every directory under root that has a signals file."""
+    out = []
+    with os.scandir(root) as it:
+        for d in sorted(it, key=lambda d: d.name):
+            if d.is_dir() and any(os.path.exists(os.path.join(d.path, rel)) for rel in SIGNAL_FILES):
+                out.append((d.name, d.path))
+    return out
+
+
+def _load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _read_cache(path):
+    """(-sort_ms, id, entry json) per cached line, in merge order."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, bid, entry = line.rstrip('\n').split('\t', 2)
+            yield -int(key), bid, entry
+
+
+def _merge(cache_dir, repos, out_path, limit):
+    """k-way merge of the per-repo newest-first caches into out_path; returns (written, duplicates)."""
+    streams = [_read_cache(os.path.join(cache_dir, _cache_name(repo))) for repo in repos]
+    seen = set()
+    written = duplicates = 0
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    tmp = out_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for _, broadcast_id, entry in heapq.merge(*streams):
+            if broadcast_id in seen:
+                duplicates += 1
+                continue
+            seen.add(broadcast_id)
+            f.write(',\n' if written else '\n')
+            f.write(entry)
+            written += 1
+            if limit and written >= limit:
+                break
+        f.write('\n]\n')
+    os.replace(tmp, out_path)
+    return written, duplicates
+
+
+def aggregate(root, out_path=FEED_PATH, cache_dir=CACHE_DIR, workers=DEFAULT_WORKERS, pool='process', limit=None):
+    t0 = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    previous = _load_manifest(cache_dir)
+    manifest = previous.get('repos', {})
+    checkouts = find_checkouts(root)
+    jobs = [(name, path, manifest.get(name), cache_dir) for name, path in checkouts]
+    executor = ProcessPoolExecutor if pool == 'process' else ThreadPoolExecutor
+    with executor(max_workers=max(1, workers)) as ex:
+        records = list(ex.map(_scan, jobs, chunksize=16) if pool == 'process' else ex.map(_scan, jobs))
+    scanned_s = time.perf_counter() - t0
+
+    actions = {'parsed': 0, 'touched': 0, 'unchanged': 0}
+    errors = {}
+    new_manifest = {}
+    for record in records:
+        actions[record.pop('action')] += 1
+        repo = record.pop('repo')
+        if record.get('errors'):
+            errors[repo] = record['errors']
+        new_manifest[repo] = record
+    # repos that disappeared from root leave the feed with their cache files
+    for repo in set(manifest) - set(new_manifest):
+        try:
+            os.unlink(os.path.join(cache_dir, _cache_name(repo)))
+        except OSError:
+            pass
+    t1 = time.perf_counter()
+    feed = previous.get('feed') or {}
+    unchanged = (actions['parsed'] == 0 and set(manifest) == set(new_manifest) and os.path.exists(out_path)
+                 and feed.get('out') == os.path.abspath(out_path) and feed.get('limit') == limit)
+    if unchanged:
+        written, duplicates = feed.get('entries', 0), feed.get('duplicates', 0)
+    else:
+        written, duplicates = _merge(cache_dir, new_manifest, out_path, limit)
+    tmp = os.path.join(cache_dir, 'manifest.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'repos': new_manifest, 'feed': {'out': os.path.abspath(out_path), 'limit': limit,
+                                                   'entries': written, 'duplicates': duplicates}},
+                  f, separators=(',', ':'))
+    os.replace(tmp, os.path.join(cache_dir, 'manifest.json'))
+    return {
+        'repos': len(checkouts),
+        **actions,
+        'entries': written,
+        'duplicates': duplicates,
+        'errors': errors,
+        'pool': pool,
+        'workers': workers,
+        'scan_seconds': round(scanned_s, 3),
+        'merge_seconds': round(time.perf_counter() - t1, 3),
+        'feed_unchanged': unchanged,
+        'seconds': round(time.perf_counter() - t0, 3),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'out': out_path,
+    }
+
+
+def make_synthetic_checkouts(root, repos, signals, shared=20, seed=420):
+    """repos checkouts with an archive of `signals` entries each; `shared` hub ids appear in every repo."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    hub = [{'broadcast.id': f'hub-{i}', 'ts.utc5': (start + timedelta(hours=i)).isoformat(),
+            'module.id': 'fourtwenty_analytics', 'broadcast.name': 'Hub broadcast'} for i in range(shared)]
+    for r in range(repos):
+        signals_dir = os.path.join(root, f'module-{r:04d}', 'signals')
+        os.makedirs(signals_dir)
+        entries = [{
+            'broadcast.id': f'module-{r}-{i}',
+            'ts.utc5': (start + timedelta(minutes=rng.randrange(0, 400000))).isoformat(),
+            'date': '', 'module.id': f'module_{r}', 'broadcast.rating': rng.choice(['critical', 'high', 'normal']),
+            'broadcast.name': 'Synthetic signal', 'broadcast.summary': 'x' * rng.randrange(20, 200),
+            'tags.keys': ['bench'],
+        } for i in range(signals)]
+        entries.sort(key=lambda e: e['ts.utc5'], reverse=True)
+        with open(os.path.join(signals_dir, 'latest.json'), 'w', encoding='utf-8') as f:
+            json.dump(entries[0], f)
+        with open(os.path.join(signals_dir, 'archive.latest.json'), 'w', encoding='utf-8') as f:
+            json.dump(entries + hub, f)
+
+
+def _is_newest_first(feed):
+    # the feed holds one entry per line, so it can be checked without loading it
+    last = None
+    with open(feed, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip().rstrip(',')
+            if line in ('[', ']', ''):
+                continue
+            key = _sort_ms(json.loads(line))
+            if last is not None and key > last:
+                return False
+            last = key
+    return True
+
+
+def bench(repos, signals, workers=DEFAULT_WORKERS):
+    base = tempfile.mkdtemp(prefix='constellation-bench-')
+    try:
+        checkouts = os.path.join(base, 'checkouts')
+        make_synthetic_checkouts(checkouts, repos, signals)
+        out = {'repos': repos, 'signals_per_repo': signals}
+        for pool in POOLS:
+            cache = os.path.join(base, f'cache-{pool}')
+            feed = os.path.join(base, f'feed-{pool}.json')
+            cold = aggregate(checkouts, feed, cache, workers, pool)
+            warm = aggregate(checkouts, feed, cache, workers, pool)
+            out[pool] = {k: cold[k] for k in ('entries', 'duplicates', 'scan_seconds', 'merge_seconds', 'seconds')}
+            out[pool]['newest_first'] = _is_newest_first(feed)
+            out[pool]['warm_seconds'] = warm['seconds']
+            out[pool]['warm_unchanged'] = warm['unchanged']
+        # one repo gets a new broadcast: only that repo is parsed again
+        latest = os.path.join(checkouts, 'module-0000', 'signals', 'latest.json')
+        with open(latest, 'w', encoding='utf-8') as f:
+            json.dump({'broadcast.id': 'module-0-new', 'ts.utc5': datetime.now(timezone.utc).isoformat()}, f)
+        one = aggregate(checkouts, os.path.join(base, 'feed.json'), os.path.join(base, 'cache-process'), workers)
+        out['one_repo_changed'] = {k: one[k] for k in ('parsed', 'unchanged', 'entries', 'seconds')}
+        out['max_rss_mb'] = one['max_rss_mb']
+        return out
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Aggregate module signals into one hub feed')
+    parser.add_argument('--root', help='directory of module checkouts')
+    parser.add_argument('--out', default=FEED_PATH)
+    parser.add_argument('--cache', default=CACHE_DIR)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--pool', choices=POOLS, default='process')
+    parser.add_argument('--limit', type=int, default=0, help='keep only the newest N entries')
+    parser.add_argument('--bench', type=int, default=0, metavar='REPOS', help='benchmark over synthetic checkouts')
+    parser.add_argument('--signals', type=int, default=50, help='bench: signals per synthetic repo')
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        print(json.dumps(bench(args.bench, args.signals, args.workers), indent=2))
+        return 0
+    if not args.root:
+        parser.error('--root is required (or use --bench)')
+    result = aggregate(args.root, args.out, args.cache, args.workers, args.pool, args.limit or None)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
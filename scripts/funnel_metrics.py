@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""Compute the metrics declared in seeds/funnel_spec.yml from the event logs.
+
+Streams data/internal/broadcast.csv (module status changes, funnel launch_lifecycle) and
+data/internal/steps.workflow.csv (workflow step changes, funnel workflow_run) in one pass
+each and emits, as NDJSON:
+
+  time_in_step_days   every time an entity leaves a step
+  lead_time_days      first event -> first steady_state step, once per entity
+  cycle_time_days     running dwell in non-terminal steps, excluding paused/dormant
+  sla_breach          a dwell (closed, or still open at --as-of) above the step's SLA
+
+Only per-entity running state (current step, when it was entered, accumulated cycle
+time) and per-step aggregates are held in memory, so memory is bounded by the number
+of entities and steps, not events. Rows are processed in file order; a row older than
+the entity's current step is counted as out_of_order and skipped rather than sorted.
+
+With --checkpoint, the byte offset reached in each log and all running state are saved
+so the next run only reads rows appended since. A log that shrank or was replaced
+(different inode, e.g. after normalize_broadcast_csv.py) is re-read from the start.
+
+Usage:
+  python3 scripts/funnel_metrics.py
+  python3 scripts/funnel_metrics.py --checkpoint data/internal/funnel_metrics.checkpoint.json \
+      --out data/internal/funnel_metrics.ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+try:
+    import yaml
+except Exception:
+    yaml = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, 'data', 'internal')
+FUNNEL_SPEC = os.path.join(REPO_ROOT, 'seeds', 'funnel_spec.yml')
+
+# (name, path, funnel id, entity column, step column candidates, timestamp column candidates)
+SOURCES = [
+    ('broadcast', os.path.join(DATA_DIR, 'broadcast.csv'), 'launch_lifecycle',
+     'module.id', ('status.id',), ('ts.utc5',)),
+    ('workflow_steps', os.path.join(DATA_DIR, 'steps.workflow.csv'), 'workflow_run',
+     'workflow_id', ('step_status', 'workflow_status', 'status'), ('step_ts', 'ts', 'workflow_last_updated')),
+]
+
+# cycle time "excludes paused/dormant"
+CYCLE_EXCLUDED_STEPS = {'paused', 'dormant'}
+SECONDS_PER_DAY = 86400.0
+
+
+def parse_ts(value):
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def sla_days(sla):
+    if not isinstance(sla, dict):
+        return None
+    if sla.get('max_days_in_step') is not None:
+        return float(sla['max_days_in_step'])
+    if sla.get('max_hours_in_step') is not None:
+        return float(sla['max_hours_in_step']) / 24.0
+    if sla.get('max_minutes_in_step') is not None:
+        return float(sla['max_minutes_in_step']) / 1440.0
+    return None
+
+
+class Funnel:
+    """Step lookups for one funnel from funnel_spec.yml."""
+
+    def __init__(self, spec, defaults):
+        self.id = spec['id']
+        default_sla = (defaults or {}).get('sla') or {}
+        self.breach_tag = default_sla.get('breach_tag', 'sla_breach')
+        self.default_severity = default_sla.get('breach_severity', 'warn')
+        self.steps = {}
+        for step in spec.get('steps') or []:
+            sla = step.get('sla') or {}
+            self.steps[step['id']] = {
+                'sla_days': sla_days(sla),
+                'severity': sla.get('breach_severity', self.default_severity),
+                'steady_state': bool(step.get('steady_state')),
+                'terminal': bool(step.get('terminal')),
+            }
+
+
+def load_funnels(path=FUNNEL_SPEC):
+    if yaml is None:
+        raise SystemExit('PyYAML is required to read funnel_spec.yml (pip install pyyaml)')
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = yaml.safe_load(f) or {}
+    defaults = spec.get('defaults') or {}
+    return {fs['id']: Funnel(fs, defaults) for fs in spec.get('funnels') or []}
+
+
+def iter_records(path, offset, header):
+    """Yield (row, end_offset) for CSV records starting at byte offset.
+
+    csv.reader only pulls another physical line when it needs one to finish a record,
+    so the bytes consumed after each yielded row are exactly that record's end, even
+    with quoted newlines.
+    """
+    consumed = [offset]
+
+    def lines(f):
+        for raw in f:
+            consumed[0] += len(raw)
+            yield raw.decode('utf-8', errors='replace')
+
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        reader = csv.reader(lines(f))
+        if header is None:
+            for row in reader:
+                if any(cell.strip() for cell in row):
+                    header = row
+                    break
+            else:
+                return
+            yield header, consumed[0]
+        for row in reader:
+            yield row, consumed[0]
+
+
+class MetricsEngine:
+    def __init__(self, funnels, as_of=None, state=None):
+        self.funnels = funnels
+        self.as_of = as_of
+        state = state or {}
+        self.sources = state.get('sources', {})
+        self.entities = state.get('entities', {})
+        self.steps = state.get('steps', {})
+        self.counters = state.get('counters', {'events': 0, 'transitions': 0, 'breaches': 0,
+                                               'out_of_order': 0, 'unknown_step': 0, 'bad_rows': 0})
+
+    def state(self):
+        return {'sources': self.sources, 'entities': self.entities, 'steps': self.steps, 'counters': self.counters}
+
+    def _step_agg(self, funnel_id, step):
+        key = f'{funnel_id}:{step}'
+        agg = self.steps.get(key)
+        if agg is None:
+            agg = self.steps[key] = {'count': 0, 'total_days': 0.0, 'max_days': 0.0, 'breaches': 0}
+        return agg
+
+    def _close_step(self, funnel, st, ts, at, emit):
+        step = st['step']
+        days = (ts - st['since']) / SECONDS_PER_DAY
+        info = funnel.steps.get(step, {})
+        agg = self._step_agg(funnel.id, step)
+        agg['count'] += 1
+        agg['total_days'] += days
+        agg['max_days'] = max(agg['max_days'], days)
+        emit({'metric': 'time_in_step_days', 'funnel': funnel.id, 'entity': st['entity'], 'step': step,
+              'value': round(days, 6), 'entered': st['since_at'], 'exited': at})
+        if not info.get('terminal') and step not in CYCLE_EXCLUDED_STEPS:
+            st['cycle_days'] += days
+        limit = info.get('sla_days')
+        if limit is not None and days > limit and not st.get('open_breach'):
+            self._breach(funnel, st, step, days, limit, 'closed', emit)
+        st['open_breach'] = False
+
+    def _breach(self, funnel, st, step, days, limit, kind, emit):
+        self.counters['breaches'] += 1
+        self._step_agg(funnel.id, step)['breaches'] += 1
+        emit({'event': funnel.breach_tag, 'tag': funnel.breach_tag, 'funnel': funnel.id, 'entity': st['entity'],
+              'step': step, 'severity': funnel.steps.get(step, {}).get('severity', funnel.default_severity),
+              'days_in_step': round(days, 6), 'max_days_in_step': limit, 'state': kind, 'entered': st['since_at']})
+
+    def observe(self, funnel, entity, step, ts, at, emit):
+        """Feed one event; ts is epoch seconds, at the timestamp as written in the log."""
+        self.counters['events'] += 1
+        if step not in funnel.steps:
+            self.counters['unknown_step'] += 1
+            return
+        key = f'{funnel.id}:{entity}'
+        st = self.entities.get(key)
+        if st is None:
+            st = self.entities[key] = {'entity': entity, 'step': step, 'since': ts, 'since_at': at, 'first': ts,
+                                       'lead_done': False, 'cycle_days': 0.0, 'open_breach': False}
+        else:
+            if ts < st['since']:
+                self.counters['out_of_order'] += 1
+                return
+            if step == st['step']:
+                return
+            self._close_step(funnel, st, ts, at, emit)
+            self.counters['transitions'] += 1
+            st['step'] = step
+            st['since'] = ts
+            st['since_at'] = at
+            emit({'metric': 'cycle_time_days', 'funnel': funnel.id, 'entity': entity,
+                  'value': round(st['cycle_days'], 6), 'at': at})
+        if not st['lead_done'] and funnel.steps[step]['steady_state']:
+            st['lead_done'] = True
+            emit({'metric': 'lead_time_days', 'funnel': funnel.id, 'entity': entity,
+                  'value': round((ts - st['first']) / SECONDS_PER_DAY, 6), 'at': at})
+
+    def run_source(self, name, path, funnel_id, entity_col, step_cols, ts_cols, emit):
+        funnel = self.funnels.get(funnel_id)
+        if funnel is None or not os.path.exists(path):
+            return 0
+        st = os.stat(path)
+        src = self.sources.get(name)
+        if src is None or src.get('inode') != st.st_ino or src.get('offset', 0) > st.st_size:
+            if src is not None:
+                # the log was rewritten: forget everything derived from it and start over
+                prefix = f'{funnel_id}:'
+                self.entities = {k: v for k, v in self.entities.items() if not k.startswith(prefix)}
+                self.steps = {k: v for k, v in self.steps.items() if not k.startswith(prefix)}
+            src = {'inode': st.st_ino, 'offset': 0, 'header': None}
+        header = src['header']
+        rows = 0
+        cols = None
+        for row, end in iter_records(path, src['offset'], header):
+            if header is None:
+                header = row
+                src['header'] = header
+                src['offset'] = end
+                continue
+            if cols is None:
+                idx = {h: i for i, h in enumerate(header)}
+                cols = (idx.get(entity_col),
+                        next((idx[c] for c in step_cols if c in idx), None),
+                        next((idx[c] for c in ts_cols if c in idx), None))
+                if None in cols:
+                    # this log does not carry the columns the funnel needs
+                    break
+            ei, si, ti = cols
+            src['offset'] = end
+            if len(row) <= max(cols):
+                self.counters['bad_rows'] += 1
+                continue
+            ts = parse_ts(row[ti])
+            if ts is None or not row[ei] or not row[si]:
+                self.counters['bad_rows'] += 1
+                continue
+            self.observe(funnel, row[ei], row[si], ts, row[ti], emit)
+            rows += 1
+        src['inode'] = st.st_ino
+        self.sources[name] = src
+        return rows
+
+    def flush_open(self, emit):
+        """Emit breaches for steps still open past their SLA as of as_of (once per stay)."""
+        as_of = self.as_of if self.as_of is not None else datetime.now(timezone.utc).timestamp()
+        for key, st in self.entities.items():
+            funnel = self.funnels.get(key.split(':', 1)[0])
+            if funnel is None or st.get('open_breach'):
+                continue
+            limit = funnel.steps.get(st['step'], {}).get('sla_days')
+            days = (as_of - st['since']) / SECONDS_PER_DAY
+            if limit is not None and days > limit:
+                self._breach(funnel, st, st['step'], days, limit, 'open', emit)
+                st['open_breach'] = True
+
+    def summary(self):
+        steps = {}
+        for key, agg in sorted(self.steps.items()):
+            steps[key] = dict(agg, mean_days=round(agg['total_days'] / agg['count'], 6) if agg['count'] else None)
+        per_funnel = {}
+        for key, st in self.entities.items():
+            fid = key.split(':', 1)[0]
+            f = per_funnel.setdefault(fid, {'entities': 0, 'cycle_time_days_total': 0.0, 'reached_steady_state': 0})
+            f['entities'] += 1
+            f['cycle_time_days_total'] += st['cycle_days']
+            f['reached_steady_state'] += 1 if st['lead_done'] else 0
+        return {'counters': self.counters, 'funnels': per_funnel, 'time_in_step_days': steps}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stream funnel metrics and SLA breaches from the event logs')
+    parser.add_argument('--spec', default=FUNNEL_SPEC)
+    parser.add_argument('--checkpoint', default=None, help='state file for incremental runs')
+    parser.add_argument('--out', default=None, help='append NDJSON events here instead of stdout')
+    parser.add_argument('--as-of', default=None, help='ISO timestamp for open-step SLA checks (default now)')
+    parser.add_argument('--broadcast-csv', default=SOURCES[0][1])
+    parser.add_argument('--steps-csv', default=SOURCES[1][1])
+    args = parser.parse_args(argv)
+
+    state = None
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        with open(args.checkpoint, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    engine = MetricsEngine(load_funnels(args.spec), as_of=parse_ts(args.as_of), state=state)
+
+    out = open(args.out, 'a', encoding='utf-8') if args.out else sys.stdout
+    buf = io.StringIO()
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def emit(event):
+        buf.write(encode(event) + '\n')
+        if buf.tell() > 1 << 16:
+            out.write(buf.getvalue())
+            buf.seek(0)
+            buf.truncate()
+
+    paths = {'broadcast': args.broadcast_csv, 'workflow_steps': args.steps_csv}
+    try:
+        for name, _, funnel_id, entity_col, step_cols, ts_cols in SOURCES:
+            engine.run_source(name, paths[name], funnel_id, entity_col, step_cols, ts_cols, emit)
+        engine.flush_open(emit)
+        out.write(buf.getvalue())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.checkpoint:
+        tmp = args.checkpoint + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(engine.state(), f)
+        os.replace(tmp, args.checkpoint)
+    print(json.dumps(engine.summary(), indent=2), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
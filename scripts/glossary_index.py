@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""Compile seeds/glossary.yml into a search index and serve lookups from it.
+
+The compiled artifact (data/glossary.index.json, a local build product that is not
+committed; it is rebuilt on first use) holds:
+
+  terms     key, term, definition, examples, tags, orbit, status per glossary entry
+  postings  token -> [[term, weight], ...]; term/key tokens weigh 3, tags 2, definition
+            and example tokens 1, all scaled by idf, so a query only sums precomputed numbers
+  vocab     every token, sorted, for prefix lookup (autocomplete on the last query word)
+  facets    tag -> terms and orbit -> terms
+  graph     key -> resolved see_also keys, unresolved see_also keys and referenced_by
+  report    the duplicate/scrub findings (same columns as scrubs/glossary-scrub-report-*.csv)
+
+The artifact records the sha1 of the YAML it came from. GlossaryIndex only re-hashes
+the YAML when its mtime/size change and only recompiles when the hash differs from the
+loaded (or on-disk) artifact, so the server can ask for the index on every request.
+
+Scrub findings are found by hashing rather than by eye: repeated keys, keys that are
+not snake_case (with the snake_case key they map to), keys that collide once
+normalized, terms or definitions whose normalized text hashes the same, and see_also
+references to keys that do not exist.
+
+Usage:
+  python3 scripts/glossary_index.py build            # write the artifact and scrubs/glossary-scrub-report-MMDDYYYY.csv
+  python3 scripts/glossary_index.py search "data lake"
+  python3 scripts/glossary_index.py bench --queries 20000
+"""
+import argparse
+import bisect
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+try:
+    import yaml
+except Exception:
+    yaml = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GLOSSARY_YML = os.path.join(REPO_ROOT, 'seeds', 'glossary.yml')
+GLOSSARY_INDEX = os.path.join(REPO_ROOT, 'data', 'glossary.index.json')
+SCRUBS_DIR = os.path.join(REPO_ROOT, 'scrubs')
+
+ARTIFACT_VERSION = 1
+FIELD_WEIGHTS = {'term': 3.0, 'key': 3.0, 'tags': 2.0, 'definition': 1.0, 'examples': 1.0}
+REPORT_HEADER = ['type', 'key', 'note', 'new_key', 'term']
+PREFIX_EXPANSIONS = 32
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_SNAKE_RE = re.compile(r'^[a-z0-9_]+$')
+STOPWORDS = frozenset('a an and are as at be by for from in into is it of on or that the to with'.split())
+
+
+if yaml is not None:
+    class _GlossaryLoader(yaml.SafeLoader):
+        """SafeLoader that records mapping keys YAML would otherwise overwrite silently."""
+
+        def __init__(self, stream):
+            super().__init__(stream)
+            self.duplicates = []
+
+        def construct_mapping(self, node, deep=False):
+            mapping = super().construct_mapping(node, deep=deep)
+            seen = set()
+            for key_node, _ in node.value:
+                key = self.construct_object(key_node, deep=deep)
+                if key in seen:
+                    self.duplicates.append({'key': str(mapping.get('key') or ''), 'field': str(key),
+                                            'line': key_node.start_mark.line + 1})
+                seen.add(key)
+            return mapping
+
+
+def load_glossary(raw):
+    """Parse glossary YAML bytes; returns (items, duplicate mapping keys)."""
+    loader = _GlossaryLoader(raw.decode('utf-8'))
+    try:
+        items = loader.get_single_data() or []
+    finally:
+        loader.dispose()
+    return items, loader.duplicates
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def _text(value):
+    if isinstance(value, list):
+        return ' '.join(str(v) for v in value if v is not None)
+    return '' if value is None else str(value)
+
+
+def _list(value):
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None and str(v).strip()]
+    return [str(value)] if value else []
+
+
+def _snake(key):
+    return re.sub(r'[^a-z0-9]+', '_', str(key).lower()).strip('_')
+
+
+def _fingerprint(text):
+    """Hash of the normalized text, so case, punctuation and spacing differences still collide."""
+    return hashlib.sha1(' '.join(_TOKEN_RE.findall(str(text).lower())).encode('utf-8')).hexdigest()
+
+
+def scrub_report(items, duplicates=()):
+    """Duplicate/scrub findings for a parsed glossary list, as REPORT_HEADER dicts."""
+    rows = [{'type': 'duplicate_original_key', 'key': d['key'], 'new_key': '', 'term': '',
+             'note': f"'{d['field']}' repeated on line {d['line']}; the last value wins"} for d in duplicates]
+    seen_keys = {}
+    snake_keys = {}
+    term_hashes = {}
+    definition_hashes = {}
+    for item in items:
+        key = str(item.get('key') or '')
+        term = _text(item.get('term'))
+        if key in seen_keys:
+            rows.append({'type': 'duplicate_key', 'key': key, 'note': f"key repeats entry #{seen_keys[key] + 1}",
+                         'new_key': '', 'term': term})
+            continue
+        seen_keys[key] = len(seen_keys)
+        snake = _snake(key)
+        if not _SNAKE_RE.match(key):
+            rows.append({'type': 'key_not_snake_case', 'key': key, 'note': '', 'new_key': snake, 'term': term})
+        if snake in snake_keys and snake_keys[snake] != key:
+            rows.append({'type': 'key_collision', 'key': key, 'note': f"normalizes to the same key as {snake_keys[snake]}",
+                         'new_key': snake, 'term': term})
+        snake_keys.setdefault(snake, key)
+        for field, hashes, kind in (('term', term_hashes, 'duplicate_term'),
+                                    ('definition', definition_hashes, 'duplicate_definition')):
+            text = _text(item.get(field))
+            if not text.strip():
+                continue
+            digest = _fingerprint(text)
+            if digest in hashes:
+                rows.append({'type': kind, 'key': key, 'note': f"same {field} as {hashes[digest]}",
+                             'new_key': '', 'term': term})
+            else:
+                hashes[digest] = key
+    for item in items:
+        key = str(item.get('key') or '')
+        for ref in _list(item.get('see_also')):
+            if ref not in seen_keys:
+                hint = _snake(ref)
+                rows.append({'type': 'unresolved_see_also', 'key': key, 'note': f"see_also {ref} not found",
+                             'new_key': hint if hint in seen_keys else '', 'term': _text(item.get('term'))})
+    return rows
+
+
+def compile_glossary(items, digest=None, duplicates=()):
+    """Build the artifact dict from the parsed glossary list."""
+    if not isinstance(items, list):
+        items = []
+    terms = []
+    index_of = {}
+    for item in items:
+        if not isinstance(item, dict) or not item.get('key'):
+            continue
+        key = str(item['key'])
+        if key in index_of:
+            continue
+        index_of[key] = len(terms)
+        terms.append({
+            'key': key,
+            'term': _text(item.get('term')),
+            'definition': _text(item.get('definition')).strip(),
+            'examples': _list(item.get('examples')),
+            'tags': _list(item.get('tags')),
+            'orbit': _text(item.get('orbit')),
+            'status': _text(item.get('status')),
+        })
+
+    # term frequency per field, weighted, then idf over terms containing the token
+    raw = {}
+    for i, term in enumerate(terms):
+        fields = {
+            'term': term['term'],
+            'key': term['key'].replace('_', ' '),
+            'tags': ' '.join(term['tags']),
+            'definition': term['definition'],
+            'examples': ' '.join(term['examples']),
+        }
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                per_term = raw.setdefault(token, {})
+                per_term[i] = per_term.get(i, 0.0) + weight
+    n = max(1, len(terms))
+    postings = {}
+    for token, per_term in raw.items():
+        idf = math.log(1 + n / len(per_term))
+        postings[token] = sorted(([i, round((1 + math.log(w)) * idf, 4)] for i, w in per_term.items()),
+                                 key=lambda p: -p[1])
+
+    facets = {'tags': {}, 'orbit': {}}
+    for i, term in enumerate(terms):
+        for tag in term['tags']:
+            facets['tags'].setdefault(tag, []).append(i)
+        if term['orbit']:
+            facets['orbit'].setdefault(term['orbit'], []).append(i)
+
+    graph = {term['key']: {'see_also': [], 'unresolved': [], 'referenced_by': []} for term in terms}
+    for item in items:
+        if not isinstance(item, dict) or str(item.get('key') or '') not in graph:
+            continue
+        node = graph[str(item['key'])]
+        for ref in _list(item.get('see_also')):
+            target = ref if ref in graph else _snake(ref) if _snake(ref) in graph else None
+            if target is None:
+                if ref not in node['unresolved']:
+                    node['unresolved'].append(ref)
+            elif target not in node['see_also'] and target != item['key']:
+                node['see_also'].append(target)
+                graph[target]['referenced_by'].append(str(item['key']))
+
+    return {
+        'version': ARTIFACT_VERSION,
+        'sha1': digest,
+        'compiled': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'terms': terms,
+        'postings': postings,
+        'vocab': sorted(postings),
+        'facets': facets,
+        'graph': graph,
+        'report': scrub_report([i for i in items if isinstance(i, dict)], duplicates),
+    }
+
+
+class CompiledGlossary:
+    """Query side of an artifact."""
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+        self.digest = artifact.get('sha1')
+        self.terms = artifact['terms']
+        self.postings = artifact['postings']
+        self.vocab = artifact['vocab']
+        self.facets = {name: {k: frozenset(v) for k, v in values.items()} for name, values in artifact['facets'].items()}
+        self.graph = artifact['graph']
+        self.by_key = {term['key']: i for i, term in enumerate(self.terms)}
+
+    def complete(self, prefix, limit=PREFIX_EXPANSIONS):
+        """Tokens starting with prefix, in vocab order."""
+        out = []
+        i = bisect.bisect_left(self.vocab, prefix)
+        while i < len(self.vocab) and len(out) < limit and self.vocab[i].startswith(prefix):
+            out.append(self.vocab[i])
+            i += 1
+        return out
+
+    def search(self, q, limit=DEFAULT_LIMIT, tag=None, orbit=None):
+        """Ranked matches for q: every word must match, the last one as a prefix.
+
+        Returns (items, suggestions); suggestions are the vocab completions of the last word.
+        """
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        tokens = tokenize(q or '')
+        allowed = None
+        if tag:
+            allowed = self.facets['tags'].get(tag, frozenset())
+        if orbit:
+            in_orbit = self.facets['orbit'].get(orbit, frozenset())
+            allowed = in_orbit if allowed is None else allowed & in_orbit
+        suggestions = []
+        if not tokens:
+            hits = {i: 0.0 for i in (allowed if allowed is not None else range(len(self.terms)))}
+        else:
+            hits = None
+            for pos, token in enumerate(tokens):
+                words = [token]
+                if pos == len(tokens) - 1 and (q or '')[-1:].isalnum():
+                    suggestions = self.complete(token)
+                    words = suggestions or [token]
+                scores = {}
+                for word in words:
+                    # an exact word outranks the same word reached as a prefix
+                    boost = 1.0 if word == token else 0.5
+                    for i, weight in self.postings.get(word, ()):
+                        scores[i] = max(scores.get(i, 0.0), weight * boost)
+                if hits is None:
+                    hits = scores
+                else:
+                    hits = {i: s + scores[i] for i, s in hits.items() if i in scores}
+                if not hits:
+                    break
+            hits = hits or {}
+            if allowed is not None:
+                hits = {i: s for i, s in hits.items() if i in allowed}
+            phrase = ' '.join(tokens)
+            for i in hits:
+                # whole-term and key matches go first
+                if ' '.join(tokenize(self.terms[i]['term'])) == phrase or self.terms[i]['key'] == phrase.replace(' ', '_'):
+                    hits[i] += 100.0
+        ranked = sorted(hits.items(), key=lambda h: (-h[1], self.terms[h[0]]['term'].lower()))[:limit]
+        items = []
+        for i, score in ranked:
+            item = dict(self.terms[i])
+            item['score'] = round(score, 4)
+            item['see_also'] = self.graph[item['key']]['see_also']
+            items.append(item)
+        return items, suggestions[:DEFAULT_LIMIT]
+
+    def term(self, key):
+        i = self.by_key.get(key)
+        if i is None:
+            return None
+        item = dict(self.terms[i])
+        item.update(self.graph[key])
+        return item
+
+
+class GlossaryIndex:
+    """The compiled glossary for one YAML file, recompiled only when its hash changes."""
+
+    def __init__(self, yaml_path=GLOSSARY_YML, artifact_path=GLOSSARY_INDEX):
+        self.yaml_path = yaml_path
+        self.artifact_path = artifact_path
+        self._lock = threading.Lock()
+        self._sig = None
+        self._compiled = None
+        self.compiles = 0
+        self.artifact_loads = 0
+        self.last_error = None
+
+    def _load_artifact(self, digest):
+        try:
+            with open(self.artifact_path, 'r', encoding='utf-8') as f:
+                artifact = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if artifact.get('version') != ARTIFACT_VERSION or artifact.get('sha1') != digest:
+            return None
+        return artifact
+
+    def _write_artifact(self, artifact):
+        os.makedirs(os.path.dirname(self.artifact_path) or '.', exist_ok=True)
+        tmp = self.artifact_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(artifact, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp, self.artifact_path)
+
+    def get(self):
+        """The current CompiledGlossary, or None if there is no glossary (or no PyYAML to compile it)."""
+        try:
+            st = os.stat(self.yaml_path)
+            sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+        if sig == self._sig and self._compiled is not None:
+            return self._compiled
+        with self._lock:
+            if sig == self._sig and self._compiled is not None:
+                return self._compiled
+            with open(self.yaml_path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()
+            if self._compiled is None or self._compiled.digest != digest:
+                artifact = self._load_artifact(digest)
+                if artifact is not None:
+                    self.artifact_loads += 1
+                else:
+                    if yaml is None:
+                        return self._compiled
+                    try:
+                        items, duplicates = load_glossary(raw)
+                        artifact = compile_glossary(items, digest, duplicates)
+                    except yaml.YAMLError as e:
+                        # keep serving the last good index on a bad edit
+                        self.last_error = str(e)
+                        return self._compiled
+                    self.compiles += 1
+                    try:
+                        self._write_artifact(artifact)
+                    except OSError as e:
+                        self.last_error = str(e)
+                self._compiled = CompiledGlossary(artifact)
+            self._sig = sig
+            return self._compiled
+
+    def stats(self):
+        compiled = self._compiled
+        return {
+            'terms': len(compiled.terms) if compiled else 0,
+            'tokens': len(compiled.vocab) if compiled else 0,
+            'findings': len(compiled.artifact['report']) if compiled else 0,
+            'sha1': compiled.digest if compiled else None,
+            'compiles': self.compiles,
+            'artifact_loads': self.artifact_loads,
+            'last_error': self.last_error,
+        }
+
+
+def write_report(rows, scrubs_dir=SCRUBS_DIR):
+    """Write findings next to the earlier manual reports (same name pattern and columns)."""
+    os.makedirs(scrubs_dir, exist_ok=True)
+    path = os.path.join(scrubs_dir, f"glossary-scrub-report-{datetime.now().strftime('%m%d%Y')}.csv")
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_HEADER)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def bench(index, queries):
+    compiled = index.get()
+    words = [t for term in compiled.terms for t in tokenize(term['term'])]
+    samples = [words[i % len(words)] for i in range(0, len(words) * 7, 7)] or ['data']
+    cases = {
+        'word': samples,
+        'prefix': [w[:3] for w in samples],
+        'two_words': [f'{a} {b}' for a, b in zip(samples, samples[1:] + samples[:1])],
+    }
+    out = {'terms': len(compiled.terms), 'tokens': len(compiled.vocab)}
+    for name, qs in cases.items():
+        timings = []
+        for i in range(queries):
+            t0 = time.perf_counter()
+            compiled.search(qs[i % len(qs)])
+            timings.append((time.perf_counter() - t0) * 1e6)
+        timings.sort()
+        out[name] = {'p50_us': round(timings[len(timings) // 2], 1),
+                     'p99_us': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 1)}
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile and query the glossary index')
+    parser.add_argument('command', choices=['build', 'search', 'bench'])
+    parser.add_argument('query', nargs='?', default='')
+    parser.add_argument('--yaml', default=GLOSSARY_YML)
+    parser.add_argument('--out', default=GLOSSARY_INDEX)
+    parser.add_argument('--no-report', action='store_true', help='build: skip the scrubs/ report')
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    index = GlossaryIndex(args.yaml, args.out)
+    if args.command == 'build':
+        if yaml is None:
+            print('PyYAML is required to compile the glossary')
+            return 1
+        with open(args.yaml, 'rb') as f:
+            raw = f.read()
+        t0 = time.perf_counter()
+        items, duplicates = load_glossary(raw)
+        artifact = compile_glossary(items, hashlib.sha1(raw).hexdigest(), duplicates)
+        index._write_artifact(artifact)
+        print(f"Compiled {len(artifact['terms'])} terms / {len(artifact['vocab'])} tokens into {args.out} "
+              f"in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        counts = {}
+        for row in artifact['report']:
+            counts[row['type']] = counts.get(row['type'], 0) + 1
+        print('Scrub findings:', json.dumps(counts) if counts else 'none')
+        if not args.no_report:
+            print('Report written to', write_report(artifact['report']))
+        return 0
+    if index.get() is None:
+        print(f'No glossary at {args.yaml}')
+        return 1
+    if args.command == 'search':
+        items, suggestions = index.get().search(args.query)
+        print(json.dumps({'items': [{k: i[k] for k in ('key', 'term', 'score')} for i in items],
+                          'suggestions': suggestions}, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(bench(index, args.queries), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
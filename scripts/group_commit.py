@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Group commit for the broadcast server's append path.
+
+GroupCommitter runs one background writer thread. Request threads hand it their rows
+with submit() and block; the writer takes everything queued (waiting up to interval_ms
+for more, or until max_rows are waiting), commits it with a single call and then
+releases every request in the group with its own result. While one group is being
+written and synced the next one queues up, so under load many requests share a single
+write, fsync and latest.json rewrite.
+
+CsvAppender keeps the CSV open between commits instead of reopening it per request, and
+reopens it if the file was replaced underneath it (e.g. by normalize_broadcast_csv.py).
+
+Durability policies (what has happened before a response is released):
+  none               rows were handed to the OS (write + flush), no fsync
+  batch-fsync        one fsync per group, covering every request in it
+  per-request-fsync  each request's rows are written and fsynced on their own
+
+Usage:
+  from group_commit import GroupCommitter, CsvAppender
+  committer = GroupCommitter(commit_groups, interval_ms=1, max_rows=1000)
+  ids = committer.submit(entries)      # returns commit_groups' result for these entries
+"""
+import os
+import threading
+import time
+
+DURABILITY_POLICIES = ('none', 'batch-fsync', 'per-request-fsync')
+
+
+class _Request:
+    __slots__ = ('items', 'done', 'result', 'error')
+
+    def __init__(self, items):
+        self.items = items
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GroupCommitter:
+    def __init__(self, commit, interval_ms=1.0, max_rows=1000, name='group-commit'):
+        """commit(groups) gets a list of item lists and must return one result per list."""
+        self._commit = commit
+        self.interval = max(0.0, float(interval_ms)) / 1000.0
+        self.max_rows = max(1, int(max_rows))
+        self._cond = threading.Condition()
+        self._queue = []
+        self._queued_rows = 0
+        self._closed = False
+        self.groups = 0
+        self.requests = 0
+        self.rows = 0
+        self.largest_group = 0
+        self.last_commit_ms = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        """Queue items and block until the group they land in has been committed."""
+        request = _Request(items)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('group committer is closed')
+            self._queue.append(request)
+            self._queued_rows += len(items)
+            self._cond.notify_all()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _take_group(self):
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            deadline = time.monotonic() + self.interval
+            while self._queued_rows < self.max_rows and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            group, self._queue, self._queued_rows = self._queue, [], 0
+            return group
+
+    def _run(self):
+        while True:
+            group = self._take_group()
+            if group is None:
+                return
+            t0 = time.perf_counter()
+            try:
+                results = self._commit([r.items for r in group])
+                for request, result in zip(group, results):
+                    request.result = result
+            except BaseException as e:
+                for request in group:
+                    request.error = e
+            self.last_commit_ms = round((time.perf_counter() - t0) * 1000, 3)
+            self.groups += 1
+            self.requests += len(group)
+            rows = sum(len(r.items) for r in group)
+            self.rows += rows
+            self.largest_group = max(self.largest_group, len(group))
+            for request in group:
+                request.done.set()
+
+    def close(self):
+        """Commit whatever is queued, then stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        return {
+            'interval_ms': self.interval * 1000,
+            'max_rows': self.max_rows,
+            'groups': self.groups,
+            'requests': self.requests,
+            'rows': self.rows,
+            'avg_requests_per_group': round(self.requests / self.groups, 2) if self.groups else None,
+            'largest_group': self.largest_group,
+            'last_commit_ms': self.last_commit_ms,
+        }
+
+
+class CsvAppender:
+    """A CSV held open in append mode across commits."""
+
+    def __init__(self, path):
+        self.path = path
+        self._f = None
+        self.opens = 0
+        self.fsyncs = 0
+
+    def _handle(self):
+        f = self._f
+        if f is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(f.fileno()).st_ino:
+                    return f
+            except OSError:
+                pass
+            f.close()
+        self._f = open(self.path, 'a', newline='', encoding='utf-8')
+        self.opens += 1
+        return self._f
+
+    def write(self, text):
+        f = self._handle()
+        f.write(text)
+        f.flush()
+
+    def sync(self):
+        if self._f is not None:
+            os.fsync(self._f.fileno())
+            self.fsyncs += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def stats(self):
+        return {'opens': self.opens, 'fsyncs': self.fsyncs}
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Bounded LRU/TTL cache of idempotency keys for POST /api/broadcast.
+
+A client that retries after a timeout should get the broadcast_id of its first attempt
+back instead of a second row with a -1 suffix. The server keys each request by its
+Idempotency-Key header (or, when configured, by a hash of the normalized payload) and:
+
+  - a key seen before (and not expired) is answered from memory with the stored result;
+    no seed snapshot, validation, store write or archive rewrite happens
+  - a key whose first request is still being committed waits for that result
+  - a key reused with a different payload is refused, so a client bug cannot silently
+    map two broadcasts onto one id
+
+Only successful results are cached. Entries expire after their TTL and the least
+recently used entries are evicted beyond max_entries.
+
+Keys survive restarts through an append-only journal (one JSON line per new key, next to
+broadcast.csv). complete() only queues the line; flush() appends everything queued in one
+write through a handle that stays open, so no request waits on file I/O. The server calls
+flush() from its background flush thread, which means a crash can lose the last fraction
+of a second of keys. The journal is replayed on first use and compacted to the live
+entries once it holds twice as many lines as the cache can.
+
+Usage:
+  cache = IdempotencyCache('data/internal/idempotency.jsonl', max_entries=10000)
+  state, result = cache.begin(key, fingerprint)
+  if state == 'owner':
+      try:
+          result = do_the_work()
+      except Exception:
+          cache.abandon(key)
+          raise
+      cache.complete(key, result, ttl=86400)
+  cache.flush()   # from a background thread; close() flushes and releases the journal
+  python3 scripts/idempotency_cache.py stats [--path data/internal/idempotency.jsonl]
+  python3 scripts/idempotency_cache.py compact   # drop expired/evicted keys from the journal
+"""
+import argparse
+import collections
+import json
+import os
+import threading
+import time
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL = 24 * 3600
+DEFAULT_WAIT = 30.0
+
+
+def _journal_line(key, expires, fingerprint, result):
+    return json.dumps({'key': key, 'expires': expires, 'fingerprint': fingerprint, 'result': result},
+                      ensure_ascii=False) + '\n'
+
+
+class _Pending:
+    __slots__ = ('fingerprint', 'done')
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+
+
+class IdempotencyCache:
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, wait=DEFAULT_WAIT):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.wait = float(wait)
+        self._lock = threading.Lock()
+        # key -> (expires_at, fingerprint, result), least recently used first
+        self._entries = collections.OrderedDict()
+        self._pending = {}
+        self._loaded = False
+        self._journal_lines = 0
+        # journal lines queued by complete(), written by flush() through the open handle
+        self._unflushed = []
+        self._journal = None
+        self._flush_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.mismatches = 0
+        self.evicted = 0
+        self.expired = 0
+        self.compactions = 0
+
+    def _load(self):
+        """Replay the journal once; later lines win, expired ones are dropped. Caller holds _lock."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        now = time.time()
+        lines = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                        key, expires = record['key'], float(record['expires'])
+                    except (ValueError, KeyError, TypeError):
+                        # a torn line from a crash mid-append
+                        continue
+                    if expires <= now:
+                        continue
+                    self._entries.pop(key, None)
+                    self._entries[key] = (expires, record.get('fingerprint'), record.get('result'))
+        except OSError:
+            return
+        self._journal_lines = lines
+        self._evict()
+        if lines > 2 * self.max_entries:
+            self._compact(list(self._entries.items()))
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def _compact(self, items):
+        """Rewrite the journal as just items, (key, entry) pairs; the append handle is reopened after."""
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for key, (expires, fingerprint, result) in items:
+                    f.write(_journal_line(key, expires, fingerprint, result))
+            self._close_journal()
+            os.replace(tmp, self.path)
+            self._journal_lines = len(items)
+            self.compactions += 1
+        except OSError:
+            pass
+
+    def _close_journal(self):
+        if self._journal is not None:
+            try:
+                self._journal.close()
+            except OSError:
+                pass
+            self._journal = None
+
+    def flush(self):
+        """Write the queued journal lines in one append (or compact instead); returns lines written."""
+        with self._flush_lock:
+            with self._lock:
+                lines, self._unflushed = self._unflushed, []
+                if not lines:
+                    return 0
+                # every queued line is already in _entries, so a compaction snapshot covers them
+                items = list(self._entries.items()) if self._journal_lines + len(lines) > 2 * self.max_entries else None
+            if items is not None:
+                self._compact(items)
+                return len(lines)
+            try:
+                if self._journal is None:
+                    os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    self._journal = open(self.path, 'a', encoding='utf-8')
+                self._journal.write(''.join(lines))
+                self._journal.flush()
+                self._journal_lines += len(lines)
+            except OSError:
+                # the keys still work for this process; they just will not survive a restart
+                self._close_journal()
+            return len(lines)
+
+    def close(self):
+        """Flush what is queued and release the journal handle."""
+        self.flush()
+        with self._flush_lock:
+            self._close_journal()
+
+    def _lookup(self, key, now):
+        """The live entry for key, refreshed as most recently used. Caller holds _lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def begin(self, key, fingerprint):
+        """Claim key for a request whose payload hashes to fingerprint.
+
+        Returns ('hit', result) for a finished key, ('mismatch', None) when the key was used
+        for a different payload, ('busy', None) when its first request is still running after
+        the wait, or ('owner', None): the caller does the work and then calls complete() or
+        abandon().
+        """
+        deadline = time.monotonic() + self.wait
+        while True:
+            with self._lock:
+                self._load()
+                entry = self._lookup(key, time.time())
+                if entry is not None:
+                    if entry[1] != fingerprint:
+                        self.mismatches += 1
+                        return 'mismatch', None
+                    self.hits += 1
+                    return 'hit', entry[2]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = _Pending(fingerprint)
+                    self.misses += 1
+                    return 'owner', None
+                if pending.fingerprint != fingerprint:
+                    self.mismatches += 1
+                    return 'mismatch', None
+                self.waits += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not pending.done.wait(remaining):
+                return 'busy', None
+
+    def complete(self, key, result, ttl=DEFAULT_TTL):
+        """Store the owner's result, queue its journal line and release anyone waiting on the key."""
+        expires = time.time() + ttl
+        with self._lock:
+            pending = self._pending.pop(key, None)
+            fingerprint = pending.fingerprint if pending is not None else None
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, fingerprint, result)
+            self._evict()
+            self._unflushed.append(_journal_line(key, expires, fingerprint, result))
+        if pending is not None:
+            pending.done.set()
+
+    def abandon(self, key):
+        """The owner failed: forget the claim so a retry does the work again."""
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.done.set()
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'pending': len(self._pending),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'waits': self.waits,
+                'mismatches': self.mismatches,
+                'evicted': self.evicted,
+                'expired': self.expired,
+                'journal_lines': self._journal_lines,
+                'journal_unflushed': len(self._unflushed),
+                'compactions': self.compactions,
+            }
+
+
+def main(argv=None):
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Broadcast idempotency key journal')
+    parser.add_argument('command', choices=['stats', 'compact'])
+    parser.add_argument('--path', default=os.path.join(os.path.dirname(here), 'data', 'internal', 'idempotency.jsonl'))
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES)
+    args = parser.parse_args(argv)
+    cache = IdempotencyCache(args.path, args.max_entries)
+    if args.command == 'compact':
+        with cache._lock:
+            cache._load()
+            cache._compact(list(cache._entries.items()))
+    print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
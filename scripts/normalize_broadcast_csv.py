@@ -5,17 +5,40 @@ Creates a timestamped backup, then rewrites the CSV with the canonical header an
 one clean row per record. This is defensive: it will attempt to parse malformed
 CSV using the csv module and fall back to line-based parsing.
 
+Rows are streamed: each one is read, repaired and written to a temp file next to the
+CSV, which then atomically replaces the original. Memory use does not depend on the
+size of the log, and a failure part-way leaves the original untouched. Because the
+original is replaced rather than rewritten in place, the backup can be a reflink or a
+hard link to the old file instead of a full copy.
+
 Usage:
   python3 scripts/normalize_broadcast_csv.py
+  python3 scripts/normalize_broadcast_csv.py --csv path/to/broadcast.csv --backup copy
+  python3 scripts/normalize_broadcast_csv.py --no-backup
+  python3 scripts/normalize_broadcast_csv.py --partitions --from 2025-10-01   # only the months in range
+
+With --partitions the log is the month-partitioned layout from scripts/broadcast_partitions.py
+(data/internal/broadcast/ by default). Only the partitions whose dates overlap --from/--to
+are normalized, each one on its own like a single CSV, and the manifest is refreshed after.
 """
+import argparse
 import csv
 import os
 import shutil
+import sys
+import tempfile
+import time
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(REPO_ROOT, 'data', 'internal')
 CSV_PATH = os.path.join(DATA_DIR, 'broadcast.csv')
+PARTITIONS_DIR = os.path.join(DATA_DIR, 'broadcast')
 
 HEADER = [
     "broadcast.id",
@@ -32,86 +55,228 @@ HEADER = [
     "status_icons",
 ]
 
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+BUFFER_SIZE = 1024 * 1024
+
+
+def _reflink(src, dst):
+    if fcntl is None:
+        raise OSError('reflink needs fcntl')
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.unlink(dst)
+            raise
+
 
-def backup(src):
+def backup(src, mode='auto'):
+    """Back up src; returns (path, method) or (None, None) when there is nothing to back up.
+
+    auto tries a copy-on-write reflink, then a hard link, then falls back to shutil.copy2.
+    A hard link is safe here only because the normalizer replaces the CSV with a new
+    file instead of writing into the old inode.
+    """
     if not os.path.exists(src):
         print(f"No CSV at {src} to back up")
-        return None
+        return None, None
     ts = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
     dst = src + f'.bak.{ts}'
-    shutil.copy2(src, dst)
-    return dst
+    methods = {
+        'reflink': _reflink,
+        'hardlink': os.link,
+        'copy': shutil.copy2,
+    }
+    order = ['reflink', 'hardlink', 'copy'] if mode == 'auto' else [mode]
+    for method in order:
+        try:
+            methods[method](src, dst)
+            return dst, method
+        except OSError:
+            if mode != 'auto':
+                raise
+    return None, None
+
 
+def iter_rows(path, stats):
+    """Yield rows as lists in HEADER order, one at a time.
 
-def read_rows(path):
-    rows = []
+    A file whose first record looks like our header is read with the csv module, which
+    handles quoted newlines, and its columns are mapped onto HEADER by name; anything
+    else is mapped by position, line by line.
+    """
     if not os.path.exists(path):
-        return rows
-    # First attempt: use csv.DictReader which can handle quoted newlines
-    try:
-        with open(path, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for r in reader:
-                # Normalize keys to canonical header where possible
-                if any(k in r for k in HEADER):
-                    rows.append(r)
-    except Exception as e:
-        print('csv.DictReader failed:', e)
+        return
+    with open(path, 'r', newline='', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        try:
+            first = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            print('csv header unreadable:', e)
+            first = []
+        if any(k in first for k in HEADER):
+            yield from _iter_csv_rows(reader, first, stats)
+            return
 
-    # If no rows parsed, try a simpler line-by-line fallback
-    if not rows:
+    yield from _iter_line_rows(path, stats)
+
+
+def _iter_csv_rows(reader, fieldnames, stats):
+    # column positions resolved once; the last column wins for a duplicated name, as with DictReader
+    position = {name: i for i, name in enumerate(fieldnames)}
+    columns = [position.get(h) for h in HEADER]
+    if columns == list(range(len(HEADER))):
+        columns = None
+    width = len(HEADER)
+    while True:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip('\n')
-                    if not line:
-                        continue
-                    try:
-                        # parse single CSV line
-                        parsed = next(csv.reader([line]))
-                        # If it's header-like, skip
-                        if 'broadcast.id' in parsed:
-                            continue
-                        # Map by position into header (best-effort)
-                        d = {HEADER[i]: parsed[i] if i < len(parsed) else '' for i in range(len(HEADER))}
-                        rows.append(d)
-                    except Exception:
-                        # as a last resort, put the whole line in broadcast.summary
-                        d = {h: '' for h in HEADER}
-                        d['broadcast.summary'] = line
-                        rows.append(d)
-        except Exception as e:
-            print('line-based fallback failed:', e)
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # the reader can resume after a bad record; count it and move on
+            stats['skipped'] += 1
+            print(f'skipping unparsable record near line {reader.line_num}: {e}')
+            continue
+        if not values:
+            continue
+        n = len(values)
+        if columns is None:
+            if n == width:
+                yield values
+            else:
+                stats['repaired'] += 1
+                yield values[:width] + [''] * (width - n)
+        else:
+            yield [values[i] if i is not None and i < n else '' for i in columns]
 
-    return rows
 
+def _iter_line_rows(path, stats):
+    with open(path, 'r', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        for line in f:
+            line = line.strip('\n')
+            if not line:
+                continue
+            try:
+                # parse single CSV line
+                parsed = next(csv.reader([line]))
+                # If it's header-like, skip
+                if 'broadcast.id' in parsed:
+                    continue
+                # Map by position into header (best-effort)
+                yield [parsed[i] if i < len(parsed) else '' for i in range(len(HEADER))]
+            except Exception:
+                # as a last resort, put the whole line in broadcast.summary
+                stats['repaired'] += 1
+                row = [''] * len(HEADER)
+                row[HEADER.index('broadcast.summary')] = line
+                yield row
 
-def write_rows(path, rows):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(HEADER)
-        for r in rows:
-            row = [r.get(h, '') for h in HEADER]
-            writer.writerow(row)
 
+def normalize(path):
+    """Stream path row by row into a temp file and atomically swap it in."""
+    stats = {'rows': 0, 'skipped': 0, 'repaired': 0}
+    t0 = time.perf_counter()
+    bytes_in = os.path.getsize(path) if os.path.exists(path) else 0
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8', buffering=BUFFER_SIZE) as out:
+            writer = csv.writer(out)
+            writer.writerow(HEADER)
+            rows = 0
+            for row in iter_rows(path, stats):
+                writer.writerow(row)
+                rows += 1
+            stats['rows'] = rows
+            out.flush()
+            os.fsync(out.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    elapsed = time.perf_counter() - t0
+    stats.update({
+        'bytes_in': bytes_in,
+        'bytes_out': os.path.getsize(path),
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(stats['rows'] / elapsed) if elapsed else None,
+        'mb_per_sec': round(bytes_in / elapsed / 1e6, 2) if elapsed else None,
+    })
+    return stats
 
-def main():
-    print('Backing up current CSV...')
-    bak = backup(CSV_PATH)
-    if bak:
-        print('Backup created:', bak)
-    rows = read_rows(CSV_PATH)
-    print(f'Parsed {len(rows)} data rows')
-    # best-effort: ensure each row is a dict with HEADER keys
-    clean = []
-    for r in rows:
-        d = {h: (r.get(h) if isinstance(r.get(h), str) else (','.join(r.get(h)) if isinstance(r.get(h), list) else str(r.get(h) or ''))) for h in HEADER}
-        clean.append(d)
 
-    write_rows(CSV_PATH, clean)
-    print('Wrote normalized CSV to', CSV_PATH)
+def normalize_partitions(args):
+    """Normalize only the partitions that overlap --from/--to, then refresh the manifest."""
+    from broadcast_partitions import PartitionedLog
+    log = PartitionedLog(args.partitions)
+    try:
+        keys = log.prune(args.date_from, args.date_to)
+    except ValueError as e:
+        print(e)
+        return 2
+    print(f'{len(keys)} of {len(log.keys())} partitions overlap the range')
+    totals = {'rows': 0, 'skipped': 0, 'repaired': 0}
+    for key in keys:
+        path = log.part_path(key)
+        if not args.no_backup:
+            bak, method = backup(path, args.backup)
+            if bak:
+                print(f'Backup created ({method}):', bak)
+        try:
+            stats = normalize(path)
+        except Exception as e:
+            print(f'Normalization of {path} failed, original left unchanged:', e)
+            return 1
+        for name in totals:
+            totals[name] += stats[name]
+        print(f"{key}: {stats['rows']} rows ({stats['skipped']} skipped, {stats['repaired']} repaired) "
+              f"in {stats['seconds']}s")
+    log.refresh()
+    log.save()
+    print(f"Parsed {totals['rows']} data rows ({totals['skipped']} skipped, {totals['repaired']} repaired)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Normalize broadcast.csv in constant memory')
+    parser.add_argument('--csv', default=CSV_PATH, help='CSV to normalize (default: data/internal/broadcast.csv)')
+    parser.add_argument('--backup', choices=['auto', 'reflink', 'hardlink', 'copy'], default='auto',
+                        help='how to create the backup (default: auto = reflink, then hard link, then copy)')
+    parser.add_argument('--no-backup', action='store_true')
+    parser.add_argument('--partitions', nargs='?', const=PARTITIONS_DIR, default=None, metavar='DIR',
+                        help='normalize a partitioned log (default dir: data/internal/broadcast) instead of --csv')
+    parser.add_argument('--from', dest='date_from', default=None, help='with --partitions: first date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', default=None, help='with --partitions: last date (YYYY-MM-DD)')
+    args = parser.parse_args(argv)
+
+    if args.partitions:
+        return normalize_partitions(args)
+    if not args.no_backup:
+        print('Backing up current CSV...')
+        bak, method = backup(args.csv, args.backup)
+        if bak:
+            print(f'Backup created ({method}):', bak)
+    try:
+        stats = normalize(args.csv)
+    except Exception as e:
+        print('Normalization failed, original left unchanged:', e)
+        return 1
+    print(f"Parsed {stats['rows']} data rows ({stats['skipped']} skipped, {stats['repaired']} repaired)")
+    print('Wrote normalized CSV to', args.csv)
+    print(f"Throughput: {stats['bytes_in'] / 1e6:.1f} MB in {stats['seconds']}s "
+          f"= {stats['mb_per_sec']} MB/s, {stats['rows_per_sec']} rows/s")
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
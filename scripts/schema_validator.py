@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""Compile schema/*.schema.yml into plain Python validator callables.
+
+Covers the JSON Schema keywords these schemas use: type, properties, required,
+additionalProperties, patternProperties, minProperties, items, minItems, minLength,
+minimum, pattern, enum, const, format (date-time), $ref into $defs, allOf, anyOf, not
+and if/then/else. Each schema is turned into a tree of closures once, with regexes
+precompiled and property lookups prebuilt, so checking a record is a handful of dict
+lookups and function calls rather than a walk over the schema document.
+
+Compiled validators are cached by the sha1 of the schema file; ValidatorCache only
+re-hashes a schema whose mtime/size changed, so the server can ask for its validator
+on every request.
+
+The seed sweep is advisory by default: several seeds predate their schemas, so
+mismatches are reported as warnings and the exit status stays 0. --fail-on error (or
+--strict) turns it into a gate that exits 1 when any file fails; validating a single
+file fails that way by default.
+
+Usage:
+  python3 scripts/schema_validator.py                 # validate every seed against its schema
+  python3 scripts/schema_validator.py --fail-on error # same, but exit 1 if any seed fails
+  python3 scripts/schema_validator.py --json          # machine-readable report
+  python3 scripts/schema_validator.py --bench 100000  # per-record cost of the broadcast validator
+  python3 scripts/schema_validator.py schema/tags.schema.yml seeds/tags.yml
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+try:
+    import yaml
+except Exception:
+    yaml = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_DIR = os.path.join(REPO_ROOT, 'schema')
+BROADCAST_SCHEMA = os.path.join(SCHEMA_DIR, 'broadcast.schema.yml')
+
+# seed file -> schema it must satisfy (paths relative to the repo root)
+SEED_SCHEMAS = [
+    ('seeds/modules.yml', 'schema/modules.schema.yml'),
+    ('seeds/statuses.yml', 'schema/statuses.schema.yml'),
+    ('seeds/tags.yml', 'schema/tags.schema.yml'),
+    ('seeds/glossary.yml', 'schema/glossary.schema.yml'),
+    ('seeds/orbits.yml', 'schema/orbits.schema.yml'),
+    ('seeds/emoji_palette.yml', 'schema/emoji_palette.schema.yml'),
+    ('seeds/funnel_spec.yml', 'schema/funnel_spec.schema.yml'),
+    ('seeds/seedset.yml', 'schema/seedset.schema.yml'),
+    ('signals/latest.json', 'schema/broadcast.schema.yml'),
+]
+
+_TYPES = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+
+def _is_date_time(value):
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return 'T' in value or ' ' in value
+    except ValueError:
+        return False
+
+
+_FORMATS = {'date-time': _is_date_time}
+
+
+class SchemaError(Exception):
+    pass
+
+
+def _compile(schema, root, refs):
+    """Return check(value, path, errors) for one (sub)schema."""
+    if schema is True or schema == {}:
+        return lambda value, path, errors: None
+    if schema is False:
+        return lambda value, path, errors: errors.append(f'{path or "$"}: not allowed')
+    if not isinstance(schema, dict):
+        raise SchemaError(f'schema must be a mapping, got {type(schema).__name__}')
+
+    checks = []
+
+    ref = schema.get('$ref')
+    if ref is not None:
+        if not ref.startswith('#/'):
+            raise SchemaError(f'only local $ref is supported: {ref}')
+        if ref not in refs:
+            # placeholder first so recursive definitions resolve to the same cell
+            cell = []
+            refs[ref] = lambda value, path, errors: cell[0](value, path, errors)
+            target = root
+            for part in ref[2:].split('/'):
+                target = target[part]
+            cell.append(_compile(target, root, refs))
+        checks.append(refs[ref])
+
+    types = schema.get('type')
+    if types is not None:
+        names = types if isinstance(types, list) else [types]
+        preds = [_TYPES[n] for n in names]
+        label = '|'.join(names)
+
+        def check_type(value, path, errors, preds=preds, label=label):
+            for p in preds:
+                if p(value):
+                    return True
+            errors.append(f'{path or "$"}: expected {label}, got {type(value).__name__}')
+            return False
+    else:
+        check_type = None
+
+    if 'enum' in schema:
+        allowed = list(schema['enum'])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f'{path or "$"}: {value!r} not in {allowed}')
+        checks.append(check_enum)
+
+    if 'const' in schema:
+        const = schema['const']
+
+        def check_const(value, path, errors):
+            if value != const:
+                errors.append(f'{path or "$"}: expected {const!r}')
+        checks.append(check_const)
+
+    # string keywords
+    min_length = schema.get('minLength')
+    pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+    fmt = _FORMATS.get(schema.get('format'))
+    if min_length is not None or pattern is not None or fmt is not None:
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                errors.append(f'{path or "$"}: shorter than {min_length}')
+            if pattern is not None and not pattern.search(value):
+                errors.append(f'{path or "$"}: {value!r} does not match {pattern.pattern}')
+            if fmt is not None and not fmt(value):
+                errors.append(f'{path or "$"}: {value!r} is not a valid {schema.get("format")}')
+        checks.append(check_string)
+
+    minimum = schema.get('minimum')
+    if minimum is not None:
+        def check_minimum(value, path, errors):
+            if _TYPES['number'](value) and value < minimum:
+                errors.append(f'{path or "$"}: {value} < {minimum}')
+        checks.append(check_minimum)
+
+    # object keywords
+    props = {k: _compile(v, root, refs) for k, v in (schema.get('properties') or {}).items()}
+    pattern_props = [(re.compile(k), _compile(v, root, refs)) for k, v in (schema.get('patternProperties') or {}).items()]
+    required = list(schema.get('required') or [])
+    additional = schema.get('additionalProperties', True)
+    additional_check = None if isinstance(additional, bool) else _compile(additional, root, refs)
+    min_props = schema.get('minProperties')
+    if props or pattern_props or required or additional is not True or min_props is not None:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(f'{path or "$"}: missing required {key!r}')
+            if min_props is not None and len(value) < min_props:
+                errors.append(f'{path or "$"}: fewer than {min_props} properties')
+            for key, item in value.items():
+                sub = f'{path}.{key}' if path else str(key)
+                matched = False
+                check = props.get(key)
+                if check is not None:
+                    matched = True
+                    check(item, sub, errors)
+                for rx, pcheck in pattern_props:
+                    if rx.search(str(key)):
+                        matched = True
+                        pcheck(item, sub, errors)
+                if not matched:
+                    if additional is False:
+                        errors.append(f'{path or "$"}: unexpected property {key!r}')
+                    elif additional_check is not None:
+                        additional_check(item, sub, errors)
+        checks.append(check_object)
+
+    # array keywords
+    items = _compile(schema['items'], root, refs) if 'items' in schema else None
+    min_items = schema.get('minItems')
+    if items is not None or min_items is not None:
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f'{path or "$"}: fewer than {min_items} items')
+            if items is not None:
+                for i, item in enumerate(value):
+                    items(item, f'{path}[{i}]', errors)
+        checks.append(check_array)
+
+    # combinators
+    for sub in schema.get('allOf') or []:
+        checks.append(_compile(sub, root, refs))
+
+    any_of = [_compile(s, root, refs) for s in schema.get('anyOf') or []]
+    if any_of:
+        def check_any_of(value, path, errors):
+            for check in any_of:
+                trial = []
+                check(value, path, trial)
+                if not trial:
+                    return
+            errors.append(f'{path or "$"}: does not match any allowed alternative')
+        checks.append(check_any_of)
+
+    if 'not' in schema:
+        negated = _compile(schema['not'], root, refs)
+
+        def check_not(value, path, errors):
+            trial = []
+            negated(value, path, trial)
+            if not trial:
+                errors.append(f'{path or "$"}: matches a disallowed schema')
+        checks.append(check_not)
+
+    if 'if' in schema:
+        cond = _compile(schema['if'], root, refs)
+        then = _compile(schema['then'], root, refs) if 'then' in schema else None
+        other = _compile(schema['else'], root, refs) if 'else' in schema else None
+
+        def check_if(value, path, errors):
+            trial = []
+            cond(value, path, trial)
+            branch = then if not trial else other
+            if branch is not None:
+                branch(value, path, errors)
+        checks.append(check_if)
+
+    checks = tuple(checks)
+
+    def check(value, path, errors):
+        if check_type is not None and not check_type(value, path, errors):
+            return
+        for c in checks:
+            c(value, path, errors)
+    return check
+
+
+class Validator:
+    """A compiled schema; calling it returns a (possibly empty) list of error strings."""
+
+    def __init__(self, schema, name='', digest=None):
+        self.name = name
+        self.digest = digest
+        self.title = schema.get('title', name) if isinstance(schema, dict) else name
+        self._check = _compile(schema, schema, {})
+
+    def __call__(self, value):
+        errors = []
+        self._check(value, '', errors)
+        return errors
+
+
+class ValidatorCache:
+    """Compiled validators keyed by schema file hash, re-hashed only when the file changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_hash = {}
+        self._by_path = {}
+        self.compiles = 0
+
+    def get(self, path):
+        try:
+            st = os.stat(path)
+            sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+        known = self._by_path.get(path)
+        if known is not None and known[0] == sig:
+            return known[1]
+        with self._lock:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()
+            validator = self._by_hash.get(digest)
+            if validator is None:
+                if yaml is None:
+                    return None
+                validator = Validator(yaml.safe_load(raw.decode('utf-8')) or {}, os.path.basename(path), digest)
+                self._by_hash[digest] = validator
+                self.compiles += 1
+            self._by_path[path] = (sig, validator)
+            return validator
+
+    def stats(self):
+        return {
+            'compiled': len(self._by_hash),
+            'compiles': self.compiles,
+            'schemas': {os.path.basename(p): v.digest for p, (_, v) in self._by_path.items()},
+        }
+
+
+VALIDATORS = ValidatorCache()
+
+
+def load_document(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        return yaml.safe_load(f)
+
+
+def validate_file(schema_path, doc_path, cache=VALIDATORS, max_errors=50):
+    t0 = time.perf_counter()
+    result = {'file': os.path.relpath(doc_path, REPO_ROOT), 'schema': os.path.relpath(schema_path, REPO_ROOT)}
+    try:
+        validator = cache.get(schema_path)
+    except (SchemaError, yaml.YAMLError, KeyError, re.error) as e:
+        result.update(ok=False, errors=[f'invalid schema: {e}'])
+        return result
+    if validator is None:
+        result.update(ok=False, errors=['schema missing or PyYAML unavailable'])
+        return result
+    try:
+        doc = load_document(doc_path)
+    except Exception as e:
+        result.update(ok=False, errors=[f'failed to parse: {e}'])
+        return result
+    errors = validator(doc)
+    result.update(ok=not errors, error_count=len(errors), errors=errors[:max_errors],
+                  ms=round((time.perf_counter() - t0) * 1000, 3))
+    return result
+
+
+def validate_seeds(root=REPO_ROOT, cache=VALIDATORS):
+    results = []
+    for doc, schema in SEED_SCHEMAS:
+        doc_path, schema_path = os.path.join(root, doc), os.path.join(root, schema)
+        if not os.path.exists(doc_path):
+            continue
+        results.append(validate_file(schema_path, doc_path, cache))
+    return results
+
+
+def bench_broadcast(n):
+    """Per-record cost of the broadcast validator the server runs on every POST."""
+    validator = VALIDATORS.get(BROADCAST_SCHEMA)
+    record = {
+        'broadcast.id': '20251006T182356Z-FourTwentyAnalytics-protector_model',
+        'ts.utc5': '2025-10-06T14:23:56.832398-04:00',
+        'date': '2025-10-06',
+        'module.id': 'protector_model',
+        'broadcast.rating': 'critical',
+        'broadcast.name': 'Broadcast Testing',
+        'broadcast.summary': 'Testing broadcast functionality via website interface',
+        'status.id': 'developing',
+        'artifact.git.link': 'https://zbreeden.github.io/protector-model/',
+        'tags.keys': ['testing', 'signal'],
+        'glyph_icons': '🛡️',
+        'status_icons': '🚧',
+    }
+    assert not validator(record), validator(record)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        validator(record)
+    elapsed = time.perf_counter() - t0
+    return {'records': n, 'us_per_record': round(elapsed / n * 1e6, 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate seeds against schema/*.schema.yml')
+    parser.add_argument('schema', nargs='?', help='validate a single file against this schema')
+    parser.add_argument('document', nargs='?')
+    parser.add_argument('--json', action='store_true', help='print a JSON report')
+    parser.add_argument('--fail-on', choices=('error', 'never'), default=None,
+                        help='exit 1 when a file fails validation (error) or never; default: never for the '
+                             'seed sweep, error for a single file')
+    parser.add_argument('--strict', action='store_true', help='same as --fail-on error')
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help='time N broadcast validations')
+    args = parser.parse_args(argv)
+
+    if yaml is None:
+        print('PyYAML is required (pip install pyyaml)', file=sys.stderr)
+        return 2
+    if args.bench:
+        print(json.dumps(bench_broadcast(args.bench), indent=2))
+        return 0
+
+    if args.schema:
+        if not args.document:
+            parser.error('a document is required with a schema')
+        results = [validate_file(os.path.abspath(args.schema), os.path.abspath(args.document))]
+    else:
+        results = validate_seeds()
+
+    fail_on = 'error' if args.strict else args.fail_on or ('error' if args.schema else 'never')
+    if args.json:
+        print(json.dumps({'ok': all(r['ok'] for r in results), 'results': results}, indent=2, ensure_ascii=False))
+    else:
+        for r in results:
+            mark = 'ok  ' if r['ok'] else ('FAIL' if fail_on == 'error' else 'warn')
+            print(f"{mark} {r['file']} ({r['schema']}) {r.get('error_count', 0)} error(s)")
+            for err in r['errors'][:10]:
+                print(f'       {err}')
+    return 1 if fail_on == 'error' and not all(r['ok'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""In-memory cache of the seeds the broadcast server validates against.
+
+seeds/modules.yml, seeds/statuses.yml and seeds/emoji_palette.yml are parsed once and
+turned into ready-made lookup structures (module id set, allowed ratings, glyph and
+status icon maps). Every call to SeedRegistry.snapshot() only stats the files; a file
+is re-read when its mtime/size changes and re-parsed only when its content hash
+actually differs.
+
+Usage:
+  python3 scripts/seed_registry.py      # print the registry stats for this repo's seeds
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+try:
+    import yaml
+except Exception:
+    yaml = None
+
+DEFAULT_RATINGS = ['critical', 'high', 'normal', 'mundane']
+RATING_MAP_KEYS = ('ratings', 'broadcast_ratings')
+
+
+def _by_id(raw):
+    """seeds are YAML lists of mappings with `id` keys; mappings are accepted as-is."""
+    out = {}
+    if isinstance(raw, list):
+        for item in raw:
+            if isinstance(item, dict) and 'id' in item:
+                out[item['id']] = item
+    elif isinstance(raw, dict):
+        out = raw
+    return out
+
+
+def _module_glyph_field(entry, glyph_icons):
+    """Same fallback chain the server has always used to fill the glyph_icons column."""
+    glyphs = entry.get('glyphs') or entry.get('glyphs:') or []
+    if not isinstance(glyphs, list):
+        glyphs = []
+    mapped = [glyph_icons.get(g, '') for g in glyphs] if glyph_icons else []
+    mapped = [m for m in mapped if m]
+    if mapped:
+        return ','.join(mapped)
+    mod_emoji = entry.get('emoji') or entry.get('icon') or entry.get('glyph')
+    if isinstance(mod_emoji, list) and mod_emoji:
+        return ','.join(mod_emoji)
+    if isinstance(mod_emoji, str) and mod_emoji:
+        return mod_emoji
+    return ','.join(str(g) for g in glyphs)
+
+
+class SeedSnapshot:
+    """Immutable view of the parsed seeds plus the lookups derived from them."""
+
+    def __init__(self, modules=None, statuses=None, emoji=None):
+        self.modules = modules
+        self.statuses = statuses
+        self.emoji = emoji
+        modules = modules or {}
+        statuses = statuses or {}
+        emoji = emoji if isinstance(emoji, dict) else {}
+
+        self.module_ids = frozenset(modules.keys()) if isinstance(modules, dict) else frozenset()
+        self.status_ids = frozenset(statuses.keys()) if isinstance(statuses, dict) else frozenset()
+
+        self.allowed_ratings = list(DEFAULT_RATINGS)
+        rating_maps = []
+        for key in RATING_MAP_KEYS:
+            if isinstance(emoji.get(key), dict):
+                rating_maps.append(emoji[key])
+        if rating_maps:
+            self.allowed_ratings = list(rating_maps[0].keys())
+
+        self.glyph_icons = emoji.get('glyph_icons') if isinstance(emoji.get('glyph_icons'), dict) else {}
+        self.status_icons = emoji.get('status_icons') if isinstance(emoji.get('status_icons'), dict) else {}
+
+        # rating -> icon: status_icons keyed by rating first, then the explicit rating maps
+        self.rating_icons = {}
+        for rating in set(self.status_icons) | {r for m in rating_maps for r in m}:
+            icon = self.status_icons.get(rating)
+            if not icon:
+                for m in rating_maps:
+                    icon = m.get(rating)
+                    if icon:
+                        break
+            if icon:
+                self.rating_icons[rating] = icon
+
+        self.module_glyph_icons = {}
+        if isinstance(modules, dict):
+            for module_id, entry in modules.items():
+                self.module_glyph_icons[module_id] = _module_glyph_field(entry or {}, self.glyph_icons)
+
+    def status_icon(self, rating, status):
+        """Icon for a broadcast: rating-derived when possible, else the legacy status mapping."""
+        icon = self.rating_icons.get(rating) if rating else None
+        if not icon and status:
+            icon = self.status_icons.get(status)
+        return icon or ''
+
+    def as_tuple(self):
+        return self.modules, self.statuses, self.emoji
+
+
+class SeedRegistry:
+    """Thread-safe, hot-reloading cache of modules/statuses/emoji_palette seeds."""
+
+    def __init__(self, modules_path, statuses_path, emoji_path):
+        self.paths = {'modules': modules_path, 'statuses': statuses_path, 'emoji': emoji_path}
+        self._lock = threading.Lock()
+        self._stat = {}
+        self._hash = {}
+        self._parsed = {}
+        self._snapshot = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_reload = None
+        self.last_error = None
+
+    @staticmethod
+    def _stat_key(path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _changed(self):
+        return [name for name, path in self.paths.items() if self._stat_key(path) != self._stat.get(name, False)]
+
+    def _reload(self, names):
+        """Re-read changed files; re-parse only those whose content hash moved."""
+        reparsed = False
+        for name in names:
+            path = self.paths[name]
+            key = self._stat_key(path)
+            if key is None:
+                self._stat[name] = None
+                if self._hash.get(name) is not None:
+                    self._hash[name] = None
+                    self._parsed[name] = {}
+                    reparsed = True
+                continue
+            with open(path, 'rb') as f:
+                raw = f.read()
+            self._stat[name] = key
+            digest = hashlib.sha1(raw).hexdigest()
+            if digest == self._hash.get(name) and name in self._parsed:
+                continue
+            loaded = yaml.safe_load(raw.decode('utf-8')) or {}
+            self._parsed[name] = loaded if name == 'emoji' else _by_id(loaded)
+            self._hash[name] = digest
+            reparsed = True
+        return reparsed
+
+    def snapshot(self):
+        """Return the current SeedSnapshot, reloading first if any seed file changed."""
+        if yaml is None:
+            return SeedSnapshot(None, None, None)
+        snap = self._snapshot
+        if snap is not None and not self._changed():
+            self.hits += 1
+            return snap
+        with self._lock:
+            changed = self._changed()
+            if self._snapshot is not None and not changed:
+                self.hits += 1
+                return self._snapshot
+            try:
+                reparsed = self._reload(changed)
+                if reparsed or self._snapshot is None:
+                    self._snapshot = SeedSnapshot(
+                        self._parsed.get('modules', {}),
+                        self._parsed.get('statuses', {}),
+                        self._parsed.get('emoji', {}),
+                    )
+                    self.reloads += 1
+                    self.last_reload = datetime.now(timezone.utc).isoformat(timespec='seconds')
+                    self.last_error = None
+                    self.misses += 1
+                else:
+                    # touched but identical content: nothing to parse
+                    self.hits += 1
+            except Exception as e:
+                # keep serving the last good snapshot (or empty seeds) on a bad edit
+                self.last_error = str(e)
+                self.misses += 1
+                self._stat.clear()
+                if self._snapshot is None:
+                    return SeedSnapshot({}, {}, {})
+            return self._snapshot
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'last_reload': self.last_reload,
+            'last_error': self.last_error,
+            'files': {name: self._hash.get(name) for name in self.paths},
+        }
+
+
+if __name__ == '__main__':
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    seeds = os.path.join(root, 'seeds')
+    registry = SeedRegistry(
+        os.path.join(seeds, 'modules.yml'),
+        os.path.join(seeds, 'statuses.yml'),
+        os.path.join(seeds, 'emoji_palette.yml'),
+    )
+    snap = registry.snapshot()
+    registry.snapshot()
+    out = registry.stats()
+    out.update({
+        'modules': len(snap.module_ids),
+        'statuses': len(snap.status_ids),
+        'allowed_ratings': snap.allowed_ratings,
+    })
+    print(json.dumps(out, indent=2, ensure_ascii=False))
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Push the seedset (seeds/seedset.yml) into module checkouts, copying only what changed.
+
+A content-hash manifest of the seedset ({path: {sha1, size}}) is built once per run.
+Every target checkout keeps the manifest of its last sync in .seedsync.json; a file is
+copied only when its hash differs from that record, or when the target copy was
+edited, removed or never recorded (then it is hashed to decide). Unchanged repos cost a
+stat per file. Targets are synced concurrently on a thread pool.
+
+Seedset entries follow scripts/new-module.sh: a directory entry (trailing /) is only
+created in the target, never filled, so the hub's data/internal logs and scrubs reports
+stay in the hub. File entries are copied, with two source fallbacks new-module.sh lacks:
+schemas/x is read from schema/x in this repo and root/x from this repo's root. Paths in
+the target are the seedset paths as written.
+
+Some paths belong to the module once it exists (see HUB_ONLY and SEED_ONCE): anything
+under data/internal/ or scrubs/ is never copied, and signals/latest.json is copied only
+into a checkout that has none, so a module's own latest signal is never overwritten.
+--prune never deletes these either; an earlier sync's record of them is just dropped.
+
+Targets are local directories: either --target PATH (repeatable), or one checkout per
+module in seeds/modules.yml under --checkouts DIR, named after the last part of its
+repo_url (e.g. DIR/archive-model). This repo's own module is skipped.
+
+Usage:
+  python3 scripts/seed_sync.py --checkouts ~/src                 # dry run: what would be copied
+  python3 scripts/seed_sync.py --checkouts ~/src --apply         # copy changed files
+  python3 scripts/seed_sync.py --target ../archive-model --apply --prune   # also delete files dropped from the seedset
+                                                                 # (never module-owned ones, see HUB_ONLY/SEED_ONCE)
+  python3 scripts/seed_sync.py --bench 24                        # synthetic offline run against temp checkouts
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import yaml
+except Exception:
+    yaml = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEEDSET_YML = os.path.join(REPO_ROOT, 'seeds', 'seedset.yml')
+MODULES_YML = os.path.join(REPO_ROOT, 'seeds', 'modules.yml')
+MANIFEST_NAME = '.seedsync.json'
+HUB_MODULE = 'fourtwenty_analytics'
+DEFAULT_WORKERS = 8
+CHUNK = 1024 * 1024
+
+# the hub's own logs, runtime state and scrub reports: never copied, even when listed as a
+# file entry (fnmatch against seedset paths, so * also crosses '/')
+HUB_ONLY = ('data/internal/*', 'scrubs/*')
+# starter files: copied into a checkout that lacks them, never over the module's own copy
+SEED_ONCE = ('signals/latest.json',)
+
+
+def _sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _matches(rel, patterns):
+    return any(fnmatch.fnmatchcase(rel, pattern) for pattern in patterns)
+
+
+def _module_owned(rel, dirs):
+    """Paths a sync must never overwrite or prune in the target."""
+    return (_matches(rel, HUB_ONLY) or _matches(rel, SEED_ONCE)
+            or any(rel.startswith(d + '/') for d in dirs))
+
+
+def _source_for(entry, root):
+    """This repo's copy of a seedset file: as written, else schema/x for schemas/x and x for root/x."""
+    candidates = [entry]
+    if entry.startswith('schemas/'):
+        candidates.append('schema/' + entry[len('schemas/'):])
+    if entry.startswith('root/'):
+        candidates.append(entry[len('root/'):])
+    for candidate in candidates:
+        path = os.path.join(root, candidate)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_seedset(path=SEEDSET_YML):
+    if yaml is None:
+        raise RuntimeError('PyYAML is required to read the seedset')
+    with open(path, 'r', encoding='utf-8') as f:
+        doc = yaml.safe_load(f) or {}
+    return [str(p) for p in (doc.get('files') or []) if p]
+
+
+def build_manifest(entries, root=REPO_ROOT):
+    """(manifest, sources, missing, dirs).
+
+    manifest maps target path -> {sha1, size} (plus once: True for SEED_ONCE files),
+    sources maps it to the local file, dirs lists the directory entries to create.
+    """
+    manifest, sources, missing, dirs = {}, {}, [], []
+    for entry in entries:
+        if entry.endswith('/'):
+            # like new-module.sh: mkdir -p only, whatever this repo keeps in it
+            dirs.append(entry.rstrip('/'))
+            continue
+        if _matches(entry, HUB_ONLY):
+            continue
+        source = _source_for(entry, root)
+        if source is None or not os.path.isfile(source):
+            missing.append(entry)
+            continue
+        sources[entry] = source
+    for rel, full in sources.items():
+        manifest[rel] = {'sha1': _sha1(full), 'size': os.path.getsize(full)}
+        if _matches(rel, SEED_ONCE):
+            manifest[rel]['once'] = True
+    return manifest, sources, missing, dirs
+
+
+def discover_targets(checkouts, modules_path=MODULES_YML):
+    """[(module_id, checkout path)] for every module in modules.yml except this hub."""
+    if yaml is None:
+        raise RuntimeError('PyYAML is required to read modules.yml')
+    with open(modules_path, 'r', encoding='utf-8') as f:
+        modules = yaml.safe_load(f) or []
+    targets = []
+    for module in modules if isinstance(modules, list) else []:
+        if not isinstance(module, dict) or module.get('id') == HUB_MODULE:
+            continue
+        name = (module.get('repo_url') or '').rstrip('/').rsplit('/', 1)[-1] or module.get('id')
+        targets.append((module.get('id'), os.path.join(checkouts, name)))
+    return targets
+
+
+def _read_manifest(target):
+    try:
+        with open(os.path.join(target, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _copy(source, dest):
+    """Copy through a temp file in the destination directory so a reader never sees half a file."""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), prefix='.' + os.path.basename(dest) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp)
+        shutil.copymode(source, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def sync_target(module_id, target, manifest, sources, apply=False, prune=False, dirs=()):
+    """Diff one checkout against the manifest and (with apply) copy the changed files."""
+    t0 = time.perf_counter()
+    result = {'module': module_id, 'target': target, 'changed': [], 'unchanged': 0, 'kept': 0,
+              'stale': [], 'created_dirs': [], 'bytes_copied': 0, 'hashed': 0}
+    if not os.path.isdir(target):
+        result.update(status='missing', seconds=round(time.perf_counter() - t0, 4))
+        return result
+    synced = _read_manifest(target)
+    for rel in dirs:
+        path = os.path.join(target, rel)
+        if not os.path.isdir(path):
+            result['created_dirs'].append(rel)
+            if apply:
+                os.makedirs(path, exist_ok=True)
+    for rel, want in manifest.items():
+        dest = os.path.join(target, rel)
+        try:
+            st = os.stat(dest)
+        except OSError:
+            st = None
+        if want.get('once') and st is not None:
+            # the module's own copy wins; nothing is recorded, so nothing is ever pruned
+            result['kept'] += 1
+            synced.pop(rel, None)
+            continue
+        record = synced.get(rel)
+        if st is not None and st.st_size == want['size']:
+            if record and record.get('sha1') == want['sha1'] and record.get('mtime_ns') == st.st_mtime_ns:
+                result['unchanged'] += 1
+                continue
+            # never synced, or touched since: only the content decides
+            result['hashed'] += 1
+            if _sha1(dest) == want['sha1']:
+                result['unchanged'] += 1
+                synced[rel] = {'sha1': want['sha1'], 'mtime_ns': st.st_mtime_ns}
+                continue
+        result['changed'].append(rel)
+        if apply:
+            _copy(sources[rel], dest)
+            result['bytes_copied'] += want['size']
+            synced[rel] = {'sha1': want['sha1'], 'mtime_ns': os.stat(dest).st_mtime_ns}
+        else:
+            result['bytes_copied'] += want['size']
+    for rel in sorted(set(synced) - set(manifest)):
+        if _module_owned(rel, dirs):
+            # pushed by an older sync, but the module's now: forget it, never delete it
+            del synced[rel]
+            continue
+        result['stale'].append(rel)
+        if apply and prune:
+            try:
+                os.unlink(os.path.join(target, rel))
+            except OSError:
+                pass
+            del synced[rel]
+    if apply:
+        doc = {'synced': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'files': synced}
+        tmp = os.path.join(target, MANIFEST_NAME + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+        os.replace(tmp, os.path.join(target, MANIFEST_NAME))
+    result.update(status='synced' if apply else 'dry-run', seconds=round(time.perf_counter() - t0, 4))
+    return result
+
+
+def sync(targets, entries=None, apply=False, prune=False, workers=DEFAULT_WORKERS, root=REPO_ROOT):
+    t0 = time.perf_counter()
+    manifest, sources, missing, dirs = build_manifest(entries if entries is not None else load_seedset(), root)
+    manifest_s = time.perf_counter() - t0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='seed-sync') as pool:
+        results = list(pool.map(lambda t: sync_target(t[0], t[1], manifest, sources, apply, prune, dirs),
+                                targets))
+    return {
+        'apply': apply,
+        'files': len(manifest),
+        'bytes': sum(f['size'] for f in manifest.values()),
+        'missing_sources': missing,
+        'manifest_seconds': round(manifest_s, 4),
+        'seconds': round(time.perf_counter() - t0, 4),
+        'bytes_copied': sum(r['bytes_copied'] for r in results),
+        'repos': results,
+    }
+
+
+def _print_report(report):
+    verb = 'copied' if report['apply'] else 'would copy'
+    print(f"Seedset: {report['files']} files, {report['bytes'] / 1024:.1f} KB "
+          f"(manifest in {report['manifest_seconds'] * 1000:.1f} ms)")
+    for entry in report['missing_sources']:
+        print(f'  ⚠️ missing in this repo: {entry}')
+    for r in report['repos']:
+        if r['status'] == 'missing':
+            print(f"  {r['module']:<28} no checkout at {r['target']}")
+            continue
+        stale = f", {len(r['stale'])} stale" if r['stale'] else ''
+        stale += f", {r['kept']} module-owned kept" if r['kept'] else ''
+        stale += f", {len(r['created_dirs'])} dirs created" if r['created_dirs'] else ''
+        print(f"  {r['module']:<28} {len(r['changed']):>4} {verb} ({r['bytes_copied'] / 1024:.1f} KB), "
+              f"{r['unchanged']} unchanged{stale} in {r['seconds'] * 1000:.1f} ms")
+    print(f"Total: {report['bytes_copied'] / 1024:.1f} KB {verb} in {report['seconds']:.3f}s")
+
+
+def bench(repos, workers=DEFAULT_WORKERS):
+    """Sync this repo's seedset into N empty temp checkouts: first sync, no-op resync, one-file change,
+    against copying every file every time."""
+    base = tempfile.mkdtemp(prefix='seed-sync-bench-')
+    try:
+        targets = []
+        for i in range(repos):
+            path = os.path.join(base, f'module-{i}')
+            os.makedirs(path)
+            targets.append((f'module_{i}', path))
+        out = {'repos': repos, 'workers': workers}
+        for label in ('initial', 'unchanged'):
+            report = sync(targets, apply=True, workers=workers)
+            out[label] = {'seconds': report['seconds'], 'bytes_copied': report['bytes_copied'],
+                          'files_copied': sum(len(r['changed']) for r in report['repos'])}
+        # a locally edited file in one target is detected and restored
+        victim = os.path.join(targets[0][1], 'seeds', 'tags.yml')
+        with open(victim, 'a', encoding='utf-8') as f:
+            f.write('\n# local edit\n')
+        report = sync(targets, apply=True, workers=workers)
+        out['one_local_edit'] = {'seconds': report['seconds'], 'bytes_copied': report['bytes_copied'],
+                                 'files_copied': sum(len(r['changed']) for r in report['repos'])}
+        serial = sync(targets, apply=True, workers=1)
+        out['unchanged_serial_seconds'] = serial['seconds']
+        # what the new-module.sh style "copy everything" pass costs for the same targets
+        _, sources, _, _ = build_manifest(load_seedset())
+        t0 = time.perf_counter()
+        for _, target in targets:
+            for rel, source in sources.items():
+                dest = os.path.join(target, rel)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                shutil.copy2(source, dest)
+        out['copy_everything_seconds'] = round(time.perf_counter() - t0, 4)
+        return out
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incremental seedset distribution to module checkouts')
+    parser.add_argument('--checkouts', help='directory holding one checkout per module (named after repo_url)')
+    parser.add_argument('--target', action='append', default=[], help='explicit checkout path (repeatable)')
+    parser.add_argument('--apply', action='store_true', help='copy files (default is a dry run)')
+    parser.add_argument('--prune', action='store_true', help='with --apply, delete files dropped from the seedset')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help='benchmark against N temp checkouts')
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        print(json.dumps(bench(args.bench, args.workers), indent=2))
+        return 0
+    targets = [(os.path.basename(os.path.normpath(t)), t) for t in args.target]
+    if args.checkouts:
+        targets += discover_targets(args.checkouts)
+    if not targets:
+        parser.error('give --checkouts DIR and/or --target PATH')
+    report = sync(targets, apply=args.apply, prune=args.prune, workers=args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Append-only, segmented store for the signals archive.
+
+The broadcast server used to load signals/archive.latest.json, prepend one entry and
+rewrite the whole file on every POST. Entries now go to JSON Lines segments under
+signals/archive/ instead:
+
+  signals/archive/manifest.json         sealed segments and their entry counts
+  signals/archive/segment-000001.jsonl  oldest entries, one JSON object per line
+  signals/archive/segment-000002.jsonl  ...the active segment is always the last one
+
+An append writes one line to the active segment; the manifest is only rewritten when
+a segment fills up and rotates, so appends cost the same no matter how much history
+exists. The newest-first JSON array that index.js reads is produced on demand by
+export(), which streams segments back to front.
+
+Usage:
+  python3 scripts/signal_archive.py import    # seed segments from signals/archive.latest.json
+  python3 scripts/signal_archive.py export    # rewrite signals/archive.latest.json from segments
+  python3 scripts/signal_archive.py stats
+"""
+import argparse
+import json
+import os
+import threading
+
+DEFAULT_SEGMENT_ENTRIES = 1000
+MANIFEST_NAME = 'manifest.json'
+
+
+def _atomic_write_json(path, obj):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_segment(path):
+    """Yield entries oldest-first, skipping a torn trailing line left by a crash."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class SignalArchive:
+    def __init__(self, archive_dir, segment_entries=DEFAULT_SEGMENT_ENTRIES):
+        self.archive_dir = archive_dir
+        self.manifest_path = os.path.join(archive_dir, MANIFEST_NAME)
+        self.segment_entries = max(1, int(segment_entries))
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._active_count = 0
+
+    # -- manifest ---------------------------------------------------------
+
+    def _load(self):
+        if self._manifest is not None:
+            return self._manifest
+        manifest = None
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except Exception:
+                manifest = None
+        if not isinstance(manifest, dict) or not manifest.get('active'):
+            manifest = {'version': 1, 'segment_entries': self.segment_entries, 'sealed': [], 'active': 'segment-000001.jsonl'}
+        self.segment_entries = int(manifest.get('segment_entries') or self.segment_entries)
+        self._manifest = manifest
+        # the active segment is bounded by segment_entries, so counting it is cheap
+        self._active_count = sum(1 for _ in _read_segment(self._segment_path(manifest['active'])))
+        return manifest
+
+    def _save(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        _atomic_write_json(self.manifest_path, self._manifest)
+
+    def _segment_path(self, name):
+        return os.path.join(self.archive_dir, name)
+
+    def _rotate(self):
+        manifest = self._manifest
+        manifest['sealed'].append({'name': manifest['active'], 'count': self._active_count})
+        seq = len(manifest['sealed']) + 1
+        manifest['active'] = f'segment-{seq:06d}.jsonl'
+        self._active_count = 0
+        self._save()
+
+    # -- public API -------------------------------------------------------
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def append(self, entry):
+        self.append_many([entry])
+
+    def append_many(self, entries):
+        """Append entries (oldest first) with one open of the active segment per rotation."""
+        entries = [e for e in entries if e]
+        if not entries:
+            return
+        with self._lock:
+            manifest = self._load()
+            os.makedirs(self.archive_dir, exist_ok=True)
+            if not os.path.exists(self.manifest_path):
+                self._save()
+            i = 0
+            while i < len(entries):
+                room = self.segment_entries - self._active_count
+                if room <= 0:
+                    self._rotate()
+                    continue
+                chunk = entries[i:i + room]
+                with open(self._segment_path(manifest['active']), 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in chunk))
+                self._active_count += len(chunk)
+                i += len(chunk)
+
+    def __len__(self):
+        with self._lock:
+            manifest = self._load()
+            return sum(s['count'] for s in manifest['sealed']) + self._active_count
+
+    def iter_newest_first(self):
+        with self._lock:
+            manifest = self._load()
+            names = [s['name'] for s in manifest['sealed']] + [manifest['active']]
+        for name in reversed(names):
+            # a single segment is bounded, so reversing it in memory is fine
+            for entry in reversed(list(_read_segment(self._segment_path(name)))):
+                yield entry
+
+    def export(self, out_path):
+        """Write the newest-first JSON array consumed by the archive viewer, one segment at a time."""
+        tmp = out_path + '.tmp'
+        count = 0
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for entry in self.iter_newest_first():
+                body = json.dumps(entry, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+                f.write((',\n  ' if count else '\n  ') + body)
+                count += 1
+            f.write('\n]' if count else ']')
+        os.replace(tmp, out_path)
+        return count
+
+    def bootstrap(self, array_path):
+        """Create the archive on first use, importing a legacy archive.latest.json if present."""
+        if self.exists():
+            return 0
+        n = self.import_array(array_path)
+        with self._lock:
+            self._load()
+            if not self.exists():
+                self._save()
+        return n
+
+    def import_array(self, array_path):
+        """Seed an empty archive from an existing newest-first archive.latest.json."""
+        if not os.path.exists(array_path):
+            return 0
+        with open(array_path, 'r', encoding='utf-8') as f:
+            archive = json.load(f) or []
+        if not isinstance(archive, list):
+            archive = [archive]
+        entries = list(reversed(archive))
+        self.append_many(entries)
+        return len(entries)
+
+    def stats(self):
+        with self._lock:
+            manifest = self._load()
+            return {
+                'entries': sum(s['count'] for s in manifest['sealed']) + self._active_count,
+                'segments': len(manifest['sealed']) + 1,
+                'segment_entries': self.segment_entries,
+                'active': manifest['active'],
+            }
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    signals = os.path.join(root, 'signals')
+    parser = argparse.ArgumentParser(description='Manage the segmented signals archive')
+    parser.add_argument('command', choices=['import', 'export', 'stats'])
+    parser.add_argument('--archive-dir', default=os.path.join(signals, 'archive'))
+    parser.add_argument('--json', default=os.path.join(signals, 'archive.latest.json'),
+                        help='newest-first JSON array to import from / export to')
+    args = parser.parse_args(argv)
+
+    archive = SignalArchive(args.archive_dir)
+    if args.command == 'import':
+        if archive.exists() and len(archive):
+            print(f'{args.archive_dir} already holds {len(archive)} entries; not importing')
+            return
+        n = archive.import_array(args.json)
+        print(f'Imported {n} entries into {args.archive_dir}')
+    elif args.command == 'export':
+        n = archive.export(args.json)
+        print(f'Exported {n} entries to {args.json}')
+    else:
+        print(json.dumps(archive.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""Precompiled data bundle for index.js, and the static file cache that serves it.
+
+index.js used to fetch README.md (~90 KB), seeds/modules.yml and signals/latest.json as
+three requests and parse the YAML in the browser with js-yaml. `build` compiles them
+ahead of time into bundle/:
+
+  bundle/site.json            minified: modules, statuses, the newest signals (latest.json
+                              then archive.latest.json, deduplicated), the README section index
+                              and the sha1 of every source it was built from
+  bundle/readme/NN-slug.md    README.md split at its '## ' headings (code fences respected);
+                              00 is the title and intro
+  bundle/manifest.json        sha1 of every source and size/sha1 of every output
+  *.gz (and *.br when the brotli module is installed)   precompressed variants
+
+Outputs are only rewritten when their bytes change (gzip headers carry no timestamp), so
+an unchanged rebuild keeps mtimes and ETags as they were. A build whose sources hash the
+same as the manifest says is skipped.
+
+bundle/ is a build artifact and is not committed, so a static host without it (GitHub
+Pages) answers site.json with a 404 and index.js falls back to the raw files.
+
+StaticSite serves index.html, index.js, index.css, README.md and the assets/, bundle/,
+seeds/ and signals/ trees for the broadcast server. Each file is read and hashed once per
+mtime/size change; responses carry a strong ETag (one per encoding), answer a matching
+If-None-Match with 304 and pick br/gzip from Accept-Encoding, preferring the precompressed
+file next to the source and compressing text in memory (once) when there is none. Before it
+serves anything under bundle/ it stats the bundle's sources and rebuilds when one changed
+since the last check, so the bundle it serves is never older than the raw files next to it
+and index.js can use site.json without downloading them.
+
+Usage:
+  python3 scripts/site_bundle.py build [--force]
+  python3 scripts/site_bundle.py bench [--runs 50]   # page-load bytes and time, as index.js fetches them
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+import urllib.parse
+
+try:
+    import yaml
+except Exception:
+    yaml = None
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLE_DIR = os.path.join(REPO_ROOT, 'bundle')
+README_PATH = os.path.join(REPO_ROOT, 'README.md')
+MODULES_YML = os.path.join(REPO_ROOT, 'seeds', 'modules.yml')
+STATUSES_YML = os.path.join(REPO_ROOT, 'seeds', 'statuses.yml')
+LATEST_PATH = os.path.join(REPO_ROOT, 'signals', 'latest.json')
+ARCHIVE_PATH = os.path.join(REPO_ROOT, 'signals', 'archive.latest.json')
+
+BUNDLE_VERSION = 2
+SIGNAL_LIMIT = 50
+# gzip/brotli headers cost more than they save on tiny bodies
+COMPRESS_MIN = 256
+COMPRESSIBLE = ('text/', 'application/json', 'application/javascript', 'application/x-yaml', 'image/svg+xml')
+# what StaticSite will serve; everything else (data/internal in particular) stays private
+SITE_FILES = ('index.html', 'index.js', 'index.css', 'README.md')
+SITE_DIRS = ('assets', 'bundle', 'seeds', 'signals')
+CONTENT_TYPES = {
+    '.md': 'text/markdown; charset=utf-8',
+    '.yml': 'application/x-yaml; charset=utf-8',
+    '.yaml': 'application/x-yaml; charset=utf-8',
+    '.json': 'application/json',
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+}
+
+_FENCE_RE = re.compile(r'^\s*(```|~~~)')
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _slug(title):
+    slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+    return slug[:48].rstrip('-') or 'section'
+
+
+def split_readme(text):
+    """[(title, subsections, body)] split at '## ' headings outside code fences.
+
+    The first part holds everything before the first '## ' (the '# ' title and intro);
+    subsections are the '### ' headings inside each part.
+    """
+    parts = []
+    title, subsections, lines = None, [], []
+    fence = None
+    for line in text.splitlines(keepends=True):
+        match = _FENCE_RE.match(line)
+        if match:
+            if fence is None:
+                fence = match.group(1)
+            elif match.group(1) == fence:
+                fence = None
+        elif fence is None:
+            if line.startswith('## '):
+                if lines:
+                    parts.append((title, subsections, ''.join(lines)))
+                title, subsections, lines = line[3:].strip(), [], []
+            elif line.startswith('### '):
+                subsections.append(line[4:].strip())
+            elif line.startswith('# ') and title is None and not parts:
+                title = line[2:].strip()
+        lines.append(line)
+    if lines:
+        parts.append((title, subsections, ''.join(lines)))
+    return [(t or 'Introduction', s, body) for t, s, body in parts]
+
+
+def _load_yaml(path):
+    raw = _read(path)
+    if raw is None:
+        return None
+    if yaml is None:
+        raise RuntimeError('PyYAML is required to build the bundle (pip install pyyaml)')
+    return yaml.safe_load(raw.decode('utf-8'))
+
+
+def _load_json(path):
+    raw = _read(path)
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw.decode('utf-8'))
+    except ValueError:
+        return None
+
+
+def recent_signals(limit=SIGNAL_LIMIT, latest_path=LATEST_PATH, archive_path=ARCHIVE_PATH):
+    """latest.json followed by archive.latest.json (newest first), one entry per broadcast id."""
+    out, seen = [], set()
+    for doc in (_load_json(latest_path), _load_json(archive_path)):
+        entries = doc if isinstance(doc, list) else [doc] if isinstance(doc, dict) else []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            key = entry.get('broadcast.id') or json.dumps(entry, sort_keys=True)
+            if key in seen:
+                continue
+            seen.add(key)
+            out.append(entry)
+            if len(out) >= limit:
+                return out
+    return out
+
+
+def _variants(data):
+    """{suffix: bytes} of precompressed variants worth keeping for data."""
+    out = {}
+    if len(data) < COMPRESS_MIN:
+        return out
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        out['.gz'] = gz
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            out['.br'] = br
+    return out
+
+
+def _write_if_changed(path, data):
+    """Write data unless the file already holds exactly these bytes; True if written."""
+    if _read(path) == data:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def source_paths(root=REPO_ROOT):
+    """build() keyword arguments for the sources under root."""
+    return {'readme_path': os.path.join(root, 'README.md'),
+            'modules_path': os.path.join(root, 'seeds', 'modules.yml'),
+            'statuses_path': os.path.join(root, 'seeds', 'statuses.yml'),
+            'latest_path': os.path.join(root, 'signals', 'latest.json'),
+            'archive_path': os.path.join(root, 'signals', 'archive.latest.json')}
+
+
+def build(out_dir=BUNDLE_DIR, force=False, signal_limit=SIGNAL_LIMIT, readme_path=README_PATH,
+          modules_path=MODULES_YML, statuses_path=STATUSES_YML, latest_path=LATEST_PATH,
+          archive_path=ARCHIVE_PATH):
+    """Compile the bundle into out_dir; returns a summary dict."""
+    t0 = time.perf_counter()
+    sources = {'README.md': readme_path, 'seeds/modules.yml': modules_path, 'seeds/statuses.yml': statuses_path,
+               'signals/latest.json': latest_path, 'signals/archive.latest.json': archive_path}
+    raw = {name: _read(path) for name, path in sources.items()}
+    source_hashes = {name: _sha1(data) if data is not None else None for name, data in raw.items()}
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    previous = _load_json(manifest_path) or {}
+    if (not force and previous.get('version') == BUNDLE_VERSION and previous.get('sources') == source_hashes
+            and previous.get('signal_limit') == signal_limit
+            and all(os.path.exists(os.path.join(out_dir, rel)) for rel in previous.get('files', {}))):
+        return {'skipped': True, 'files': len(previous.get('files', {})),
+                'seconds': round(time.perf_counter() - t0, 4)}
+
+    outputs = {}
+    sections = []
+    readme = (raw['README.md'] or b'').decode('utf-8')
+    for i, (title, subsections, body) in enumerate(split_readme(readme)):
+        rel = f'readme/{i:02d}-{_slug(title)}.md'
+        data = body.encode('utf-8')
+        outputs[rel] = data
+        sections.append({'slug': _slug(title), 'title': title, 'subsections': subsections,
+                         'bytes': len(data), 'file': rel})
+
+    # a broadcast only changes the signals: reuse the YAML parsed into the last site.json
+    last_site = (None if force else _load_json(os.path.join(out_dir, 'site.json'))) or {}
+    if last_site.get('version') != BUNDLE_VERSION:
+        last_site = {}
+    parsed = {}
+    for key, name, path in (('modules', 'seeds/modules.yml', modules_path),
+                            ('statuses', 'seeds/statuses.yml', statuses_path)):
+        if key in last_site and (previous.get('sources') or {}).get(name) == source_hashes[name]:
+            parsed[key] = last_site[key]
+        else:
+            parsed[key] = _load_yaml(path)
+    modules, statuses = parsed['modules'], parsed['statuses']
+    site = {
+        'version': BUNDLE_VERSION,
+        'modules': modules if modules is not None else [],
+        'statuses': statuses if statuses is not None else {},
+        'signals': recent_signals(signal_limit, latest_path, archive_path),
+        'readme': {'sha1': source_hashes['README.md'], 'bytes': len(raw['README.md'] or b''), 'sections': sections},
+        'sources': source_hashes,
+    }
+    outputs['site.json'] = json.dumps(site, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    files = {}
+    written = 0
+    for rel, data in outputs.items():
+        path = os.path.join(out_dir, rel)
+        written += _write_if_changed(path, data)
+        info = {'bytes': len(data), 'sha1': _sha1(data)}
+        variants = _variants(data)
+        for suffix in ('.gz', '.br'):
+            if suffix in variants:
+                written += _write_if_changed(path + suffix, variants[suffix])
+                info[suffix[1:]] = len(variants[suffix])
+            elif suffix == '.gz' or brotli is not None:
+                # only drop .br files when we could have rebuilt them
+                _remove(path + suffix)
+        files[rel] = info
+
+    # fragments of sections that no longer exist
+    removed = 0
+    for rel in previous.get('files', {}):
+        if rel not in files:
+            for suffix in ('', '.gz', '.br'):
+                removed += _remove(os.path.join(out_dir, rel + suffix))
+
+    manifest = {'version': BUNDLE_VERSION, 'signal_limit': signal_limit, 'sources': source_hashes, 'files': files}
+    _write_if_changed(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8') + b'\n')
+    return {'skipped': False, 'files': len(files), 'written': written, 'removed': removed,
+            'sections': len(sections), 'signals': len(site['signals']),
+            'site_json_bytes': files['site.json']['bytes'], 'site_json_gzip_bytes': files['site.json'].get('gz'),
+            'brotli': brotli is not None, 'seconds': round(time.perf_counter() - t0, 4)}
+
+
+def _content_type(path):
+    ext = os.path.splitext(path)[1].lower()
+    return CONTENT_TYPES.get(ext) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def _accepted_encodings(header):
+    """Encodings the client accepts (q > 0), from an Accept-Encoding header."""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(name)
+    return accepted
+
+
+class StaticAsset:
+    """One file's bytes, content type and encoded variants, each with its own strong ETag."""
+
+    def __init__(self, path, body, signature):
+        self.path = path
+        self.signature = signature
+        self.content_type = _content_type(path)
+        digest = _sha1(body)[:20]
+        self.variants = {'identity': (body, f'"{digest}"')}
+        compressible = self.content_type.startswith(COMPRESSIBLE) and len(body) >= COMPRESS_MIN
+        for encoding, suffix, compress in (('br', '.br', brotli.compress if brotli is not None else None),
+                                           ('gzip', '.gz', lambda data: gzip.compress(data, 6, mtime=0))):
+            encoded = self._precompressed(path + suffix, signature)
+            if encoded is None and compressible and compress is not None:
+                encoded = compress(body)
+            if encoded is not None and len(encoded) < len(body):
+                self.variants[encoding] = (encoded, f'"{digest}-{encoding}"')
+
+    @staticmethod
+    def _precompressed(path, signature):
+        """A .gz/.br sibling written no earlier than the source, else None."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if st.st_mtime_ns < signature[0]:
+            return None
+        return _read(path)
+
+    def negotiate(self, accept_encoding):
+        """(encoding, body, etag) for the best representation the client accepts."""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accepted:
+                body, etag = self.variants[encoding]
+                return encoding, body, etag
+        body, etag = self.variants['identity']
+        return 'identity', body, etag
+
+    @staticmethod
+    def not_modified(if_none_match, etag):
+        """True if an If-None-Match header matches etag (weak comparison, as RFC 9110 asks)."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+                return True
+        return False
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class StaticSite:
+    def __init__(self, root=REPO_ROOT, files=SITE_FILES, dirs=SITE_DIRS, bundle='bundle'):
+        self.root = os.path.realpath(root)
+        self.files = frozenset(files)
+        self.dirs = tuple(d + '/' for d in dirs)
+        self.bundle = bundle
+        self._bundle_sources = source_paths(self.root)
+        self._bundle_signature = None
+        self._build_lock = threading.Lock()
+        self._assets = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.builds = 0
+
+    def refresh_bundle(self):
+        """Rebuild the bundle if a source changed since the last check; False if it is unusable."""
+        signature = tuple(_signature(path) for path in self._bundle_sources.values())
+        if signature == self._bundle_signature:
+            return True
+        with self._build_lock:
+            if signature == self._bundle_signature:
+                return True
+            try:
+                # a source touched but not changed hashes the same and the build is skipped
+                build(os.path.join(self.root, self.bundle), **self._bundle_sources)
+            except Exception:
+                self._bundle_signature = None
+                return False
+            self._bundle_signature = signature
+            self.builds += 1
+        return True
+
+    def resolve(self, url_path):
+        """Absolute path for a URL path the site may serve, else None."""
+        rel = urllib.parse.unquote(url_path).lstrip('/') or 'index.html'
+        if '\\' in rel or '\x00' in rel:
+            return None
+        rel = os.path.normpath(rel).replace(os.sep, '/')
+        if rel.startswith('../') or rel == '..':
+            return None
+        if rel not in self.files and not rel.startswith(self.dirs):
+            return None
+        path = os.path.realpath(os.path.join(self.root, rel))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def get(self, url_path):
+        """The StaticAsset for url_path (reloaded only when the file changes) or None."""
+        if self.bundle and url_path.lstrip('/').startswith(self.bundle + '/') and not self.refresh_bundle():
+            # never serve a bundle that could not be brought up to date: index.js falls back
+            return None
+        path = self.resolve(url_path)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        asset = self._assets.get(path)
+        if asset is not None and asset.signature == signature:
+            self.hits += 1
+            return asset
+        body = _read(path)
+        if body is None:
+            return None
+        asset = StaticAsset(path, body, signature)
+        with self._lock:
+            self._assets[path] = asset
+            self.loads += 1
+        return asset
+
+    def stats(self):
+        return {'root': self.root, 'cached': len(self._assets), 'loads': self.loads, 'hits': self.hits,
+                'bundle_builds': self.builds, 'brotli_available': brotli is not None}
+
+
+def _fetch(conn, path, accept_encoding=None, etag=None):
+    headers = {}
+    if accept_encoding:
+        headers['Accept-Encoding'] = accept_encoding
+    if etag:
+        headers['If-None-Match'] = etag
+    conn.request('GET', path, headers=headers)
+    resp = conn.getresponse()
+    body = resp.read()
+    if resp.status not in (200, 304, 404):
+        raise RuntimeError(f'GET {path}: HTTP {resp.status}')
+    if resp.getheader('Content-Encoding') == 'gzip':
+        decoded = gzip.decompress(body)
+    elif resp.getheader('Content-Encoding') == 'br':
+        decoded = brotli.decompress(body)
+    else:
+        decoded = body
+    return resp.status, len(body), decoded, resp.getheader('ETag')
+
+
+def bench(runs=50):
+    """Bytes on the wire and fetch+parse time until the page has what it renders first.
+
+    Each scenario is the request sequence index.js makes. 'raw' is the baseline: README.md,
+    modules.yml and latest.json, YAML parsed on the client (PyYAML stands in for js-yaml).
+    'no_bundle' is a host without bundle/ (GitHub Pages): site.json 404s, then the raw files.
+    'bundle' is site.json plus the README's first section; 'bundle_after_broadcast' rewrites
+    latest.json before every load, so each one pays for StaticSite's rebuild. Parse time is
+    the stand-in for time-to-first-render; a real TTFR needs a browser.
+    """
+    import http.client
+    import shutil
+    import statistics
+    import tempfile
+    import broadcast_server
+
+    # served from a throwaway copy of the sources, so a bench never rewrites the real bundle/
+    root = tempfile.mkdtemp(prefix='site_bundle_bench_')
+    for rel in ('README.md', 'seeds/modules.yml', 'seeds/statuses.yml', 'signals/latest.json',
+                'signals/archive.latest.json'):
+        src = os.path.join(REPO_ROOT, rel)
+        if os.path.exists(src):
+            os.makedirs(os.path.dirname(os.path.join(root, rel)), exist_ok=True)
+            shutil.copyfile(src, os.path.join(root, rel))
+    out_dir = os.path.join(root, 'bundle')
+    build(out_dir, force=True, **source_paths(root))
+    site_before = broadcast_server.SITE
+    with_bundle = StaticSite(root)
+    without_bundle = StaticSite(root, dirs=[d for d in SITE_DIRS if d != 'bundle'], bundle=None)
+    broadcast_server.SITE = with_bundle
+    broadcast_server.Handler.log_message = lambda self, *args: None
+    server = broadcast_server.make_server('127.0.0.1', 0, mode='threaded', workers=4, keepalive=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+
+    latest_path = os.path.join(root, 'signals', 'latest.json')
+    latest = _load_json(latest_path) or {}
+
+    def broadcast(i):
+        with open(latest_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(latest, **{'broadcast.id': f'bench-{i}'}), f)
+
+    def scenario(paths, encoding, parse, revalidate=False, site=with_bundle, before=None):
+        broadcast_server.SITE = site
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        etags = {}
+        if revalidate:
+            for path in paths:
+                etags[path] = _fetch(conn, path, encoding)[3]
+        fetch_ms, parse_ms, wire = [], [], 0
+        for i in range(runs):
+            if before is not None:
+                before(i)
+            t0 = time.perf_counter()
+            wire = 0
+            bodies = []
+            for path in paths:
+                status, n, body, _ = _fetch(conn, path, encoding, etags.get(path))
+                wire += n
+                bodies.append(body)
+            t1 = time.perf_counter()
+            if not revalidate:
+                parse(bodies)
+            fetch_ms.append((t1 - t0) * 1000)
+            parse_ms.append((time.perf_counter() - t1) * 1000)
+        conn.close()
+        total = sorted(f + p for f, p in zip(fetch_ms, parse_ms))
+        return {'requests': len(paths), 'wire_bytes': wire, 'fetch_ms': round(statistics.median(fetch_ms), 3),
+                'parse_ms': round(statistics.median(parse_ms), 3), 'median_ms': round(statistics.median(total), 3),
+                'p95_ms': round(total[int(len(total) * 0.95) - 1], 3)}
+
+    def parse_raw(bodies):
+        readme, modules, latest = bodies
+        readme.decode('utf-8')
+        yaml.safe_load(modules.decode('utf-8'))
+        json.loads(latest)
+
+    def parse_bundle(bodies):
+        site, first = bodies
+        json.loads(site)
+        first.decode('utf-8')
+
+    def parse_fallback(bodies):
+        parse_raw(bodies[1:])
+
+    site = _load_json(os.path.join(out_dir, 'site.json'))
+    first = '/bundle/' + site['readme']['sections'][0]['file']
+    raw_paths = ['/README.md', '/seeds/modules.yml', '/signals/latest.json']
+    bundle_paths = ['/bundle/site.json', first]
+    try:
+        out = {
+            'runs': runs,
+            'brotli': brotli is not None,
+            'raw_identity': scenario(raw_paths, None, parse_raw),
+            'raw_gzip': scenario(raw_paths, 'gzip', parse_raw),
+            'no_bundle_gzip': scenario(['/bundle/site.json'] + raw_paths, 'gzip', parse_fallback,
+                                       site=without_bundle),
+            'bundle_identity': scenario(bundle_paths, None, parse_bundle),
+            'bundle_gzip': scenario(bundle_paths, 'gzip, br', parse_bundle),
+            'bundle_revalidate_304': scenario(bundle_paths, 'gzip, br', None, revalidate=True),
+            'bundle_after_broadcast_gzip': scenario(bundle_paths, 'gzip, br', parse_bundle, before=broadcast),
+            'bundle_builds': with_bundle.builds,
+            'bundle_signals': len(site['signals']),
+            'readme_sections': len(site['readme']['sections']),
+        }
+        out['wire_bytes_saved'] = out['raw_identity']['wire_bytes'] - out['bundle_gzip']['wire_bytes']
+        return out
+    finally:
+        server.shutdown()
+        server.server_close()
+        broadcast_server.SITE = site_before
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build and benchmark the index.js data bundle')
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('--out', default=BUNDLE_DIR)
+    parser.add_argument('--force', action='store_true', help='rebuild even if no source changed')
+    parser.add_argument('--signals', type=int, default=SIGNAL_LIMIT, help='newest signals to include')
+    parser.add_argument('--runs', type=int, default=50, help='bench: page loads per scenario')
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        print(json.dumps(bench(args.runs), indent=2))
+        return
+    print(json.dumps(build(args.out, force=args.force, signal_limit=args.signals), indent=2))
+
+
+if __name__ == '__main__':
+    main()
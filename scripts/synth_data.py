@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""Seeded synthetic data for benchmarking the broadcast server and the normalizer.
+
+The checked-in CSVs are empty, so nothing measures how the ingest and normalize paths
+behave at production scale. This writes realistic files of any size (10k to 10M rows is
+the intended range) from a fixed seed, so the same arguments always produce the same
+bytes. Every id comes from the real seeds: module ids, tags, glyph icons and statuses
+from seeds/modules.yml, statuses.yml and emoji_palette.yml (through seed_registry), and
+workflow statuses from the workflow_run funnel in funnel_spec.yml.
+
+  broadcast   data/internal/broadcast.csv in the canonical HEADER order, oldest first,
+              timestamps spread over --days. A --malformed fraction of the rows are broken
+              on purpose, one of MALFORMED_KINDS each, to exercise the normalizer's repair
+              and line-based fallback paths
+  archive     signals/archive/ segments (signal_archive.SignalArchive), latest.json-shaped
+  workflows   data/internal/master.workflow.csv + steps.workflow.csv; each workflow walks the
+              workflow_run funnel from its first step to a terminal step
+  modules     a modules.yml-shaped list: the real modules, then clones with real orbits,
+              statuses, tags and glyphs (for the seed parsers and seed_integrity.py)
+  all         every file above under one data root (the layout use_data_root() expects)
+
+Files are streamed in chunks, so memory does not grow with --rows. Each command prints
+JSON stats: rows, bytes, seconds, and the malformed rows written per kind.
+
+Usage:
+  python3 scripts/synth_data.py broadcast --rows 100000 --out /tmp/bench/broadcast.csv
+  python3 scripts/synth_data.py broadcast --rows 1000000 --malformed 0.02 --seed 7 --out big.csv
+  python3 scripts/synth_data.py archive --rows 50000 --out /tmp/bench/signals/archive
+  python3 scripts/synth_data.py workflows --rows 100000 --out /tmp/bench/data/internal
+  python3 scripts/synth_data.py modules --rows 10000 --out /tmp/bench/seeds/modules.yml
+  python3 scripts/synth_data.py all --rows 100000 --out /tmp/bench-root
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from normalize_broadcast_csv import HEADER  # noqa: E402
+from seed_registry import SeedRegistry  # noqa: E402
+from signal_archive import SignalArchive  # noqa: E402
+from workflow_store import ARRAY_FIELDS, MASTER_HEADER, STEPS_HEADER  # noqa: E402
+
+try:
+    import yaml
+except Exception:
+    yaml = None
+
+try:
+    from zoneinfo import ZoneInfo
+    EASTERN = ZoneInfo('America/New_York')
+except Exception:
+    EASTERN = timezone(timedelta(hours=-5))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEEDS_DIR = os.path.join(REPO_ROOT, 'seeds')
+FUNNEL_YML = os.path.join(SEEDS_DIR, 'funnel_spec.yml')
+
+DEFAULT_SEED = 420
+DEFAULT_START = '2024-01-01'
+DEFAULT_DAYS = 730
+DEFAULT_MALFORMED = 0.01
+CHUNK_ROWS = 10000
+MALFORMED_KINDS = (
+    'short',             # trailing columns missing
+    'long',              # extra trailing columns
+    'unquoted_comma',    # a summary with a bare comma, so every later column shifts right
+    'embedded_newline',  # quoted summary spanning two lines (valid CSV, breaks line-based readers)
+    'stray_quote',       # a quote in the middle of an unquoted field
+    'header_repeat',     # the header again, as when two logs are concatenated
+    'blank',             # an empty line
+    'unknown_ids',       # well-formed, but module/status/rating ids that are not in the seeds
+    'bad_date',          # unparsable date and timestamp
+)
+# used when the seeds cannot be read (no PyYAML); same shape as the real ones
+FALLBACK_MODULES = ['fourtwenty_analytics', 'archive_model', 'signal_model', 'launch_model']
+FALLBACK_STATUSES = ['seed', 'sprout', 'budding', 'bloom', 'developing', 'active', 'paused', 'fired']
+FALLBACK_WORKFLOW_STEPS = {'queued': ['in_progress', 'cancelled'],
+                           'in_progress': ['success', 'failure', 'cancelled', 'timed_out'],
+                           'success': [], 'failure': [], 'cancelled': [], 'timed_out': []}
+WORDS = ('signal', 'orbit', 'launch', 'archive', 'ledger', 'pipeline', 'refresh', 'release', 'cohort',
+         'dashboard', 'metric', 'forecast', 'backfill', 'schema', 'glossary', 'seed', 'funnel', 'audit')
+
+
+class SeedIds:
+    """The real ids the generators draw from, resolved once."""
+
+    def __init__(self):
+        snap = SeedRegistry(os.path.join(SEEDS_DIR, 'modules.yml'), os.path.join(SEEDS_DIR, 'statuses.yml'),
+                            os.path.join(SEEDS_DIR, 'emoji_palette.yml')).snapshot()
+        modules = snap.modules if isinstance(snap.modules, dict) else {}
+        self.module_ids = sorted(snap.module_ids) or list(FALLBACK_MODULES)
+        self.status_ids = sorted(snap.status_ids) or list(FALLBACK_STATUSES)
+        self.ratings = list(snap.allowed_ratings)
+        self.glyph_icons = {m: snap.module_glyph_icons.get(m, '') for m in self.module_ids}
+        self.status_icon = snap.status_icon
+        self.tags = {}
+        self.links = {}
+        for m in self.module_ids:
+            entry = modules.get(m) or {}
+            tags = entry.get('tags') if isinstance(entry.get('tags'), list) else []
+            self.tags[m] = [str(t) for t in tags] or ['signal']
+            self.links[m] = entry.get('pages_url') or entry.get('repo_url') or ''
+        self.modules = modules
+        self.palette = snap.emoji if isinstance(snap.emoji, dict) else {}
+        self.workflow_steps = _workflow_funnel()
+
+
+def _workflow_funnel():
+    """{step id: [next step ids]} for the workflow_run funnel, first step first."""
+    if yaml is None or not os.path.exists(FUNNEL_YML):
+        return dict(FALLBACK_WORKFLOW_STEPS)
+    try:
+        with open(FUNNEL_YML, 'r', encoding='utf-8') as f:
+            spec = yaml.safe_load(f) or {}
+        for funnel in spec.get('funnels') or []:
+            if funnel.get('id') == 'workflow_run':
+                steps = {}
+                for step in funnel.get('steps') or []:
+                    steps[str(step['id'])] = [str(s) for s in (step.get('next') or [])]
+                if steps:
+                    return steps
+    except Exception:
+        pass
+    return dict(FALLBACK_WORKFLOW_STEPS)
+
+
+def _timeline(n, start, days):
+    """(first UTC datetime, seconds between rows) for n rows spread evenly over days."""
+    base = datetime.strptime(start, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    step = days * 86400.0 / max(1, n)
+    return base, step
+
+
+def _phrase(rng, k):
+    return ' '.join(rng.choice(WORDS) for _ in range(k))
+
+
+def broadcast_rows(n, seed=DEFAULT_SEED, malformed=DEFAULT_MALFORMED, start=DEFAULT_START, days=DEFAULT_DAYS,
+                   ids=None):
+    """Yield (kind, row) oldest first: kind is None and row a HEADER list for a good row, or a
+    MALFORMED_KINDS name and the row to write for a broken one (a list, or a raw CSV line)."""
+    ids = ids or SeedIds()
+    rng = random.Random(seed)
+    base, step = _timeline(n, start, days)
+    last_second, used = None, set()
+    width = len(HEADER)
+    summary_at = HEADER.index('broadcast.summary')
+    for i in range(n):
+        utc = base + timedelta(seconds=i * step + rng.random() * step)
+        module = rng.choice(ids.module_ids)
+        rating = rng.choice(ids.ratings)
+        status = rng.choice(ids.status_ids)
+        second = utc.strftime('%Y%m%dT%H%M%SZ')
+        if second != last_second:
+            last_second, used = second, set()
+        # the server suffixes -1, -2, ... when the same module broadcasts twice in a second
+        broadcast_id = f'{second}-FourTwentyAnalytics-{module}'
+        suffix = 0
+        while broadcast_id in used:
+            suffix += 1
+            broadcast_id = f'{second}-FourTwentyAnalytics-{module}-{suffix}'
+        used.add(broadcast_id)
+        ts = utc.astimezone(EASTERN).isoformat(timespec='microseconds')
+        tags = rng.sample(ids.tags[module], min(len(ids.tags[module]), rng.randint(1, 3)))
+        row = [broadcast_id, ts, ts[:10], module, rating, f'{_phrase(rng, 2).title()} {i}',
+               f'{_phrase(rng, rng.randint(4, 12)).capitalize()}.', status, ids.links[module],
+               ','.join(tags), ids.glyph_icons[module], ids.status_icon(rating, status)]
+        if not malformed or rng.random() >= malformed:
+            yield None, row
+            continue
+        kind = rng.choice(MALFORMED_KINDS)
+        if kind == 'short':
+            yield kind, row[:rng.randint(2, width - 1)]
+        elif kind == 'long':
+            yield kind, row + [_phrase(rng, 1) for _ in range(rng.randint(1, 3))]
+        elif kind == 'unquoted_comma':
+            fields = [f.replace('"', '') for f in row]
+            fields[summary_at] = f'{_phrase(rng, 3)}, {_phrase(rng, 3)}'
+            yield kind, ','.join(f if ',' not in f or k == summary_at else f'"{f}"' for k, f in enumerate(fields))
+        elif kind == 'embedded_newline':
+            row[summary_at] = f'{_phrase(rng, 4)}\n{_phrase(rng, 4)}'
+            yield kind, row
+        elif kind == 'stray_quote':
+            fields = [f'"{f}"' if ',' in f else f for f in row]
+            fields[summary_at] = f'{_phrase(rng, 2)} "{_phrase(rng, 1)}" {_phrase(rng, 2)}'
+            yield kind, ','.join(fields)
+        elif kind == 'header_repeat':
+            yield kind, ','.join(HEADER)
+        elif kind == 'blank':
+            yield kind, ''
+        elif kind == 'unknown_ids':
+            row[3] = f'retired_{_phrase(rng, 1)}_model'
+            row[4] = rng.choice(('urgent', 'low', ''))
+            row[7] = rng.choice(('archived', 'unknown', ''))
+            yield kind, row
+        else:
+            row[1] = rng.choice(('', 'yesterday', '2024-13-45T99:00:00'))
+            row[2] = rng.choice(('', 'n/a', '31/02/2024'))
+            yield kind, row
+
+
+def write_broadcast_csv(path, n, seed=DEFAULT_SEED, malformed=DEFAULT_MALFORMED, start=DEFAULT_START,
+                        days=DEFAULT_DAYS, ids=None):
+    """Write n rows (HEADER first) to path atomically; returns stats."""
+    t0 = time.perf_counter()
+    counts = {kind: 0 for kind in MALFORMED_KINDS}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='', encoding='utf-8', buffering=1024 * 1024) as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        chunk = []
+        for kind, row in broadcast_rows(n, seed, malformed, start, days, ids):
+            if kind is None:
+                chunk.append(row)
+                if len(chunk) >= CHUNK_ROWS:
+                    writer.writerows(chunk)
+                    chunk = []
+                continue
+            counts[kind] += 1
+            if chunk:
+                writer.writerows(chunk)
+                chunk = []
+            if isinstance(row, list):
+                writer.writerow(row)
+            else:
+                f.write(row + '\r\n')
+        writer.writerows(chunk)
+    os.replace(tmp, path)
+    return _stats(path, n, t0, malformed=counts)
+
+
+def archive_entries(n, seed=DEFAULT_SEED, start=DEFAULT_START, days=DEFAULT_DAYS, ids=None):
+    """Yield n latest.json-shaped entries, oldest first (the archive never holds malformed rows)."""
+    for _, row in broadcast_rows(n, seed, 0, start, days, ids):
+        entry = dict(zip(HEADER, row))
+        entry['tags.keys'] = entry['tags.keys'].split(',')
+        yield entry
+
+
+def write_archive(archive_dir, n, seed=DEFAULT_SEED, start=DEFAULT_START, days=DEFAULT_DAYS, ids=None):
+    t0 = time.perf_counter()
+    archive = SignalArchive(archive_dir)
+    chunk = []
+    for entry in archive_entries(n, seed, start, days, ids):
+        chunk.append(entry)
+        if len(chunk) >= CHUNK_ROWS:
+            archive.append_many(chunk)
+            chunk = []
+    archive.append_many(chunk)
+    out = _stats(archive_dir, n, t0)
+    out['segments'] = archive.stats().get('segments')
+    return out
+
+
+def workflow_records(n, seed=DEFAULT_SEED, start=DEFAULT_START, days=DEFAULT_DAYS, ids=None):
+    """Yield (master row, [step rows]) per workflow; each walks the workflow_run funnel to a terminal step."""
+    ids = ids or SeedIds()
+    rng = random.Random(seed + 1)
+    funnel = ids.workflow_steps
+    first = next(iter(funnel))
+    owners = [m.split('_')[0] for m in ids.module_ids]
+    base, step = _timeline(n, start, days)
+    kinds = ('ci', 'deploy', 'scheduled', 'backfill')
+    for i in range(n):
+        created = base + timedelta(seconds=i * step)
+        owner = rng.choice(owners)
+        workflow_id = f'wf-{i:08d}'
+        path, at, ts = [first], first, created
+        while funnel.get(at):
+            at = rng.choice(funnel[at])
+            path.append(at)
+        steps = []
+        for seq, status in enumerate(path, 1):
+            steps.append([workflow_id, seq, status, ts.astimezone(EASTERN).isoformat(timespec='seconds'), owner])
+            ts += timedelta(seconds=rng.randint(5, 1800))
+        module = rng.choice(ids.module_ids)
+        record = {
+            'workflow_id': workflow_id,
+            'workflow_name': f'{module} {_phrase(rng, 1)}',
+            'workflow_description': _phrase(rng, rng.randint(3, 8)).capitalize(),
+            'workflow_type': rng.choice(kinds),
+            'workflow_creation_date': created.strftime('%Y-%m-%d'),
+            'workflow_status': path[-1],
+            'workflow_owner': owner,
+            'workflow_last_updated': ts.strftime('%Y-%m-%d'),
+            'workflow_steps_integer': len(path),
+            'workflow_steps_array': path,
+            'workflow_artifacts_array': [f'{module}-{i}.zip'] if path[-1] == 'success' else [],
+            'ts.utc5': ts.astimezone(EASTERN).isoformat(timespec='seconds'),
+        }
+        yield [','.join(record[h]) if h in ARRAY_FIELDS else str(record[h]) for h in MASTER_HEADER], steps
+
+
+def write_workflows(out_dir, n, seed=DEFAULT_SEED, start=DEFAULT_START, days=DEFAULT_DAYS, ids=None):
+    t0 = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    master_path = os.path.join(out_dir, 'master.workflow.csv')
+    steps_path = os.path.join(out_dir, 'steps.workflow.csv')
+    step_rows = 0
+    with open(master_path + '.tmp', 'w', newline='', encoding='utf-8', buffering=1024 * 1024) as mf, \
+            open(steps_path + '.tmp', 'w', newline='', encoding='utf-8', buffering=1024 * 1024) as sf:
+        master, steps = csv.writer(mf), csv.writer(sf)
+        master.writerow(MASTER_HEADER)
+        steps.writerow(STEPS_HEADER)
+        for row, step_list in workflow_records(n, seed, start, days, ids):
+            master.writerow(row)
+            steps.writerows(step_list)
+            step_rows += len(step_list)
+    os.replace(master_path + '.tmp', master_path)
+    os.replace(steps_path + '.tmp', steps_path)
+    out = _stats(out_dir, n, t0, files=(master_path, steps_path))
+    out['step_rows'] = step_rows
+    return out
+
+
+def write_modules(path, n, seed=DEFAULT_SEED, ids=None):
+    """A modules.yml of n entries: the real modules first, then clones of them with suffixed ids."""
+    ids = ids or SeedIds()
+    rng = random.Random(seed + 2)
+    t0 = time.perf_counter()
+    real = [dict(ids.modules.get(m) or {'id': m}, id=m) for m in ids.module_ids]
+    status_emoji = [str(v) for v in (ids.palette.get('status_icons') or {}).values()] or ['🟢']
+    orbit_emoji = [str(v) for v in (ids.palette.get('orbit_icons') or {}).values()] or ['🪐']
+    glyphs = list((ids.palette.get('glyph_icons') or {}).keys()) or ['signal']
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write('# Synthetic modules list generated by scripts/synth_data.py\n\n')
+        for i in range(n):
+            template = real[i % len(real)]
+            entry = dict(template)
+            if i >= len(real):
+                entry['id'] = f"{template['id']}_{i:07d}"
+                entry['name'] = f"{template.get('name') or template['id']} {i}"
+                entry['orbit'] = rng.choice(orbit_emoji)
+                entry['status'] = rng.choice(status_emoji)
+                entry['glyphs'] = rng.sample(glyphs, min(len(glyphs), rng.randint(1, 3)))
+            # JSON scalars and flow lists are valid YAML, and much faster to write than yaml.dump
+            lines = [f"- id: {entry['id']}"]
+            for key in ('name', 'emoji', 'orbit', 'status', 'tags', 'glyphs', 'repo_url', 'pages_url', 'owners'):
+                if entry.get(key) is not None:
+                    lines.append(f'  {key}: {json.dumps(entry[key], ensure_ascii=False)}')
+            f.write('\n'.join(lines) + '\n\n')
+    os.replace(path + '.tmp', path)
+    return _stats(path, n, t0)
+
+
+def write_all(root, n, seed=DEFAULT_SEED, malformed=DEFAULT_MALFORMED, start=DEFAULT_START, days=DEFAULT_DAYS):
+    """Every file under one data root; the archive and workflow files get n // 10 rows."""
+    ids = SeedIds()
+    data_dir = os.path.join(root, 'data', 'internal')
+    return {
+        'broadcast': write_broadcast_csv(os.path.join(data_dir, 'broadcast.csv'), n, seed, malformed, start, days,
+                                         ids),
+        'archive': write_archive(os.path.join(root, 'signals', 'archive'), max(1, n // 10), seed, start, days, ids),
+        'workflows': write_workflows(data_dir, max(1, n // 10), seed, start, days, ids),
+        'modules': write_modules(os.path.join(root, 'seeds', 'modules.yml'), max(len(ids.module_ids), n // 100),
+                                 seed, ids),
+    }
+
+
+def _stats(path, n, t0, malformed=None, files=None):
+    elapsed = time.perf_counter() - t0
+    if files is None:
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in os.listdir(path)]
+        else:
+            files = [path]
+    size = sum(os.path.getsize(p) for p in files if os.path.isfile(p))
+    out = {'path': path, 'rows': n, 'bytes': size, 'seconds': round(elapsed, 3),
+           'rows_per_sec': round(n / elapsed) if elapsed else None}
+    if malformed is not None:
+        out['malformed'] = malformed
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate seeded synthetic broadcast/workflow/module data')
+    parser.add_argument('command', choices=['broadcast', 'archive', 'workflows', 'modules', 'all'])
+    parser.add_argument('--rows', type=int, default=10000, help='rows to generate (10k-10M intended)')
+    parser.add_argument('--out', required=True, help='file (broadcast, modules) or directory (archive, workflows, all)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--malformed', type=float, default=DEFAULT_MALFORMED,
+                        help='fraction of broadcast rows to break on purpose (default: 0.01)')
+    parser.add_argument('--start', default=DEFAULT_START, help='first date (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='days the timestamps span')
+    args = parser.parse_args(argv)
+    if args.rows < 1:
+        parser.error('--rows must be at least 1')
+    if not 0 <= args.malformed <= 1:
+        parser.error('--malformed must be between 0 and 1')
+    if args.command == 'broadcast':
+        out = write_broadcast_csv(args.out, args.rows, args.seed, args.malformed, args.start, args.days)
+    elif args.command == 'archive':
+        out = write_archive(args.out, args.rows, args.seed, args.start, args.days)
+    elif args.command == 'workflows':
+        out = write_workflows(args.out, args.rows, args.seed, args.start, args.days)
+    elif args.command == 'modules':
+        out = write_modules(args.out, args.rows, args.seed)
+    else:
+        out = write_all(args.out, args.rows, args.seed, args.malformed, args.start, args.days)
+    print(json.dumps(out, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
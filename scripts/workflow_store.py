@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""Append-only storage and in-memory index for workflow submissions.
+
+  data/internal/master.workflow.csv  one row per submission; the newest row for a
+                                     workflow_id is its current state
+  data/internal/steps.workflow.csv   one row each time a workflow enters a new status
+                                     (workflow_id, step_seq, step_status, step_ts), the
+                                     shape scripts/funnel_metrics.py reads for workflow_run
+
+Both files are only ever appended to, with one buffered write per file per batch, by
+the broadcast server's single writer. The index (current record per id, ids by status
+and by owner, step history per id) is built with one pass over the files and then
+updated in place after each append; as with BroadcastIdIndex, a change to either file
+that we did not make triggers a rebuild.
+
+Usage:
+  python3 scripts/workflow_store.py                 # build the index for this repo's CSVs and print stats
+  python3 scripts/workflow_store.py --bench 20000   # ingest + lookup benchmark on throwaway files
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+MASTER_HEADER = [
+    'workflow_id',
+    'workflow_name',
+    'workflow_description',
+    'workflow_type',
+    'workflow_creation_date',
+    'workflow_status',
+    'workflow_owner',
+    'workflow_last_updated',
+    'workflow_steps_integer',
+    'workflow_steps_array',
+    'workflow_artifacts_array',
+    'ts.utc5',
+]
+STEPS_HEADER = ['workflow_id', 'step_seq', 'step_status', 'step_ts', 'workflow_owner']
+ARRAY_FIELDS = ('workflow_steps_array', 'workflow_artifacts_array')
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _needs_header(path):
+    """True for a missing file or one holding only whitespace (the repo ships them as a bare newline)."""
+    try:
+        if os.path.getsize(path) > 64:
+            return False
+        with open(path, 'r', encoding='utf-8') as f:
+            return not f.read().strip()
+    except OSError:
+        return True
+
+
+def _to_row(record, header):
+    return [','.join(record[h]) if h in ARRAY_FIELDS else str(record.get(h, '')) for h in header]
+
+
+def _from_row(row):
+    record = dict(row)
+    for h in ARRAY_FIELDS:
+        value = record.get(h) or ''
+        record[h] = [v for v in value.split(',') if v]
+    try:
+        record['workflow_steps_integer'] = int(record.get('workflow_steps_integer') or 0)
+    except ValueError:
+        record['workflow_steps_integer'] = 0
+    return record
+
+
+class WorkflowStore:
+    def __init__(self, master_path, steps_path):
+        self.master_path = master_path
+        self.steps_path = steps_path
+        self._lock = threading.Lock()
+        self._reset()
+        self._signature = False
+        self.rebuilds = 0
+        self.last_rebuild_seconds = None
+
+    def _reset(self):
+        self._workflows = {}
+        self._versions = {}
+        self._updated = {}
+        self._by_status = {}
+        self._by_owner = {}
+        # (seq, id) per update, oldest first, overall and per status/owner; entries superseded
+        # by a later update are skipped when read and compacted away once they dominate
+        self._log = []
+        self._status_log = {}
+        self._owner_log = {}
+        self._steps = {}
+        self._seq = 0
+
+    # -- index maintenance --------------------------------------------------
+
+    def _current_signature(self):
+        return (_signature(self.master_path), _signature(self.steps_path))
+
+    def _apply_master(self, record):
+        wid = record['workflow_id']
+        old = self._workflows.get(wid)
+        if old is not None:
+            self._by_status.get(old['workflow_status'], set()).discard(wid)
+            self._by_owner.get(old['workflow_owner'].lower(), set()).discard(wid)
+        self._workflows[wid] = record
+        self._versions[wid] = self._versions.get(wid, 0) + 1
+        self._seq += 1
+        self._updated[wid] = self._seq
+        owner = record['workflow_owner'].lower()
+        self._by_status.setdefault(record['workflow_status'], set()).add(wid)
+        self._by_owner.setdefault(owner, set()).add(wid)
+        entry = (self._seq, wid)
+        self._log.append(entry)
+        self._status_log.setdefault(record['workflow_status'], []).append(entry)
+        self._owner_log.setdefault(owner, []).append(entry)
+
+    def _apply_step(self, step):
+        self._steps.setdefault(step['workflow_id'], []).append(step)
+
+    def rebuild(self):
+        with self._lock:
+            t0 = time.perf_counter()
+            self._reset()
+            signature = self._current_signature()
+            if not _needs_header(self.master_path):
+                with open(self.master_path, 'r', newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        if row.get('workflow_id'):
+                            self._apply_master(_from_row(row))
+            if not _needs_header(self.steps_path):
+                with open(self.steps_path, 'r', newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        if row.get('workflow_id'):
+                            self._apply_step(dict(row))
+            self._signature = signature
+            self.rebuilds += 1
+            self.last_rebuild_seconds = round(time.perf_counter() - t0, 6)
+
+    def ensure_fresh(self):
+        """Rebuild if either CSV changed behind our back since the last sync point."""
+        if self._current_signature() != self._signature:
+            self.rebuild()
+
+    def ensure_files(self):
+        for path, header in ((self.master_path, MASTER_HEADER), (self.steps_path, STEPS_HEADER)):
+            if _needs_header(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerow(header)
+                self._signature = False
+
+    # -- writes -------------------------------------------------------------
+
+    def append(self, records, now):
+        """Append prepared master records (oldest first); the caller holds the server's write lock.
+
+        A step row is written whenever a workflow is new or its status differs from its
+        current one. Returns [(workflow_id, version)] in input order.
+        """
+        self.ensure_files()
+        self.ensure_fresh()
+        with self._lock:
+            status = {}
+            versions = {}
+            step_counts = {}
+            steps = []
+            out = []
+            for record in records:
+                wid = record['workflow_id']
+                current = status.get(wid)
+                if current is None and wid in self._workflows:
+                    current = self._workflows[wid]['workflow_status']
+                version = versions.get(wid, self._versions.get(wid, 0)) + 1
+                versions[wid] = version
+                if current != record['workflow_status']:
+                    seq = step_counts.get(wid, len(self._steps.get(wid, ()))) + 1
+                    step_counts[wid] = seq
+                    steps.append({
+                        'workflow_id': wid,
+                        'step_seq': str(seq),
+                        'step_status': record['workflow_status'],
+                        'step_ts': now,
+                        'workflow_owner': record['workflow_owner'],
+                    })
+                status[wid] = record['workflow_status']
+                out.append((wid, version))
+
+        try:
+            for path, header, rows in ((self.master_path, MASTER_HEADER, records),
+                                       (self.steps_path, STEPS_HEADER, steps)):
+                if not rows:
+                    continue
+                buf = io.StringIO()
+                csv.writer(buf).writerows(_to_row(r, header) for r in rows)
+                with open(path, 'a', newline='', encoding='utf-8') as f:
+                    f.write(buf.getvalue())
+        except Exception:
+            # part of the batch may be on disk; re-read the files next time
+            self._signature = False
+            raise
+
+        with self._lock:
+            for record in records:
+                self._apply_master(dict(record))
+            for step in steps:
+                self._apply_step(step)
+            self._signature = self._current_signature()
+        return out
+
+    # -- lookups ------------------------------------------------------------
+
+    def get(self, workflow_id):
+        self.ensure_fresh()
+        with self._lock:
+            record = self._workflows.get(workflow_id)
+            if record is None:
+                return None
+            return dict(record, version=self._versions[workflow_id])
+
+    def steps(self, workflow_id):
+        self.ensure_fresh()
+        with self._lock:
+            return list(self._steps.get(workflow_id, ()))
+
+    def find(self, status=None, owner=None, limit=DEFAULT_LIMIT):
+        """Current records matching status and/or owner (case-insensitive), most recently updated first.
+
+        Returns (records, total matches). Walks the smaller of the matching update logs
+        newest-first and stops after limit live entries.
+        """
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        owner = owner.lower() if owner else None
+        self.ensure_fresh()
+        with self._lock:
+            candidates = []
+            if status:
+                candidates.append((self._by_status.get(status, set()), self._status_log, status))
+            if owner:
+                candidates.append((self._by_owner.get(owner, set()), self._owner_log, owner))
+            if not candidates:
+                live, logs, key = self._workflows.keys(), None, None
+                log = self._log
+            else:
+                candidates.sort(key=lambda c: len(c[0]))
+                live, logs, key = candidates[0]
+                log = logs.get(key, [])
+            if len(candidates) > 1:
+                total = len(live & candidates[1][0])
+            else:
+                total = len(live)
+
+            updated = self._updated
+            workflows = self._workflows
+            out = []
+            for seq, wid in reversed(log):
+                if updated[wid] != seq:
+                    continue
+                record = workflows[wid]
+                if status and record['workflow_status'] != status:
+                    continue
+                if owner and record['workflow_owner'].lower() != owner:
+                    continue
+                out.append(dict(record, version=self._versions[wid]))
+                if len(out) >= limit:
+                    break
+
+            if len(log) > 2 * len(live) + 64:
+                compacted = [(seq, wid) for seq, wid in log if updated[wid] == seq]
+                if logs is None:
+                    self._log = compacted
+                else:
+                    logs[key] = compacted
+            return out, total
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workflows': len(self._workflows),
+                'steps': sum(len(s) for s in self._steps.values()),
+                'statuses': {k: len(v) for k, v in self._by_status.items() if v},
+                'owners': sum(1 for v in self._by_owner.values() if v),
+                'rebuilds': self.rebuilds,
+                'last_rebuild_seconds': self.last_rebuild_seconds,
+            }
+
+
+def _percentile_us(samples, q):
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6, 2)
+
+
+def bench(n, batch=500, seed=420):
+    """Ingest n workflows and a status change for each, then time the lookups, on temp files."""
+    rng = random.Random(seed)
+    root = tempfile.mkdtemp(prefix='workflow-bench-')
+    try:
+        store = WorkflowStore(os.path.join(root, 'master.workflow.csv'), os.path.join(root, 'steps.workflow.csv'))
+        owners = [f'owner{i}' for i in range(50)]
+        now = '2025-10-06T14:23:56-04:00'
+
+        def record(i, status):
+            return {
+                'workflow_id': f'wf-{i:07d}', 'workflow_name': f'Workflow {i}', 'workflow_description': 'bench',
+                'workflow_type': 'ci', 'workflow_creation_date': '2025-10-06', 'workflow_status': status,
+                'workflow_owner': owners[i % len(owners)], 'workflow_last_updated': '2025-10-06',
+                'workflow_steps_integer': 3, 'workflow_steps_array': ['build', 'test', 'deploy'],
+                'workflow_artifacts_array': ['report.html'], 'ts.utc5': now,
+            }
+
+        out = {'workflows': n}
+        t0 = time.perf_counter()
+        for start in range(0, n, batch):
+            store.append([record(i, 'queued') for i in range(start, min(n, start + batch))], now)
+        elapsed = time.perf_counter() - t0
+        out['ingest_batched'] = {'batch': batch, 'records_per_s': round(n / elapsed)}
+
+        single = min(n, 2000)
+        t0 = time.perf_counter()
+        for i in range(single):
+            store.append([record(i, rng.choice(['in_progress', 'success', 'failure']))], now)
+        elapsed = time.perf_counter() - t0
+        out['ingest_single'] = {'records': single, 'records_per_s': round(single / elapsed)}
+
+        cases = {
+            'get': lambda: store.get(f'wf-{rng.randrange(n):07d}'),
+            'steps': lambda: store.steps(f'wf-{rng.randrange(single):07d}'),
+            'find_status': lambda: store.find(status=rng.choice(['queued', 'in_progress', 'success'])),
+            'find_owner': lambda: store.find(owner=rng.choice(owners)),
+            'find_status_owner': lambda: store.find(status='queued', owner=rng.choice(owners)),
+        }
+        for name, fn in cases.items():
+            samples = []
+            for _ in range(2000):
+                t0 = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - t0)
+            out[name] = {'p50_us': _percentile_us(samples, 0.5), 'p99_us': _percentile_us(samples, 0.99)}
+
+        store.rebuild()
+        out['rebuild_seconds'] = store.last_rebuild_seconds
+        return out
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data = os.path.join(root, 'data', 'internal')
+    parser = argparse.ArgumentParser(description='Workflow store index stats and benchmark')
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help='ingest N workflows into temp files and time lookups')
+    args = parser.parse_args(argv)
+    if args.bench:
+        print(json.dumps(bench(args.bench), indent=2))
+        return
+    store = WorkflowStore(os.path.join(data, 'master.workflow.csv'), os.path.join(data, 'steps.workflow.csv'))
+    store.ensure_fresh()
+    print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Shared fixtures: the scripts/ modules on sys.path and a broadcast server on a temp data root."""
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts'))
+
+import broadcast_server  # noqa: E402
+
+
+class Client:
+    def __init__(self, base):
+        self.base = base
+
+    def request(self, method, path, body=None, headers=None):
+        """(status, headers, decoded JSON or raw bytes); HTTP errors are returned, not raised."""
+        data = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode('utf-8')
+        headers = dict(headers or {})
+        if data is not None:
+            headers.setdefault('Content-Type', 'application/json')
+        req = urllib.request.Request(self.base + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                status, resp_headers, raw = resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:
+            status, resp_headers, raw = e.code, e.headers, e.read()
+        try:
+            return status, resp_headers, json.loads(raw)
+        except ValueError:
+            return status, resp_headers, raw
+
+    def get(self, path, headers=None):
+        return self.request('GET', path, headers=headers)
+
+    def post(self, path, body, headers=None):
+        return self.request('POST', path, body, headers)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """The broadcast_server module pointed at tmp_path and serving on an ephemeral port."""
+    monkeypatch.setattr(broadcast_server.Handler, 'log_message', lambda self, *args: None)
+    broadcast_server.use_data_root(str(tmp_path))
+    broadcast_server.configure_storage('csv')
+    broadcast_server.configure_commit('group', 'none')
+    httpd = broadcast_server.make_server('127.0.0.1', 0, mode='threaded', workers=4, keepalive=5)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield broadcast_server, Client('http://127.0.0.1:%d' % httpd.server_address[1])
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        broadcast_server.STREAM.close()
+        broadcast_server.close_commit()
+        broadcast_server.IDEMPOTENCY.close()
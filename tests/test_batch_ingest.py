@@ -0,0 +1,60 @@
+"""POST /api/broadcasts: JSON array and NDJSON batches with per-record results."""
+import json
+
+MODULE = 'fourtwenty_analytics'
+
+
+def ndjson(records):
+    return ''.join(json.dumps(r) + '\n' for r in records).encode('utf-8')
+
+
+def test_json_array_reports_each_record_in_order(server):
+    bs, client = server
+    status, _, body = client.post('/api/broadcasts', [
+        {'moduleId': MODULE, 'broadcastName': 'first'},
+        {'moduleId': 'no_such_module'},
+        {'moduleId': MODULE, 'broadcastName': 'third'},
+    ])
+    assert status == 200
+    assert body['status'] == 'partial'
+    assert (body['accepted'], body['rejected']) == (2, 1)
+    assert [r['index'] for r in body['results']] == [0, 1, 2]
+    assert [r['status'] for r in body['results']] == ['ok', 'error', 'ok']
+    assert body['results'][1]['error'] == 'unknown moduleId'
+
+    stored = client.get('/api/broadcasts?limit=10')[2]['items']
+    assert {item['broadcast.id'] for item in stored} == {body['results'][0]['broadcast_id'],
+                                                        body['results'][2]['broadcast_id']}
+
+
+def test_wrapped_array_is_accepted(server):
+    _, client = server
+    status, _, body = client.post('/api/broadcasts', {'broadcasts': [{'moduleId': MODULE}]})
+    assert status == 200
+    assert body['status'] == 'ok' and body['accepted'] == 1
+
+
+def test_ndjson_batch_gets_unique_ids(server):
+    bs, client = server
+    records = [{'moduleId': MODULE, 'broadcastId': 'same-id'} for _ in range(3)]
+    status, _, body = client.post('/api/broadcasts', ndjson(records),
+                                  headers={'Content-Type': 'application/x-ndjson'})
+    assert status == 200
+    ids = [r['broadcast_id'] for r in body['results']]
+    assert ids == ['same-id', 'same-id-1', 'same-id-2']
+    with open(bs.LATEST_PATH, encoding='utf-8') as f:
+        assert json.load(f)['broadcast.id'] == 'same-id-2'
+
+
+def test_all_invalid_batch_is_rejected(server):
+    _, client = server
+    status, _, body = client.post('/api/broadcasts', [{}, {'moduleId': ''}])
+    assert status == 200
+    assert body['status'] == 'rejected' and body['accepted'] == 0
+
+
+def test_unparseable_body_is_400(server):
+    _, client = server
+    status, _, body = client.post('/api/broadcasts', b'[{', headers={'Content-Type': 'application/json'})
+    assert status == 400
+    assert body['error'] == 'invalid json'
@@ -0,0 +1,119 @@
+"""Month partitions: rows land in their own month, and range reads open only the months in range."""
+import csv
+
+import broadcast_partitions
+from broadcast_partitions import HEADER, PartitionedLog
+from broadcast_store import PartitionedBroadcastStore
+
+DAYS = ['2025-09-30', '2025-10-01', '2025-10-31', '2025-11-15', '2025-12-01', '']
+
+
+def row(broadcast_id, day, ts=None):
+    values = dict.fromkeys(HEADER, '')
+    values.update({'broadcast.id': broadcast_id, 'date': day, 'module.id': 'fourtwenty_analytics',
+                   'ts.utc5': ts if ts is not None else (day + 'T12:00:00-05:00' if day else '')})
+    return [values[h] for h in HEADER]
+
+
+def entry(broadcast_id, day):
+    values = dict(zip(HEADER, row(broadcast_id, day)))
+    values['tags.keys'] = []
+    return values
+
+
+def opened_partitions(monkeypatch):
+    opened = []
+    real = broadcast_partitions._open_body
+
+    def spy(path):
+        opened.append(path.split('date=')[1].split('/')[0])
+        return real(path)
+
+    monkeypatch.setattr(broadcast_partitions, '_open_body', spy)
+    return opened
+
+
+def test_rows_land_in_their_own_month(tmp_path):
+    log = PartitionedLog(str(tmp_path))
+    log.append([row(f'b{i}', day) for i, day in enumerate(DAYS)])
+    # a backdated row goes to its month's file, not the newest one
+    log.append([row('late', '2025-10-15')])
+    assert log.keys() == ['unknown', '2025-09', '2025-10', '2025-11', '2025-12']
+    with open(log.part_path('2025-10'), newline='', encoding='utf-8') as f:
+        assert [r['broadcast.id'] for r in csv.DictReader(f)] == ['b1', 'b2', 'late']
+    meta = log.refresh()['2025-10']
+    assert (meta['rows'], meta['min_date'], meta['max_date']) == (3, '2025-10-01', '2025-10-31')
+    # the date column wins; ts.utc5 is the fallback when there is none
+    assert broadcast_partitions.partition_key('', '2025-08-02T01:00:00-05:00') == '2025-08'
+    log.close()
+
+
+def test_prune_keeps_only_overlapping_months(tmp_path):
+    log = PartitionedLog(str(tmp_path))
+    log.append([row(f'b{i}', day) for i, day in enumerate(DAYS)])
+    assert log.prune('2025-10-05', '2025-11-20') == ['2025-10', '2025-11']
+    assert log.prune('2025-11-16', '2025-11-30') == []
+    assert log.prune(date_from='2025-11-15') == ['2025-11', '2025-12']
+    assert log.prune(date_to='2025-09-30') == ['2025-09']
+    # undated rows only come back from an unbounded read
+    assert log.prune() == ['unknown', '2025-09', '2025-10', '2025-11', '2025-12']
+    log.close()
+
+
+def test_range_read_opens_only_pruned_partitions(tmp_path, monkeypatch):
+    log = PartitionedLog(str(tmp_path))
+    log.append([row(f'b{i}', day) for i, day in enumerate(DAYS)])
+    opened = opened_partitions(monkeypatch)
+    ids = [r[0] for r in log.iter_rows('2025-10-01', '2025-10-30')]
+    assert ids == ['b1']
+    assert opened == ['2025-10']
+    log.close()
+
+
+def test_manifest_reload_rescans_only_grown_partitions(tmp_path):
+    log = PartitionedLog(str(tmp_path))
+    log.append([row(f'b{i}', day) for i, day in enumerate(DAYS)])
+    log.close()
+    with open(log.part_path('2025-11'), 'a', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(row('edit', '2025-11-30'))
+    reopened = PartitionedLog(str(tmp_path))
+    assert reopened.prune('2025-11-20', '2025-11-30') == ['2025-11']
+    assert reopened.rescans == 1
+    assert len(reopened) == len(DAYS) + 1
+
+
+def test_import_and_export_round_trip(tmp_path):
+    source = tmp_path / 'broadcast.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(row(f'b{i}', day) for i, day in enumerate(DAYS))
+    log = PartitionedLog(str(tmp_path / 'broadcast'))
+    assert log.import_csv(str(source)) == len(DAYS)
+    out = tmp_path / 'export.csv'
+    assert log.export_csv(str(out)) == len(DAYS)
+    with open(out, newline='', encoding='utf-8') as f:
+        exported = sorted(r['broadcast.id'] for r in csv.DictReader(f))
+    assert exported == sorted(f'b{i}' for i in range(len(DAYS)))
+
+
+def test_store_query_reads_only_months_in_range(tmp_path):
+    store = PartitionedBroadcastStore(str(tmp_path))
+    store.commit([[entry(f'b{i}', day) for i, day in enumerate(DAYS)]])
+    items, cursor = store.query(date_from='2025-10-01', date_to='2025-10-31')
+    assert [item['broadcast.id'] for item in items] == ['b2', 'b1']
+    assert cursor is None
+    assert set(store._indexes) == {'2025-10'}
+
+
+def test_store_pages_across_months_newest_first(tmp_path):
+    store = PartitionedBroadcastStore(str(tmp_path))
+    store.commit([[entry(f'b{i}', day) for i, day in enumerate(DAYS)]])
+    seen, cursor = [], None
+    while True:
+        items, cursor = store.query(date_from='2025-09-01', limit=2, cursor=cursor)
+        seen.extend(item['broadcast.id'] for item in items)
+        if cursor is None:
+            break
+    assert seen == ['b4', 'b3', 'b2', 'b1', 'b0']
+    assert 'unknown' not in store._indexes
@@ -0,0 +1,41 @@
+"""Storage engines: the CSV store's length is its row count, duplicates included."""
+import csv
+
+from broadcast_rollup import rebuild as rebuild_rollups
+from broadcast_store import HEADER, CsvBroadcastStore
+
+
+def write_log(path, ids):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for broadcast_id in ids:
+            row = dict.fromkeys(HEADER, '')
+            row.update({'broadcast.id': broadcast_id, 'ts.utc5': '2026-01-01T00:00:00-05:00',
+                        'date': '2026-01-01', 'module.id': 'fourtwenty_analytics'})
+            writer.writerow([row[h] for h in HEADER])
+
+
+def test_len_counts_rows_not_distinct_ids(tmp_path):
+    path = str(tmp_path / 'broadcast.csv')
+    write_log(path, ['a', 'a', 'b', '', 'c', 'b'])
+    store = CsvBroadcastStore(path)
+    assert len(store) == 5
+    assert len(store) == sum(1 for _ in store.iter_entries())
+    assert rebuild_rollups(store.iter_entries()).rows == len(store)
+
+
+def test_len_follows_appends_and_external_edits(tmp_path):
+    path = str(tmp_path / 'broadcast.csv')
+    write_log(path, ['a', 'a'])
+    store = CsvBroadcastStore(path)
+    assert len(store) == 2
+    row = dict.fromkeys(HEADER, '')
+    row.update({'broadcast.id': 'a', 'ts.utc5': '2026-01-02T00:00:00-05:00', 'date': '2026-01-02',
+                'module.id': 'fourtwenty_analytics', 'tags.keys': []})
+    store.commit([[row]])
+    assert row['broadcast.id'] == 'a-1'
+    assert len(store) == 3
+    store.close()
+    write_log(path, ['x', 'x', 'x', 'x'])
+    assert len(store) == 4
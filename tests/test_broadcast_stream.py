@@ -0,0 +1,127 @@
+"""GET /api/broadcasts/stream: live events, Last-Event-ID resume from the ring, reset on a gap."""
+import json
+import socket
+import time
+import urllib.parse
+
+MODULE = 'fourtwenty_analytics'
+
+
+class EventReader:
+    """A raw SSE connection; events() returns the next n (id, event, data) frames."""
+
+    def __init__(self, client, path='/api/broadcasts/stream', last_event_id=None):
+        host, port = urllib.parse.urlsplit(client.base).netloc.split(':')
+        self.sock = socket.create_connection((host, int(port)), timeout=5)
+        extra = f'Last-Event-ID: {last_event_id}\r\n' if last_event_id is not None else ''
+        self.sock.sendall(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n{extra}\r\n'
+                          .encode('ascii'))
+        self.buffer = b''
+        head = self._until(b'\r\n\r\n')
+        self.status = int(head.split(b' ', 2)[1])
+
+    def _until(self, sep):
+        while sep not in self.buffer:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError('stream closed')
+            self.buffer += chunk
+        block, self.buffer = self.buffer.split(sep, 1)
+        return block
+
+    def events(self, n):
+        out = []
+        while len(out) < n:
+            fields = {}
+            for line in self._until(b'\n\n').decode('utf-8').split('\n'):
+                key, _, value = line.partition(': ')
+                if key and not line.startswith(':'):
+                    fields[key] = value
+            if 'data' in fields:
+                out.append((int(fields['id']), fields.get('event'), json.loads(fields['data'])))
+        return out
+
+    def close(self):
+        self.sock.close()
+
+
+def post(client, name):
+    status, _, body = client.post('/api/broadcast', {'moduleId': MODULE, 'broadcastId': name})
+    assert status == 200
+    return body['broadcast_id']
+
+
+def wait_for_subscriber(bs, count=1):
+    deadline = time.monotonic() + 5
+    while bs.STREAM.stats()['clients'] < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_live_events_arrive_in_commit_order(server):
+    bs, client = server
+    reader = EventReader(client)
+    try:
+        assert reader.status == 200
+        wait_for_subscriber(bs)
+        ids = [post(client, 'live-a'), post(client, 'live-b')]
+        events = reader.events(2)
+    finally:
+        reader.close()
+    assert [e[0] for e in events] == [1, 2]
+    assert {e[1] for e in events} == {'broadcast'}
+    assert [e[2]['broadcast.id'] for e in events] == ids
+
+
+def test_last_event_id_replays_missed_events_then_goes_live(server):
+    bs, client = server
+    ids = [post(client, f'resume-{i}') for i in range(3)]
+    reader = EventReader(client, last_event_id=1)
+    try:
+        replayed = reader.events(2)
+        wait_for_subscriber(bs)
+        live_id = post(client, 'resume-live')
+        live = reader.events(1)
+    finally:
+        reader.close()
+    assert [(e[0], e[2]['broadcast.id']) for e in replayed] == [(2, ids[1]), (3, ids[2])]
+    assert [(e[0], e[2]['broadcast.id']) for e in live] == [(4, live_id)]
+    assert bs.STREAM.stats()['replayed'] == 2
+
+
+def test_query_parameter_resumes_like_the_header(server):
+    _, client = server
+    ids = [post(client, f'query-{i}') for i in range(2)]
+    reader = EventReader(client, path='/api/broadcasts/stream?last_event_id=1')
+    try:
+        events = reader.events(1)
+    finally:
+        reader.close()
+    assert [(e[0], e[2]['broadcast.id']) for e in events] == [(2, ids[1])]
+
+
+def test_resume_past_the_ring_gets_a_reset_first(server, monkeypatch):
+    bs, client = server
+    monkeypatch.setattr(bs, 'STREAM_RING', 2)
+    bs.configure_storage('csv')
+    ids = [post(client, f'gap-{i}') for i in range(4)]
+    reader = EventReader(client, last_event_id=1)
+    try:
+        events = reader.events(3)
+    finally:
+        reader.close()
+    reset, *replayed = events
+    assert reset[1] == 'reset'
+    assert reset[2] == {'reason': 'gap', 'last_event_id': 1, 'oldest_id': 3}
+    assert [(e[0], e[2]['broadcast.id']) for e in replayed] == [(3, ids[2]), (4, ids[3])]
+
+
+def test_unknown_future_id_gets_a_reset(server):
+    _, client = server
+    post(client, 'future')
+    reader = EventReader(client, last_event_id=99)
+    try:
+        (event_id, event, data), = reader.events(1)
+    finally:
+        reader.close()
+    assert (event_id, event) == (1, 'reset')
+    assert data['last_event_id'] == 99
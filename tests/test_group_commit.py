@@ -0,0 +1,116 @@
+"""Group commit: grouping, per-request results, durability policies and the batch size limit."""
+import csv
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import group_commit
+from broadcast_store import HEADER, CsvBroadcastStore
+from group_commit import GroupCommitter
+
+MODULE = 'fourtwenty_analytics'
+
+
+def entry(broadcast_id):
+    row = dict.fromkeys(HEADER, '')
+    row.update({'broadcast.id': broadcast_id, 'ts.utc5': '2026-01-01T00:00:00-05:00', 'date': '2026-01-01',
+                'module.id': MODULE, 'tags.keys': []})
+    return row
+
+
+def test_concurrent_submits_share_a_group_and_get_their_own_results():
+    calls = []
+
+    def commit(groups):
+        calls.append(groups)
+        return [[item * 10 for item in items] for items in groups]
+
+    committer = GroupCommitter(commit, interval_ms=200, max_rows=1000)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: committer.submit([i, i + 1]), range(8)))
+    finally:
+        committer.close()
+    assert results == [[i * 10, (i + 1) * 10] for i in range(8)]
+    assert committer.requests == 8 and committer.rows == 16
+    assert len(calls) < 8
+
+
+def test_commit_error_reaches_every_request_in_the_group():
+    def commit(groups):
+        raise ValueError('disk full')
+
+    committer = GroupCommitter(commit, interval_ms=50)
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            futures = [pool.submit(committer.submit, [i]) for i in range(4)]
+        for future in futures:
+            with pytest.raises(ValueError, match='disk full'):
+                future.result()
+    finally:
+        committer.close()
+
+
+def test_close_commits_what_is_queued_and_refuses_more():
+    committed = []
+    release = threading.Event()
+
+    def commit(groups):
+        release.wait(5)
+        committed.extend(groups)
+        return [None] * len(groups)
+
+    committer = GroupCommitter(commit, interval_ms=0)
+    threads = [threading.Thread(target=committer.submit, args=([i],)) for i in range(3)]
+    for t in threads:
+        t.start()
+    release.set()
+    committer.close()
+    for t in threads:
+        t.join(5)
+    assert sorted(sum(committed, [])) == [0, 1, 2]
+    with pytest.raises(RuntimeError):
+        committer.submit([3])
+
+
+@pytest.mark.parametrize('durability, fsyncs', [('none', 0), ('batch-fsync', 1), ('per-request-fsync', 3)])
+def test_csv_store_fsyncs_per_policy(tmp_path, monkeypatch, durability, fsyncs):
+    calls = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(group_commit.os, 'fsync', lambda fd: (calls.append(fd), real_fsync(fd)))
+    store = CsvBroadcastStore(str(tmp_path / 'broadcast.csv'))
+    groups = [[entry('a')], [entry('b'), entry('c')], [entry('a')]]
+    store.commit(groups, durability)
+    store.close()
+    assert len(calls) == fsyncs
+    with open(tmp_path / 'broadcast.csv', newline='', encoding='utf-8') as f:
+        ids = [row['broadcast.id'] for row in csv.DictReader(f)]
+    assert ids == ['a', 'b', 'c', 'a-1']
+
+
+@pytest.mark.parametrize('durability', ['none', 'batch-fsync', 'per-request-fsync'])
+def test_row_is_in_the_csv_before_the_response(server, durability):
+    bs, client = server
+    bs.configure_commit('group', durability, interval_ms=5)
+
+    def post(i):
+        status, _, body = client.post('/api/broadcast', {'moduleId': MODULE, 'broadcastId': f'gc-{i}'})
+        assert status == 200
+        with open(bs.CSV_PATH, newline='', encoding='utf-8') as f:
+            stored = {row['broadcast.id'] for row in csv.DictReader(f)}
+        return body['broadcast_id'] in stored
+
+    with ThreadPoolExecutor(8) as pool:
+        assert all(pool.map(post, range(24)))
+    assert bs.commit_stats()['group']['requests'] == 24
+
+
+def test_batch_over_the_limit_is_413(server, monkeypatch):
+    bs, client = server
+    monkeypatch.setattr(bs, 'BATCH_MAX', 2)
+    status, _, body = client.post('/api/broadcasts', [{'moduleId': MODULE}] * 3)
+    assert status == 413
+    assert body == {'error': 'batch too large', 'max_records': 2, 'details': 'a batch may hold at most 2 broadcasts'}
+    assert client.get('/api/broadcasts')[2]['count'] == 0
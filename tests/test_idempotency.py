@@ -0,0 +1,118 @@
+"""Idempotency-Key on POST /api/broadcast: replay, conflict, opt-in content hashing and the journal."""
+import json
+import threading
+
+from idempotency_cache import IdempotencyCache
+
+MODULE = 'fourtwenty_analytics'
+
+
+def broadcast(name):
+    return {'moduleId': MODULE, 'broadcastName': name}
+
+
+def stored_ids(client):
+    return [item['broadcast.id'] for item in client.get('/api/broadcasts?limit=50')[2]['items']]
+
+
+def test_retry_with_the_same_key_replays_the_first_result(server):
+    bs, client = server
+    headers = {'Idempotency-Key': 'retry-1'}
+    status, first_headers, first = client.post('/api/broadcast', broadcast('once'), headers)
+    assert status == 200 and first_headers.get('Idempotent-Replayed') is None
+    with open(bs.LATEST_PATH, 'rb') as f:
+        latest = f.read()
+
+    status, replay_headers, replay = client.post('/api/broadcast', broadcast('once'), headers)
+    assert status == 200
+    assert replay == first
+    assert replay_headers.get('Idempotent-Replayed') == 'true'
+    assert stored_ids(client) == [first['broadcast_id']]
+    with open(bs.LATEST_PATH, 'rb') as f:
+        assert f.read() == latest
+
+
+def test_same_key_for_a_different_payload_is_422(server):
+    _, client = server
+    headers = {'Idempotency-Key': 'conflict'}
+    first = client.post('/api/broadcast', broadcast('original'), headers)[2]
+    status, _, body = client.post('/api/broadcast', broadcast('changed'), headers)
+    assert status == 422
+    assert body['error'] == 'Idempotency-Key was already used for a different payload'
+    assert stored_ids(client) == [first['broadcast_id']]
+
+
+def test_requests_without_a_key_are_never_deduplicated(server):
+    _, client = server
+    payload = dict(broadcast('twice'), broadcastId='same')
+    ids = [client.post('/api/broadcast', payload)[2]['broadcast_id'] for _ in range(2)]
+    assert ids == ['same', 'same-1']
+
+
+def test_content_hashing_is_opt_in(server, monkeypatch):
+    bs, client = server
+    monkeypatch.setattr(bs, 'IDEMPOTENCY_CONTENT_TTL', 60.0)
+    first = client.post('/api/broadcast', broadcast('hashed'))[2]
+    status, headers, replay = client.post('/api/broadcast', broadcast('hashed'))
+    assert replay == first and headers.get('Idempotent-Replayed') == 'true'
+    # fields the stored row never sees do not change the hash
+    assert client.post('/api/broadcast', dict(broadcast('hashed'), ignored=1))[2] == first
+
+
+def test_failed_attempts_are_not_remembered(server):
+    _, client = server
+    headers = {'Idempotency-Key': 'fix-and-retry'}
+    status, _, _ = client.post('/api/broadcast', {'moduleId': 'no_such_module'}, headers)
+    assert status == 400
+    status, headers_out, _ = client.post('/api/broadcast', broadcast('fixed'), headers)
+    assert status == 200 and headers_out.get('Idempotent-Replayed') is None
+
+
+def test_overlong_key_is_400(server):
+    _, client = server
+    status, _, body = client.post('/api/broadcast', broadcast('x'), {'Idempotency-Key': 'k' * 256})
+    assert status == 400 and body['error'] == 'invalid Idempotency-Key'
+
+
+def test_keys_survive_a_restart_through_the_journal(server):
+    bs, client = server
+    first = client.post('/api/broadcast', broadcast('durable'), {'Idempotency-Key': 'restart'})[2]
+    bs.IDEMPOTENCY.flush()
+    with open(bs.IDEMPOTENCY_PATH, encoding='utf-8') as f:
+        assert [json.loads(line)['key'] for line in f] == ['key:restart']
+    reopened = IdempotencyCache(bs.IDEMPOTENCY_PATH)
+    fingerprint = bs.idempotency_key('restart', broadcast('durable'))[1]
+    assert reopened.begin('key:restart', fingerprint) == ('hit', first)
+    assert reopened.begin('key:restart', 'other') == ('mismatch', None)
+
+
+def test_concurrent_retry_waits_for_the_first_attempt(tmp_path):
+    cache = IdempotencyCache(str(tmp_path / 'idempotency.jsonl'), wait=5)
+    assert cache.begin('k', 'fp') == ('owner', None)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(cache.begin('k', 'fp')))
+    waiter.start()
+    cache.complete('k', {'broadcast_id': 'b1'})
+    waiter.join(5)
+    assert results == [('hit', {'broadcast_id': 'b1'})]
+
+
+def test_busy_key_gives_up_after_the_wait(tmp_path):
+    cache = IdempotencyCache(str(tmp_path / 'idempotency.jsonl'), wait=0.05)
+    assert cache.begin('k', 'fp') == ('owner', None)
+    assert cache.begin('k', 'fp') == ('busy', None)
+    cache.abandon('k')
+    assert cache.begin('k', 'fp') == ('owner', None)
+
+
+def test_expired_and_evicted_keys_are_forgotten(tmp_path):
+    path = str(tmp_path / 'idempotency.jsonl')
+    cache = IdempotencyCache(path, max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.begin(key, 'fp')
+        cache.complete(key, {'broadcast_id': key}, ttl=60 if key != 'b' else -1)
+    assert cache.begin('a', 'fp') == ('owner', None)
+    assert cache.begin('b', 'fp') == ('owner', None)
+    assert cache.begin('c', 'fp') == ('hit', {'broadcast_id': 'c'})
+    stats = cache.stats()
+    assert (stats['evicted'], stats['expired']) == (1, 1)
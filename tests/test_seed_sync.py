@@ -0,0 +1,94 @@
+"""seed_sync: seedset resolution against an empty checkout, resyncs and module-owned files."""
+import json
+import os
+
+import seed_sync
+
+ENTRIES = [
+    'seeds/tags.yml',
+    'schemas/broadcast.schema.yml',
+    'signals/latest.json',
+    'data/internal/',
+    'scrubs/',
+    'data/internal/broadcast.csv',
+]
+
+
+def make_hub(root):
+    files = {
+        'seeds/tags.yml': 'tags: []\n',
+        'schema/broadcast.schema.yml': 'type: object\n',
+        'signals/latest.json': '{"broadcast.id": "hub"}\n',
+        'data/internal/broadcast.csv': 'broadcast.id\nhub-1\n',
+        'scrubs/report.json': '{}\n',
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+
+
+def run(hub, target, **kwargs):
+    report = seed_sync.sync([('module_a', str(target))], ENTRIES, apply=True, root=str(hub), **kwargs)
+    return report['repos'][0]
+
+
+def test_empty_target_gets_files_and_bare_directories(tmp_path):
+    hub, target = tmp_path / 'hub', tmp_path / 'module'
+    make_hub(hub)
+    target.mkdir()
+    result = run(hub, target)
+    assert sorted(result['changed']) == ['schemas/broadcast.schema.yml', 'seeds/tags.yml', 'signals/latest.json']
+    assert sorted(result['created_dirs']) == ['data/internal', 'scrubs']
+    assert os.listdir(target / 'data' / 'internal') == []
+    assert os.listdir(target / 'scrubs') == []
+    assert (target / 'schemas' / 'broadcast.schema.yml').read_text(encoding='utf-8') == 'type: object\n'
+
+
+def test_module_latest_signal_is_never_overwritten(tmp_path):
+    hub, target = tmp_path / 'hub', tmp_path / 'module'
+    make_hub(hub)
+    (target / 'signals').mkdir(parents=True)
+    (target / 'signals' / 'latest.json').write_text('{"broadcast.id": "mine"}\n', encoding='utf-8')
+    result = run(hub, target)
+    assert 'signals/latest.json' not in result['changed']
+    assert result['kept'] == 1
+    assert json.loads((target / 'signals' / 'latest.json').read_text(encoding='utf-8')) == {'broadcast.id': 'mine'}
+
+
+def test_resync_copies_nothing_and_restores_local_edits(tmp_path):
+    hub, target = tmp_path / 'hub', tmp_path / 'module'
+    make_hub(hub)
+    target.mkdir()
+    run(hub, target)
+    again = run(hub, target)
+    assert again['changed'] == [] and again['bytes_copied'] == 0 and again['created_dirs'] == []
+    with open(target / 'seeds' / 'tags.yml', 'a', encoding='utf-8') as f:
+        f.write('# local edit\n')
+    edited = run(hub, target)
+    assert edited['changed'] == ['seeds/tags.yml']
+    assert (target / 'seeds' / 'tags.yml').read_text(encoding='utf-8') == 'tags: []\n'
+
+
+def test_prune_never_deletes_module_owned_files(tmp_path):
+    hub, target = tmp_path / 'hub', tmp_path / 'module'
+    make_hub(hub)
+    target.mkdir()
+    run(hub, target)
+    # a record left by an older sync that pushed hub logs and reports into the module
+    for rel in ('data/internal/broadcast.csv', 'scrubs/report.json', 'seeds/old.yml'):
+        (target / rel).parent.mkdir(parents=True, exist_ok=True)
+        (target / rel).write_text('module data\n', encoding='utf-8')
+    record_path = target / seed_sync.MANIFEST_NAME
+    record = json.loads(record_path.read_text(encoding='utf-8'))
+    for rel in ('data/internal/broadcast.csv', 'scrubs/report.json', 'seeds/old.yml'):
+        record['files'][rel] = {'sha1': 'x', 'mtime_ns': 0}
+    record_path.write_text(json.dumps(record), encoding='utf-8')
+
+    result = run(hub, target, prune=True)
+    assert result['stale'] == ['seeds/old.yml']
+    assert not (target / 'seeds' / 'old.yml').exists()
+    assert (target / 'data' / 'internal' / 'broadcast.csv').read_text(encoding='utf-8') == 'module data\n'
+    assert (target / 'scrubs' / 'report.json').exists()
+    assert set(json.loads(record_path.read_text(encoding='utf-8'))['files']) == {
+        'schemas/broadcast.schema.yml', 'seeds/tags.yml'}
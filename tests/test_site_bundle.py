@@ -0,0 +1,58 @@
+"""StaticSite serves a bundle that is never older than the raw files it was built from."""
+import json
+import os
+
+from site_bundle import StaticSite
+
+
+def make_root(root):
+    files = {
+        'README.md': '# Hub\n\nintro\n\n## Usage\n\nrun it\n',
+        'seeds/modules.yml': '- id: fourtwenty_analytics\n',
+        'seeds/statuses.yml': 'active: {}\n',
+        'signals/latest.json': json.dumps({'broadcast.id': 'first'}),
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+
+
+def site_json(site):
+    body, etag = site.get('/bundle/site.json').variants['identity']
+    return json.loads(body), etag
+
+
+def test_bundle_is_built_on_first_request(tmp_path):
+    make_root(tmp_path)
+    site = StaticSite(str(tmp_path))
+    doc, _ = site_json(site)
+    assert doc['modules'] == [{'id': 'fourtwenty_analytics'}]
+    assert [s['title'] for s in doc['readme']['sections']] == ['Hub', 'Usage']
+    assert site.get('/bundle/' + doc['readme']['sections'][1]['file']) is not None
+
+
+def test_source_change_rebuilds_before_serving(tmp_path):
+    make_root(tmp_path)
+    site = StaticSite(str(tmp_path))
+    doc, etag = site_json(site)
+    assert doc['signals'][0]['broadcast.id'] == 'first'
+    assert site_json(site)[1] == etag and site.builds == 1
+
+    latest = tmp_path / 'signals' / 'latest.json'
+    latest.write_text(json.dumps({'broadcast.id': 'second!'}), encoding='utf-8')
+    doc, new_etag = site_json(site)
+    assert doc['signals'][0]['broadcast.id'] == 'second!'
+    assert new_etag != etag and site.builds == 2
+
+    # touched but identical: the build is skipped and the ETag holds
+    os.utime(latest, ns=(1, 1))
+    assert site_json(site)[1] == new_etag
+
+
+def test_site_without_bundle_404s_site_json(tmp_path):
+    make_root(tmp_path)
+    site = StaticSite(str(tmp_path), dirs=('seeds', 'signals'), bundle=None)
+    assert site.get('/bundle/site.json') is None
+    assert not (tmp_path / 'bundle').exists()
+    assert site.get('/README.md') is not None